@@ -0,0 +1,137 @@
+# isort: skip_file
+# Needs to be first to set up django environment
+from . import helpers  # noqa: F401
+import tracemalloc
+
+from posthog.hogql import ast
+from posthog.hogql.context import HogQLContext
+from posthog.hogql.printer import print_ast
+from posthog.hogql.visitor import clone_expr
+from posthog.hogql_queries.insights.funnels.funnels_query_runner import FunnelsQueryRunner
+from posthog.hogql_queries.insights.lifecycle_query_runner import LifecycleQueryRunner
+from posthog.hogql_queries.insights.paths_query_runner import PathsQueryRunner
+from posthog.hogql_queries.insights.retention_query_runner import RetentionQueryRunner
+from posthog.hogql_queries.insights.trends.trends_query_runner import TrendsQueryRunner
+from posthog.hogql_queries.query_runner import QueryRunner
+from posthog.models import Organization, Team
+from posthog.schema import (
+    BaseMathType,
+    BreakdownFilter,
+    EventPropertyFilter,
+    EventsNode,
+    FunnelsQuery,
+    InsightDateRange,
+    LifecycleQuery,
+    PathsFilter,
+    PathsQuery,
+    PathType,
+    PersonPropertyFilter,
+    PropertyOperator,
+    RetentionFilter,
+    RetentionQuery,
+    TrendsQuery,
+)
+
+DATE_RANGE = InsightDateRange(date_from="2021-01-01", date_to="2021-10-01")
+PROPERTIES = [
+    EventPropertyFilter(key="$browser", value=["Chrome", "Safari"], operator=PropertyOperator.EXACT),
+    PersonPropertyFilter(key="email", value="@posthog.com", operator=PropertyOperator.NOT_ICONTAINS),
+]
+
+
+def insight_query_runner(insight: str, team: Team) -> QueryRunner:
+    if insight == "trends":
+        return TrendsQueryRunner(
+            query=TrendsQuery(
+                dateRange=DATE_RANGE,
+                series=[
+                    EventsNode(event="$pageview"),
+                    EventsNode(event="$pageview", math=BaseMathType.DAU),
+                    EventsNode(event="signed up", math=BaseMathType.WEEKLY_ACTIVE),
+                ],
+                properties=PROPERTIES,
+                breakdownFilter=BreakdownFilter(breakdown="$browser"),
+            ),
+            team=team,
+        )
+    if insight == "funnel":
+        return FunnelsQueryRunner(
+            query=FunnelsQuery(
+                dateRange=DATE_RANGE,
+                series=[EventsNode(event=event) for event in ("$pageview", "viewed pricing", "signed up", "paid")],
+                properties=PROPERTIES,
+                breakdownFilter=BreakdownFilter(breakdown="$browser"),
+            ),
+            team=team,
+        )
+    if insight == "retention":
+        return RetentionQueryRunner(
+            query=RetentionQuery(dateRange=DATE_RANGE, properties=PROPERTIES, retentionFilter=RetentionFilter()),
+            team=team,
+        )
+    if insight == "paths":
+        return PathsQueryRunner(
+            query=PathsQuery(
+                dateRange=DATE_RANGE,
+                properties=PROPERTIES,
+                pathsFilter=PathsFilter(includeEventTypes=[PathType.FIELD_PAGEVIEW, PathType.CUSTOM_EVENT]),
+            ),
+            team=team,
+        )
+    return LifecycleQueryRunner(
+        query=LifecycleQuery(dateRange=DATE_RANGE, series=[EventsNode(event="$pageview")]),
+        team=team,
+    )
+
+
+class HogQLCompileSuite:
+    """
+    How long insight queries take to compile from HogQL to ClickHouse SQL, without running them, and how large and
+    quick to clone their ASTs are
+    """
+
+    timeout = 600.0
+    version = "v001"
+    params = ["trends", "funnel", "retention", "paths", "lifecycle"]
+    param_names = ["insight"]
+
+    runner: QueryRunner
+    query: ast.SelectQuery | ast.SelectUnionQuery
+
+    def setup(self, insight):
+        # :TRICKY: Data in benchmark servers has ID=2
+        team = Team.objects.filter(id=2).first()
+        if team is None:
+            organization = Organization.objects.create()
+            team = Team.objects.create(id=2, organization=organization, name="The Bakery")
+        self.runner = insight_query_runner(insight, team)
+        query = self.runner.to_query()
+        assert isinstance(query, ast.SelectQuery | ast.SelectUnionQuery)
+        self.query = query
+        # Warm up caches that aren't being measured, like the parser's and the database schema's
+        self.time_compile(insight)
+
+    def time_compile(self, insight):
+        query = self.runner.to_query()
+        assert isinstance(query, ast.SelectQuery | ast.SelectUnionQuery)
+        print_ast(
+            query,
+            HogQLContext(team_id=self.runner.team.pk, enable_select_queries=True, modifiers=self.runner.modifiers),
+            "clickhouse",
+        )
+
+    def time_clone(self, insight):
+        clone_expr(self.query)
+
+    def track_ast_bytes(self, insight):
+        tracemalloc.start()
+        try:
+            query = self.runner.to_query()
+            # what is still allocated while the query is, i.e. the AST and not the garbage made building it
+            ast_bytes = tracemalloc.get_traced_memory()[0]
+            del query
+            return ast_bytes
+        finally:
+            tracemalloc.stop()
+
+    track_ast_bytes.unit = "bytes"  # type: ignore[attr-defined]
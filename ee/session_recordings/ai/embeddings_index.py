@@ -0,0 +1,336 @@
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+import structlog
+from django.conf import settings
+from prometheus_client import Histogram
+from sklearn.cluster import MiniBatchKMeans
+
+from posthog.caching.bounded_cache import BoundedLRUCache
+from posthog.clickhouse.client import sync_execute_iter
+
+logger = structlog.get_logger(__name__)
+
+REFRESH_RECORDING_EMBEDDINGS_INDEX_TIMING = Histogram(
+    "posthog_session_recordings_refresh_recording_embeddings_index",
+    "Time spent loading new recording embeddings into a team's nearest neighbour index",
+)
+
+# embeddings older than this are dropped, as they are from ClickHouse queries
+MAX_EMBEDDING_AGE_SECONDS = 7 * 24 * 60 * 60
+# how often an index checks ClickHouse for embeddings generated since it was last refreshed
+REFRESH_INTERVAL_SECONDS = 60
+# below this many embeddings, scanning all of them is about as fast as scanning only the nearest lists
+MIN_EMBEDDINGS_FOR_INVERTED_LISTS = 10_000
+# how many of the lists with the nearest centroids are scanned for neighbours
+PROBED_LISTS = 8
+# roughly what each recording costs besides its embedding, in its session_id string and the entries pointing to it
+SESSION_ID_BYTES = 200
+# how long an index found too large to keep isn't loaded again for
+TOO_LARGE_RETRY_INTERVAL_SECONDS = 60 * 60
+
+
+class RecordingEmbeddingsIndex:
+    """
+    An approximate nearest neighbour index of the latest session embedding of each of a team's recordings.
+
+    Embeddings are normalized and kept in one float32 matrix, so that cosine distance is one matrix-vector product.
+    Once there are enough of them, they are split into lists around k-means centroids (an inverted file index), and
+    only the lists with the centroids nearest to a recording are scanned for its neighbours. The rows of each list
+    are kept together, so scanning one doesn't copy its embeddings. New embeddings are appended after them with the
+    list of their nearest centroid, and the centroids are retrained once the index has doubled in size.
+
+    Only `refresh` changes the index, from one thread at a time, holding the lock only while it changes what readers
+    see. Readers hold the lock while they use the index.
+    """
+
+    def __init__(self, team_id: int) -> None:
+        self.team_id = team_id
+        self.lock = threading.Lock()
+        self.session_ids: list[str] = []
+        self.positions: dict[str, int] = {}
+        self.size = 0
+        # rows beyond size are spare capacity, so adding embeddings doesn't copy the matrix every time
+        self.embeddings: Optional[np.ndarray] = None
+        self.generated_at = np.empty(0, dtype=np.float64)
+        self.centroids: Optional[np.ndarray] = None
+        self.lists = np.empty(0, dtype=np.int32)
+        # rows before trained_size are sorted by list, list i being the rows from list_offsets[i] to list_offsets[i + 1]
+        self.trained_size = 0
+        self.list_offsets = np.empty(0, dtype=np.int64)
+        self.refreshed_at: float = 0
+        # unix timestamp in seconds of the newest embedding loaded from ClickHouse
+        self.last_generated_at: Optional[int] = None
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Roughly how much memory the index takes, including the copy of its embeddings made while retraining it
+        """
+        arrays = [self.embeddings, self.generated_at, self.lists, self.centroids, self.list_offsets]
+        training_copy_nbytes = self.embeddings[: self.size].nbytes if self.embeddings is not None else 0
+        return (
+            sum(array.nbytes for array in arrays if array is not None)
+            + training_copy_nbytes
+            + SESSION_ID_BYTES * len(self.session_ids)
+        )
+
+    def add(self, session_ids: list[str], embeddings: np.ndarray, generated_at: np.ndarray) -> None:
+        """
+        Adds embeddings to the index, replacing any earlier embedding of the same recording. Callers must hold the
+        lock if the index is being read.
+        """
+        if not len(session_ids):
+            return
+
+        embeddings = embeddings.astype(np.float32, copy=False)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.where(norms == 0, 1, norms)
+
+        if self.embeddings is None:
+            self.embeddings = np.empty((0, embeddings.shape[1]), dtype=np.float32)
+
+        positions = np.empty(len(session_ids), dtype=np.int64)
+        for i, session_id in enumerate(session_ids):
+            position = self.positions.get(session_id)
+            if position is None:
+                position = self.positions[session_id] = len(self.session_ids)
+                self.session_ids.append(session_id)
+            positions[i] = position
+        self._grow(len(self.session_ids))
+
+        self.embeddings[positions] = embeddings
+        self.generated_at[positions] = generated_at
+        self.size = len(self.session_ids)
+
+        if self.centroids is not None:
+            # a replaced embedding of a trained row stays in its list, so that the trained rows stay sorted by list
+            added = positions >= self.trained_size
+            self.lists[positions[added]] = self._nearest_centroids(embeddings[added])
+
+    def _grow(self, size: int) -> None:
+        assert self.embeddings is not None
+        capacity = len(self.embeddings)
+        if size <= capacity:
+            return
+
+        capacity = max(size, 2 * capacity)
+        embeddings = np.empty((capacity, self.embeddings.shape[1]), dtype=np.float32)
+        embeddings[: self.size] = self.embeddings[: self.size]
+        self.embeddings = embeddings
+        self.generated_at = np.resize(self.generated_at, capacity)
+        self.lists = np.resize(self.lists, capacity)
+
+    def train_if_due(self) -> None:
+        """
+        Trains the centroids once there are enough embeddings, and again each time the index has doubled in size.
+        Training reads the index without the lock, so it must be called from the thread that changes the index.
+        An index too large to be kept isn't trained, as it is dropped anyway.
+        """
+        if (
+            self.size >= MIN_EMBEDDINGS_FOR_INVERTED_LISTS
+            and self.size >= 2 * self.trained_size
+            and self.nbytes <= settings.REPLAY_EMBEDDINGS_INDEX_MAX_BYTES
+        ):
+            self._train()
+
+    def _train(self) -> None:
+        assert self.embeddings is not None
+        size = self.size
+        n_lists = int(math.sqrt(size))
+        kmeans = MiniBatchKMeans(n_clusters=n_lists, n_init=1, random_state=0, batch_size=max(1024, 4 * n_lists))
+        kmeans.fit(self.embeddings[:size])
+        centroids = kmeans.cluster_centers_.astype(np.float32)
+        centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+
+        lists = self._nearest_centroids(self.embeddings[:size], centroids)
+        order = np.argsort(lists, kind="stable")
+        embeddings = self.embeddings[order]
+        generated_at = self.generated_at[order]
+        session_ids = [self.session_ids[position] for position in order]
+        positions = {session_id: position for position, session_id in enumerate(session_ids)}
+
+        # readers only wait for the trained index to be swapped in
+        with self.lock:
+            self.centroids = centroids
+            self.embeddings[:size] = embeddings
+            self.generated_at[:size] = generated_at
+            self.lists[:size] = lists[order]
+            self.session_ids = session_ids
+            self.positions = positions
+            self.trained_size = size
+            self.list_offsets = np.searchsorted(self.lists[:size], np.arange(n_lists + 1))
+
+    def _nearest_centroids(
+        self, embeddings: np.ndarray, centroids: Optional[np.ndarray] = None, chunk_size: int = 10_000
+    ) -> np.ndarray:
+        if centroids is None:
+            centroids = self.centroids
+        assert centroids is not None
+        return np.concatenate(
+            [
+                np.argmax(embeddings[start : start + chunk_size] @ centroids.T, axis=1)
+                for start in range(0, len(embeddings), chunk_size)
+            ]
+        ).astype(np.int32)
+
+    def remove_older_than(self, generated_before: float) -> None:
+        """
+        Removes the embeddings generated before the given unix timestamp. Callers must hold the lock if the index is
+        being read.
+        """
+        keep = self.generated_at[: self.size] >= generated_before
+        if keep.all():
+            return
+
+        assert self.embeddings is not None
+        kept = np.flatnonzero(keep)
+        self.session_ids = [self.session_ids[position] for position in kept]
+        self.positions = {session_id: position for position, session_id in enumerate(self.session_ids)}
+        self.embeddings = self.embeddings[kept]
+        self.generated_at = self.generated_at[kept]
+        self.lists = self.lists[kept]
+        self.size = len(kept)
+
+        # removing rows keeps the rest in order, so the trained rows are still sorted by list
+        self.trained_size = int(keep[: self.trained_size].sum())
+        if self.centroids is not None:
+            self.list_offsets = np.searchsorted(self.lists[: self.trained_size], np.arange(len(self.centroids) + 1))
+
+    def nearest(self, session_id: str, limit: int) -> list[tuple[str, float]]:
+        """
+        Returns up to limit other recordings with the closest embeddings, and their cosine distance, closest first
+        """
+        position = self.positions.get(session_id)
+        if position is None or self.embeddings is None:
+            return []
+
+        target = self.embeddings[position]
+        if self.centroids is not None:
+            probed_lists = np.argsort(self.centroids @ target)[-PROBED_LISTS:]
+            slices = [slice(self.list_offsets[i], self.list_offsets[i + 1]) for i in probed_lists]
+            added_since_training = self.trained_size + np.flatnonzero(
+                np.isin(self.lists[self.trained_size : self.size], probed_lists)
+            )
+            candidates = np.concatenate([np.arange(s.start, s.stop) for s in slices] + [added_since_training])
+            similarities = np.concatenate(
+                [self.embeddings[s] @ target for s in slices] + [self.embeddings[added_since_training] @ target]
+            )
+        else:
+            candidates = np.arange(self.size)
+            similarities = self.embeddings[: self.size] @ target
+
+        not_target = candidates != position
+        candidates = candidates[not_target]
+        distances = 1 - similarities[not_target]
+        if len(candidates) > limit:
+            closest = np.argpartition(distances, limit)[:limit]
+        else:
+            closest = np.arange(len(candidates))
+        closest = closest[np.argsort(distances[closest])]
+
+        return [(self.session_ids[candidates[i]], float(distances[i])) for i in closest]
+
+    def refresh(self) -> None:
+        """
+        Loads the embeddings generated since the index was last refreshed from ClickHouse
+        """
+        with REFRESH_RECORDING_EMBEDDINGS_INDEX_TIMING.time():
+            for session_ids, embeddings, generated_at in fetch_recording_embeddings(
+                self.team_id, since=self.last_generated_at
+            ):
+                with self.lock:
+                    self.add(session_ids, embeddings, generated_at)
+                self.last_generated_at = max(self.last_generated_at or 0, int(generated_at.max()))
+
+            with self.lock:
+                self.remove_older_than(time.time() - MAX_EMBEDDING_AGE_SECONDS)
+            self.train_if_due()
+            self.refreshed_at = time.monotonic()
+
+
+def fetch_recording_embeddings(team_id: int, since: Optional[int] = None):
+    """
+    Yields the latest session embedding of each recording a block of rows at a time, with the embeddings as a float32
+    matrix, so that they are never all held as lists of Python floats
+    """
+    query = """
+            SELECT
+                session_id,
+                argMax(embeddings, generation_timestamp),
+                toUnixTimestamp(max(generation_timestamp))
+            FROM
+                session_replay_embeddings
+            WHERE
+                team_id = %(team_id)s
+                -- don't load all data for all time
+                AND generation_timestamp > now() - INTERVAL 7 DAY
+                AND source_type = 'session'
+                {since_clause}
+            GROUP BY session_id
+        """.format(
+        # embeddings generated in the same second as the last ones loaded are loaded again, which is harmless
+        since_clause="AND generation_timestamp >= toDateTime(%(since)s)" if since is not None else ""
+    )
+
+    for block in sync_execute_iter(query, {"team_id": team_id, "since": since}):
+        yield (
+            [row[0] for row in block.rows],
+            np.asarray([row[1] for row in block.rows], dtype=np.float32),
+            np.asarray([row[2] for row in block.rows], dtype=np.float64),
+        )
+
+
+# the indexes of the teams whose similar recordings were last looked for, up to a total size
+_indexes: BoundedLRUCache[int, RecordingEmbeddingsIndex] = BoundedLRUCache(
+    max_entries=settings.REPLAY_EMBEDDINGS_INDEX_MAX_TEAMS,
+    max_weight=settings.REPLAY_EMBEDDINGS_INDEX_MAX_BYTES,
+    weigh=lambda team_id, index: index.nbytes,
+)
+_refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recording_embeddings_index")
+_refreshing: set[int] = set()
+# monotonic time each team's index was last found too large to keep
+_too_large_at: dict[int, float] = {}
+_refreshing_lock = threading.Lock()
+
+
+def recording_embeddings_index(team_id: int) -> Optional[RecordingEmbeddingsIndex]:
+    """
+    Returns the team's index, or None until it has been loaded. Indexes are loaded, and refreshed at most every
+    REFRESH_INTERVAL_SECONDS, in the background, so that callers never wait for them.
+    Callers must hold its lock while using it.
+    """
+    index = _indexes.get(team_id)
+    if index is None or time.monotonic() - index.refreshed_at > REFRESH_INTERVAL_SECONDS:
+        with _refreshing_lock:
+            too_large_at = _too_large_at.get(team_id)
+            if team_id in _refreshing or (
+                too_large_at is not None and time.monotonic() - too_large_at < TOO_LARGE_RETRY_INTERVAL_SECONDS
+            ):
+                return index
+            _refreshing.add(team_id)
+        _refresh_executor.submit(_refresh_index, team_id, index)
+
+    return index
+
+
+def _refresh_index(team_id: int, index: Optional[RecordingEmbeddingsIndex]) -> None:
+    try:
+        if index is None:
+            index = RecordingEmbeddingsIndex(team_id)
+        index.refresh()
+        # stored again, as the index has grown, which evicts the indexes used longest ago if they don't all fit
+        if not _indexes.set(team_id, index):
+            _indexes.pop(team_id)
+            with _refreshing_lock:
+                _too_large_at[team_id] = time.monotonic()
+            logger.warning("recording_embeddings_index_too_large", team_id=team_id, nbytes=index.nbytes)
+    except Exception as e:
+        logger.exception("recording_embeddings_index_refresh_failed", team_id=team_id, error=e)
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(team_id)
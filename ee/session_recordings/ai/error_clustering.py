@@ -1,12 +1,20 @@
+import pickle
+from dataclasses import dataclass
+
+import structlog
 from prometheus_client import Histogram
 from django.conf import settings
-from posthog.clickhouse.client import sync_execute
+from django.core.cache import cache
+from posthog.clickhouse.client import sync_execute_iter
 from posthog.models import Team
 from sklearn.cluster import DBSCAN
+from sklearn.neighbors import BallTree
 import pandas as pd
 import numpy as np
 from posthog.session_recordings.models.session_recording_event import SessionRecordingViewed
-from datetime import date
+from datetime import date, datetime, timedelta, UTC
+
+logger = structlog.get_logger(__name__)
 
 CLUSTER_REPLAY_ERRORS_TIMING = Histogram(
     "posthog_session_recordings_cluster_replay_errors",
@@ -24,23 +32,123 @@ CLUSTER_REPLAY_ERRORS_CLUSTER_COUNT = Histogram(
 DBSCAN_EPS = settings.REPLAY_EMBEDDINGS_CLUSTERING_DBSCAN_EPS
 DBSCAN_MIN_SAMPLES = settings.REPLAY_EMBEDDINGS_CLUSTERING_DBSCAN_MIN_SAMPLES
 
+# clusters are rebuilt from scratch at least this often, even if no new errors are left unassigned
+FULL_CLUSTERING_INTERVAL = timedelta(days=1)
+
+# the columns that tell one embedded error from another, as errors of one session embedded together share a timestamp
+ERROR_KEY_COLUMNS = ["session_id", "error", "timestamp"]
+
+# states larger than this aren't cached, so teams with that many errors are clustered from scratch every time
+MAX_STATE_BYTES = settings.REPLAY_EMBEDDINGS_CLUSTERING_MAX_STATE_BYTES
+
 
-def error_clustering(team: Team):
-    results = fetch_error_embeddings(team.pk)
+@dataclass
+class ErrorClusteringState:
+    """
+    What incremental clustering of a team's errors needs to carry on from its last run
+    """
 
-    if not results:
+    # the errors of the last 7 days, with their cluster
+    errors: pd.DataFrame
+    # the embeddings of the core samples found by DBSCAN, and their cluster
+    core_samples: np.ndarray
+    core_samples_clusters: np.ndarray
+    last_generation_timestamp: datetime
+    clustered_at: datetime
+    # errors not near any existing cluster since the clusters were built
+    unassigned_count: int = 0
+
+
+def error_clustering(team: Team, incremental: bool = False):
+    if incremental:
+        errors = incremental_error_clustering(team.pk)
+    else:
+        state = full_error_clustering(team.pk)
+        errors = state.errors if state else None
+
+    if errors is None or errors.empty:
         return []
 
-    df = pd.DataFrame(results, columns=["session_id", "error", "embeddings", "timestamp"])
+    CLUSTER_REPLAY_ERRORS_CLUSTER_COUNT.labels(team_id=team.pk).observe(errors["cluster"].nunique())
+
+    return construct_response(errors, team)
 
-    df["cluster"] = cluster_embeddings(df["embeddings"].tolist())
 
-    CLUSTER_REPLAY_ERRORS_CLUSTER_COUNT.labels(team_id=team.pk).observe(df["cluster"].nunique())
+def full_error_clustering(team_id: int) -> ErrorClusteringState | None:
+    errors, embeddings = fetch_error_embeddings(team_id)
 
-    return construct_response(df, team)
+    if errors.empty:
+        return None
 
+    dbscan = cluster_embeddings(embeddings)
+    errors["cluster"] = dbscan.labels_
 
-def fetch_error_embeddings(team_id: int):
+    core_samples = dbscan.core_sample_indices_
+    return ErrorClusteringState(
+        errors=errors,
+        core_samples=embeddings[core_samples],
+        core_samples_clusters=dbscan.labels_[core_samples],
+        last_generation_timestamp=errors["timestamp"].max(),
+        clustered_at=datetime.now(tz=UTC),
+    )
+
+
+def incremental_error_clustering(team_id: int) -> pd.DataFrame | None:
+    """
+    Clusters only the errors embedded since the last run, adding each of them to the cluster of the nearest core
+    sample within DBSCAN_EPS, as DBSCAN would have done with them. New errors can't form new clusters this way, so
+    the clusters are rebuilt from scratch once enough of them are left unassigned to possibly form one.
+
+    The state is cached pickled, without the nearest neighbour index of the core samples, which is quicker to build
+    again than to load.
+    """
+    cache_key = f"error_clustering_state_{team_id}"
+    cached_state: bytes | None = cache.get(cache_key)
+    state: ErrorClusteringState | None = pickle.loads(cached_state) if cached_state is not None else None
+
+    if state is None or datetime.now(tz=UTC) - state.clustered_at > FULL_CLUSTERING_INTERVAL:
+        state = full_error_clustering(team_id)
+    else:
+        new_errors, new_embeddings = fetch_error_embeddings(team_id, since=state.last_generation_timestamp)
+        # errors generated at the last timestamp are fetched again, along with any generated later in the same second.
+        # Repeats within the new errors are kept, as full clustering counts them too.
+        is_new = ~pd.MultiIndex.from_frame(new_errors[ERROR_KEY_COLUMNS]).isin(
+            pd.MultiIndex.from_frame(state.errors[ERROR_KEY_COLUMNS])
+        )
+        new_errors, new_embeddings = new_errors[is_new].reset_index(drop=True), new_embeddings[is_new]
+        if not new_errors.empty:
+            new_errors["cluster"] = assign_to_clusters(new_embeddings, state.core_samples, state.core_samples_clusters)
+            state.unassigned_count += int((new_errors["cluster"] == -1).sum())
+            state.last_generation_timestamp = max(state.last_generation_timestamp, new_errors["timestamp"].max())
+            state.errors = pd.concat([state.errors, new_errors], ignore_index=True)
+            state.errors = state.errors[
+                state.errors["timestamp"] > state.last_generation_timestamp - timedelta(days=7)
+            ].reset_index(drop=True)
+
+        if state.unassigned_count >= DBSCAN_MIN_SAMPLES:
+            state = full_error_clustering(team_id)
+
+    if state is None:
+        cache.delete(cache_key)
+        return None
+
+    pickled_state = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(pickled_state) > MAX_STATE_BYTES:
+        logger.warning("error_clustering_state_too_large", team_id=team_id, nbytes=len(pickled_state))
+        cache.delete(cache_key)
+    else:
+        cache.set(cache_key, pickled_state, FULL_CLUSTERING_INTERVAL.total_seconds())
+    return state.errors
+
+
+def fetch_error_embeddings(team_id: int, since: datetime | None = None) -> tuple[pd.DataFrame, np.ndarray]:
+    """
+    Returns the errors, and their embeddings as one row each of a float32 matrix. The embeddings are converted a block
+    of rows at a time, so they are never all held as lists of Python floats.
+
+    With `since`, only the errors generated at or after it are returned.
+    """
+    since_clause = "AND generation_timestamp >= toDateTime64(%(since)s, 6, 'UTC')" if since else ""
     query = """
             SELECT
                 session_id, input, embeddings, generation_timestamp
@@ -52,19 +160,41 @@ def fetch_error_embeddings(team_id: int):
                 AND generation_timestamp > now() - INTERVAL 7 DAY
                 AND source_type = 'error'
                 AND input != ''
-        """
-
-    return sync_execute(
-        query,
-        {"team_id": team_id},
+                {since_clause}
+        """.format(since_clause=since_clause)
+
+    since_param = None
+    if since:
+        # as a string, as datetime parameters are sent without their microseconds
+        since_param = (since.astimezone(UTC) if since.tzinfo else since).strftime("%Y-%m-%d %H:%M:%S.%f")
+
+    errors: list[tuple] = []
+    embeddings: list[np.ndarray] = []
+    for block in sync_execute_iter(query, {"team_id": team_id, "since": since_param}):
+        errors.extend((session_id, error, timestamp) for session_id, error, _, timestamp in block.rows)
+        embeddings.append(np.asarray([row[2] for row in block.rows], dtype=np.float32))
+
+    return (
+        pd.DataFrame(errors, columns=["session_id", "error", "timestamp"]),
+        np.vstack(embeddings) if embeddings else np.empty((0, 0), dtype=np.float32),
     )
 
 
-def cluster_embeddings(embeddings):
+def cluster_embeddings(embeddings: np.ndarray) -> DBSCAN:
     dbscan = DBSCAN(eps=DBSCAN_EPS, min_samples=DBSCAN_MIN_SAMPLES)
     with CLUSTER_REPLAY_ERRORS_TIMING.time():
         dbscan.fit(embeddings)
-    return dbscan.labels_
+    return dbscan
+
+
+def assign_to_clusters(
+    embeddings: np.ndarray, core_samples: np.ndarray, core_samples_clusters: np.ndarray
+) -> np.ndarray:
+    if not len(core_samples):
+        return np.full(len(embeddings), -1)
+
+    distances, nearest = BallTree(core_samples).query(embeddings, k=1)
+    return np.where(distances[:, 0] <= DBSCAN_EPS, core_samples_clusters[nearest[:, 0]], -1)
 
 
 def construct_response(df: pd.DataFrame, team: Team):
@@ -90,7 +220,7 @@ def construct_response(df: pd.DataFrame, team: Team):
                 "cluster": cluster,
                 "sample": sample.get("error"),
                 "session_ids": np.random.choice(session_ids, size=DBSCAN_MIN_SAMPLES - 1),
-                "occurrences": rows.size,
+                "occurrences": len(rows),
                 "sparkline": sparkline,
                 "unique_sessions": len(session_ids),
                 "viewed": len(np.intersect1d(session_ids, viewed_session_ids, assume_unique=True)),
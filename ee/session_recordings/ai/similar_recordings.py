@@ -1,5 +1,6 @@
 from prometheus_client import Histogram
 
+from ee.session_recordings.ai.embeddings_index import recording_embeddings_index
 from posthog.clickhouse.client import sync_execute
 from posthog.models.team import Team
 from posthog.session_recordings.models.session_recording import SessionRecording
@@ -12,7 +13,13 @@ FIND_RECORDING_NEIGHBOURS_TIMING = Histogram(
 
 def similar_recordings(recording: SessionRecording, team: Team):
     with FIND_RECORDING_NEIGHBOURS_TIMING.time():
-        similar_embeddings = closest_embeddings(session_id=recording.session_id, team_id=team.pk)
+        index = recording_embeddings_index(team.pk)
+        if index is None:
+            # while the team's index is being loaded
+            similar_embeddings = closest_embeddings(session_id=recording.session_id, team_id=team.pk)
+        else:
+            with index.lock:
+                similar_embeddings = index.nearest(str(recording.session_id), limit=3)
 
     # TODO: join session recording context (person, duration, etc) to show in frontend
 
@@ -20,6 +27,10 @@ def similar_recordings(recording: SessionRecording, team: Team):
 
 
 def closest_embeddings(session_id: str, team_id: int):
+    """
+    Finds the closest embeddings by scanning all of them in ClickHouse, which the in-memory index avoids once it has
+    been loaded.
+    """
     query = """
             WITH (
                 SELECT
@@ -30,6 +41,7 @@ def closest_embeddings(session_id: str, team_id: int):
                     team_id = %(team_id)s
                     -- don't load all data for all time
                     AND generation_timestamp > now() - INTERVAL 7 DAY
+                    AND source_type = 'session'
                     AND session_id = %(session_id)s
                 group by session_id
                 LIMIT 1
@@ -44,6 +56,7 @@ def closest_embeddings(session_id: str, team_id: int):
                 team_id = %(team_id)s
                 -- don't load all data for all time
                 AND generation_timestamp > now() - INTERVAL 7 DAY
+                AND source_type = 'session'
                 -- skip the target recording
                 AND session_id != %(session_id)s
             ORDER BY similarity_score ASC
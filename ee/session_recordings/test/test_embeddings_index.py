@@ -0,0 +1,143 @@
+import time
+from collections.abc import Iterator
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from django.test import override_settings
+
+from ee.session_recordings.ai import embeddings_index
+from ee.session_recordings.ai.embeddings_index import RecordingEmbeddingsIndex, recording_embeddings_index
+from posthog.caching.bounded_cache import BoundedLRUCache
+
+
+def closest_by_scanning(embeddings: dict[str, np.ndarray], session_id: str, limit: int) -> list[str]:
+    target = embeddings[session_id] / np.linalg.norm(embeddings[session_id])
+    distances = {
+        other: 1 - float(embedding @ target / np.linalg.norm(embedding))
+        for other, embedding in embeddings.items()
+        if other != session_id
+    }
+    return sorted(distances, key=distances.__getitem__)[:limit]
+
+
+def test_finds_the_closest_recordings() -> None:
+    index = RecordingEmbeddingsIndex(team_id=1)
+    index.add(
+        ["a", "b", "c", "d"],
+        np.array([[1, 0], [0.9, 0.1], [0, 1], [-1, 0]], dtype=np.float32),
+        np.full(4, time.time()),
+    )
+
+    nearest = index.nearest("a", limit=2)
+
+    assert [session_id for session_id, _ in nearest] == ["b", "c"]
+    assert nearest[1][1] == 1.0
+    assert index.nearest("unknown", limit=2) == []
+
+
+def test_replaces_and_removes_embeddings() -> None:
+    index = RecordingEmbeddingsIndex(team_id=1)
+    now = time.time()
+    index.add(["a", "b", "c"], np.array([[1, 0], [0, 1], [-1, 0]], dtype=np.float32), np.array([now, now - 100, now]))
+
+    index.add(["c"], np.array([[1, 0.1]], dtype=np.float32), np.array([now]))
+    assert [session_id for session_id, _ in index.nearest("a", limit=1)] == ["c"]
+
+    index.remove_older_than(now - 50)
+    assert index.session_ids == ["a", "c"]
+    assert [session_id for session_id, _ in index.nearest("a", limit=3)] == ["c"]
+
+
+@patch("ee.session_recordings.ai.embeddings_index.MIN_EMBEDDINGS_FOR_INVERTED_LISTS", 100)
+def test_inverted_lists_find_the_same_recordings_when_probing_all_of_them() -> None:
+    rng = np.random.default_rng(0)
+    index = RecordingEmbeddingsIndex(team_id=1)
+    embeddings: dict[str, np.ndarray] = {}
+
+    # enough batches to train the lists, add to them, and retrain them
+    for _ in range(5):
+        session_ids = [str(session_id) for session_id in rng.integers(0, 500, size=100)]
+        batch = rng.standard_normal((100, 8), dtype=np.float32)
+        index.add(session_ids, batch, np.full(100, time.time()))
+        index.train_if_due()
+        embeddings.update(zip(session_ids, batch))
+
+    assert index.centroids is not None
+    with patch("ee.session_recordings.ai.embeddings_index.PROBED_LISTS", len(index.centroids)):
+        for session_id in list(embeddings)[:20]:
+            assert [other for other, _ in index.nearest(session_id, limit=3)] == closest_by_scanning(
+                embeddings, session_id, limit=3
+            )
+
+
+@pytest.fixture
+def indexes() -> Iterator[BoundedLRUCache]:
+    # room for two indexes of two 2-dimensional embeddings, and the copy of them made while retraining
+    nbytes = RecordingEmbeddingsIndex(team_id=1).nbytes + 2 * (2 * 2 * 4 + 8 + 4 + embeddings_index.SESSION_ID_BYTES)
+    cache: BoundedLRUCache = BoundedLRUCache(max_entries=10, max_weight=2 * nbytes, weigh=lambda _, index: index.nbytes)
+    with patch.object(embeddings_index, "_indexes", cache), patch.object(embeddings_index, "_too_large_at", {}):
+        yield cache
+
+
+def load_indexes(*team_ids: int) -> list[RecordingEmbeddingsIndex | None]:
+    indexes = [recording_embeddings_index(team_id) for team_id in team_ids]
+    embeddings_index._refresh_executor.submit(lambda: None).result()
+    return indexes
+
+
+@patch("ee.session_recordings.ai.embeddings_index.fetch_recording_embeddings")
+def test_loads_indexes_in_the_background(mock_fetch_recording_embeddings, indexes) -> None:
+    mock_fetch_recording_embeddings.return_value = [
+        (["a", "b"], np.array([[1, 0], [0, 1]], dtype=np.float32), np.full(2, time.time()))
+    ]
+
+    assert load_indexes(1) == [None]
+
+    index = recording_embeddings_index(1)
+    assert index is not None
+    assert [session_id for session_id, _ in index.nearest("a", limit=1)] == ["b"]
+    mock_fetch_recording_embeddings.assert_called_once_with(1, since=None)
+
+
+@patch("ee.session_recordings.ai.embeddings_index.fetch_recording_embeddings")
+def test_keeps_the_indexes_used_last_within_their_size_limit(mock_fetch_recording_embeddings, indexes) -> None:
+    mock_fetch_recording_embeddings.side_effect = lambda team_id, since: [
+        ([f"{team_id}-a", f"{team_id}-b"], np.array([[1, 0], [0, 1]], dtype=np.float32), np.full(2, time.time()))
+    ]
+
+    load_indexes(1, 2)
+    assert recording_embeddings_index(1) is not None
+    load_indexes(3)
+
+    assert 1 in indexes and 3 in indexes
+    assert 2 not in indexes
+
+
+@patch("ee.session_recordings.ai.embeddings_index.fetch_recording_embeddings")
+def test_doesnt_keep_or_reload_an_index_too_large_to_keep(mock_fetch_recording_embeddings, indexes) -> None:
+    mock_fetch_recording_embeddings.return_value = [
+        ([str(i) for i in range(10)], np.eye(10, dtype=np.float32), np.full(10, time.time()))
+    ]
+
+    assert load_indexes(1) == [None]
+    assert load_indexes(1) == [None]
+
+    assert 1 not in indexes
+    mock_fetch_recording_embeddings.assert_called_once()
+
+
+@patch("ee.session_recordings.ai.embeddings_index.MIN_EMBEDDINGS_FOR_INVERTED_LISTS", 100)
+def test_counts_the_copy_made_while_retraining_and_doesnt_train_an_index_too_large_to_keep() -> None:
+    index = RecordingEmbeddingsIndex(team_id=1)
+    index.add([str(i) for i in range(100)], np.eye(100, dtype=np.float32), np.full(100, time.time()))
+    assert index.embeddings is not None
+    assert index.nbytes > 2 * index.embeddings[: index.size].nbytes
+
+    with override_settings(REPLAY_EMBEDDINGS_INDEX_MAX_BYTES=index.nbytes - 1):
+        index.train_if_due()
+    assert index.centroids is None
+
+    with override_settings(REPLAY_EMBEDDINGS_INDEX_MAX_BYTES=index.nbytes):
+        index.train_if_due()
+    assert index.centroids is not None
@@ -0,0 +1,143 @@
+import pickle
+from datetime import datetime, timedelta, UTC
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+from freezegun import freeze_time
+
+from ee.session_recordings.ai.error_clustering import (
+    DBSCAN_EPS,
+    DBSCAN_MIN_SAMPLES,
+    fetch_error_embeddings,
+    incremental_error_clustering,
+)
+from django.core.cache import cache
+
+from posthog.test.base import BaseTest
+
+# far enough apart that no embedding near one of them is within DBSCAN_EPS of another
+CLUSTER_CENTERS = np.array([[0, 0, 1], [0, 1, 0], [1, 0, 0]], dtype=np.float32)
+
+
+def errors_near(centers: list[int], generated_at: datetime, spread: float = DBSCAN_EPS / 4):
+    rng = np.random.default_rng(0)
+    embeddings = CLUSTER_CENTERS[centers] + rng.uniform(-spread, spread, size=(len(centers), 3)).astype(np.float32)
+    errors = pd.DataFrame(
+        [(f"session-{i}", f"error near {center}", generated_at) for i, center in enumerate(centers)],
+        columns=["session_id", "error", "timestamp"],
+    )
+    return errors, embeddings
+
+
+@patch("ee.session_recordings.ai.error_clustering.fetch_error_embeddings")
+class TestIncrementalErrorClustering(BaseTest):
+    def test_assigns_new_errors_to_existing_clusters(self, mock_fetch_error_embeddings) -> None:
+        clustered_at = datetime(2024, 1, 1, tzinfo=UTC)
+        mock_fetch_error_embeddings.return_value = errors_near([0, 1] * DBSCAN_MIN_SAMPLES, clustered_at)
+        with freeze_time(clustered_at):
+            errors = incremental_error_clustering(self.team.pk)
+
+        assert errors is not None
+        assert errors["cluster"].nunique() == 2
+        first_cluster, second_cluster = errors["cluster"][0], errors["cluster"][1]
+
+        # one new error near each cluster, and one near neither
+        mock_fetch_error_embeddings.return_value = errors_near([0, 1, 2], clustered_at + timedelta(hours=1))
+        with freeze_time(clustered_at + timedelta(hours=2)):
+            errors = incremental_error_clustering(self.team.pk)
+
+        mock_fetch_error_embeddings.assert_called_with(self.team.pk, since=clustered_at)
+        assert errors is not None
+        assert len(errors) == 2 * DBSCAN_MIN_SAMPLES + 3
+        assert errors["cluster"].tolist()[-3:] == [first_cluster, second_cluster, -1]
+
+    def test_rebuilds_clusters_once_enough_errors_are_unassigned(self, mock_fetch_error_embeddings) -> None:
+        clustered_at = datetime(2024, 1, 1, tzinfo=UTC)
+        mock_fetch_error_embeddings.return_value = errors_near([0] * DBSCAN_MIN_SAMPLES, clustered_at)
+        with freeze_time(clustered_at):
+            incremental_error_clustering(self.team.pk)
+
+        # a whole new cluster's worth of errors that can't join the existing one
+        new_errors = errors_near([1] * DBSCAN_MIN_SAMPLES, clustered_at + timedelta(hours=1))
+        all_errors = errors_near([0] * DBSCAN_MIN_SAMPLES + [1] * DBSCAN_MIN_SAMPLES, clustered_at)
+        mock_fetch_error_embeddings.side_effect = [new_errors, all_errors]
+        with freeze_time(clustered_at + timedelta(hours=2)):
+            errors = incremental_error_clustering(self.team.pk)
+
+        mock_fetch_error_embeddings.assert_called_with(self.team.pk)
+        assert errors is not None
+        assert errors["cluster"].nunique() == 2
+        assert -1 not in errors["cluster"].tolist()
+
+    def test_rebuilds_clusters_after_an_interval(self, mock_fetch_error_embeddings) -> None:
+        clustered_at = datetime(2024, 1, 1, tzinfo=UTC)
+        mock_fetch_error_embeddings.return_value = errors_near([0] * DBSCAN_MIN_SAMPLES, clustered_at)
+        with freeze_time(clustered_at):
+            incremental_error_clustering(self.team.pk)
+
+        with freeze_time(clustered_at + timedelta(days=2)):
+            incremental_error_clustering(self.team.pk)
+
+        mock_fetch_error_embeddings.assert_called_with(self.team.pk)
+
+    def test_errors_fetched_again_are_not_counted_twice(self, mock_fetch_error_embeddings) -> None:
+        clustered_at = datetime(2024, 1, 1, tzinfo=UTC)
+        # a cluster, and an error near no other at the last timestamp
+        mock_fetch_error_embeddings.return_value = errors_near([0] * DBSCAN_MIN_SAMPLES + [2], clustered_at)
+        with freeze_time(clustered_at):
+            clustered_errors = incremental_error_clustering(self.team.pk)
+
+        assert clustered_errors is not None
+        # the errors at the last timestamp are fetched again, with no new ones
+        for hours in (1, 2):
+            with freeze_time(clustered_at + timedelta(hours=hours)):
+                errors = incremental_error_clustering(self.team.pk)
+                state = pickle.loads(cache.get(f"error_clustering_state_{self.team.pk}"))
+
+            mock_fetch_error_embeddings.assert_called_with(self.team.pk, since=clustered_at)
+            assert errors is not None
+            assert errors["cluster"].value_counts().to_dict() == clustered_errors["cluster"].value_counts().to_dict()
+            assert state.unassigned_count == 0
+
+    def test_counts_repeats_within_new_errors_as_full_clustering_does(self, mock_fetch_error_embeddings) -> None:
+        clustered_at = datetime(2024, 1, 1, tzinfo=UTC)
+        mock_fetch_error_embeddings.return_value = errors_near([0] * DBSCAN_MIN_SAMPLES, clustered_at)
+        with freeze_time(clustered_at):
+            incremental_error_clustering(self.team.pk)
+
+        # the same error of the same session twice in one insert
+        new_errors, new_embeddings = errors_near([0], clustered_at + timedelta(hours=1))
+        mock_fetch_error_embeddings.return_value = (
+            pd.concat([new_errors, new_errors], ignore_index=True),
+            np.vstack([new_embeddings, new_embeddings]),
+        )
+        with freeze_time(clustered_at + timedelta(hours=2)):
+            errors = incremental_error_clustering(self.team.pk)
+
+        assert errors is not None
+        assert len(errors) == DBSCAN_MIN_SAMPLES + 2
+
+    def test_doesnt_cache_a_state_too_large_to_keep(self, mock_fetch_error_embeddings) -> None:
+        clustered_at = datetime(2024, 1, 1, tzinfo=UTC)
+        mock_fetch_error_embeddings.return_value = errors_near([0] * DBSCAN_MIN_SAMPLES, clustered_at)
+        with freeze_time(clustered_at), patch("ee.session_recordings.ai.error_clustering.MAX_STATE_BYTES", 100):
+            errors = incremental_error_clustering(self.team.pk)
+
+        assert errors is not None
+        assert cache.get(f"error_clustering_state_{self.team.pk}") is None
+
+
+class TestFetchErrorEmbeddings(BaseTest):
+    @patch("ee.session_recordings.ai.error_clustering.sync_execute_iter")
+    def test_fetches_errors_since_a_timestamp_to_the_microsecond(self, mock_sync_execute_iter) -> None:
+        generated_at = datetime(2024, 1, 1, 12, 30, 15, 123456, tzinfo=UTC)
+        mock_sync_execute_iter.return_value = [MagicMock(rows=[("session-1", "error", [0.0, 1.0], generated_at)])]
+
+        errors, embeddings = fetch_error_embeddings(self.team.pk, since=pd.Timestamp(generated_at))
+
+        query, params = mock_sync_execute_iter.call_args[0]
+        assert "generation_timestamp >= toDateTime64(%(since)s, 6, 'UTC')" in query
+        assert params == {"team_id": self.team.pk, "since": "2024-01-01 12:30:15.123456"}
+        assert errors.to_dict("records") == [{"session_id": "session-1", "error": "error", "timestamp": generated_at}]
+        assert embeddings.tolist() == [[0.0, 1.0]]
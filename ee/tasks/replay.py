@@ -85,7 +85,7 @@ def generate_replay_embedding_error_clusters() -> None:
 def cluster_replay_error_embeddings(team_id: int) -> None:
     try:
         team = Team.objects.get(id=team_id)
-        clusters = error_clustering(team)
+        clusters = error_clustering(team, incremental=True)
 
         cache.set(f"cluster_errors_{team.pk}", clusters, settings.CACHED_RESULTS_TTL)
 
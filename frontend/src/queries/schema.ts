@@ -199,6 +199,8 @@ export interface HogQLQueryModifiers {
     personsJoinMode?: 'inner' | 'left'
     bounceRatePageViewMode?: 'count_pageviews' | 'uniq_urls'
     sessionTableVersion?: 'auto' | 'v1' | 'v2'
+    /** Reuse the printed ClickHouse SQL of an identical earlier query. Enabled unless set to false. */
+    useCompiledQueryCache?: boolean
 }
 
 export interface DataWarehouseEventsModifier {
@@ -1011,6 +1013,13 @@ interface CachedQueryResponseMixin {
     next_allowed_client_refresh: string
     /**  @format date-time */
     cache_target_age?: string
+    /**
+     * When the results were last calculated in full, rather than only their latest intervals
+     * @format date-time
+     */
+    last_full_calculation?: string
+    /** How many times only the latest intervals were recalculated since `last_full_calculation` */
+    incremental_calculations?: integer
     cache_key: string
     timezone: string
     /** Query status indicates whether next to the provided data, a query is still running. */
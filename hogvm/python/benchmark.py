@@ -0,0 +1,74 @@
+"""
+Micro-benchmarks the bytecode interpreters on the example programs in hogvm/__tests__/__snapshots__.
+
+    python -m hogvm.python.benchmark [--repeat 20] [file.hoge ...]
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+from datetime import timedelta
+
+from .execute import execute_bytecode_reference
+from .program import execute_decoded_bytecode, get_decoded_bytecode
+
+SNAPSHOTS = os.path.join(os.path.dirname(__file__), "..", "__tests__", "__snapshots__", "*.hoge")
+TIMEOUT = timedelta(seconds=60)
+
+
+def best_of(run, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the reference and the decoded bytecode interpreters")
+    parser.add_argument("files", nargs="*", help="Compiled .hoge programs (default: all snapshots)")
+    parser.add_argument("--repeat", type=int, default=20, help="Number of times to run each program")
+    args = parser.parse_args()
+
+    print(f"{'program':<20} {'reference':>12} {'decoded':>12} {'speedup':>8}")  # noqa: T201
+    total_reference = total_decoded = 0.0
+    for filename in args.files or sorted(glob.glob(SNAPSHOTS)):
+        with open(filename) as file:
+            bytecode = json.loads(file.read())
+
+        program = get_decoded_bytecode(bytecode)
+        if program is None:
+            print(f"{os.path.basename(filename):<20} can't be decoded, skipping")  # noqa: T201
+            continue
+        reference = execute_bytecode_reference(bytecode, timeout=TIMEOUT)
+        if execute_decoded_bytecode(program, None, None, TIMEOUT, None) != (reference.result, reference.stdout):
+            raise ValueError(f"Interpreters disagree on {filename}")
+
+        reference_time = best_of(
+            lambda bytecode=bytecode: execute_bytecode_reference(bytecode, timeout=TIMEOUT), args.repeat
+        )
+        # Includes looking up the decoded program, as `execute_bytecode` does
+        decoded_time = best_of(
+            lambda bytecode=bytecode: execute_decoded_bytecode(  # type: ignore
+                get_decoded_bytecode(bytecode), None, None, TIMEOUT, None
+            ),
+            args.repeat,
+        )
+        total_reference += reference_time
+        total_decoded += decoded_time
+        print(  # noqa: T201
+            f"{os.path.basename(filename):<20} {reference_time * 1000:>10.3f}ms {decoded_time * 1000:>10.3f}ms "
+            f"{reference_time / decoded_time:>7.2f}x"
+        )
+
+    print(  # noqa: T201
+        f"{'total':<20} {total_reference * 1000:>10.3f}ms {total_decoded * 1000:>10.3f}ms "
+        f"{total_reference / total_decoded:>7.2f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
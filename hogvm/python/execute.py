@@ -7,6 +7,7 @@ from collections.abc import Callable
 
 from hogvm.python.debugger import debugger, color_bytecode
 from hogvm.python.operation import Operation, HOGQL_BYTECODE_IDENTIFIER
+from hogvm.python.program import execute_decoded_bytecode, get_decoded_bytecode
 from hogvm.python.stl import STL
 from dataclasses import dataclass
 
@@ -31,6 +32,25 @@ def execute_bytecode(
     team: Optional["Team"] = None,
     debug=False,
 ) -> BytecodeResult:
+    if not debug:
+        program = get_decoded_bytecode(bytecode)
+        if program is not None:
+            result, stdout = execute_decoded_bytecode(program, globals, functions, timeout, team)
+            return BytecodeResult(result=result, stdout=stdout, bytecode=bytecode)
+    return execute_bytecode_reference(bytecode, globals, functions, timeout, team, debug)
+
+
+def execute_bytecode_reference(
+    bytecode: list[Any],
+    globals: Optional[dict[str, Any]] = None,
+    functions: Optional[dict[str, Callable[..., Any]]] = None,
+    timeout=timedelta(seconds=5),
+    team: Optional["Team"] = None,
+    debug=False,
+) -> BytecodeResult:
+    """
+    Interprets the bytecode token by token. Used when debugging, and for bytecode that can't be decoded up front.
+    """
     result = None
     start_time = time.time()
     last_op = len(bytecode) - 1
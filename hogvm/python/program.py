@@ -0,0 +1,377 @@
+import operator
+import re
+import time
+from copy import deepcopy
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Optional, TYPE_CHECKING
+from collections.abc import Callable
+
+from hogvm.python.operation import Operation, HOGQL_BYTECODE_IDENTIFIER
+from hogvm.python.stl import STL
+from hogvm.python.utils import HogVMException, get_nested_value, like, set_nested_value
+
+if TYPE_CHECKING:
+    from datetime import timedelta
+
+    from posthog.models import Team
+
+# A decoded instruction: (opcode, stack handler, number of values it pops, decoded operand).
+# Operations that only touch the stack have a handler, called as `handler(stack, operand)`. Control flow operations
+# (jumps, calls, locals and globals) have `None`, and are interpreted inline, with jump targets resolved to
+# instruction indexes.
+Instruction = tuple[int, Optional[Callable[[list, Any], None]], int, Any]
+
+# Opcode for a `None` where an operation is expected, which ends execution
+END = -1
+# Opcode for anything else that isn't an operation, which does nothing
+NOP = -2
+
+
+@dataclass(frozen=True)
+class DecodedBytecode:
+    """
+    Bytecode decoded once into instructions with their operands, so it can be executed many times without
+    re-parsing. Behaves exactly like interpreting `bytecode` directly.
+    """
+
+    bytecode: list[Any]
+    instructions: list[Instruction]
+
+
+def _push(stack: list, value: Any) -> None:
+    stack.append(value)
+
+
+def _pop(stack: list, _: Any) -> None:
+    stack.pop()
+
+
+def _not(stack: list, _: Any) -> None:
+    stack[-1] = not stack[-1]
+
+
+def _and(stack: list, count: int) -> None:
+    values = stack[len(stack) - count :]
+    del stack[len(stack) - count :]
+    stack.append(all(values))
+
+
+def _or(stack: list, count: int) -> None:
+    values = stack[len(stack) - count :]
+    del stack[len(stack) - count :]
+    stack.append(any(values))
+
+
+def _binary(function: Callable[[Any, Any], Any]) -> Callable[[list, Any], None]:
+    # The left operand is on top of the stack
+    def handler(stack: list, _: Any) -> None:
+        left = stack.pop()
+        stack[-1] = function(left, stack[-1])
+
+    return handler
+
+
+def _regex(flags: int, negate: bool) -> Callable[[list, Any], None]:
+    def handler(stack: list, _: Any) -> None:
+        string = stack.pop()
+        stack[-1] = bool(re.search(re.compile(stack[-1], flags), string)) != negate
+
+    return handler
+
+
+def _get_property(stack: list, _: Any) -> None:
+    property = stack.pop()
+    stack[-1] = get_nested_value(stack[-1], [property])
+
+
+def _set_property(stack: list, _: Any) -> None:
+    value = stack.pop()
+    field = stack.pop()
+    set_nested_value(stack.pop(), [field], value)
+
+
+def _dict(stack: list, count: int) -> None:
+    if count > 0:
+        elems = stack[-(count * 2) :]
+        del stack[len(stack) - len(elems) :]
+        stack.append({elems[i]: elems[i + 1] for i in range(0, len(elems), 2)})
+    else:
+        stack.append({})
+
+
+def _array(stack: list, count: int) -> None:
+    # Slices like the reference implementation, including its handling of a count of 0
+    elems = stack[-count:]
+    del stack[len(stack) - len(elems) :]
+    stack.append(elems)
+
+
+def _tuple(stack: list, count: int) -> None:
+    elems = stack[-count:]
+    del stack[len(stack) - len(elems) :]
+    stack.append(tuple(elems))
+
+
+# opcode -> (number of operands, stack handler, number of values popped, or None if given by the first operand)
+_STACK_OPERATIONS: dict[int, tuple[int, Callable[[list, Any], None], Optional[int]]] = {
+    Operation.STRING: (1, _push, 0),
+    Operation.INTEGER: (1, _push, 0),
+    Operation.FLOAT: (1, _push, 0),
+    Operation.NOT: (0, _not, 1),
+    Operation.AND: (1, _and, None),
+    Operation.OR: (1, _or, None),
+    Operation.PLUS: (0, _binary(operator.add), 2),
+    Operation.MINUS: (0, _binary(operator.sub), 2),
+    Operation.DIVIDE: (0, _binary(operator.truediv), 2),
+    Operation.MULTIPLY: (0, _binary(operator.mul), 2),
+    Operation.MOD: (0, _binary(operator.mod), 2),
+    Operation.EQ: (0, _binary(operator.eq), 2),
+    Operation.NOT_EQ: (0, _binary(operator.ne), 2),
+    Operation.GT: (0, _binary(operator.gt), 2),
+    Operation.GT_EQ: (0, _binary(operator.ge), 2),
+    Operation.LT: (0, _binary(operator.lt), 2),
+    Operation.LT_EQ: (0, _binary(operator.le), 2),
+    Operation.LIKE: (0, _binary(like), 2),
+    Operation.ILIKE: (0, _binary(lambda string, pattern: like(string, pattern, re.IGNORECASE)), 2),
+    Operation.NOT_LIKE: (0, _binary(lambda string, pattern: not like(string, pattern)), 2),
+    Operation.NOT_ILIKE: (0, _binary(lambda string, pattern: not like(string, pattern, re.IGNORECASE)), 2),
+    Operation.IN: (0, _binary(lambda value, collection: value in collection), 2),
+    Operation.NOT_IN: (0, _binary(lambda value, collection: value not in collection), 2),
+    Operation.REGEX: (0, _regex(0, negate=False), 2),
+    Operation.NOT_REGEX: (0, _regex(0, negate=True), 2),
+    Operation.IREGEX: (0, _regex(re.IGNORECASE, negate=False), 2),
+    Operation.NOT_IREGEX: (0, _regex(re.IGNORECASE, negate=True), 2),
+    Operation.POP: (0, _pop, 1),
+    Operation.GET_PROPERTY: (0, _get_property, 2),
+    Operation.SET_PROPERTY: (0, _set_property, 3),
+    Operation.DICT: (1, _dict, 0),
+    Operation.ARRAY: (1, _array, 0),
+    Operation.TUPLE: (1, _tuple, 0),
+}
+
+_CONSTANTS = {Operation.TRUE: True, Operation.FALSE: False, Operation.NULL: None}
+
+# Control flow operations and their number of operands
+_CONTROL_OPERATIONS: dict[int, int] = {
+    Operation.GET_GLOBAL: 1,
+    Operation.GET_LOCAL: 1,
+    Operation.SET_LOCAL: 1,
+    Operation.RETURN: 0,
+    Operation.JUMP: 1,
+    Operation.JUMP_IF_FALSE: 1,
+    Operation.JUMP_IF_STACK_NOT_NULL: 1,
+    Operation.DECLARE_FN: 3,
+    Operation.CALL: 2,
+}
+
+_JUMP = int(Operation.JUMP)
+_JUMP_IF_FALSE = int(Operation.JUMP_IF_FALSE)
+_JUMP_IF_STACK_NOT_NULL = int(Operation.JUMP_IF_STACK_NOT_NULL)
+_GET_GLOBAL = int(Operation.GET_GLOBAL)
+_GET_LOCAL = int(Operation.GET_LOCAL)
+_SET_LOCAL = int(Operation.SET_LOCAL)
+_RETURN = int(Operation.RETURN)
+_DECLARE_FN = int(Operation.DECLARE_FN)
+_CALL = int(Operation.CALL)
+
+
+def decode_bytecode(bytecode: list[Any]) -> Optional[DecodedBytecode]:
+    """
+    Decodes `bytecode` into instructions. Returns None for bytecode whose behavior relies on positions within the
+    flat list (e.g. jumping into the middle of an instruction, or truncated operands), which is left to the
+    reference interpreter.
+    """
+    if not bytecode or bytecode[0] != HOGQL_BYTECODE_IDENTIFIER:
+        return None
+
+    # (opcode, handler, pops, operands, position of the last operand)
+    decoded: list[tuple[int, Optional[Callable[[list, Any], None]], int, list[Any], int]] = []
+    index_of_position: dict[int, int] = {}
+    position = 1
+    while position < len(bytecode):
+        symbol = bytecode[position]
+        index_of_position[position] = len(decoded)
+        if symbol is None:
+            decoded.append((END, None, 0, [], position))
+            position += 1
+            continue
+
+        try:
+            stack_operation = _STACK_OPERATIONS.get(symbol)
+        except TypeError:
+            # unhashable, so not an operation
+            stack_operation, symbol = None, NOP
+        if stack_operation is not None:
+            operand_count, handler, pops = stack_operation
+        elif symbol in _CONSTANTS:
+            operand_count, handler, pops = 0, _push, 0
+        elif symbol in _CONTROL_OPERATIONS:
+            operand_count, handler, pops = _CONTROL_OPERATIONS[symbol], None, 0
+        else:
+            decoded.append((NOP, None, 0, [], position))
+            position += 1
+            continue
+
+        if position + operand_count >= len(bytecode):
+            return None
+        operands = bytecode[position + 1 : position + 1 + operand_count]
+        if symbol in _CONSTANTS:
+            operands = [_CONSTANTS[symbol]]
+        opcode = int(symbol)
+        if pops is None:
+            pops = operands[0]
+            if not isinstance(pops, int):
+                return None
+        decoded.append((opcode, handler, pops, operands, position + operand_count))
+        position += operand_count + 1
+
+    end_position = len(bytecode)
+    index_of_position[end_position] = len(decoded)
+
+    def resolve(target_position: int) -> Optional[int]:
+        return index_of_position.get(target_position)
+
+    instructions: list[Instruction] = []
+    for opcode, handler, pops, operands, last_position in decoded:
+        operand: Any = operands[0] if operands else None
+        if opcode in (_JUMP, _JUMP_IF_FALSE, _JUMP_IF_STACK_NOT_NULL):
+            if not isinstance(operands[0], int):
+                return None
+            target = resolve(last_position + operands[0] + 1)
+            if target is None:
+                return None
+            operand = target
+            pops = 1 if opcode == _JUMP_IF_FALSE else 0
+        elif opcode == _DECLARE_FN:
+            name, arg_len, body_len = operands
+            if not isinstance(body_len, int):
+                return None
+            body_end = resolve(last_position + body_len + 1)
+            if body_end is None:
+                return None
+            operand = (name, resolve(last_position + 1), arg_len, body_end)
+        elif opcode == _CALL:
+            operand = (operands[0], operands[1])
+        elif opcode in (_GET_GLOBAL, _SET_LOCAL, _RETURN):
+            pops = operand if opcode == _GET_GLOBAL else 1
+            if not isinstance(pops, int):
+                return None
+        instructions.append((opcode, handler, pops, operand))
+
+    return DecodedBytecode(bytecode=bytecode, instructions=instructions)
+
+
+@lru_cache(maxsize=1024)
+def _decode_cached(bytecode: tuple, types: tuple) -> Optional[DecodedBytecode]:
+    return decode_bytecode(list(bytecode))
+
+
+def get_decoded_bytecode(bytecode: list[Any]) -> Optional[DecodedBytecode]:
+    """`decode_bytecode`, cached for bytecode that is executed repeatedly (e.g. the same filter for each event)."""
+    try:
+        # Keyed on types too, as e.g. `1`, `1.0` and `True` are equal, but don't print the same
+        return _decode_cached(tuple(bytecode), tuple(map(type, bytecode)))
+    except TypeError:
+        # unhashable operands
+        return decode_bytecode(bytecode)
+
+
+def execute_decoded_bytecode(
+    program: DecodedBytecode,
+    globals: Optional[dict[str, Any]],
+    functions: Optional[dict[str, Callable[..., Any]]],
+    timeout: "timedelta",
+    team: Optional["Team"],
+) -> tuple[Any, list[str]]:
+    """Interprets decoded bytecode. Returns the result and what was printed."""
+    start_time = time.time()
+    instructions = program.instructions
+    end = len(instructions)
+    stack: list = []
+    call_stack: list[tuple[int, int, int]] = []  # (return index, stack_start, arg_len)
+    declared_functions: dict[str, tuple[int, int]] = {}
+    stack_start = 0
+    stdout: list[str] = []
+    ops = 0
+    pc = 0
+
+    def check_timeout():
+        if time.time() - start_time > timeout.total_seconds():
+            raise HogVMException(f"Execution timed out after {timeout.total_seconds()} seconds. Performed {ops} ops.")
+
+    while pc < end:
+        opcode, handler, pops, operand = instructions[pc]
+        pc += 1
+        ops += 1
+        if (ops & 127) == 0:  # every 128th operation
+            check_timeout()
+        if len(stack) < pops:
+            raise HogVMException("Stack underflow")
+
+        if handler is not None:
+            handler(stack, operand)
+        elif opcode == _JUMP:
+            pc = operand
+        elif opcode == _JUMP_IF_FALSE:
+            if not stack.pop():
+                pc = operand
+        elif opcode == _GET_LOCAL:
+            stack.append(stack[operand + stack_start])
+        elif opcode == _SET_LOCAL:
+            value = stack.pop()
+            stack[operand + stack_start] = value
+        elif opcode == _GET_GLOBAL:
+            chain = stack[len(stack) - operand :][::-1]
+            del stack[len(stack) - operand :]
+            stack.append(deepcopy(get_nested_value(globals, chain)))
+        elif opcode == _JUMP_IF_STACK_NOT_NULL:
+            if len(stack) > 0 and stack[-1] is not None:
+                pc = operand
+        elif opcode == _CALL:
+            check_timeout()
+            name, arg_count = operand
+            if name in declared_functions:
+                body_start, arg_len = declared_functions[name]
+                call_stack.append((pc, len(stack) - arg_len, arg_len))
+                stack_start = len(stack) - arg_len
+                pc = body_start
+            else:
+                if not isinstance(arg_count, int):
+                    raise TypeError(f"'{type(arg_count).__name__}' object cannot be interpreted as an integer")
+                if len(stack) < arg_count:
+                    raise HogVMException("Stack underflow")
+                args = stack[len(stack) - arg_count :][::-1] if arg_count > 0 else []
+                if arg_count > 0:
+                    del stack[len(stack) - arg_count :]
+
+                if functions is not None and name in functions:
+                    stack.append(functions[name](*args))
+                    # The reference implementation expects another instruction after calling a passed in function
+                    if pc == end:
+                        raise HogVMException("Unexpected end of bytecode")
+                    continue
+
+                if name not in STL:
+                    raise HogVMException(f"Unsupported function call: {name}")
+
+                stack.append(STL[name](name, args, team, stdout, timeout))
+        elif opcode == _RETURN:
+            if call_stack:
+                pc, frame_start, _ = call_stack.pop()
+                response = stack.pop()
+                del stack[frame_start:]
+                stack.append(response)
+                stack_start = call_stack[-1][1] if call_stack else 0
+            else:
+                return stack.pop(), stdout
+        elif opcode == _DECLARE_FN:
+            name, body_start, arg_len, body_end = operand
+            declared_functions[name] = (body_start, arg_len)
+            pc = body_end
+        elif opcode == END:
+            break
+
+    if len(stack) > 1:
+        raise HogVMException("Invalid bytecode. More than one value left on stack")
+    return (stack.pop() if stack else None), stdout
@@ -0,0 +1,118 @@
+import glob
+import json
+import os
+from datetime import timedelta
+
+import pytest
+
+from hogvm.python.execute import execute_bytecode, execute_bytecode_reference
+from hogvm.python.operation import Operation as op, HOGQL_BYTECODE_IDENTIFIER as _H
+from hogvm.python.program import decode_bytecode, get_decoded_bytecode
+from hogvm.python.utils import HogVMException
+
+SNAPSHOTS = sorted(
+    glob.glob(os.path.join(os.path.dirname(__file__), "..", "..", "__tests__", "__snapshots__", "*.hoge"))
+)
+
+
+def run_both(bytecode, globals=None, functions=None):
+    def run(execute):
+        try:
+            response = execute(list(bytecode), globals, functions)
+            return response.result, response.stdout
+        except Exception as e:
+            return type(e), str(e)
+
+    return run(execute_bytecode), run(execute_bytecode_reference)
+
+
+class TestDecodedBytecode:
+    @pytest.mark.parametrize("filename", SNAPSHOTS, ids=os.path.basename)
+    def test_snapshots_match_reference(self, filename):
+        with open(filename) as file:
+            bytecode = json.loads(file.read())
+        with open(filename.replace(".hoge", ".stdout")) as file:
+            expected = file.read()
+
+        assert get_decoded_bytecode(bytecode) is not None
+        response = execute_bytecode(bytecode, timeout=timedelta(seconds=60))
+        assert "".join(f"{line}\n" for line in response.stdout) == expected
+
+    def test_jump_targets_are_resolved_to_instructions(self):
+        # if (true) { return 1 } else { return 2 }
+        bytecode = [_H, op.TRUE, op.JUMP_IF_FALSE, 5, op.INTEGER, 1, op.RETURN, op.JUMP, 3, op.INTEGER, 2, op.RETURN]
+        program = decode_bytecode(bytecode)
+
+        assert program is not None
+        assert [instruction[0] for instruction in program.instructions] == [
+            op.TRUE,
+            op.JUMP_IF_FALSE,
+            op.INTEGER,
+            op.RETURN,
+            op.JUMP,
+            op.INTEGER,
+            op.RETURN,
+        ]
+        assert program.instructions[1][3] == 5
+        assert program.instructions[4][3] == 7  # the end
+        assert execute_bytecode(bytecode).result == 1
+
+    @pytest.mark.parametrize(
+        "bytecode",
+        [
+            [_H, op.INTEGER],  # truncated operand
+            [_H, op.JUMP, 1, op.INTEGER, 1],  # jumps into an operand
+            [_H, op.JUMP, 10, op.TRUE],  # jumps past the end
+            [_H, op.DECLARE_FN, "f", 0, 10],  # function body past the end
+        ],
+    )
+    def test_undecodable_bytecode_falls_back_to_reference(self, bytecode):
+        assert decode_bytecode(bytecode) is None
+
+        decoded, reference = run_both(bytecode)
+        assert decoded == reference
+
+    @pytest.mark.parametrize(
+        "bytecode",
+        [
+            [_H, op.INTEGER, 1, op.INTEGER, 2, op.MINUS],
+            [_H, op.STRING, "%a%", op.STRING, "bab", op.LIKE],
+            [_H, op.STRING, "^b", op.STRING, "bab", op.REGEX],
+            [_H, op.INTEGER, 1, op.INTEGER, 2, op.INTEGER, 3, op.ARRAY, 0],
+            [_H, op.DICT, 0],
+            [_H, op.AND, 0],
+            [_H, op.OR, 0],
+            [_H, op.INTEGER, 1, op.PLUS],
+            [_H, op.TRUE, op.AND, 2],
+            [_H, op.NOT],
+            [_H, op.INTEGER, 1, op.INTEGER, 2, op.INTEGER, 3, op.DICT, 1, op.POP],
+            [_H, op.STRING, "x", op.STRING, "a", op.GET_GLOBAL, 2],
+            [_H, op.STRING, "a", op.GET_GLOBAL, 1, op.STRING, "y", op.INTEGER, 4, op.SET_PROPERTY, op.NULL],
+            [_H, op.INTEGER, 2, op.INTEGER, 1, op.CALL, "f", 2, op.RETURN],
+            [_H, op.INTEGER, 1, op.CALL, "f", 1],
+            [_H, op.INTEGER, 1, op.CALL, "print", 1],
+            [_H, op.DECLARE_FN, "f", 1, 4, op.GET_LOCAL, 0, op.RETURN, op.POP, op.INTEGER, 7, op.CALL, "f", 1],
+            [_H, op.NULL, op.JUMP_IF_STACK_NOT_NULL, 2, op.INTEGER, 1, op.RETURN],
+            [_H, op.GET_LOCAL, 0],
+            [_H, op.TRUE, op.IN_COHORT, "not an operation", None, op.FALSE],
+        ],
+    )
+    def test_matches_reference(self, bytecode):
+        globals = {"a": {"x": [1, 2]}}
+        functions = {"f": lambda *args: list(args)}
+
+        decoded, reference = run_both(bytecode, globals, functions)
+        assert decoded == reference
+
+    def test_equal_operands_of_different_types_are_decoded_separately(self):
+        assert execute_bytecode([_H, op.INTEGER, 1]).result == 1
+        assert execute_bytecode([_H, op.INTEGER, True]).result is True
+        assert isinstance(execute_bytecode([_H, op.INTEGER, 1.0]).result, float)
+
+    def test_errors(self):
+        with pytest.raises(HogVMException, match="Stack underflow"):
+            execute_bytecode([_H, op.INTEGER, 1, op.PLUS])
+        with pytest.raises(HogVMException, match="Unexpected end of bytecode"):
+            execute_bytecode([_H, op.CALL, "f", 0], functions={"f": lambda: 1})
+        with pytest.raises(HogVMException, match="timed out"):
+            execute_bytecode([_H, op.JUMP, -2], timeout=timedelta(seconds=0.01))
@@ -5,16 +5,20 @@ from random import random
 
 import sentry_sdk
 import structlog
-import time
+from asgiref.sync import sync_to_async
 from collections.abc import Iterator
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from dateutil import parser
 from django.conf import settings
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.exception import convert_exception_to_response
+from django.http import HttpResponse, JsonResponse
+from django.urls import ResolverMatch
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from enum import Enum
-from kafka.errors import KafkaError, MessageSizeTooLargeError, KafkaTimeoutError
+from kafka.errors import MessageSizeTooLargeError, KafkaTimeoutError
 from kafka.producer.future import FutureRecordMetadata
 from prometheus_client import Counter, Gauge, Histogram
 from rest_framework import status
@@ -23,13 +27,18 @@ from sentry_sdk.api import capture_exception, start_span
 from statshog.defaults.django import statsd
 from token_bucket import Limiter, MemoryStorage
 from typing import Any, Optional, Literal
-from collections.abc import Callable
 
 from ee.billing.quota_limiting import QuotaLimitingCaches
 from posthog.api.utils import get_data, get_token, safe_clickhouse_string
 from posthog.cache_utils import cache_for
 from posthog.exceptions import generate_exception_response
-from posthog.kafka_client.client import KafkaProducer, session_recording_kafka_producer
+from posthog.kafka_client.client import (
+    KafkaMessage,
+    KafkaProduceBatchError,
+    KafkaProducer,
+    _KafkaProducer,
+    session_recording_kafka_producer,
+)
 from posthog.kafka_client.topics import (
     KAFKA_EVENTS_PLUGIN_INGESTION_HISTORICAL,
     KAFKA_SESSION_RECORDING_EVENTS,
@@ -174,7 +183,7 @@ def build_kafka_event_data(
         "distinct_id": safe_clickhouse_string(distinct_id),
         "ip": safe_clickhouse_string(ip) if ip else ip,
         "site_url": safe_clickhouse_string(site_url),
-        "data": json.dumps(data),
+        "data": _KafkaProducer.json_serializer(data).decode("utf-8"),
         "now": now.isoformat(),
         "sent_at": sent_at.isoformat() if sent_at else "",
         "token": token,
@@ -201,37 +210,85 @@ def _kafka_topic(event_name: str, historical: bool = False, overflowing: bool =
             return settings.KAFKA_EVENTS_PLUGIN_INGESTION_TOPIC
 
 
-def log_event(
-    data: dict,
-    event_name: str,
-    partition_key: Optional[str],
-    headers: Optional[list] = None,
-    historical: bool = False,
-    overflowing: bool = False,
-    value_serializer: Optional[Callable[[Any], Any]] = None,
-) -> FutureRecordMetadata:
-    kafka_topic = _kafka_topic(event_name, historical=historical, overflowing=overflowing)
+def _kafka_producer(event_name: str) -> _KafkaProducer:
+    if event_name in SESSION_RECORDING_DEDICATED_KAFKA_EVENTS:
+        return session_recording_kafka_producer()
+    return KafkaProducer()
+
 
-    logger.debug("logging_event", event_name=event_name, kafka_topic=kafka_topic)
+def log_event(message: KafkaMessage, event_name: str) -> FutureRecordMetadata:
+    logger.debug("logging_event", event_name=event_name, kafka_topic=message.topic)
 
     # TODO: Handle Kafka being unavailable with exponential backoff retries
     try:
-        if event_name in SESSION_RECORDING_DEDICATED_KAFKA_EVENTS:
-            producer = session_recording_kafka_producer()
-        else:
-            producer = KafkaProducer()
-
-        future = producer.produce(
-            topic=kafka_topic, data=data, key=partition_key, headers=headers, value_serializer=value_serializer
+        future = _kafka_producer(event_name).produce(
+            topic=message.topic,
+            data=message.data,
+            key=message.key,
+            headers=message.headers,
+            value_serializer=message.value_serializer,
         )
         statsd.incr("posthog_cloud_plugin_server_ingestion")
         return future
     except Exception:
         statsd.incr("capture_endpoint_log_event_error")
-        logger.exception("Failed to produce event to Kafka topic %s with error", kafka_topic)
+        logger.exception("Failed to produce event to Kafka topic %s with error", message.topic)
         raise
 
 
+def _batches_by_producer(events: list[tuple[str, KafkaMessage]]) -> list[tuple[_KafkaProducer, list[int]]]:
+    batches: dict[int, tuple[_KafkaProducer, list[int]]] = {}
+    for index, (event_name, _) in enumerate(events):
+        producer = _kafka_producer(event_name)
+        batches.setdefault(id(producer), (producer, []))[1].append(index)
+    return list(batches.values())
+
+
+def log_events(events: list[tuple[str, KafkaMessage]]) -> None:
+    """
+    Produces (event name, message) pairs, waiting for all acks within a single KAFKA_PRODUCE_ACK_TIMEOUT_SECONDS.
+    Raises `KafkaProduceBatchError`, with indexes into `events`, if any of them failed to be delivered.
+    """
+    errors: list[tuple[int, Exception]] = []
+    for producer, indexes in _batches_by_producer(events):
+        try:
+            producer.produce_batch(
+                [events[index][1] for index in indexes], timeout=settings.KAFKA_PRODUCE_ACK_TIMEOUT_SECONDS
+            )
+        except KafkaProduceBatchError as exc:
+            errors.extend((indexes[batch_index], error) for batch_index, error in exc.errors)
+        except Exception:
+            statsd.incr("capture_endpoint_log_event_error")
+            logger.exception("Failed to produce events to Kafka")
+            raise
+        statsd.incr("posthog_cloud_plugin_server_ingestion", len(indexes))
+
+    if errors:
+        raise KafkaProduceBatchError(sorted(errors, key=lambda error: error[0]), total=len(events))
+
+
+async def log_events_async(events: list[tuple[str, KafkaMessage]]) -> None:
+    """
+    Like `log_events`, but awaits the acks rather than blocking the thread until they arrive
+    """
+    errors: list[tuple[int, Exception]] = []
+    for producer, indexes in _batches_by_producer(events):
+        try:
+            await producer.produce_batch_async(
+                [events[index][1] for index in indexes], timeout=settings.KAFKA_PRODUCE_ACK_TIMEOUT_SECONDS
+            )
+        except KafkaProduceBatchError as exc:
+            errors.extend((indexes[batch_index], error) for batch_index, error in exc.errors)
+        except Exception:
+            statsd.incr("capture_endpoint_log_event_error")
+            logger.exception("Failed to produce events to Kafka")
+            raise
+        statsd.incr("posthog_cloud_plugin_server_ingestion", len(indexes))
+
+    if errors:
+        raise KafkaProduceBatchError(sorted(errors, key=lambda error: error[0]), total=len(events))
+
+
 def _datetime_from_seconds_or_millis(timestamp: str) -> datetime:
     if len(timestamp) > 11:  # assuming milliseconds / update "11" to "12" if year > 5138 (set a reminder!)
         timestamp_number = float(timestamp) / 1000
@@ -367,26 +424,47 @@ def lib_version_from_query_params(request) -> str:
     return request.GET.get("ver", "unknown")
 
 
-@csrf_exempt
-@timed("posthog_cloud_event_endpoint")
-def get_event(request):
-    structlog.contextvars.unbind_contextvars("team_id")
+@dataclass
+class CaptureRequest:
+    """
+    A parsed capture request, ready for its events to be produced to Kafka
+    """
 
-    # handle cors request
-    if request.method == "OPTIONS":
-        return cors_response(request, JsonResponse({"status": 1}))
+    data: Any
+    token: str
+    now: datetime
+    sent_at: Optional[datetime]
+    retry_count: Optional[int]
+    historical: bool
+    site_url: str
+    ip: Optional[str]
+    processed_events: list[tuple[dict[str, Any], UUIDT, str]]
+    replay_events: list[Any]
 
+
+@dataclass
+class ReplayCapture:
+    processed_events: list[tuple[dict[str, Any], UUIDT, str]]
+    lib_version: str
+    compression_in_capture: bool
+
+
+def _parse_capture_request(request) -> tuple[Optional[CaptureRequest], Optional[HttpResponse]]:
+    """
+    Checks the token and payload of a capture request, dropping events over quota and splitting off replay events.
+    Returns either the parsed request, or the error response to send.
+    """
     now = timezone.now()
 
     data, error_response = get_data(request)
 
     if error_response:
-        return error_response
+        return None, error_response
 
     sent_at, error_response = _get_sent_at(data, request)
 
     if error_response:
-        return error_response
+        return None, error_response
 
     retry_count = _get_retry_count(request)
 
@@ -394,7 +472,7 @@ def get_event(request):
         token = get_token(data, request)
 
         if not token:
-            return cors_response(
+            return None, cors_response(
                 request,
                 generate_exception_response(
                     "capture",
@@ -419,7 +497,7 @@ def get_event(request):
         if invalid_token_reason:
             TOKEN_SHAPE_INVALID_COUNTER.labels(reason=invalid_token_reason).inc()
             logger.warning("capture_token_shape_invalid", token=token, reason=invalid_token_reason)
-            return cors_response(
+            return None, cors_response(
                 request,
                 generate_exception_response(
                     "capture",
@@ -455,7 +533,7 @@ def get_event(request):
             events = [data]
 
         if not all(data):  # Check that all items are truthy (not null, not empty dict)
-            return cors_response(
+            return None, cors_response(
                 request,
                 generate_exception_response(
                     "capture", f"Invalid payload: some events are null", code="invalid_payload"
@@ -479,7 +557,7 @@ def get_event(request):
             events = other_events
 
         except ValueError as e:
-            return cors_response(
+            return None, cors_response(
                 request,
                 generate_exception_response("capture", f"Invalid payload: {e}", code="invalid_payload"),
             )
@@ -491,129 +569,173 @@ def get_event(request):
         try:
             processed_events = list(preprocess_events(events))
         except ValueError as e:
-            return cors_response(
+            return None, cors_response(
                 request,
                 generate_exception_response("capture", f"Invalid payload: {e}", code="invalid_payload"),
             )
 
-    futures: list[FutureRecordMetadata] = []
+    return (
+        CaptureRequest(
+            data=data,
+            token=token,
+            now=now,
+            sent_at=sent_at,
+            retry_count=retry_count,
+            historical=historical,
+            site_url=site_url,
+            ip=ip,
+            processed_events=processed_events,
+            replay_events=replay_events,
+        ),
+        None,
+    )
 
-    with start_span(op="kafka.produce") as span:
-        span.set_tag("event.count", len(processed_events))
-        for event, event_uuid, distinct_id in processed_events:
-            try:
-                futures.append(
-                    capture_internal(
-                        event, distinct_id, ip, site_url, now, sent_at, event_uuid, token, historical=historical
-                    )
-                )
-            except Exception as exc:
-                capture_exception(exc, {"data": data})
-                statsd.incr("posthog_cloud_raw_endpoint_failure", tags={"endpoint": "capture"})
-                logger.exception("kafka_produce_failure", exc_info=exc)
-                return cors_response(
-                    request,
-                    generate_exception_response(
-                        "capture",
-                        "Unable to store event. Please try again. If you are the owner of this app you can check the logs for further details.",
-                        code="server_error",
-                        type="server_error",
-                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                    ),
-                )
-
-    with start_span(op="kafka.wait"):
-        span.set_tag("future.count", len(futures))
-        start_time = time.monotonic()
-        for future in futures:
-            try:
-                future.get(timeout=settings.KAFKA_PRODUCE_ACK_TIMEOUT_SECONDS - (time.monotonic() - start_time))
-            except KafkaError as exc:
-                # TODO: distinguish between retriable errors and non-retriable
-                # errors, and set Retry-After header accordingly.
-                # TODO: return 400 error for non-retriable errors that require the
-                # client to change their request.
-
-                logger.exception(
-                    "kafka_produce_failure",
-                    exc_info=exc,
-                    name=exc.__class__.__name__,
-                    # data could be large, so we don't always want to include it,
-                    # but we do want to include it for some errors to aid debugging
-                    data=data if isinstance(exc, MessageSizeTooLargeError) else None,
-                )
-                return cors_response(
-                    request,
-                    generate_exception_response(
-                        "capture",
-                        "Unable to store some events. Please try again. If you are the owner of this app you can check the logs for further details.",
-                        code="server_error",
-                        type="server_error",
-                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                    ),
-                )
 
-    try:
-        if replay_events:
-            lib_version = lib_version_from_query_params(request)
+def _capture_messages(capture: CaptureRequest) -> list[tuple[str, KafkaMessage]]:
+    return [
+        (
+            event["event"],
+            build_capture_message(
+                event,
+                distinct_id,
+                capture.ip,
+                capture.site_url,
+                capture.now,
+                capture.sent_at,
+                event_uuid,
+                capture.token,
+                historical=capture.historical,
+            ),
+        )
+        for event, event_uuid, distinct_id in capture.processed_events
+    ]
+
+
+def _produce_failure_response(request, capture: CaptureRequest, exc: Exception) -> HttpResponse:
+    if isinstance(exc, KafkaProduceBatchError):
+        # TODO: distinguish between retriable errors and non-retriable
+        # errors, and set Retry-After header accordingly.
+        # TODO: return 400 error for non-retriable errors that require the
+        # client to change their request.
+
+        logger.exception(
+            "kafka_produce_failure",
+            exc_info=exc,
+            name=exc.errors[0][1].__class__.__name__,
+            failed=len(exc.errors),
+            total=exc.total,
+            # data could be large, so we don't always want to include it,
+            # but we do want to include it for some errors to aid debugging
+            data=capture.data if any(isinstance(error, MessageSizeTooLargeError) for _, error in exc.errors) else None,
+        )
+        return cors_response(
+            request,
+            generate_exception_response(
+                "capture",
+                "Unable to store some events. Please try again. If you are the owner of this app you can check the logs for further details.",
+                code="server_error",
+                type="server_error",
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            ),
+        )
 
-            alternative_replay_events = preprocess_replay_events_for_blob_ingestion(
-                replay_events, settings.SESSION_RECORDING_KAFKA_MAX_REQUEST_SIZE_BYTES
-            )
+    capture_exception(exc, {"data": capture.data})
+    statsd.incr("posthog_cloud_raw_endpoint_failure", tags={"endpoint": "capture"})
+    logger.exception("kafka_produce_failure", exc_info=exc)
+    return cors_response(
+        request,
+        generate_exception_response(
+            "capture",
+            "Unable to store event. Please try again. If you are the owner of this app you can check the logs for further details.",
+            code="server_error",
+            type="server_error",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        ),
+    )
+
+
+def _prepare_replay_capture(request, capture: CaptureRequest) -> Optional[ReplayCapture]:
+    if not capture.replay_events:
+        return None
+
+    lib_version = lib_version_from_query_params(request)
 
-            replay_futures: list[tuple[FutureRecordMetadata, tuple, dict]] = []
-
-            # We want to be super careful with our new ingestion flow for now so the whole thing is separated
-            # This is mostly a copy of above except we only log, we don't error out
-            if alternative_replay_events:
-                processed_events = list(preprocess_events(alternative_replay_events))
-                compression_in_capture = _compress_in_capture(token)
-                with REPLAY_MESSAGE_PRODUCTION_TIMER.labels(compress_in_capture=compression_in_capture).time():
-                    for event, event_uuid, distinct_id in processed_events:
-                        capture_args = (
-                            event,
-                            distinct_id,
-                            ip,
-                            site_url,
-                            now,
-                            sent_at,
-                            event_uuid,
-                            token,
-                        )
-                        capture_kwargs = {
-                            "extra_headers": [
-                                ("lib_version", lib_version),
-                            ],
-                        }
-                        this_future = capture_internal(*capture_args, **capture_kwargs)
-                        replay_futures.append((this_future, capture_args, capture_kwargs))
-
-                    start_time = time.monotonic()
-                    for future, args, kwargs in replay_futures:
-                        if future is not None:
-                            try:
-                                future.get(
-                                    timeout=settings.KAFKA_PRODUCE_ACK_TIMEOUT_SECONDS - (time.monotonic() - start_time)
-                                )
-                            except MessageSizeTooLargeError as mstle:
-                                REPLAY_MESSAGE_SIZE_TOO_LARGE_COUNTER.inc()
-                                warning_event = replace_with_warning(args[0], token, mstle, lib_version)
-                                if warning_event:
-                                    warning_future = capture_internal(warning_event, *args[1:], **kwargs)
-                                    warning_future.get(timeout=settings.KAFKA_PRODUCE_ACK_TIMEOUT_SECONDS)
-
-    except ValueError as e:
+    alternative_replay_events = preprocess_replay_events_for_blob_ingestion(
+        capture.replay_events, settings.SESSION_RECORDING_KAFKA_MAX_REQUEST_SIZE_BYTES
+    )
+
+    # We want to be super careful with our new ingestion flow for now so the whole thing is separated
+    # This is mostly a copy of above except we only log, we don't error out
+    if not alternative_replay_events:
+        return None
+
+    return ReplayCapture(
+        processed_events=list(preprocess_events(alternative_replay_events)),
+        lib_version=lib_version,
+        compression_in_capture=_compress_in_capture(capture.token),
+    )
+
+
+def _replay_message(
+    capture: CaptureRequest, replay: ReplayCapture, event: dict[str, Any], event_uuid: UUIDT, distinct_id: str
+) -> KafkaMessage:
+    return build_capture_message(
+        event,
+        distinct_id,
+        capture.ip,
+        capture.site_url,
+        capture.now,
+        capture.sent_at,
+        event_uuid,
+        capture.token,
+        extra_headers=[("lib_version", replay.lib_version)],
+    )
+
+
+def _replay_messages(capture: CaptureRequest, replay: ReplayCapture) -> list[tuple[str, KafkaMessage]]:
+    return [
+        (event["event"], _replay_message(capture, replay, event, event_uuid, distinct_id))
+        for event, event_uuid, distinct_id in replay.processed_events
+    ]
+
+
+def _message_too_large_warnings(
+    capture: CaptureRequest, replay: ReplayCapture, exc: KafkaProduceBatchError
+) -> list[tuple[str, KafkaMessage]]:
+    """
+    Replaces each replay message that was too large for Kafka with a warning, re-raising any other error
+    """
+    warning_messages = []
+    for index, error in exc.errors:
+        if not isinstance(error, MessageSizeTooLargeError):
+            raise error
+        REPLAY_MESSAGE_SIZE_TOO_LARGE_COUNTER.inc()
+        event, event_uuid, distinct_id = replay.processed_events[index]
+        warning_event = replace_with_warning(event, capture.token, error, replay.lib_version)
+        if warning_event:
+            warning_message = _replay_message(capture, replay, warning_event, event_uuid, distinct_id)
+            warning_messages.append((warning_event["event"], warning_message))
+    return warning_messages
+
+
+def _replay_failure_response(request, capture: CaptureRequest, exc: Exception) -> Optional[HttpResponse]:
+    """
+    Returns the response to send when producing replay events failed, or None if the failure is only logged
+    """
+    if isinstance(exc, ValueError):
         with sentry_sdk.push_scope() as scope:
             scope.set_tag("capture-pathway", "replay")
-            scope.set_tag("ph-team-token", token)
-            capture_exception(e)
+            scope.set_tag("ph-team-token", capture.token)
+            capture_exception(exc)
         # this means we're getting an event we can't process, we shouldn't swallow this
         # in production this is mostly seen as events with a missing distinct_id
         return cors_response(
             request,
             generate_exception_response("capture", f"Invalid recording payload", code="invalid_payload"),
         )
-    except KafkaTimeoutError as kte:
+
+    if isinstance(exc, KafkaTimeoutError):
+        retry_count = capture.retry_count
         # posthog-js will retry when it receives a 504, and it sends `retry_count` in the query params,
         # so we use this to retry on 0, 1, and 2 and then return a 400 on the fourth attempt
         # this is to prevent a client from retrying indefinitely
@@ -624,9 +746,9 @@ def get_event(request):
         if status_code == status.HTTP_400_BAD_REQUEST:
             with sentry_sdk.push_scope() as scope:
                 scope.set_tag("capture-pathway", "replay")
-                scope.set_tag("ph-team-token", token)
+                scope.set_tag("ph-team-token", capture.token)
                 scope.set_tag("retry_count", retry_count)
-                capture_exception(kte)
+                capture_exception(exc)
 
         return cors_response(
             request,
@@ -638,18 +760,149 @@ def get_event(request):
                 status_code=status_code,
             ),
         )
+
+    with sentry_sdk.push_scope() as scope:
+        scope.set_tag("capture-pathway", "replay")
+        scope.set_tag("ph-team-token", capture.token)
+        capture_exception(exc, {"data": capture.data})
+    logger.exception("kafka_session_recording_produce_failure", exc_info=exc)
+    return None
+
+
+@csrf_exempt
+@timed("posthog_cloud_event_endpoint")
+def get_event(request):
+    structlog.contextvars.unbind_contextvars("team_id")
+
+    # handle cors request
+    if request.method == "OPTIONS":
+        return cors_response(request, JsonResponse({"status": 1}))
+
+    capture, error_response = _parse_capture_request(request)
+    if capture is None:
+        return error_response
+
+    with start_span(op="kafka.produce") as span:
+        span.set_tag("event.count", len(capture.processed_events))
+        try:
+            log_events(_capture_messages(capture))
+        except Exception as exc:
+            return _produce_failure_response(request, capture, exc)
+
+    try:
+        replay = _prepare_replay_capture(request, capture)
+        if replay:
+            with REPLAY_MESSAGE_PRODUCTION_TIMER.labels(compress_in_capture=replay.compression_in_capture).time():
+                replay_messages = _replay_messages(capture, replay)
+                try:
+                    log_events(replay_messages)
+                except KafkaProduceBatchError as exc:
+                    warning_messages = _message_too_large_warnings(capture, replay, exc)
+                    if warning_messages:
+                        log_events(warning_messages)
     except Exception as exc:
-        with sentry_sdk.push_scope() as scope:
-            scope.set_tag("capture-pathway", "replay")
-            scope.set_tag("ph-team-token", token)
-            capture_exception(exc, {"data": data})
-        logger.exception("kafka_session_recording_produce_failure", exc_info=exc)
-        pass
+        replay_error_response = _replay_failure_response(request, capture, exc)
+        if replay_error_response:
+            return replay_error_response
 
     statsd.incr("posthog_cloud_raw_endpoint_success", tags={"endpoint": "capture"})
     return cors_response(request, JsonResponse({"status": 1}))
 
 
+def _parse_capture_request_and_messages(
+    request,
+) -> tuple[Optional[CaptureRequest], Optional[HttpResponse], list[tuple[str, KafkaMessage]]]:
+    capture, error_response = _parse_capture_request(request)
+    return capture, error_response, _capture_messages(capture) if capture else []
+
+
+def _prepare_replay_capture_and_messages(
+    request, capture: CaptureRequest
+) -> tuple[Optional[ReplayCapture], list[tuple[str, KafkaMessage]]]:
+    replay = _prepare_replay_capture(request, capture)
+    return replay, _replay_messages(capture, replay) if replay else []
+
+
+@timed("posthog_cloud_event_endpoint")
+async def get_event_async(request):
+    """
+    The same as `get_event`, but awaits Kafka acks instead of blocking a thread on them, so that one ASGI worker can
+    have many requests in flight while they are produced. Parsing the request and building the messages (with the
+    Redis lookups for quotas and overflow) still block, so they run in a thread. Served without any middleware by
+    `CaptureASGIHandler`.
+    """
+    structlog.contextvars.unbind_contextvars("team_id")
+
+    # handle cors request
+    if request.method == "OPTIONS":
+        return cors_response(request, JsonResponse({"status": 1}))
+
+    capture, error_response, messages = await sync_to_async(
+        _parse_capture_request_and_messages, thread_sensitive=False
+    )(request)
+    if capture is None:
+        return error_response
+
+    with start_span(op="kafka.produce") as span:
+        span.set_tag("event.count", len(capture.processed_events))
+        try:
+            await log_events_async(messages)
+        except Exception as exc:
+            return _produce_failure_response(request, capture, exc)
+
+    if not capture.replay_events:
+        statsd.incr("posthog_cloud_raw_endpoint_success", tags={"endpoint": "capture"})
+        return cors_response(request, JsonResponse({"status": 1}))
+
+    try:
+        replay, replay_messages = await sync_to_async(_prepare_replay_capture_and_messages, thread_sensitive=False)(
+            request, capture
+        )
+        if replay:
+            with REPLAY_MESSAGE_PRODUCTION_TIMER.labels(compress_in_capture=replay.compression_in_capture).time():
+                try:
+                    await log_events_async(replay_messages)
+                except KafkaProduceBatchError as exc:
+                    # replacing them can write samples of them to object storage
+                    warning_messages = await sync_to_async(_message_too_large_warnings, thread_sensitive=False)(
+                        capture, replay, exc
+                    )
+                    if warning_messages:
+                        await log_events_async(warning_messages)
+    except Exception as exc:
+        replay_error_response = _replay_failure_response(request, capture, exc)
+        if replay_error_response:
+            return replay_error_response
+
+    statsd.incr("posthog_cloud_raw_endpoint_success", tags={"endpoint": "capture"})
+    return cors_response(request, JsonResponse({"status": 1}))
+
+
+class CaptureASGIHandler(ASGIHandler):
+    """
+    Serves capture requests with `get_event_async` and no middleware.
+
+    All of our middleware is sync-only, so Django would run it in a thread for every request, and then the view back
+    on the event loop. Capture doesn't need any of it (`CaptureMiddleware` skips it for the sync view too, and the
+    views set their own CORS headers), so this leaves the event loop free to have many capture requests in flight.
+    """
+
+    async def __call__(self, scope, receive, send):
+        # Django serves each request in a ThreadSensitiveContext of its own, which starts a thread for each of them to
+        # run sync code in. Capture only runs its request signals in it, which can share the one thread instead.
+        await self.handle(scope, receive, send)
+
+    def load_middleware(self, is_async=False):
+        self._view_middleware = []
+        self._template_response_middleware = []
+        self._exception_middleware = []
+        self._middleware_chain = convert_exception_to_response(self._get_response_async)
+
+    def resolve_request(self, request):
+        request.resolver_match = ResolverMatch(get_event_async, (), {}, route=request.path_info)
+        return request.resolver_match
+
+
 def _compress_in_capture(token: str | None) -> bool:
     if (
         # this check is only here so that we can test in a limited way in production
@@ -808,6 +1061,28 @@ def capture_internal(
     historical=False,
     extra_headers: list[tuple[str, str]] | None = None,
 ):
+    message = build_capture_message(
+        event, distinct_id, ip, site_url, now, sent_at, event_uuid, token, historical, extra_headers
+    )
+    return log_event(message, event["event"])
+
+
+def gzip_json_serializer(data):
+    return gzip.compress(_KafkaProducer.json_serializer(data))
+
+
+def build_capture_message(
+    event,
+    distinct_id,
+    ip,
+    site_url,
+    now,
+    sent_at,
+    event_uuid=None,
+    token=None,
+    historical=False,
+    extra_headers: list[tuple[str, str]] | None = None,
+) -> KafkaMessage:
     if event_uuid is None:
         event_uuid = UUIDT()
 
@@ -825,10 +1100,6 @@ def capture_internal(
         token=token,
     )
 
-    def gzip_json_serializer(data):
-        json_data = json.dumps(data).encode("utf-8")
-        return gzip.compress(json_data)
-
     if event["event"] in SESSION_RECORDING_EVENT_NAMES:
         session_id = event["properties"]["$session_id"]
         headers = [("token", token), *extra_headers]
@@ -840,12 +1111,11 @@ def capture_internal(
         elif settings.REPLAY_OVERFLOW_SESSIONS_ENABLED:
             overflowing = session_id in _list_overflowing_keys(InputType.REPLAY)
 
-        return log_event(
-            parsed_event,
-            event["event"],
-            partition_key=session_id,
+        return KafkaMessage(
+            topic=_kafka_topic(event["event"], overflowing=overflowing),
+            data=parsed_event,
+            key=session_id,
             headers=headers,
-            overflowing=overflowing,
             value_serializer=value_serializer,
         )
 
@@ -862,7 +1132,11 @@ def capture_internal(
     else:
         kafka_partition_key = candidate_partition_key
 
-    return log_event(parsed_event, event["event"], partition_key=kafka_partition_key, historical=historical)
+    return KafkaMessage(
+        topic=_kafka_topic(event["event"], historical=historical),
+        data=parsed_event,
+        key=kafka_partition_key,
+    )
 
 
 def is_randomly_partitioned(candidate_partition_key: str) -> bool:
@@ -46,6 +46,7 @@ from posthog.models.feature_flag import (
     get_all_feature_flags,
     get_user_blast_radius,
 )
+from posthog.models.feature_flag.bulk_flag_matching import get_all_feature_flags_for_distinct_ids
 from posthog.models.feature_flag.flag_analytics import increment_request_count
 from posthog.models.feature_flag.flag_matching import check_flag_evaluation_query_is_ok
 from posthog.models.feedback.survey import Survey
@@ -65,6 +66,9 @@ DATABASE_FOR_LOCAL_EVALUATION = (
 
 BEHAVIOURAL_COHORT_FOUND_ERROR_CODE = "behavioral_cohort_found"
 
+# Most distinct_ids a single bulk evaluation request can evaluate flags for
+BULK_EVALUATION_MAX_DISTINCT_IDS = 10_000
+
 
 class FeatureFlagThrottle(BurstRateThrottle):
     # Throttle class that's scoped just to the local evaluation endpoint.
@@ -393,6 +397,21 @@ class MinimalFeatureFlagSerializer(serializers.ModelSerializer):
         ]
 
 
+class FeatureFlagBulkEvaluationSerializer(serializers.Serializer):
+    distinct_ids = serializers.ListField(child=serializers.CharField(), allow_empty=False)
+    # group type name -> group key
+    groups = serializers.DictField(child=serializers.CharField(), required=False, default=dict)
+    # group type name -> properties of that group
+    group_properties = serializers.DictField(child=serializers.DictField(), required=False, default=dict)
+
+    def validate_distinct_ids(self, distinct_ids: list[str]) -> list[str]:
+        if len(distinct_ids) > BULK_EVALUATION_MAX_DISTINCT_IDS:
+            raise serializers.ValidationError(
+                f"At most {BULK_EVALUATION_MAX_DISTINCT_IDS} distinct_ids can be evaluated at a time."
+            )
+        return distinct_ids
+
+
 class FeatureFlagViewSet(
     TeamAndOrgViewSetMixin,
     TaggedItemViewSetMixin,
@@ -619,6 +638,32 @@ class FeatureFlagViewSet(
             }
         )
 
+    @action(
+        methods=["POST"], detail=False, throttle_classes=[FeatureFlagThrottle], required_scopes=["feature_flag:read"]
+    )
+    def bulk_evaluation(self, request: request.Request, **kwargs):
+        """
+        Evaluates all feature flags for many distinct_ids at once, for backends (e.g. before sending an email
+        campaign). Doesn't write hash key overrides.
+        """
+        serializer = FeatureFlagBulkEvaluationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        matches = get_all_feature_flags_for_distinct_ids(
+            self.team_id,
+            list(dict.fromkeys(serializer.validated_data["distinct_ids"])),
+            serializer.validated_data["groups"],
+            group_property_value_overrides=serializer.validated_data["group_properties"],
+        )
+
+        return Response(
+            {
+                "featureFlags": {distinct_id: flag_values for distinct_id, (flag_values, _, _, _) in matches.items()},
+                "featureFlagPayloads": {distinct_id: payloads for distinct_id, (_, _, payloads, _) in matches.items()},
+                "errorsWhileComputingFlags": any(errors for (_, _, _, errors) in matches.values()),
+            }
+        )
+
     @action(methods=["GET"], detail=False)
     def evaluation_reasons(self, request: request.Request, **kwargs):
         distinct_id = request.query_params.get("distinct_id", None)
@@ -17,12 +17,14 @@ import lzstring
 import pytest
 import structlog
 import zlib
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
 from boto3 import resource
 from botocore.client import Config
 from botocore.exceptions import ClientError
 from django.http import HttpResponse
 from django.test import override_settings
-from django.test.client import MULTIPART_CONTENT, Client
+from django.test.client import MULTIPART_CONTENT, Client, RequestFactory
 from django.utils import timezone
 from freezegun import freeze_time
 from kafka.errors import KafkaError, MessageSizeTooLargeError, KafkaTimeoutError
@@ -37,6 +39,7 @@ from ee.billing.quota_limiting import QuotaLimitingCaches
 from posthog.api import capture
 from posthog.api.capture import (
     LIKELY_ANONYMOUS_IDS,
+    CaptureASGIHandler,
     get_distinct_id,
     is_randomly_partitioned,
     sample_replay_data_to_object_storage,
@@ -698,6 +701,98 @@ class TestCapture(BaseTest):
         response = self.client.get("/e/?data={}".format(quote(self._to_json(data))), HTTP_ORIGIN="https://localhost")
         self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
 
+    def _settled_future(self, exception: Exception | None = None) -> FutureRecordMetadata:
+        future = FutureRecordMetadata(
+            produce_future=FutureProduceResult(topic_partition=TopicPartition(KAFKA_EVENTS_PLUGIN_INGESTION_TOPIC, 1)),
+            relative_offset=0,
+            timestamp_ms=0,
+            checksum=0,
+            serialized_key_size=0,
+            serialized_value_size=0,
+            serialized_header_size=0,
+        )
+        if exception:
+            future.failure(exception)
+        else:
+            future.success(None)
+        return future
+
+    @patch("posthog.kafka_client.client._KafkaProducer.produce")
+    def test_async_capture_event(self, kafka_produce):
+        kafka_produce.return_value = self._settled_future()
+        data = {"event": "$pageview", "properties": {"distinct_id": 2, "token": self.team.api_token}}
+
+        request = RequestFactory().get(
+            "/e/?data={}".format(quote(self._to_json(data))), HTTP_ORIGIN="https://localhost"
+        )
+        response = async_to_sync(capture.get_event_async)(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.get("access-control-allow-origin"), "https://localhost")
+        self.assertDictContainsSubset(
+            {"distinct_id": "2", "ip": "127.0.0.1", "data": data, "token": self.team.api_token},
+            self._to_arguments(kafka_produce),
+        )
+
+    @patch("posthog.kafka_client.client._KafkaProducer.produce")
+    def test_async_capture_events_503_on_kafka_produce_errors(self, kafka_produce):
+        kafka_produce.return_value = self._settled_future(KafkaError("Failed to produce"))
+        data = {"event": "$pageview", "properties": {"distinct_id": 2, "token": self.team.api_token}}
+
+        request = RequestFactory().get("/e/?data={}".format(quote(self._to_json(data))))
+        response = async_to_sync(capture.get_event_async)(request)
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    @patch("posthog.kafka_client.client._KafkaProducer.produce")
+    def test_async_replay_capture_kafka_timeout_error(self, kafka_produce: MagicMock) -> None:
+        kafka_produce.side_effect = KafkaTimeoutError()
+        event = {
+            "event": "$snapshot",
+            "properties": {
+                "$snapshot_bytes": 60,
+                "$snapshot_data": [{"type": 2, "data": {"lots": "of data"}, "timestamp": 1234567890}],
+                "$session_id": "abc123",
+                "$window_id": "def456",
+                "distinct_id": "ghi789",
+            },
+            "distinct_id": "ghi789",
+        }
+
+        request = RequestFactory().post(
+            "/s/", data={"api_key": self.team.api_token, "data": json.dumps([event])}, content_type=MULTIPART_CONTENT
+        )
+        response = async_to_sync(capture.get_event_async)(request)
+
+        # signal the timeout so that the client retries
+        assert response.status_code == 504
+
+    @patch("posthog.kafka_client.client._KafkaProducer.produce")
+    def test_async_capture_handler_serves_capture_without_middleware(self, kafka_produce):
+        kafka_produce.return_value = self._settled_future()
+        body = json.dumps({"api_key": self.team.api_token, "batch": [{"event": "$pageview", "distinct_id": "2"}]})
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": "/batch/",
+            "query_string": b"",
+            "headers": [(b"content-type", b"application/json"), (b"origin", b"https://localhost")],
+        }
+
+        async def serve() -> tuple[dict, dict]:
+            communicator = ApplicationCommunicator(CaptureASGIHandler(), scope)
+            await communicator.send_input({"type": "http.request", "body": body.encode()})
+            return await communicator.receive_output(), await communicator.receive_output()
+
+        with patch("posthog.middleware.CaptureMiddleware.__call__") as capture_middleware:
+            start, response_body = async_to_sync(serve)()
+
+        self.assertEqual(start["status"], status.HTTP_200_OK)
+        self.assertIn((b"Access-Control-Allow-Origin", b"https://localhost"), start["headers"])
+        self.assertEqual(json.loads(response_body["body"]), {"status": 1})
+        self.assertEqual(self._to_arguments(kafka_produce)["distinct_id"], "2")
+        capture_middleware.assert_not_called()
+
     @patch("posthog.kafka_client.client._KafkaProducer.produce")
     def test_capture_event_ip(self, kafka_produce):
         data = {
@@ -975,7 +1070,7 @@ class TestCapture(BaseTest):
 
         validate_response(openapi_spec, response)
 
-    @patch("gzip.decompress")
+    @patch("posthog.utils.gunzip")
     @patch("posthog.kafka_client.client._KafkaProducer.produce")
     def test_invalid_js_gzip_zlib_error(self, kafka_produce, gzip_decompress):
         """
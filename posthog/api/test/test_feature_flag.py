@@ -5051,6 +5051,94 @@ class TestBlastRadius(ClickhouseTestMixin, APIBaseTest):
         )
 
 
+@patch(
+    "posthog.models.feature_flag.bulk_flag_matching.postgres_healthcheck.is_connected",
+    return_value=True,
+)
+class TestFeatureFlagBulkEvaluation(APIBaseTest):
+    def setUp(self):
+        cache.clear()
+        super().setUp()
+        self.personal_api_key = self._create_personal_api_key(scopes=["feature_flag:read"])
+        self.client.logout()
+
+    def _create_personal_api_key(self, **kwargs) -> str:
+        personal_api_key = generate_random_token_personal()
+        PersonalAPIKey.objects.create(
+            label="X", user=self.user, secure_value=hash_key_value(personal_api_key), **kwargs
+        )
+        return personal_api_key
+
+    def _post_bulk_evaluation(self, data: dict, personal_api_key: Optional[str] = None):
+        return self.client.post(
+            f"/api/projects/{self.team.id}/feature_flags/bulk_evaluation",
+            data,
+            format="json",
+            HTTP_AUTHORIZATION=f"Bearer {personal_api_key or self.personal_api_key}",
+        )
+
+    def test_flags_for_each_distinct_id(self, *args):
+        Person.objects.create(team=self.team, distinct_ids=["example_id"], properties={"email": "tim@posthog.com"})
+        FeatureFlag.objects.create(
+            team=self.team,
+            key="posthog-people",
+            created_by=self.user,
+            filters={
+                "groups": [
+                    {
+                        "properties": [
+                            {"key": "email", "value": "posthog.com", "type": "person", "operator": "icontains"}
+                        ]
+                    }
+                ],
+                "payloads": {"true": {"color": "blue"}},
+            },
+        )
+
+        response = self._post_bulk_evaluation({"distinct_ids": ["example_id", "other_id"]})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(),
+            {
+                "featureFlags": {"example_id": {"posthog-people": True}, "other_id": {"posthog-people": False}},
+                "featureFlagPayloads": {"example_id": {"posthog-people": {"color": "blue"}}, "other_id": {}},
+                "errorsWhileComputingFlags": False,
+            },
+        )
+
+    def test_requires_a_personal_api_key_with_access_to_the_project(self, *args):
+        response = self.client.post(
+            f"/api/projects/{self.team.id}/feature_flags/bulk_evaluation",
+            {"distinct_ids": ["example_id"], "api_key": self.team.api_token},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        for personal_api_key in (
+            self._create_personal_api_key(scopes=["insight:read"]),
+            self._create_personal_api_key(scopes=["feature_flag:read"], scoped_teams=[self.team.id + 1]),
+        ):
+            response = self._post_bulk_evaluation({"distinct_ids": ["example_id"]}, personal_api_key)
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_validates_the_request(self, *args):
+        for data in (
+            {},
+            {"distinct_ids": []},
+            {"distinct_ids": "example_id"},
+            {"distinct_ids": ["example_id"], "groups": ["company"]},
+            {"distinct_ids": ["example_id"], "groups": {"company": {"key": "posthog"}}},
+            {"distinct_ids": ["example_id"], "group_properties": {"company": "posthog"}},
+        ):
+            response = self._post_bulk_evaluation(data)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, data)
+
+        with patch("posthog.api.feature_flag.BULK_EVALUATION_MAX_DISTINCT_IDS", 2):
+            response = self._post_bulk_evaluation({"distinct_ids": ["a", "b", "c"]})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 class QueryTimeoutWrapper:
     def __call__(self, execute, *args, **kwargs):
         # execute so we capture queries in snapshots
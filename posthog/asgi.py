@@ -1,5 +1,6 @@
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 from django.http.response import HttpResponse
 
@@ -19,4 +20,23 @@ def lifetime_wrapper(func):
     return inner
 
 
-application = lifetime_wrapper(get_asgi_application())
+# Capture requests skip the middleware, and are served by the async capture view instead
+def capture_router(func, capture_func):
+    from posthog.middleware import CAPTURE_PATHS
+
+    async def inner(scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in CAPTURE_PATHS:
+            return await capture_func(scope, receive, send)
+        return await func(scope, receive, send)
+
+    return inner
+
+
+application = get_asgi_application()
+
+if settings.CAPTURE_ASYNC_VIEW_ENABLED:
+    from posthog.api.capture import CaptureASGIHandler
+
+    application = capture_router(application, CaptureASGIHandler())
+
+application = lifetime_wrapper(application)
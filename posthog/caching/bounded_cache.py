@@ -0,0 +1,98 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Generic, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class BoundedLRUCache(Generic[K, V]):
+    """
+    A thread-safe, process-local LRU cache bounded both by number of entries and by total weight.
+
+    The weight of an entry is computed by `weigh` when it is inserted, so callers can bound memory
+    with a cheap proxy (e.g. the length of the string an AST was parsed from) instead of measuring objects.
+    Entries heavier than `max_entry_weight` are never stored.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_weight: int,
+        weigh: Callable[[K, V], int] = lambda key, value: 1,
+        max_entry_weight: Optional[int] = None,
+        on_evict: Optional[Callable[[K, V], None]] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_weight = max_weight
+        self.max_entry_weight = max_entry_weight if max_entry_weight is not None else max_weight
+        self._weigh = weigh
+        self._on_evict = on_evict
+        self._data: OrderedDict[K, tuple[V, int]] = OrderedDict()
+        self._weight = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._data
+
+    @property
+    def weight(self) -> int:
+        return self._weight
+
+    def get(self, key: K) -> Optional[V]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: K, value: V) -> bool:
+        """Store `value` under `key`. Returns False if the entry was too heavy to be cached."""
+        if self.max_entries <= 0:
+            return False
+        weight = self._weigh(key, value)
+        if weight > self.max_entry_weight:
+            return False
+
+        evicted: list[tuple[K, V]] = []
+        with self._lock:
+            existing = self._data.pop(key, None)
+            if existing is not None:
+                self._weight -= existing[1]
+            self._data[key] = (value, weight)
+            self._weight += weight
+            while len(self._data) > self.max_entries or self._weight > self.max_weight:
+                evicted_key, (evicted_value, evicted_weight) = self._data.popitem(last=False)
+                self._weight -= evicted_weight
+                evicted.append((evicted_key, evicted_value))
+
+        if self._on_evict is not None:
+            for evicted_key, evicted_value in evicted:
+                self._on_evict(evicted_key, evicted_value)
+        return True
+
+    def pop(self, key: K) -> Optional[V]:
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is None:
+                return None
+            self._weight -= entry[1]
+            return entry[0]
+
+    def pop_where(self, predicate: Callable[[K], bool]) -> int:
+        """Remove all entries whose key matches `predicate`. Returns the number of removed entries."""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                self._weight -= self._data.pop(key)[1]
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._weight = 0
@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+from typing import Generic, Optional, TypeVar
+from uuid import uuid4
+
+import structlog
+from prometheus_client import Counter
+
+from posthog.caching.bounded_cache import BoundedLRUCache
+from posthog.redis import get_client
+
+logger = structlog.get_logger(__name__)
+
+LOCAL_CACHE_COUNTER = Counter(
+    "posthog_local_cache_total",
+    "Lookups of in-process caches kept coherent over Redis pub/sub, by result (hit, miss, expired or unavailable)",
+    labelnames=["cache", "result"],
+)
+
+# How long the listener blocks waiting for a message at a time
+LISTENER_POLL_INTERVAL_SECONDS = 1.0
+# How long the listener waits before reconnecting after Redis errors
+LISTENER_RETRY_INTERVAL_SECONDS = 5.0
+
+V = TypeVar("V")
+
+
+class PubSubInvalidatedCache(Generic[V]):
+    """
+    An in-process LRU cache in front of a shared store (e.g. Redis), kept coherent across processes.
+
+    Whoever writes a newer value to the shared store calls `set` (or `invalidate`), which publishes the key, and every
+    other process drops its copy. Entries are only served while this process is listening for those messages, so
+    a lost subscription can't leave a process serving outdated values: everyone falls back to the shared store.
+    """
+
+    def __init__(self, name: str, max_entries: int, max_weight: int, max_entry_weight: Optional[int] = None):
+        self.name = name
+        self.channel = f"local_cache_invalidation:{name}"
+        # (monotonic expiry time, value, weight)
+        self._cache: BoundedLRUCache[str, tuple[float, V, int]] = BoundedLRUCache(
+            max_entries=max_entries,
+            max_weight=max_weight,
+            max_entry_weight=max_entry_weight,
+            weigh=lambda key, entry: entry[2],
+        )
+        self._instance_id = uuid4().hex
+        self._listening = threading.Event()
+        self._listener: Optional[threading.Thread] = None
+        self._listener_pid: Optional[int] = None
+        self._listener_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[V]:
+        if not self._ensure_listener():
+            LOCAL_CACHE_COUNTER.labels(cache=self.name, result="unavailable").inc()
+            return None
+        entry = self._cache.get(key)
+        if entry is None:
+            LOCAL_CACHE_COUNTER.labels(cache=self.name, result="miss").inc()
+            return None
+        if time.monotonic() >= entry[0]:
+            LOCAL_CACHE_COUNTER.labels(cache=self.name, result="expired").inc()
+            self._cache.pop(key)
+            return None
+        LOCAL_CACHE_COUNTER.labels(cache=self.name, result="hit").inc()
+        return entry[1]
+
+    def set(self, key: str, value: V, ttl_seconds: float, weight: int = 1, *, publish: bool = True) -> None:
+        """
+        Cache `value` locally for `ttl_seconds`. Pass `publish=True` when `value` was just written to the shared
+        store, so that other processes drop what they have; `publish=False` when it was just read from there.
+        """
+        if publish:
+            self.invalidate(key)
+        if ttl_seconds > 0 and self._ensure_listener():
+            self._cache.set(key, (time.monotonic() + ttl_seconds, value, weight))
+
+    def invalidate(self, key: str) -> None:
+        self._cache.pop(key)
+        try:
+            get_client().publish(self.channel, f"{self._instance_id}:{key}")
+        except Exception as e:
+            # Other processes' copies will expire on their own
+            logger.warning("local_cache_invalidation_failed", cache=self.name, error=str(e))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def _ensure_listener(self) -> bool:
+        pid = os.getpid()
+        if self._listener_pid != pid or self._listener is None or not self._listener.is_alive():
+            with self._listener_lock:
+                if self._listener_pid != pid or self._listener is None or not self._listener.is_alive():
+                    # Forked (or first use): whatever was cached before isn't being invalidated in this process
+                    self._listening.clear()
+                    self._cache.clear()
+                    # Forked processes share our memory, but must not ignore each other's invalidations
+                    self._instance_id = uuid4().hex
+                    self._listener_pid = pid
+                    self._listener = threading.Thread(target=self._listen, name=f"local-cache-{self.name}", daemon=True)
+                    self._listener.start()
+                    self._listening.wait(timeout=0.1)
+        return self._listening.is_set()
+
+    def _listen(self) -> None:
+        own_prefix = f"{self._instance_id}:"
+        while True:
+            pubsub = None
+            try:
+                pubsub = get_client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                self._listening.set()
+                while True:
+                    message = pubsub.get_message(timeout=LISTENER_POLL_INTERVAL_SECONDS)
+                    if message is None or message["type"] != "message":
+                        continue
+                    data = message["data"]
+                    data = data.decode("utf-8") if isinstance(data, bytes) else data
+                    if not data.startswith(own_prefix):
+                        self._cache.pop(data.split(":", 1)[1])
+            except Exception as e:
+                logger.warning("local_cache_listener_failed", cache=self.name, error=str(e))
+                # We may have missed invalidations while disconnected
+                self._listening.clear()
+                self._cache.clear()
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            time.sleep(LISTENER_RETRY_INTERVAL_SECONDS)
@@ -0,0 +1,127 @@
+from collections.abc import Callable
+import time
+from time import monotonic
+from typing import Optional, TypeVar
+from uuid import uuid4
+
+import structlog
+from prometheus_client import Counter, Histogram
+from redis import RedisError
+
+from posthog.metrics import LABEL_TEAM_ID
+from posthog.redis import get_client
+
+logger = structlog.get_logger(__name__)
+
+SINGLE_FLIGHT_COUNTER = Counter(
+    "posthog_single_flight_total",
+    "Calculations run through single-flight, by how the caller got its result.",
+    labelnames=[LABEL_TEAM_ID, "outcome"],
+)
+
+SINGLE_FLIGHT_WAIT_HISTOGRAM = Histogram(
+    "posthog_single_flight_wait_seconds",
+    "How long coalesced callers waited for a calculation in flight elsewhere.",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, float("inf")),
+)
+
+# Only delete the lock if we still own it, i.e. it hasn't expired and been taken over by someone else
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+else
+    return 0
+end
+"""
+
+# How often waiters wake up without a notification, to notice a leader whose lock expired
+WAITER_POLL_INTERVAL_SECONDS = 1.0
+
+T = TypeVar("T")
+
+
+def run_single_flight(
+    key: str,
+    calculate: Callable[[], T],
+    get_result: Callable[[], Optional[T]],
+    *,
+    team_id: int,
+    lock_timeout: float,
+    wait_timeout: float,
+) -> T:
+    """
+    Runs `calculate` in at most one process at a time for `key`, coordinated through a Redis lock.
+
+    Callers that find a calculation for the same key in flight subscribe to its completion and return `get_result()`
+    instead (e.g. reading what the leader wrote to the cache). `calculate` is expected to make its result available
+    to `get_result` before returning. If the leader fails or waiting takes longer than `wait_timeout`, callers take over
+    the calculation themselves. If Redis is unavailable, everyone just calculates.
+    """
+    client = get_client()
+    lock_key = f"single_flight:{key}"
+    channel = f"single_flight_done:{key}"
+    token = uuid4().hex
+    deadline = monotonic() + wait_timeout
+    wait_start: Optional[float] = None
+    pubsub = None
+
+    try:
+        while True:
+            try:
+                acquired = client.set(lock_key, token, nx=True, px=int(lock_timeout * 1000))
+            except RedisError as e:
+                logger.warning("single_flight_redis_unavailable", key=key, error=str(e))
+                SINGLE_FLIGHT_COUNTER.labels(team_id=team_id, outcome="redis_unavailable").inc()
+                return calculate()
+
+            if acquired:
+                try:
+                    if wait_start is not None:
+                        # We waited for a leader that released the lock, maybe after it got the result ready
+                        SINGLE_FLIGHT_WAIT_HISTOGRAM.observe(monotonic() - wait_start)
+                        result = get_result()
+                        if result is not None:
+                            SINGLE_FLIGHT_COUNTER.labels(team_id=team_id, outcome="coalesced").inc()
+                            return result
+                        SINGLE_FLIGHT_COUNTER.labels(team_id=team_id, outcome="took_over").inc()
+                    else:
+                        SINGLE_FLIGHT_COUNTER.labels(team_id=team_id, outcome="leader").inc()
+                    return calculate()
+                finally:
+                    try:
+                        client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+                        client.publish(channel, token)
+                    except RedisError as e:
+                        # Waiters will notice once the lock expires
+                        logger.warning("single_flight_release_failed", key=key, error=str(e))
+
+            if wait_start is None or pubsub is None:
+                wait_start = monotonic()
+                try:
+                    pubsub = client.pubsub(ignore_subscribe_messages=True)
+                    pubsub.subscribe(channel)
+                except RedisError as e:
+                    logger.warning("single_flight_redis_unavailable", key=key, error=str(e))
+                    SINGLE_FLIGHT_COUNTER.labels(team_id=team_id, outcome="redis_unavailable").inc()
+                    return calculate()
+
+            # Check after subscribing, as the leader may have finished before we did
+            result = get_result()
+            if result is not None:
+                SINGLE_FLIGHT_COUNTER.labels(team_id=team_id, outcome="coalesced").inc()
+                SINGLE_FLIGHT_WAIT_HISTOGRAM.observe(monotonic() - wait_start)
+                return result
+
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                SINGLE_FLIGHT_COUNTER.labels(team_id=team_id, outcome="wait_timeout").inc()
+                return calculate()
+
+            try:
+                pubsub.get_message(timeout=min(remaining, WAITER_POLL_INTERVAL_SECONDS))
+            except RedisError:
+                # Fall back to polling until the deadline
+                time.sleep(min(remaining, WAITER_POLL_INTERVAL_SECONDS))
+    finally:
+        if pubsub is not None:
+            pubsub.close()
@@ -0,0 +1,51 @@
+from unittest import TestCase
+
+from posthog.caching.bounded_cache import BoundedLRUCache
+
+
+class TestBoundedLRUCache(TestCase):
+    def test_evicts_least_recently_used_entry(self):
+        evicted = []
+        cache: BoundedLRUCache[str, int] = BoundedLRUCache(
+            max_entries=2, max_weight=100, on_evict=lambda key, value: evicted.append(key)
+        )
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(evicted, ["b"])
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+
+    def test_bounded_by_weight(self):
+        cache: BoundedLRUCache[str, str] = BoundedLRUCache(
+            max_entries=100, max_weight=10, weigh=lambda key, value: len(value)
+        )
+        cache.set("a", "aaaa")
+        cache.set("b", "bbbb")
+        cache.set("c", "cccc")
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.weight, 8)
+        self.assertNotIn("a", cache)
+
+    def test_does_not_store_entries_heavier_than_max_entry_weight(self):
+        cache: BoundedLRUCache[str, str] = BoundedLRUCache(
+            max_entries=100, max_weight=10, max_entry_weight=3, weigh=lambda key, value: len(value)
+        )
+
+        self.assertFalse(cache.set("a", "aaaa"))
+        self.assertTrue(cache.set("b", "bb"))
+        self.assertEqual(len(cache), 1)
+
+    def test_replacing_an_entry_updates_the_weight(self):
+        cache: BoundedLRUCache[str, str] = BoundedLRUCache(
+            max_entries=100, max_weight=10, weigh=lambda key, value: len(value)
+        )
+        cache.set("a", "aaaa")
+        cache.set("a", "aa")
+
+        self.assertEqual(cache.weight, 2)
+        self.assertEqual(cache.pop("a"), "aa")
+        self.assertEqual(cache.weight, 0)
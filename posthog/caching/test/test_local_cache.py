@@ -0,0 +1,56 @@
+import time
+from unittest.mock import patch
+
+from posthog.caching.local_cache import PubSubInvalidatedCache
+from posthog.test.base import BaseTest
+
+
+def wait_until(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+class TestPubSubInvalidatedCache(BaseTest):
+    def _cache(self) -> PubSubInvalidatedCache[str]:
+        cache: PubSubInvalidatedCache[str] = PubSubInvalidatedCache("test", max_entries=10, max_weight=100)
+        self.assertTrue(wait_until(lambda: cache._ensure_listener()))
+        return cache
+
+    def test_get_and_set(self):
+        cache = self._cache()
+
+        self.assertIsNone(cache.get("key"))
+        cache.set("key", "value", ttl_seconds=60)
+
+        self.assertEqual(cache.get("key"), "value")
+
+    def test_entries_expire(self):
+        cache = self._cache()
+
+        with patch("posthog.caching.local_cache.time.monotonic", return_value=1000):
+            cache.set("key", "value", ttl_seconds=10)
+        with patch("posthog.caching.local_cache.time.monotonic", return_value=1011):
+            self.assertIsNone(cache.get("key"))
+
+    def test_set_in_one_process_invalidates_others(self):
+        writer, reader = self._cache(), self._cache()
+        writer.set("key", "old", ttl_seconds=60)
+        reader.set("key", "old", ttl_seconds=60, publish=False)
+
+        writer.set("key", "new", ttl_seconds=60)
+
+        self.assertTrue(wait_until(lambda: reader.get("key") is None))
+        # The writer's own message doesn't drop what it just cached
+        self.assertEqual(writer.get("key"), "new")
+
+    def test_nothing_is_served_without_a_subscription(self):
+        cache: PubSubInvalidatedCache[str] = PubSubInvalidatedCache("test", max_entries=10, max_weight=100)
+
+        with patch("posthog.caching.local_cache.get_client", side_effect=ConnectionError("redis is down")):
+            cache.set("key", "value", ttl_seconds=60, publish=False)
+
+            self.assertIsNone(cache.get("key"))
@@ -0,0 +1,98 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+from redis import RedisError
+
+from posthog.caching.single_flight import run_single_flight
+from posthog.redis import get_client
+from posthog.test.base import BaseTest
+
+
+class TestSingleFlight(BaseTest):
+    def setUp(self):
+        super().setUp()
+        get_client().flushdb()
+
+    def test_calculates_when_lock_is_free(self):
+        calculate = MagicMock(return_value="result")
+
+        result = run_single_flight("key", calculate, lambda: None, team_id=1, lock_timeout=10, wait_timeout=10)
+
+        self.assertEqual(result, "result")
+        calculate.assert_called_once()
+        self.assertIsNone(get_client().get("single_flight:key"))
+
+    def test_waits_for_leader_and_returns_its_result(self):
+        results: dict[str, str] = {}
+        leader_started = threading.Event()
+
+        def leader_calculate():
+            leader_started.set()
+            threading.Event().wait(0.5)
+            results["key"] = "from leader"
+            return "from leader"
+
+        leader = threading.Thread(
+            target=run_single_flight,
+            args=("key", leader_calculate, lambda: results.get("key")),
+            kwargs={"team_id": 1, "lock_timeout": 10, "wait_timeout": 10},
+        )
+        leader.start()
+        leader_started.wait()
+
+        follower_calculate = MagicMock(return_value="from follower")
+        result = run_single_flight(
+            "key", follower_calculate, lambda: results.get("key"), team_id=1, lock_timeout=10, wait_timeout=10
+        )
+        leader.join()
+
+        self.assertEqual(result, "from leader")
+        follower_calculate.assert_not_called()
+
+    def test_takes_over_when_leader_fails(self):
+        leader_started = threading.Event()
+
+        def leader_calculate():
+            leader_started.set()
+            threading.Event().wait(0.5)
+            raise ValueError("query failed")
+
+        leader = threading.Thread(
+            target=lambda: self.assertRaises(
+                ValueError,
+                run_single_flight,
+                "key",
+                leader_calculate,
+                lambda: None,
+                team_id=1,
+                lock_timeout=10,
+                wait_timeout=10,
+            )
+        )
+        leader.start()
+        leader_started.wait()
+
+        result = run_single_flight("key", lambda: "retried", lambda: None, team_id=1, lock_timeout=10, wait_timeout=10)
+        leader.join()
+
+        self.assertEqual(result, "retried")
+
+    def test_calculates_after_wait_timeout(self):
+        get_client().set("single_flight:key", "someone else")
+
+        result = run_single_flight("key", lambda: "result", lambda: None, team_id=1, lock_timeout=10, wait_timeout=0.1)
+
+        self.assertEqual(result, "result")
+        # Someone else's lock is left alone
+        self.assertEqual(get_client().get("single_flight:key"), b"someone else")
+
+    def test_calculates_when_redis_is_unavailable(self):
+        client = MagicMock()
+        client.set.side_effect = RedisError("connection refused")
+
+        with patch("posthog.caching.single_flight.get_client", return_value=client):
+            result = run_single_flight(
+                "key", lambda: "result", lambda: None, team_id=1, lock_timeout=10, wait_timeout=10
+            )
+
+        self.assertEqual(result, "result")
@@ -1,4 +1,10 @@
-from typing import Optional
+import json
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Optional
+
+from hogvm.python.execute import execute_bytecode
+from hogvm.python.program import DecodedBytecode, execute_decoded_bytecode, get_decoded_bytecode
 from posthog.models.action.action import Action
 from posthog.hogql.bytecode import create_bytecode
 from posthog.hogql.parser import parse_expr
@@ -83,3 +89,155 @@ def compile_filters_bytecode(filters: Optional[dict], team: Team, actions: Optio
         filters["bytecode_error"] = str(e)
 
     return filters
+
+
+# Filters are simple comparisons, so each condition gets a fraction of the timeout a whole hog function gets
+FILTER_CONDITION_TIMEOUT = timedelta(seconds=1)
+
+
+@dataclass
+class _FilterCondition:
+    bytecode: list[Any]
+    program: Optional[DecodedBytecode]
+
+    def matches(self, globals: dict[str, Any]) -> bool:
+        try:
+            if self.program is not None:
+                result, _ = execute_decoded_bytecode(self.program, globals, None, FILTER_CONDITION_TIMEOUT, None)
+            else:
+                result = execute_bytecode(self.bytecode, globals, timeout=FILTER_CONDITION_TIMEOUT).result
+        except Exception:
+            # A condition that fails to evaluate (e.g. on a malformed event) doesn't match
+            return False
+        return bool(result)
+
+
+@dataclass
+class _FilterClause:
+    function_index: int
+    # indexes of the filter set's conditions, which must all match
+    conditions: list[int]
+
+
+@dataclass
+class HogFunctionFilterSet:
+    """
+    The filters of many hog functions (e.g. all of a team's) merged together, to find which functions an event matches
+    without running each function's filters bytecode on it.
+
+    Each function's filters are split into clauses, any of which matching is enough, of conditions that must all match.
+    Conditions the functions share (e.g. the team's test account filters) are evaluated once per event, and clauses
+    for a specific event are only looked at for that event.
+    """
+
+    function_ids: list[str] = field(default_factory=list)
+    conditions: list[_FilterCondition] = field(default_factory=list)
+    clauses_by_event: dict[str, list[_FilterClause]] = field(default_factory=dict)
+    clauses_for_all_events: list[_FilterClause] = field(default_factory=list)
+    # functions whose filters couldn't be compiled, with the error, which never match
+    errors: dict[str, str] = field(default_factory=dict)
+
+    def matching_function_ids(self, globals: dict[str, Any]) -> list[str]:
+        """
+        Returns the ids of the functions whose filters match the event, given the globals their filters bytecode gets
+        """
+        condition_results: dict[int, bool] = {}
+        matched: set[int] = set()
+
+        for clauses in (self.clauses_by_event.get(globals.get("event"), []), self.clauses_for_all_events):
+            for clause in clauses:
+                if clause.function_index in matched:
+                    continue
+                for condition in clause.conditions:
+                    result = condition_results.get(condition)
+                    if result is None:
+                        result = condition_results[condition] = self.conditions[condition].matches(globals)
+                    if not result:
+                        break
+                else:
+                    matched.add(clause.function_index)
+
+        return [self.function_ids[index] for index in sorted(matched)]
+
+
+def _filter_clauses(expr: ast.Expr) -> list[list[ast.Expr]]:
+    """
+    Splits filters into clauses, any of which matching is enough, of conditions that must all match
+    """
+    return [_clause_conditions(clause) for clause in (expr.exprs if isinstance(expr, ast.Or) else [expr])]
+
+
+def _clause_conditions(expr: ast.Expr) -> list[ast.Expr]:
+    if isinstance(expr, ast.And):
+        return [condition for sub_expr in expr.exprs for condition in _clause_conditions(sub_expr)]
+    if isinstance(expr, ast.Constant) and expr.value is True:
+        return []
+    return [expr]
+
+
+def _event_name(condition: ast.Expr) -> Optional[str]:
+    if (
+        isinstance(condition, ast.CompareOperation)
+        and condition.op == ast.CompareOperationOp.Eq
+        and isinstance(condition.left, ast.Field)
+        and condition.left.chain == ["event"]
+        and isinstance(condition.right, ast.Constant)
+        and isinstance(condition.right.value, str)
+    ):
+        return condition.right.value
+    return None
+
+
+def compile_filter_set(
+    filters_by_function_id: dict[str, Optional[dict]], team: Team, actions: Optional[dict[int, Action]] = None
+) -> HogFunctionFilterSet:
+    """
+    Compiles the filters of the team's hog functions, keyed by function id, into one filter set
+    """
+    if actions is None:
+        # Fetch the actions of all the functions at once, rather than for each of them
+        action_ids = [
+            action_id for filters in filters_by_function_id.values() for action_id in filter_action_ids(filters)
+        ]
+        actions = {
+            action.id: action
+            for action in Action.objects.select_related("team").filter(team_id=team.id).filter(id__in=action_ids)
+        }
+
+    filter_set = HogFunctionFilterSet()
+    condition_indexes: dict[str, int] = {}
+
+    for function_id, filters in filters_by_function_id.items():
+        try:
+            clauses = [
+                [(condition, create_bytecode(condition)) for condition in conditions]
+                for conditions in _filter_clauses(compile_filters_expr(filters, team, actions))
+            ]
+        except Exception as e:
+            filter_set.errors[function_id] = str(e)
+            continue
+
+        function_index = len(filter_set.function_ids)
+        filter_set.function_ids.append(function_id)
+
+        for clause in clauses:
+            event_name: Optional[str] = None
+            filter_clause = _FilterClause(function_index=function_index, conditions=[])
+            for condition, bytecode in clause:
+                if event_name is None:
+                    event_name = _event_name(condition)
+                    if event_name is not None:
+                        continue
+
+                key = json.dumps(bytecode)
+                if key not in condition_indexes:
+                    condition_indexes[key] = len(filter_set.conditions)
+                    filter_set.conditions.append(_FilterCondition(bytecode, get_decoded_bytecode(bytecode)))
+                filter_clause.conditions.append(condition_indexes[key])
+
+            if event_name is not None:
+                filter_set.clauses_by_event.setdefault(event_name, []).append(filter_clause)
+            else:
+                filter_set.clauses_for_all_events.append(filter_clause)
+
+    return filter_set
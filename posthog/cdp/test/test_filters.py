@@ -0,0 +1,77 @@
+from hogvm.python.execute import execute_bytecode
+from posthog.cdp.filters import compile_filter_set, compile_filters_bytecode
+from posthog.models.action.action import Action
+from posthog.test.base import BaseTest
+
+
+class TestHogFunctionFilterSet(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.team.test_account_filters = [
+            {"key": "email", "value": "@posthog.com", "operator": "not_icontains", "type": "person"}
+        ]
+        self.team.save()
+        action = Action.objects.create(
+            team=self.team,
+            name="Viewed docs",
+            steps_json=[{"event": "$pageview", "url": "docs", "url_matching": "contains"}],
+        )
+        chrome = [{"key": "$browser", "value": "Chrome", "operator": "exact", "type": "event"}]
+        self.filters_by_function_id = {
+            "pageviews": {
+                "events": [{"id": "$pageview", "name": "$pageview", "type": "events", "order": 0}],
+                "filter_test_accounts": True,
+            },
+            "chrome pageviews and signups": {
+                "events": [
+                    {"id": "$pageview", "name": "$pageview", "type": "events", "order": 0, "properties": chrome},
+                    {"id": "signed up", "name": "signed up", "type": "events", "order": 1},
+                ],
+                "filter_test_accounts": True,
+            },
+            "docs": {"actions": [{"id": f"{action.id}", "name": "Viewed docs", "type": "actions", "order": 0}]},
+            "missing action": {"actions": [{"id": "0", "name": "Deleted", "type": "actions", "order": 0}]},
+            "chrome": {"events": [{"id": None, "name": None, "type": "events", "order": 0, "properties": chrome}]},
+            "real users": {"filter_test_accounts": True},
+            "everything": {},
+        }
+
+    def _globals(self, event: str, browser: str = "Chrome", email: str = "someone@example.com", url: str = "/") -> dict:
+        return {
+            "event": event,
+            "properties": {"$browser": browser, "$current_url": url},
+            "person": {"properties": {"email": email}},
+        }
+
+    def test_matches_the_functions_their_own_filters_match(self):
+        filter_set = compile_filter_set(self.filters_by_function_id, self.team)
+
+        for globals in [
+            self._globals("$pageview"),
+            self._globals("$pageview", browser="Safari", url="https://posthog.com/docs"),
+            self._globals("$pageview", email="max@posthog.com", url="https://posthog.com/docs"),
+            self._globals("signed up", browser="Firefox"),
+            self._globals("signed up", email="max@posthog.com"),
+            self._globals("$autocapture"),
+        ]:
+            assert filter_set.matching_function_ids(globals) == [
+                function_id
+                for function_id, filters in self.filters_by_function_id.items()
+                if execute_bytecode(compile_filters_bytecode(dict(filters), self.team)["bytecode"], globals).result
+            ], globals
+
+    def test_evaluates_shared_conditions_once_and_indexes_clauses_by_event(self):
+        filter_set = compile_filter_set(self.filters_by_function_id, self.team)
+
+        # the test account filter, the browser, the action's url, and the missing action
+        assert len(filter_set.conditions) == 4
+        # the action's step is for pageviews too
+        assert {event: len(clauses) for event, clauses in filter_set.clauses_by_event.items()} == {
+            "$pageview": 3,
+            "signed up": 1,
+        }
+        assert filter_set.matching_function_ids(self._globals("$pageview", browser="Safari")) == [
+            "pageviews",
+            "real users",
+            "everything",
+        ]
@@ -1,11 +1,13 @@
+import dataclasses
 import json
 import threading
 import types
 from contextlib import contextmanager
 from functools import lru_cache
+from itertools import islice
 from time import perf_counter
-from typing import Any, Optional, Union
-from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any, Optional, Union
+from collections.abc import Iterator, Sequence
 
 import sqlparse
 from clickhouse_driver import Client as SyncClient
@@ -19,12 +21,19 @@ from posthog.errors import wrap_query_error
 from posthog.settings import TEST
 from posthog.utils import generate_short_id, patchable
 
+if TYPE_CHECKING:
+    import numpy as np
+    import pyarrow as pa
+
 InsertParams = Union[list, tuple, types.GeneratorType]
 NonInsertParams = dict[str, Any]
 QueryArgs = Optional[Union[InsertParams, NonInsertParams]]
 
 thread_local_storage = threading.local()
 
+# Rows per block yielded by `sync_execute_iter`, also used as ClickHouse's `max_block_size` for the query
+DEFAULT_STREAM_BLOCK_SIZE = 10_000
+
 # As of CH 22.8 - more algorithms have been added on newer versions
 CLICKHOUSE_SUPPORTED_JOIN_ALGORITHMS = [
     "default",
@@ -84,37 +93,16 @@ def sync_execute(
     readonly=False,
 ):
     if TEST and flush:
-        try:
-            from posthog.test.base import flush_persons_and_events
-
-            flush_persons_and_events()
-        except ModuleNotFoundError:  # when we run plugin server tests it tries to run above, ignore
-            pass
-
-    if workload == Workload.DEFAULT and (
-        # When someone uses an API key, always put their query to the offline cluster
-        get_query_tag_value("access_method") == "personal_api_key"
-        or
-        # Execute all celery tasks not directly set to be online on the offline cluster
-        get_query_tag_value("kind") == "celery"
-    ):
-        workload = Workload.OFFLINE
+        _flush_test_data()
 
-    # Make sure we always have process_query_task on the online cluster
-    if get_query_tag_value("id") == "posthog.tasks.tasks.process_query_task":
-        workload = Workload.ONLINE
+    workload = _resolve_workload(workload)
 
     with get_pool(workload, team_id, readonly).get_client() as client:
         start_time = perf_counter()
 
         prepared_sql, prepared_args, tags = _prepare_query(client=client, query=query, args=args, workload=workload)
         query_id = validated_client_query_id()
-        core_settings = {**default_settings(), **(settings or {})}
-        tags["query_settings"] = core_settings
-        settings = {
-            **core_settings,
-            "log_comment": json.dumps(tags, separators=(",", ":")),
-        }
+        settings = _query_settings(settings, tags)
         try:
             result = client.execute(
                 prepared_sql,
@@ -144,6 +132,121 @@ def sync_execute(
     return result
 
 
+@dataclasses.dataclass
+class ResultBlock:
+    """A block of rows of a streamed query result, see `sync_execute_iter`."""
+
+    column_types: list[tuple[str, str]]
+    rows: list[tuple]
+
+    @property
+    def column_names(self) -> list[str]:
+        return [name for name, _type in self.column_types]
+
+    def to_dicts(self) -> list[dict[str, Any]]:
+        names = self.column_names
+        return [dict(zip(names, row)) for row in self.rows]
+
+    def to_numpy(self) -> dict[str, "np.ndarray"]:
+        """Decode the block into one NumPy array per column, using native dtypes for numeric columns."""
+        import numpy as np
+
+        columns = list(zip(*self.rows)) if self.rows else [() for _ in self.column_types]
+        return {
+            name: np.array(values, dtype=_numpy_dtype(type_name))
+            for (name, type_name), values in zip(self.column_types, columns)
+        }
+
+    def to_arrow(self) -> "pa.RecordBatch":
+        """Decode the block into a columnar Arrow record batch."""
+        import pyarrow as pa
+
+        columns = list(zip(*self.rows)) if self.rows else [() for _ in self.column_types]
+        return pa.RecordBatch.from_arrays([pa.array(values) for values in columns], names=self.column_names)
+
+
+_NUMPY_DTYPES = {
+    "UInt8": "uint8",
+    "UInt16": "uint16",
+    "UInt32": "uint32",
+    "UInt64": "uint64",
+    "Int8": "int8",
+    "Int16": "int16",
+    "Int32": "int32",
+    "Int64": "int64",
+    "Float32": "float32",
+    "Float64": "float64",
+    "Bool": "bool",
+}
+
+
+def _numpy_dtype(clickhouse_type: str) -> str:
+    # Anything that can hold NULLs, strings, dates or nested values stays a Python object
+    return _NUMPY_DTYPES.get(clickhouse_type, "object")
+
+
+def sync_execute_iter(
+    query,
+    args=None,
+    settings=None,
+    flush=True,
+    *,
+    block_size: int = DEFAULT_STREAM_BLOCK_SIZE,
+    workload: Workload = Workload.DEFAULT,
+    team_id: Optional[int] = None,
+    readonly=False,
+) -> Iterator[ResultBlock]:
+    """
+    Like `sync_execute(..., with_column_types=True)`, but streams the result in blocks of at most `block_size` rows
+    instead of materializing it, so that arbitrarily large results can be processed in constant memory.
+
+    The pooled connection is held until the iterator is exhausted or closed. Closing it early drops the connection,
+    as the rest of the result would otherwise still be waiting on the wire for the next user of the client.
+    """
+    if TEST and flush:
+        _flush_test_data()
+
+    workload = _resolve_workload(workload)
+
+    with get_pool(workload, team_id, readonly).get_client() as client:
+        start_time = perf_counter()
+
+        prepared_sql, prepared_args, tags = _prepare_query(client=client, query=query, args=args, workload=workload)
+        query_id = validated_client_query_id()
+        settings = _query_settings({"max_block_size": block_size, **(settings or {})}, tags)
+        exhausted = False
+        try:
+            rows = client.execute_iter(
+                prepared_sql,
+                params=prepared_args,
+                settings=settings,
+                with_column_types=True,
+                query_id=query_id,
+            )
+            column_types = next(rows)
+            while block := list(islice(rows, block_size)):
+                yield ResultBlock(column_types=column_types, rows=block)
+            exhausted = True
+        except Exception as e:
+            err = wrap_query_error(e)
+            statsd.incr(
+                "clickhouse_sync_execution_failure",
+                tags={"failed": True, "reason": type(err).__name__, "streaming": True},
+            )
+
+            raise err from e
+        finally:
+            if not exhausted:
+                client.disconnect()
+
+            execution_time = perf_counter() - start_time
+
+            statsd.timing("clickhouse_sync_streaming_execution_time", execution_time * 1000.0)
+
+            if query_counter := getattr(thread_local_storage, "query_counter", None):
+                query_counter.total_query_time += execution_time
+
+
 def query_with_columns(
     query: str,
     args: Optional[QueryArgs] = None,
@@ -172,6 +275,41 @@ def query_with_columns(
     return rows
 
 
+def _flush_test_data() -> None:
+    try:
+        from posthog.test.base import flush_persons_and_events
+
+        flush_persons_and_events()
+    except ModuleNotFoundError:  # when we run plugin server tests it tries to run above, ignore
+        pass
+
+
+def _resolve_workload(workload: Workload) -> Workload:
+    if workload == Workload.DEFAULT and (
+        # When someone uses an API key, always put their query to the offline cluster
+        get_query_tag_value("access_method") == "personal_api_key"
+        or
+        # Execute all celery tasks not directly set to be online on the offline cluster
+        get_query_tag_value("kind") == "celery"
+    ):
+        workload = Workload.OFFLINE
+
+    # Make sure we always have process_query_task on the online cluster
+    if get_query_tag_value("id") == "posthog.tasks.tasks.process_query_task":
+        workload = Workload.ONLINE
+
+    return workload
+
+
+def _query_settings(settings: Optional[dict], tags: dict) -> dict:
+    core_settings = {**default_settings(), **(settings or {})}
+    tags["query_settings"] = core_settings
+    return {
+        **core_settings,
+        "log_comment": json.dumps(tags, separators=(",", ":")),
+    }
+
+
 @patchable
 def _prepare_query(
     client: SyncClient,
@@ -0,0 +1,45 @@
+from posthog.clickhouse.client import sync_execute, sync_execute_iter
+from posthog.test.base import BaseTest, ClickhouseTestMixin
+
+
+class TestSyncExecuteIter(ClickhouseTestMixin, BaseTest):
+    QUERY = "SELECT number, toString(number) AS label FROM numbers(25)"
+
+    def test_streams_result_in_blocks(self):
+        blocks = list(sync_execute_iter(self.QUERY, block_size=10))
+
+        self.assertEqual([len(block.rows) for block in blocks], [10, 10, 5])
+        self.assertEqual(blocks[0].column_types, [("number", "UInt64"), ("label", "String")])
+        self.assertEqual(
+            [row for block in blocks for row in block.rows], sync_execute(self.QUERY, with_column_types=False)
+        )
+
+    def test_empty_result(self):
+        self.assertEqual(list(sync_execute_iter("SELECT number FROM numbers(0)")), [])
+
+    def test_block_to_dicts(self):
+        block = next(sync_execute_iter(self.QUERY, block_size=2))
+
+        self.assertEqual(block.to_dicts(), [{"number": 0, "label": "0"}, {"number": 1, "label": "1"}])
+
+    def test_block_to_numpy(self):
+        block = next(sync_execute_iter(self.QUERY, block_size=10))
+        columns = block.to_numpy()
+
+        self.assertEqual(str(columns["number"].dtype), "uint64")
+        self.assertEqual(int(columns["number"].sum()), 45)
+        self.assertEqual(columns["label"][3], "3")
+
+    def test_block_to_arrow(self):
+        block = next(sync_execute_iter(self.QUERY, block_size=10))
+        record_batch = block.to_arrow()
+
+        self.assertEqual(record_batch.num_rows, 10)
+        self.assertEqual(record_batch.schema.names, ["number", "label"])
+
+    def test_closing_the_stream_early_keeps_the_pool_usable(self):
+        stream = sync_execute_iter("SELECT number FROM numbers(100000)", block_size=10)
+        next(stream)
+        stream.close()
+
+        self.assertEqual(sync_execute("SELECT 1"), [(1,)])
@@ -23,52 +23,52 @@ from posthog.hogql.errors import NotImplementedError, QueryError, ResolutionErro
 # :NOTE2: also search for ":TRICKY:" in "resolver.py" when modifying SelectQuery or JoinExpr
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Declaration(AST):
     pass
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class VariableAssignment(Declaration):
     left: Expr
     right: Expr
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class VariableDeclaration(Declaration):
     name: str
     expr: Optional[Expr] = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Statement(Declaration):
     pass
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ExprStatement(Statement):
     expr: Optional[Expr]
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ReturnStatement(Statement):
     expr: Optional[Expr]
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class IfStatement(Statement):
     expr: Expr
     then: Statement
     else_: Optional[Statement] = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class WhileStatement(Statement):
     expr: Expr
     body: Statement
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ForStatement(Statement):
     initializer: Optional[VariableDeclaration | VariableAssignment | Expr]
     condition: Optional[Expr]
@@ -76,24 +76,24 @@ class ForStatement(Statement):
     body: Statement
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Function(Statement):
     name: str
     params: list[str]
     body: Statement
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Block(Statement):
     declarations: list[Declaration]
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Program(AST):
     declarations: list[Declaration]
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class FieldAliasType(Type):
     alias: str
     type: Type
@@ -122,7 +122,7 @@ class FieldAliasType(Type):
         raise NotImplementedError("FieldAliasType.resolve_table_type not implemented")
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class BaseTableType(Type):
     def resolve_database_table(self, context: HogQLContext) -> Table:
         raise NotImplementedError("BaseTableType.resolve_database_table not overridden")
@@ -154,7 +154,7 @@ TableOrSelectType = Union[
 ]
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class TableType(BaseTableType):
     table: Table
 
@@ -162,7 +162,7 @@ class TableType(BaseTableType):
         return self.table
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class TableAliasType(BaseTableType):
     alias: str
     table_type: TableType
@@ -171,7 +171,7 @@ class TableAliasType(BaseTableType):
         return self.table_type.table
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class LazyJoinType(BaseTableType):
     table_type: TableOrSelectType
     field: str
@@ -184,7 +184,7 @@ class LazyJoinType(BaseTableType):
         return self.get_child(self.field, context).resolve_constant_type(context)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class LazyTableType(BaseTableType):
     table: LazyTable
 
@@ -192,7 +192,7 @@ class LazyTableType(BaseTableType):
         return self.table
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class VirtualTableType(BaseTableType):
     table_type: TableOrSelectType
     field: str
@@ -208,7 +208,7 @@ class VirtualTableType(BaseTableType):
         return self.get_child(self.field, context).resolve_constant_type(context)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class SelectQueryType(Type):
     """Type and new enclosed scope for a select query. Contains information about all tables and columns in the query."""
 
@@ -252,7 +252,7 @@ class SelectQueryType(Type):
         return UnknownType()
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class SelectUnionQueryType(Type):
     types: list[SelectQueryType]
 
@@ -269,7 +269,7 @@ class SelectUnionQueryType(Type):
         return self.types[0].resolve_column_constant_type(name, context)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class SelectViewType(Type):
     view_name: str
     alias: str
@@ -315,7 +315,7 @@ class SelectViewType(Type):
         return self.select_query_type.resolve_column_constant_type(name, context)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class SelectQueryAliasType(Type):
     alias: str
     select_query_type: SelectQueryType | SelectUnionQueryType
@@ -335,7 +335,7 @@ class SelectQueryAliasType(Type):
         return self.select_query_type.resolve_column_constant_type(name, context)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class IntegerType(ConstantType):
     data_type: ConstantDataType = field(default="int", init=False)
 
@@ -343,7 +343,7 @@ class IntegerType(ConstantType):
         return "Integer"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class FloatType(ConstantType):
     data_type: ConstantDataType = field(default="float", init=False)
 
@@ -351,7 +351,7 @@ class FloatType(ConstantType):
         return "Float"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class StringType(ConstantType):
     data_type: ConstantDataType = field(default="str", init=False)
 
@@ -359,7 +359,7 @@ class StringType(ConstantType):
         return "String"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class BooleanType(ConstantType):
     data_type: ConstantDataType = field(default="bool", init=False)
 
@@ -367,7 +367,7 @@ class BooleanType(ConstantType):
         return "Boolean"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class DateType(ConstantType):
     data_type: ConstantDataType = field(default="date", init=False)
 
@@ -375,7 +375,7 @@ class DateType(ConstantType):
         return "Date"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class DateTimeType(ConstantType):
     data_type: ConstantDataType = field(default="datetime", init=False)
 
@@ -383,7 +383,7 @@ class DateTimeType(ConstantType):
         return "DateTime"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class UUIDType(ConstantType):
     data_type: ConstantDataType = field(default="uuid", init=False)
 
@@ -391,7 +391,7 @@ class UUIDType(ConstantType):
         return "UUID"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ArrayType(ConstantType):
     data_type: ConstantDataType = field(default="array", init=False)
     item_type: ConstantType = field(default_factory=UnknownType)
@@ -400,7 +400,7 @@ class ArrayType(ConstantType):
         return "Array"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class TupleType(ConstantType):
     data_type: ConstantDataType = field(default="tuple", init=False)
     item_types: list[ConstantType]
@@ -410,7 +410,7 @@ class TupleType(ConstantType):
         return "Tuple"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class CallType(Type):
     name: str
     arg_types: list[ConstantType]
@@ -421,7 +421,7 @@ class CallType(Type):
         return self.return_type
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class AsteriskType(Type):
     table_type: TableOrSelectType
 
@@ -429,7 +429,7 @@ class AsteriskType(Type):
         return UnknownType()
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class FieldTraverserType(Type):
     chain: list[str | int]
     table_type: TableOrSelectType
@@ -438,7 +438,7 @@ class FieldTraverserType(Type):
         return UnknownType()
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ExpressionFieldType(Type):
     name: str
     expr: Expr
@@ -450,7 +450,7 @@ class ExpressionFieldType(Type):
         return UnknownType()
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class FieldType(Type):
     name: str
     table_type: TableOrSelectType
@@ -498,7 +498,7 @@ class FieldType(Type):
         return self.table_type
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class UnresolvedFieldType(Type):
     name: str
 
@@ -512,7 +512,7 @@ class UnresolvedFieldType(Type):
         return UnknownType()
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class PropertyType(Type):
     chain: list[str | int]
     field_type: FieldType
@@ -534,7 +534,7 @@ class PropertyType(Type):
         return self.field_type.resolve_constant_type(context)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class LambdaArgumentType(Type):
     name: str
 
@@ -542,7 +542,7 @@ class LambdaArgumentType(Type):
         return UnknownType()
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Alias(Expr):
     alias: str
     expr: Expr
@@ -562,20 +562,20 @@ class ArithmeticOperationOp(StrEnum):
     Mod = "%"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ArithmeticOperation(Expr):
     left: Expr
     right: Expr
     op: ArithmeticOperationOp
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class And(Expr):
     type: Optional[ConstantType] = None
     exprs: list[Expr]
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Or(Expr):
     exprs: list[Expr]
     type: Optional[ConstantType] = None
@@ -604,7 +604,7 @@ class CompareOperationOp(StrEnum):
     NotIRegex = "!~*"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class CompareOperation(Expr):
     left: Expr
     right: Expr
@@ -612,67 +612,67 @@ class CompareOperation(Expr):
     type: Optional[ConstantType] = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Not(Expr):
     expr: Expr
     type: Optional[ConstantType] = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class OrderExpr(Expr):
     expr: Expr
     order: Literal["ASC", "DESC"] = "ASC"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ArrayAccess(Expr):
     array: Expr
     property: Expr
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Array(Expr):
     exprs: list[Expr]
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Dict(Expr):
     items: list[tuple[Expr, Expr]]
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class TupleAccess(Expr):
     tuple: Expr
     index: int
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Tuple(Expr):
     exprs: list[Expr]
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Lambda(Expr):
     args: list[str]
     expr: Expr
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Constant(Expr):
     value: Any
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Field(Expr):
     chain: list[str | int]
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Placeholder(Expr):
     field: str
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Call(Expr):
     name: str
     """Function name"""
@@ -685,13 +685,13 @@ class Call(Expr):
     distinct: bool = False
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class JoinConstraint(Expr):
     expr: Expr
     constraint_type: Literal["ON", "USING"]
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class JoinExpr(Expr):
     # :TRICKY: When adding new fields, make sure they're handled in visitor.py and resolver.py
     type: Optional[TableOrSelectType] = None
@@ -706,13 +706,13 @@ class JoinExpr(Expr):
     sample: Optional["SampleExpr"] = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class WindowFrameExpr(Expr):
     frame_type: Optional[Literal["CURRENT ROW", "PRECEDING", "FOLLOWING"]] = None
     frame_value: Optional[int] = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class WindowExpr(Expr):
     partition_by: Optional[list[Expr]] = None
     order_by: Optional[list[OrderExpr]] = None
@@ -721,7 +721,7 @@ class WindowExpr(Expr):
     frame_end: Optional[WindowFrameExpr] = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class WindowFunction(Expr):
     name: str
     args: Optional[list[Expr]] = None
@@ -730,7 +730,7 @@ class WindowFunction(Expr):
     over_identifier: Optional[str] = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class SelectQuery(Expr):
     # :TRICKY: When adding new fields, make sure they're handled in visitor.py and resolver.py
     type: Optional[SelectQueryType] = None
@@ -754,32 +754,32 @@ class SelectQuery(Expr):
     view_name: Optional[str] = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class SelectUnionQuery(Expr):
     type: Optional[SelectUnionQueryType] = None
     select_queries: list[SelectQuery]
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class RatioExpr(Expr):
     left: Constant
     right: Optional[Constant] = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class SampleExpr(Expr):
     # k or n
     sample_value: RatioExpr
     offset_value: Optional[RatioExpr] = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class HogQLXAttribute(AST):
     name: str
     value: Any
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class HogQLXTag(AST):
     kind: str
     attributes: list[HogQLXAttribute]
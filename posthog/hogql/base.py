@@ -1,7 +1,8 @@
 import re
+from collections.abc import Callable
 from dataclasses import dataclass, field
 
-from typing import TYPE_CHECKING, Literal, Optional
+from typing import TYPE_CHECKING, Any, Literal, Optional
 
 from posthog.hogql.constants import ConstantDataType
 from posthog.hogql.errors import NotImplementedError
@@ -12,30 +13,50 @@ if TYPE_CHECKING:
 # Given a string like "CorrectHorseBS", match the "H" and "B", so that we can convert this to "correct_horse_bs"
 camel_case_pattern = re.compile(r"(?<!^)(?<![A-Z])(?=[A-Z])")
 
+# The method each visitor class visits each node class with. Every pass over a query visits every node in it, so the
+# method is looked up once per pair of classes, not once per visit.
+_visit_methods: dict[type, dict[type, Callable[[Any, "AST"], Any]]] = {}
 
-@dataclass(kw_only=True)
+
+def _visit_method_name(node_class: type) -> str:
+    name = camel_case_pattern.sub("_", node_class.__name__).lower()
+
+    # NOTE: Sync with ./test/test_visitor.py#test_hogql_visitor_naming_exceptions
+    replacements = {"hog_qlxtag": "hogqlx_tag", "hog_qlxattribute": "hogqlx_attribute", "uuidtype": "uuid_type"}
+    for old, new in replacements.items():
+        name = name.replace(old, new)
+    return f"visit_{name}"
+
+
+def _find_visit_method(visitor_class: type, node_class: type) -> Callable[[Any, "AST"], Any]:
+    method_name = _visit_method_name(node_class)
+    if hasattr(visitor_class, method_name):
+        return getattr(visitor_class, method_name)
+    if hasattr(visitor_class, "visit_unknown"):
+        return visitor_class.visit_unknown  # type: ignore
+
+    def not_implemented(visitor, node: "AST"):
+        raise NotImplementedError(f"{visitor.__class__.__name__} has no method {method_name}")
+
+    return not_implemented
+
+
+@dataclass(kw_only=True, slots=True)
 class AST:
     start: Optional[int] = field(default=None)
     end: Optional[int] = field(default=None)
 
     # This is part of the visitor pattern from visitor.py.
     def accept(self, visitor):
-        name = camel_case_pattern.sub("_", self.__class__.__name__).lower()
-
-        # NOTE: Sync with ./test/test_visitor.py#test_hogql_visitor_naming_exceptions
-        replacements = {"hog_qlxtag": "hogqlx_tag", "hog_qlxattribute": "hogqlx_attribute", "uuidtype": "uuid_type"}
-        for old, new in replacements.items():
-            name = name.replace(old, new)
-        method_name = f"visit_{name}"
-        if hasattr(visitor, method_name):
-            visit = getattr(visitor, method_name)
-            return visit(self)
-        if hasattr(visitor, "visit_unknown"):
-            return visitor.visit_unknown(self)
-        raise NotImplementedError(f"{visitor.__class__.__name__} has no method {method_name}")
+        try:
+            visit = _visit_methods[visitor.__class__][self.__class__]
+        except KeyError:
+            visit = _find_visit_method(visitor.__class__, self.__class__)
+            _visit_methods.setdefault(visitor.__class__, {})[self.__class__] = visit
+        return visit(visitor, self)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Type(AST):
     def get_child(self, name: str, context: "HogQLContext") -> "Type":
         raise NotImplementedError("Type.get_child not overridden")
@@ -50,12 +71,12 @@ class Type(AST):
         raise NotImplementedError(f"{self.__class__.__name__}.resolve_column_constant_type not overridden")
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Expr(AST):
     type: Optional[Type] = field(default=None)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class CTE(Expr):
     """A common table expression."""
 
@@ -65,7 +86,7 @@ class CTE(Expr):
     cte_type: Literal["column", "subquery"]
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ConstantType(Type):
     data_type: ConstantDataType
     nullable: bool = field(default=True)
@@ -77,7 +98,7 @@ class ConstantType(Type):
         raise NotImplementedError("ConstantType.print_type not implemented")
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class UnknownType(ConstantType):
     data_type: ConstantDataType = field(default="unknown", init=False)
 
@@ -0,0 +1,116 @@
+import dataclasses
+import hashlib
+import time
+from typing import TYPE_CHECKING, Any, Optional
+
+from django.conf import settings
+from prometheus_client import Counter
+
+from posthog.caching.bounded_cache import BoundedLRUCache
+from posthog.hogql import ast
+from posthog.hogql.constants import HogQLGlobalSettings
+from posthog.hogql.database.cache import get_team_database_version
+from posthog.hogql.visitor import CloningVisitor
+from posthog.schema import HogQLQueryModifiers
+
+if TYPE_CHECKING:
+    from posthog.models import Team
+
+COMPILED_QUERY_CACHE_COUNTER = Counter(
+    "hogql_compiled_query_cache_total",
+    "Lookups of the in-process cache of compiled HogQL queries, by result (hit, miss, expired or uncacheable)",
+    labelnames=["result"],
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class CompiledQuery:
+    hogql: str
+    clickhouse: str
+    values: dict[str, Any]
+    columns: list[str]
+
+
+# key -> (monotonic time of creation, compiled query)
+_COMPILED_QUERY_CACHE: BoundedLRUCache[str, tuple[float, CompiledQuery]] = BoundedLRUCache(
+    max_entries=settings.HOGQL_COMPILED_QUERY_CACHE_MAX_ENTRIES,
+    max_weight=settings.HOGQL_COMPILED_QUERY_CACHE_MAX_CHARS,
+    max_entry_weight=settings.HOGQL_COMPILED_QUERY_CACHE_MAX_CHARS // 10,
+    weigh=lambda key, entry: len(entry[1].clickhouse) + len(entry[1].hogql),
+)
+
+
+class CompiledQueryKeyVisitor(CloningVisitor):
+    """
+    Clones the query without types or locations, so that its repr only depends on its structure. Also notes whether
+    the query uses anything that's resolved from Postgres outside of the team's schema (cohorts, actions,
+    nested queries), as those can change without the schema version changing.
+    """
+
+    def __init__(self):
+        super().__init__(clear_types=True, clear_locations=True)
+        self.cacheable = True
+
+    def visit_call(self, node: ast.Call):
+        if node.name == "matchesAction":
+            self.cacheable = False
+        return super().visit_call(node)
+
+    def visit_compare_operation(self, node: ast.CompareOperation):
+        if node.op in (ast.CompareOperationOp.InCohort, ast.CompareOperationOp.NotInCohort):
+            self.cacheable = False
+        return super().visit_compare_operation(node)
+
+    def visit_hogqlx_tag(self, node: ast.HogQLXTag):
+        self.cacheable = False
+        return super().visit_hogqlx_tag(node)
+
+
+def get_compiled_query_cache_key(
+    node: ast.SelectQuery | ast.SelectUnionQuery,
+    team: "Team",
+    modifiers: HogQLQueryModifiers,
+    query_settings: HogQLGlobalSettings,
+    pretty: bool,
+) -> Optional[str]:
+    """Canonical key for the compiled form of `node`, or None if the query shouldn't be cached."""
+    if settings.HOGQL_COMPILED_QUERY_CACHE_TTL_SECONDS <= 0 or modifiers.useCompiledQueryCache is False:
+        return None
+
+    visitor = CompiledQueryKeyVisitor()
+    canonical_node = visitor.visit(node)
+    version = get_team_database_version(team.pk)
+    if not visitor.cacheable or version is None:
+        COMPILED_QUERY_CACHE_COUNTER.labels(result="uncacheable").inc()
+        return None
+
+    key = "\n".join(
+        [
+            str(team.pk),
+            str(version),
+            str(team.timezone),
+            str(team.week_start_day),
+            modifiers.model_dump_json(),
+            query_settings.model_dump_json(),
+            str(pretty),
+            repr(canonical_node),
+        ]
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def get_compiled_query(key: str) -> Optional[CompiledQuery]:
+    entry = _COMPILED_QUERY_CACHE.get(key)
+    if entry is None:
+        COMPILED_QUERY_CACHE_COUNTER.labels(result="miss").inc()
+        return None
+    if time.monotonic() - entry[0] >= settings.HOGQL_COMPILED_QUERY_CACHE_TTL_SECONDS:
+        COMPILED_QUERY_CACHE_COUNTER.labels(result="expired").inc()
+        _COMPILED_QUERY_CACHE.pop(key)
+        return None
+    COMPILED_QUERY_CACHE_COUNTER.labels(result="hit").inc()
+    return entry[1]
+
+
+def set_compiled_query(key: str, compiled_query: CompiledQuery) -> None:
+    _COMPILED_QUERY_CACHE.set(key, (time.monotonic(), compiled_query))
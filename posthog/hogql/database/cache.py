@@ -0,0 +1,117 @@
+import time
+from typing import TYPE_CHECKING, Any, Optional
+
+import structlog
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from prometheus_client import Counter
+
+from posthog.caching.bounded_cache import BoundedLRUCache
+from posthog.hogql.database.database import Database, create_hogql_database
+from posthog.hogql.modifiers import create_default_modifiers_for_team
+from posthog.models.signals import mutable_receiver
+from posthog.schema import HogQLQueryModifiers
+
+if TYPE_CHECKING:
+    from posthog.models import Team
+
+logger = structlog.get_logger(__name__)
+
+HOGQL_DATABASE_CACHE_COUNTER = Counter(
+    "hogql_database_cache_total",
+    "Lookups of the in-process HogQL database cache, by result (hit, miss, expired or unavailable)",
+    labelnames=["result"],
+)
+
+DATABASE_VERSION_CACHE_KEY = "hogql_database_version:{team_id}"
+
+# (team_id, schema version, timezone, week start day, modifiers json) -> (monotonic time of creation, frozen database)
+_DATABASE_CACHE: BoundedLRUCache[tuple[int, int, str, Any, str], tuple[float, Database]] = BoundedLRUCache(
+    max_entries=settings.HOGQL_DATABASE_CACHE_MAX_ENTRIES,
+    max_weight=settings.HOGQL_DATABASE_CACHE_MAX_ENTRIES,
+)
+
+
+def get_team_database_version(team_id: int) -> Optional[int]:
+    """
+    The version of a team's HogQL schema, bumped whenever a model the schema is derived from changes.
+    Stored in Redis so that changes made by one process invalidate databases cached in all others.
+    Returns None if the version can't be fetched, in which case nothing should be cached.
+    """
+    try:
+        return cache.get(DATABASE_VERSION_CACHE_KEY.format(team_id=team_id), 0)
+    except Exception:
+        # redis is unavailable
+        return None
+
+
+def invalidate_team_database(team_id: int) -> None:
+    _DATABASE_CACHE.pop_where(lambda key: key[0] == team_id)
+    key = DATABASE_VERSION_CACHE_KEY.format(team_id=team_id)
+    try:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+    except Exception as e:
+        logger.warning("hogql_database_cache_invalidation_failed", team_id=team_id, error=str(e))
+
+
+def get_hogql_database(
+    team_id: int,
+    modifiers: Optional[HogQLQueryModifiers] = None,
+    team_arg: Optional["Team"] = None,
+    *,
+    read_only: bool = False,
+) -> Database:
+    """
+    A cached `create_hogql_database`. The cached instance is frozen: pass `read_only=True` to get that shared
+    instance (cheapest, any attempt to modify it raises), otherwise a private mutable copy of it is returned.
+
+    Invalidated through the team's schema version, and additionally expired after HOGQL_DATABASE_CACHE_TTL_SECONDS,
+    as some of its inputs (e.g. group types created by the plugin server) change without Django signals.
+    """
+    from posthog.models import Team
+
+    ttl = settings.HOGQL_DATABASE_CACHE_TTL_SECONDS
+    if ttl <= 0:
+        return create_hogql_database(team_id, modifiers, team_arg)
+
+    team = team_arg or Team.objects.get(pk=team_id)
+    modifiers = create_default_modifiers_for_team(team, modifiers)
+    version = get_team_database_version(team.pk)
+    if version is None:
+        HOGQL_DATABASE_CACHE_COUNTER.labels(result="unavailable").inc()
+        return create_hogql_database(team.pk, modifiers, team)
+
+    key = (team.pk, version, team.timezone, team.week_start_day, modifiers.model_dump_json())
+    now = time.monotonic()
+    entry = _DATABASE_CACHE.get(key)
+    if entry is not None and now - entry[0] < ttl:
+        HOGQL_DATABASE_CACHE_COUNTER.labels(result="hit").inc()
+        database = entry[1]
+    else:
+        HOGQL_DATABASE_CACHE_COUNTER.labels(result="miss" if entry is None else "expired").inc()
+        database = create_hogql_database(team.pk, modifiers, team).freeze()
+        _DATABASE_CACHE.set(key, (now, database))
+
+    return database if read_only else database.mutable_copy()
+
+
+@mutable_receiver(post_save, sender="posthog.Team")
+@mutable_receiver(post_delete, sender="posthog.Team")
+def team_database_changed(sender, instance, **kwargs):
+    invalidate_team_database(instance.pk)
+
+
+@mutable_receiver(post_save, sender="posthog.GroupTypeMapping")
+@mutable_receiver(post_delete, sender="posthog.GroupTypeMapping")
+@mutable_receiver(post_save, sender="posthog.DataWarehouseTable")
+@mutable_receiver(post_delete, sender="posthog.DataWarehouseTable")
+@mutable_receiver(post_save, sender="posthog.DataWarehouseSavedQuery")
+@mutable_receiver(post_delete, sender="posthog.DataWarehouseSavedQuery")
+@mutable_receiver(post_save, sender="posthog.DataWarehouseJoin")
+@mutable_receiver(post_delete, sender="posthog.DataWarehouseJoin")
+@mutable_receiver(post_save, sender="posthog.PropertyDefinition")
+@mutable_receiver(post_delete, sender="posthog.PropertyDefinition")
+def team_schema_model_changed(sender, instance, **kwargs):
+    invalidate_team_database(instance.team_id)
@@ -1,3 +1,4 @@
+import copy
 import dataclasses
 from collections.abc import Callable
 from typing import TYPE_CHECKING, Any, ClassVar, Optional, TypeAlias, cast, Union
@@ -143,6 +144,7 @@ class Database(BaseModel):
 
     _timezone: Optional[str]
     _week_start_day: Optional[WeekStartDay]
+    _frozen: bool = False
 
     def __init__(self, timezone: Optional[str] = None, week_start_day: Optional[WeekStartDay] = None):
         super().__init__()
@@ -152,6 +154,30 @@ class Database(BaseModel):
             raise ValueError(f"Unknown timezone: '{str(timezone)}'")
         self._week_start_day = week_start_day
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        if not name.startswith("_") and getattr(self, "_frozen", False):
+            raise TypeError(f'Cannot set "{name}" on a frozen database, use mutable_copy() instead')
+        super().__setattr__(name, value)
+
+    def freeze(self) -> "Database":
+        """
+        Make the database and the fields of all its tables read-only, so that one instance can be shared between
+        queries. Use `mutable_copy()` to get a copy that can be modified.
+        """
+        seen: set[int] = set()
+        for table_name in [*self.model_fields.keys(), *self._warehouse_table_names, *self._view_table_names]:
+            _freeze_table(getattr(self, table_name), seen)
+        self._frozen = True
+        return self
+
+    def is_frozen(self) -> bool:
+        return self._frozen
+
+    def mutable_copy(self) -> "Database":
+        database = self.model_copy(deep=True)
+        database._frozen = False
+        return database
+
     def get_timezone(self) -> str:
         return self._timezone or "UTC"
 
@@ -179,16 +205,51 @@ class Database(BaseModel):
         return self._view_table_names
 
     def add_warehouse_tables(self, **field_definitions: Any):
+        if self._frozen:
+            raise TypeError("Cannot add tables to a frozen database, use mutable_copy() instead")
         for f_name, f_def in field_definitions.items():
             setattr(self, f_name, f_def)
             self._warehouse_table_names.append(f_name)
 
     def add_views(self, **field_definitions: Any):
+        if self._frozen:
+            raise TypeError("Cannot add views to a frozen database, use mutable_copy() instead")
         for f_name, f_def in field_definitions.items():
             setattr(self, f_name, f_def)
             self._view_table_names.append(f_name)
 
 
+class FrozenFields(dict):
+    """The `fields` of a table in a frozen database. Deep copies turn back into a regular, mutable dict."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Cannot modify the fields of a table in a frozen database, use mutable_copy() instead")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly  # type: ignore
+    clear = pop = popitem = setdefault = update = _readonly  # type: ignore
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> dict[str, FieldOrTable]:
+        fields: dict[str, FieldOrTable] = {}
+        memo[id(self)] = fields
+        for key, value in self.items():
+            fields[key] = copy.deepcopy(value, memo)
+        return fields
+
+
+def _freeze_table(table: Any, seen: set[int]) -> None:
+    if not isinstance(table, Table) or id(table) in seen:
+        return
+    seen.add(id(table))
+    if not isinstance(table.fields, FrozenFields):
+        # Bypass pydantic, which would otherwise validate (and copy) the dict back into a plain one
+        table.__dict__["fields"] = FrozenFields(table.fields)
+    for field in table.fields.values():
+        if isinstance(field, LazyJoin):
+            _freeze_table(field.join_table, seen)
+        else:
+            _freeze_table(field, seen)
+
+
 def _use_person_properties_from_events(database: Database) -> None:
     database.events.fields["person"] = FieldTraverser(chain=["poe"])
 
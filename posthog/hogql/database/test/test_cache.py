@@ -0,0 +1,71 @@
+from django.test import override_settings
+
+from posthog.hogql.database.cache import get_hogql_database, get_team_database_version
+from posthog.hogql.database.models import StringDatabaseField
+from posthog.models.group_type_mapping import GroupTypeMapping
+from posthog.schema import HogQLQueryModifiers, PersonsOnEventsMode
+from posthog.test.base import BaseTest
+
+
+@override_settings(HOGQL_DATABASE_CACHE_TTL_SECONDS=60)
+class TestDatabaseCache(BaseTest):
+    def test_cached_database_skips_postgres(self):
+        get_hogql_database(self.team.pk, team_arg=self.team)
+
+        with self.assertNumQueries(0):
+            get_hogql_database(self.team.pk, team_arg=self.team)
+
+    def test_read_only_database_is_shared_and_frozen(self):
+        database = get_hogql_database(self.team.pk, team_arg=self.team, read_only=True)
+
+        self.assertIs(database, get_hogql_database(self.team.pk, team_arg=self.team, read_only=True))
+        self.assertTrue(database.is_frozen())
+        with self.assertRaises(TypeError):
+            database.events.fields["foo"] = StringDatabaseField(name="foo")
+        with self.assertRaises(TypeError):
+            database.add_warehouse_tables(foo=database.events)
+
+    def test_mutable_copy_does_not_affect_the_cached_database(self):
+        database = get_hogql_database(self.team.pk, team_arg=self.team)
+
+        self.assertFalse(database.is_frozen())
+        database.events.fields["foo"] = StringDatabaseField(name="foo")
+
+        cached = get_hogql_database(self.team.pk, team_arg=self.team, read_only=True)
+        self.assertNotIn("foo", cached.events.fields)
+
+    def test_modifiers_are_part_of_the_key(self):
+        joined = get_hogql_database(
+            self.team.pk,
+            HogQLQueryModifiers(personsOnEventsMode=PersonsOnEventsMode.DISABLED),
+            team_arg=self.team,
+            read_only=True,
+        )
+        on_events = get_hogql_database(
+            self.team.pk,
+            HogQLQueryModifiers(personsOnEventsMode=PersonsOnEventsMode.PERSON_ID_NO_OVERRIDE_PROPERTIES_ON_EVENTS),
+            team_arg=self.team,
+            read_only=True,
+        )
+
+        self.assertIsNot(joined, on_events)
+        self.assertIsInstance(on_events.events.fields["person_id"], StringDatabaseField)
+
+    def test_group_type_mapping_invalidates_the_cache(self):
+        version = get_team_database_version(self.team.pk)
+        database = get_hogql_database(self.team.pk, team_arg=self.team, read_only=True)
+        self.assertNotIn("organization", database.events.fields)
+
+        GroupTypeMapping.objects.create(team=self.team, group_type="organization", group_type_index=0)
+
+        self.assertEqual(get_team_database_version(self.team.pk), (version or 0) + 1)
+        database = get_hogql_database(self.team.pk, team_arg=self.team, read_only=True)
+        self.assertIn("organization", database.events.fields)
+
+    @override_settings(HOGQL_DATABASE_CACHE_TTL_SECONDS=0)
+    def test_cache_can_be_disabled(self):
+        first = get_hogql_database(self.team.pk, team_arg=self.team, read_only=True)
+        second = get_hogql_database(self.team.pk, team_arg=self.team, read_only=True)
+
+        self.assertIsNot(first, second)
+        self.assertFalse(first.is_frozen())
@@ -3,6 +3,7 @@ from posthog.hogql.database.database import create_hogql_database
 from posthog.hogql.parser import parse_select
 from posthog.hogql.printer import print_ast
 from posthog.hogql.query import create_default_modifiers_for_team
+from posthog.hogql.visitor import clone_expr
 from posthog.test.base import BaseTest
 from posthog.hogql.database.test.tables import (
     create_aapl_stock_table_view,
@@ -70,3 +71,12 @@ class TestView(BaseTest):
             clickhouse,
             "SELECT some_alias.Date AS Date, some_alias.Open AS Open, some_alias.High AS High, some_alias.Low AS Low, some_alias.Close AS Close, some_alias.Volume AS Volume, some_alias.OpenInt AS OpenInt FROM (SELECT aapl_stock.Date AS Date, aapl_stock.Open AS Open, aapl_stock.High AS High, aapl_stock.Low AS Low, aapl_stock.Close AS Close, aapl_stock.Volume AS Volume, aapl_stock.OpenInt AS OpenInt FROM s3(%(hogql_val_0_sensitive)s, %(hogql_val_1)s) AS aapl_stock) AS some_alias LIMIT 10",
         )
+
+    def test_view_select_leaves_query_unchanged(self):
+        self._init_database()
+        query = parse_select("SELECT * FROM aapl_stock_view AS some_alias LIMIT 10")
+        original = clone_expr(query)
+
+        for dialect in ("hogql", "clickhouse"):
+            print_ast(query, self.context, dialect=dialect)
+            assert query == original
@@ -3,8 +3,10 @@ from collections.abc import Callable
 
 from antlr4 import CommonTokenStream, InputStream, ParseTreeVisitor, ParserRuleContext
 from antlr4.error.ErrorListener import ErrorListener
-from prometheus_client import Histogram
+from django.conf import settings
+from prometheus_client import Counter, Histogram
 
+from posthog.caching.bounded_cache import BoundedLRUCache
 from posthog.hogql import ast
 from posthog.hogql.base import AST
 from posthog.hogql.constants import RESERVED_KEYWORDS
@@ -14,6 +16,7 @@ from posthog.hogql.grammar.HogQLParser import HogQLParser
 from posthog.hogql.parse_string import parse_string_literal_text, parse_string_literal_ctx, parse_string_text_ctx
 from posthog.hogql.placeholders import replace_placeholders
 from posthog.hogql.timings import HogQLTimings
+from posthog.hogql.visitor import clone_expr
 from hogql_parser import (
     parse_expr as _parse_expr_cpp,
     parse_order_expr as _parse_order_expr_cpp,
@@ -62,11 +65,49 @@ RULE_TO_HISTOGRAM: dict[Literal["expr", "order_expr", "select", "full_template_s
     cast(Literal["expr", "order_expr", "select", "full_template_string"], rule): Histogram(
         f"parse_{rule}_seconds",
         f"Time to parse {rule} expression",
-        labelnames=["backend"],
+        labelnames=["backend", "cache"],
     )
     for rule in ("expr", "order_expr", "select", "full_template_string")
 }
 
+PARSE_CACHE_EVICTIONS_COUNTER = Counter(
+    "parse_cache_evictions_total",
+    "Number of parsed HogQL ASTs evicted from the in-process parse cache",
+    labelnames=["rule"],
+)
+
+# Parsed ASTs keyed by (rule, backend, source, start). Placeholders are never part of the key: we cache the raw
+# parse and replace placeholders on a clone. The cache is bounded by entries and by the total length of the parsed
+# source strings, which is a cheap proxy for the size of the resulting AST.
+PARSE_CACHE: BoundedLRUCache[tuple[str, str, str, Optional[int]], AST] = BoundedLRUCache(
+    max_entries=settings.HOGQL_PARSE_CACHE_MAX_ENTRIES,
+    max_weight=settings.HOGQL_PARSE_CACHE_MAX_CHARS,
+    max_entry_weight=settings.HOGQL_PARSE_CACHE_MAX_CHARS // 10,
+    weigh=lambda key, node: len(key[2]),
+    on_evict=lambda key, node: PARSE_CACHE_EVICTIONS_COUNTER.labels(rule=key[0]).inc(),
+)
+
+
+def _parse_cached(
+    rule: Literal["expr", "select"],
+    backend: Literal["python", "cpp"],
+    source: str,
+    parse: Callable[[], AST],
+    start: Optional[int] = None,
+) -> AST:
+    """Parse `source` via `parse`, reusing a previously parsed AST if we have one. Always returns a fresh clone."""
+    key = (rule, backend, source, start)
+    cached = PARSE_CACHE.get(key)
+    if cached is not None:
+        with RULE_TO_HISTOGRAM[rule].labels(backend=backend, cache="hit").time():
+            return clone_expr(cast(ast.Expr, cached))
+    with RULE_TO_HISTOGRAM[rule].labels(backend=backend, cache="miss").time():
+        node = parse()
+    if PARSE_CACHE.set(key, node):
+        # The stored node must never be handed out, as callers freely mutate the ASTs they get back
+        return clone_expr(cast(ast.Expr, node))
+    return node
+
 
 def parse_string_template(
     string: str,
@@ -79,7 +120,7 @@ def parse_string_template(
     if timings is None:
         timings = HogQLTimings()
     with timings.measure(f"parse_full_template_string_{backend}"):
-        with RULE_TO_HISTOGRAM["full_template_string"].labels(backend=backend).time():
+        with RULE_TO_HISTOGRAM["full_template_string"].labels(backend=backend, cache="none").time():
             node = RULE_TO_PARSE_FUNCTION[backend]["full_template_string"]("F'" + string)
         if placeholders:
             with timings.measure("replace_placeholders"):
@@ -100,8 +141,9 @@ def parse_expr(
     if timings is None:
         timings = HogQLTimings()
     with timings.measure(f"parse_expr_{backend}"):
-        with RULE_TO_HISTOGRAM["expr"].labels(backend=backend).time():
-            node = RULE_TO_PARSE_FUNCTION[backend]["expr"](expr, start)
+        node = _parse_cached(
+            "expr", backend, expr, lambda: RULE_TO_PARSE_FUNCTION[backend]["expr"](expr, start), start=start
+        )
         if placeholders:
             with timings.measure("replace_placeholders"):
                 node = replace_placeholders(node, placeholders)
@@ -118,7 +160,7 @@ def parse_order_expr(
     if timings is None:
         timings = HogQLTimings()
     with timings.measure(f"parse_order_expr_{backend}"):
-        with RULE_TO_HISTOGRAM["order_expr"].labels(backend=backend).time():
+        with RULE_TO_HISTOGRAM["order_expr"].labels(backend=backend, cache="none").time():
             node = RULE_TO_PARSE_FUNCTION[backend]["order_expr"](order_expr)
         if placeholders:
             with timings.measure("replace_placeholders"):
@@ -136,8 +178,7 @@ def parse_select(
     if timings is None:
         timings = HogQLTimings()
     with timings.measure(f"parse_select_{backend}"):
-        with RULE_TO_HISTOGRAM["select"].labels(backend=backend).time():
-            node = RULE_TO_PARSE_FUNCTION[backend]["select"](statement)
+        node = _parse_cached("select", backend, statement, lambda: RULE_TO_PARSE_FUNCTION[backend]["select"](statement))
         if placeholders:
             with timings.measure("replace_placeholders"):
                 node = replace_placeholders(node, placeholders)
@@ -153,7 +194,7 @@ def parse_program(
     if timings is None:
         timings = HogQLTimings()
     with timings.measure(f"parse_expr_{backend}"):
-        with RULE_TO_HISTOGRAM["expr"].labels(backend=backend).time():
+        with RULE_TO_HISTOGRAM["expr"].labels(backend=backend, cache="none").time():
             node = RULE_TO_PARSE_FUNCTION[backend]["program"](source)
     return node
 
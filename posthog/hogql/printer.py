@@ -20,7 +20,7 @@ from posthog.hogql.functions import (
 )
 from posthog.hogql.context import HogQLContext
 from posthog.hogql.database.models import Table, FunctionCallTable, SavedQuery
-from posthog.hogql.database.database import create_hogql_database
+from posthog.hogql.database.cache import get_hogql_database
 from posthog.hogql.database.s3_table import S3Table
 from posthog.hogql.errors import ImpossibleASTError, InternalHogQLError, QueryError, ResolutionError
 from posthog.hogql.escape_sql import (
@@ -60,7 +60,7 @@ def team_id_guard_for_table(table_type: Union[ast.TableType, ast.TableAliasType]
 def to_printed_hogql(query: ast.Expr, team: Team, modifiers: Optional[HogQLQueryModifiers] = None) -> str:
     """Prints the HogQL query without mutating the node"""
     return print_ast(
-        clone_expr(query),
+        query,
         dialect="hogql",
         context=HogQLContext(
             team_id=team.pk, enable_select_queries=True, modifiers=create_default_modifiers_for_team(team, modifiers)
@@ -98,12 +98,16 @@ def prepare_ast_for_printing(
     settings: Optional[HogQLGlobalSettings] = None,
 ) -> ast.Expr | None:
     with context.timings.measure("create_hogql_database"):
-        context.database = context.database or create_hogql_database(context.team_id, context.modifiers, context.team)
+        context.database = context.database or get_hogql_database(
+            context.team_id, context.modifiers, context.team, read_only=True
+        )
 
     context.modifiers = set_default_in_cohort_via(context.modifiers)
 
+    # Resolving types builds a new tree, leaving the node as it was. Only clone it for passes that change it in place.
     if context.modifiers.inCohortVia == InCohortVia.LEFTJOIN_CONJOINED:
         with context.timings.measure("resolve_in_cohorts_conjoined"):
+            node = clone_expr(node)
             resolve_in_cohorts_conjoined(node, dialect, context, stack)
     with context.timings.measure("resolve_types"):
         node = resolve_types(node, context, dialect=dialect, scopes=[node.type for node in stack] if stack else None)
@@ -4,6 +4,12 @@ from typing import Optional, Union, cast
 from posthog.clickhouse.client.connection import Workload
 from posthog.errors import ExposedCHQueryError
 from posthog.hogql import ast
+from posthog.hogql.compiled_query_cache import (
+    CompiledQuery,
+    get_compiled_query,
+    get_compiled_query_cache_key,
+    set_compiled_query,
+)
 from posthog.hogql.constants import HogQLGlobalSettings, LimitContext, get_default_limit_for_context
 from posthog.hogql.errors import ExposedHogQLError
 from posthog.hogql.hogql import HogQLContext
@@ -17,7 +23,6 @@ from posthog.hogql.printer import (
 )
 from posthog.hogql.filters import replace_filters
 from posthog.hogql.timings import HogQLTimings
-from posthog.hogql.visitor import clone_expr
 from posthog.models.team import Team
 from posthog.clickhouse.query_tagging import tag_queries
 from posthog.client import sync_execute
@@ -50,6 +55,7 @@ def execute_hogql_query(
     if timings is None:
         timings = HogQLTimings()
 
+    context_arg = context
     if context is None:
         context = HogQLContext(team_id=team.pk)
 
@@ -95,81 +101,70 @@ def execute_hogql_query(
             if one_query.limit is None:
                 one_query.limit = ast.Constant(value=get_default_limit_for_context(limit_context))
 
-    # Get printed HogQL query, and returned columns. Using a cloned query.
-    with timings.measure("hogql"):
-        with timings.measure("prepare_ast"):
-            hogql_query_context = dataclasses.replace(
-                context,
-                # set the team.pk here so someone can't pass a context for a different team 🤷‍️
-                team_id=team.pk,
-                team=team,
-                enable_select_queries=True,
-                timings=timings,
-                modifiers=query_modifiers,
-            )
+    settings = settings or HogQLGlobalSettings()
+    if limit_context in (LimitContext.EXPORT, LimitContext.COHORT_CALCULATION, LimitContext.QUERY_ASYNC):
+        settings.max_execution_time = HOGQL_INCREASED_MAX_EXECUTION_TIME
 
-            with timings.measure("clone"):
-                cloned_query = clone_expr(select_query, True)
-            select_query_hogql = cast(
-                ast.SelectQuery,
-                prepare_ast_for_printing(node=cloned_query, context=hogql_query_context, dialect="hogql"),
+    clickhouse_context = dataclasses.replace(
+        context,
+        # set the team.pk here so someone can't pass a context for a different team 🤷‍️
+        team_id=team.pk,
+        team=team,
+        enable_select_queries=True,
+        timings=timings,
+        modifiers=query_modifiers,
+    )
+
+    # Reuse the printed queries of an identical earlier query. Only for the default context, as a custom one
+    # can change how the query is printed.
+    compiled_query_key: Optional[str] = None
+    compiled_query: Optional[CompiledQuery] = None
+    if context_arg is None and not debug:
+        with timings.measure("compiled_query_cache"):
+            compiled_query_key = get_compiled_query_cache_key(
+                select_query, team, query_modifiers, settings, pretty if pretty is not None else True
             )
+            if compiled_query_key is not None:
+                compiled_query = get_compiled_query(compiled_query_key)
 
+    if compiled_query is not None:
+        hogql = compiled_query.hogql
+        print_columns = list(compiled_query.columns)
+        clickhouse_sql = compiled_query.clickhouse
+        clickhouse_context.values = dict(compiled_query.values)
+    else:
+        hogql, print_columns = _print_hogql(select_query, context, team, query_modifiers, timings, pretty)
+
+        # Print the ClickHouse SQL query
         with timings.measure("print_ast"):
-            hogql = print_prepared_ast(
-                select_query_hogql, hogql_query_context, "hogql", pretty=pretty if pretty is not None else True
-            )
-            print_columns = []
-            columns_query = (
-                select_query_hogql.select_queries[0]
-                if isinstance(select_query_hogql, ast.SelectUnionQuery)
-                else select_query_hogql
-            )
-            for node in columns_query.select:
-                if isinstance(node, ast.Alias):
-                    print_columns.append(node.alias)
+            try:
+                clickhouse_sql = print_ast(
+                    select_query,
+                    context=clickhouse_context,
+                    dialect="clickhouse",
+                    settings=settings,
+                    pretty=pretty if pretty is not None else True,
+                )
+            except Exception as e:
+                if debug:
+                    clickhouse_sql = None
+                    if isinstance(e, ExposedCHQueryError | ExposedHogQLError):
+                        error = str(e)
+                    else:
+                        error = "Unknown error"
                 else:
-                    print_columns.append(
-                        print_prepared_ast(
-                            node=node,
-                            context=hogql_query_context,
-                            dialect="hogql",
-                            stack=[select_query_hogql],
-                        )
-                    )
-
-    settings = settings or HogQLGlobalSettings()
-    if limit_context in (LimitContext.EXPORT, LimitContext.COHORT_CALCULATION, LimitContext.QUERY_ASYNC):
-        settings.max_execution_time = HOGQL_INCREASED_MAX_EXECUTION_TIME
+                    raise
 
-    # Print the ClickHouse SQL query
-    with timings.measure("print_ast"):
-        try:
-            clickhouse_context = dataclasses.replace(
-                context,
-                # set the team.pk here so someone can't pass a context for a different team 🤷‍️
-                team_id=team.pk,
-                team=team,
-                enable_select_queries=True,
-                timings=timings,
-                modifiers=query_modifiers,
-            )
-            clickhouse_sql = print_ast(
-                select_query,
-                context=clickhouse_context,
-                dialect="clickhouse",
-                settings=settings,
-                pretty=pretty if pretty is not None else True,
+        if compiled_query_key is not None and clickhouse_sql is not None:
+            set_compiled_query(
+                compiled_query_key,
+                CompiledQuery(
+                    hogql=hogql,
+                    clickhouse=clickhouse_sql,
+                    values=dict(clickhouse_context.values),
+                    columns=list(print_columns),
+                ),
             )
-        except Exception as e:
-            if debug:
-                clickhouse_sql = None
-                if isinstance(e, ExposedCHQueryError | ExposedHogQLError):
-                    error = str(e)
-                else:
-                    error = "Unknown error"
-            else:
-                raise
 
     if clickhouse_sql is not None:
         timings_dict = timings.to_dict()
@@ -231,3 +226,54 @@ def execute_hogql_query(
         explain=explain,
         metadata=metadata,
     )
+
+
+def _print_hogql(
+    select_query: ast.SelectQuery | ast.SelectUnionQuery,
+    context: HogQLContext,
+    team: Team,
+    query_modifiers: HogQLQueryModifiers,
+    timings: HogQLTimings,
+    pretty: Optional[bool],
+) -> tuple[str, list[str]]:
+    """Get printed HogQL query, and returned columns. Leaves the query as it was."""
+    with timings.measure("hogql"):
+        with timings.measure("prepare_ast"):
+            hogql_query_context = dataclasses.replace(
+                context,
+                # set the team.pk here so someone can't pass a context for a different team 🤷‍️
+                team_id=team.pk,
+                team=team,
+                enable_select_queries=True,
+                timings=timings,
+                modifiers=query_modifiers,
+            )
+
+            select_query_hogql = cast(
+                ast.SelectQuery,
+                prepare_ast_for_printing(node=select_query, context=hogql_query_context, dialect="hogql"),
+            )
+
+        with timings.measure("print_ast"):
+            hogql = print_prepared_ast(
+                select_query_hogql, hogql_query_context, "hogql", pretty=pretty if pretty is not None else True
+            )
+            print_columns = []
+            columns_query = (
+                select_query_hogql.select_queries[0]
+                if isinstance(select_query_hogql, ast.SelectUnionQuery)
+                else select_query_hogql
+            )
+            for node in columns_query.select:
+                if isinstance(node, ast.Alias):
+                    print_columns.append(node.alias)
+                else:
+                    print_columns.append(
+                        print_prepared_ast(
+                            node=node,
+                            context=hogql_query_context,
+                            dialect="hogql",
+                            stack=[select_query_hogql],
+                        )
+                    )
+    return hogql, print_columns
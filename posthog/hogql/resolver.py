@@ -1,3 +1,4 @@
+from copy import copy
 from datetime import date, datetime
 from typing import Optional, Any, cast, Literal
 from uuid import UUID
@@ -277,6 +278,10 @@ class Resolver(CloningVisitor):
 
         scope = self.scopes[-1]
 
+        # HogQLX tables and views are swapped for the queries they stand for below, so don't do that to the caller's
+        # node. The branches that resolve a table clone the node before changing anything else in it.
+        node = copy(node)
+
         if isinstance(node.table, ast.HogQLXTag):
             node.table = expand_hogqlx_query(node.table, self.context.team_id)
 
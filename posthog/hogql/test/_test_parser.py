@@ -1,4 +1,5 @@
 from typing import Literal, cast, Optional
+from unittest.mock import patch
 
 import math
 from posthog.hogql.ast import (
@@ -26,7 +27,7 @@ from posthog.hogql.ast import (
 from posthog.hogql.parser import parse_program
 from posthog.hogql import ast
 from posthog.hogql.errors import ExposedHogQLError, SyntaxError
-from posthog.hogql.parser import parse_expr, parse_order_expr, parse_select, parse_string_template
+from posthog.hogql.parser import PARSE_CACHE, parse_expr, parse_order_expr, parse_select, parse_string_template
 from posthog.hogql.visitor import clear_locations
 from posthog.test.base import BaseTest, MemoryLeakTestMixin
 
@@ -42,6 +43,14 @@ def parser_test_factory(backend: Literal["python", "cpp"]):
 
         maxDiff = None
 
+        def setUp(self):
+            super().setUp()
+            # Exercise the parser itself (and its memory behaviour) on every call, not the parse cache
+            patcher = patch.object(PARSE_CACHE, "max_entries", 0)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+            PARSE_CACHE.clear()
+
         def _string_template(self, template: str, placeholders: Optional[dict[str, ast.Expr]] = None) -> ast.Expr:
             return clear_locations(parse_string_template(template, placeholders=placeholders, backend=backend))
 
@@ -0,0 +1,65 @@
+from unittest.mock import patch
+
+from django.test import override_settings
+
+from posthog.hogql import ast
+from posthog.hogql.compiled_query_cache import get_compiled_query_cache_key
+from posthog.hogql.constants import HogQLGlobalSettings
+from posthog.hogql.modifiers import create_default_modifiers_for_team
+from posthog.hogql.parser import parse_select
+from posthog.hogql.query import execute_hogql_query
+from posthog.hogql import query as hogql_query_module
+from posthog.schema import HogQLQueryModifiers
+from posthog.test.base import APIBaseTest, ClickhouseTestMixin
+
+
+@override_settings(HOGQL_COMPILED_QUERY_CACHE_TTL_SECONDS=60)
+class TestCompiledQueryCache(ClickhouseTestMixin, APIBaseTest):
+    def _key(self, query: str, modifiers: HogQLQueryModifiers | None = None, **placeholders: ast.Expr):
+        return get_compiled_query_cache_key(
+            parse_select(query, placeholders=placeholders),
+            self.team,
+            create_default_modifiers_for_team(self.team, modifiers),
+            HogQLGlobalSettings(),
+            pretty=True,
+        )
+
+    def test_identical_query_is_printed_once(self):
+        query = "select event, count() from events where event = {event} group by event"
+        placeholders = {"event": ast.Constant(value="$pageview")}
+
+        with patch.object(hogql_query_module, "print_ast", wraps=hogql_query_module.print_ast) as print_ast:
+            first = execute_hogql_query(query, self.team, placeholders=placeholders)
+            second = execute_hogql_query(query, self.team, placeholders=placeholders)
+
+        self.assertEqual(print_ast.call_count, 1)
+        self.assertEqual(first.clickhouse, second.clickhouse)
+        self.assertEqual(first.hogql, second.hogql)
+        self.assertEqual(first.columns, second.columns)
+        self.assertIn("./compiled_query_cache", [timing.k for timing in second.timings or []])
+
+    def test_cache_can_be_disabled_with_modifiers(self):
+        modifiers = HogQLQueryModifiers(useCompiledQueryCache=False)
+
+        with patch.object(hogql_query_module, "print_ast", wraps=hogql_query_module.print_ast) as print_ast:
+            execute_hogql_query("select 1", self.team, modifiers=modifiers)
+            execute_hogql_query("select 1", self.team, modifiers=modifiers)
+
+        self.assertEqual(print_ast.call_count, 2)
+        self.assertIsNone(self._key("select 1", HogQLQueryModifiers(useCompiledQueryCache=False)))
+
+    def test_key_depends_on_constants_but_not_on_locations(self):
+        self.assertEqual(self._key("select 1"), self._key("select   1"))
+        self.assertNotEqual(
+            self._key("select {x}", x=ast.Constant(value=1)), self._key("select {x}", x=ast.Constant(value=2))
+        )
+
+    def test_key_depends_on_modifiers(self):
+        self.assertNotEqual(
+            self._key("select event from events", HogQLQueryModifiers(personsArgMaxVersion="v1")),
+            self._key("select event from events", HogQLQueryModifiers(personsArgMaxVersion="v2")),
+        )
+
+    def test_queries_resolved_from_postgres_are_not_cached(self):
+        self.assertIsNone(self._key("select 1 from events where person_id in cohort 1"))
+        self.assertIsNone(self._key("select 1 from events where matchesAction(1)"))
@@ -0,0 +1,63 @@
+from typing import cast
+from unittest.mock import patch
+
+from posthog.hogql import ast
+from posthog.hogql.parser import PARSE_CACHE, RULE_TO_PARSE_FUNCTION, parse_expr, parse_select
+from posthog.test.base import BaseTest
+
+
+class TestParserCache(BaseTest):
+    def setUp(self):
+        super().setUp()
+        PARSE_CACHE.clear()
+
+    def test_select_is_parsed_once(self):
+        counting_parse = _CountingParse(RULE_TO_PARSE_FUNCTION["cpp"]["select"])
+        with patch.dict(RULE_TO_PARSE_FUNCTION["cpp"], {"select": counting_parse}):
+            first = parse_select("select event from events")
+            second = parse_select("select event from events")
+
+        self.assertEqual(counting_parse.calls, 1)
+        self.assertEqual(first, second)
+
+    def test_cached_ast_is_cloned_on_read(self):
+        first = cast(ast.SelectQuery, parse_select("select event from events"))
+        first.limit = ast.Constant(value=10)
+        second = cast(ast.SelectQuery, parse_select("select event from events"))
+
+        self.assertIsNone(second.limit)
+        self.assertIsNot(first.select[0], second.select[0])
+
+    def test_placeholders_are_not_part_of_the_key(self):
+        first = parse_expr("{foo} + 1", placeholders={"foo": ast.Constant(value=1)})
+        second = parse_expr("{foo} + 1", placeholders={"foo": ast.Constant(value=2)})
+
+        self.assertEqual(len(PARSE_CACHE), 1)
+        self.assertEqual(cast(ast.Constant, cast(ast.ArithmeticOperation, first).left).value, 1)
+        self.assertEqual(cast(ast.Constant, cast(ast.ArithmeticOperation, second).left).value, 2)
+
+    def test_backend_and_start_are_part_of_the_key(self):
+        parse_expr("1 + 1", backend="cpp")
+        parse_expr("1 + 1", backend="python")
+        parse_expr("1 + 1", start=None, backend="cpp")
+
+        self.assertEqual(len(PARSE_CACHE), 3)
+
+    def test_entries_are_evicted(self):
+        with patch.object(PARSE_CACHE, "max_entries", 2):
+            parse_expr("1")
+            parse_expr("2")
+            parse_expr("3")
+
+        self.assertEqual(len(PARSE_CACHE), 2)
+        self.assertNotIn(("expr", "cpp", "1", 0), PARSE_CACHE)
+
+
+class _CountingParse:
+    def __init__(self, parse):
+        self.parse = parse
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self.parse(*args, **kwargs)
@@ -0,0 +1,105 @@
+from unittest.mock import patch
+
+from posthog.hogql import ast
+from posthog.hogql.base import AST, _visit_method_name, _visit_methods
+from posthog.hogql.context import HogQLContext
+from posthog.hogql.errors import NotImplementedError
+from posthog.hogql.parser import parse_expr
+from posthog.hogql.printer import print_ast
+from posthog.hogql.visitor import TraversingVisitor
+from posthog.hogql_queries.insights.funnels.funnels_query_runner import FunnelsQueryRunner
+from posthog.hogql_queries.insights.trends.trends_query_runner import TrendsQueryRunner
+from posthog.hogql_queries.query_runner import QueryRunner
+from posthog.schema import (
+    BaseMathType,
+    BreakdownFilter,
+    EventPropertyFilter,
+    EventsNode,
+    FunnelsQuery,
+    InsightDateRange,
+    PersonPropertyFilter,
+    PropertyOperator,
+    TrendsQuery,
+)
+from posthog.test.base import BaseTest
+
+
+def accept_looking_up_visit_method(self: AST, visitor):
+    """
+    How `AST.accept` dispatched before visit methods were cached, working out the method on every visit
+    """
+    method_name = _visit_method_name(self.__class__)
+    if hasattr(visitor, method_name):
+        return getattr(visitor, method_name)(self)
+    if hasattr(visitor, "visit_unknown"):
+        return visitor.visit_unknown(self)
+    raise NotImplementedError(f"{visitor.__class__.__name__} has no method {method_name}")
+
+
+class TestVisitDispatch(BaseTest):
+    def _insight_query_runners(self) -> dict[str, QueryRunner]:
+        # Fixed dates, so that compiling a query a second later gives the same SQL
+        date_range = InsightDateRange(date_from="2024-03-01", date_to="2024-05-31")
+        properties = [
+            EventPropertyFilter(key="$browser", value=["Chrome", "Safari"], operator=PropertyOperator.EXACT),
+            PersonPropertyFilter(key="email", value="@posthog.com", operator=PropertyOperator.NOT_ICONTAINS),
+        ]
+        breakdown_filter = BreakdownFilter(breakdown="$browser")
+        return {
+            "trends": TrendsQueryRunner(
+                query=TrendsQuery(
+                    dateRange=date_range,
+                    series=[EventsNode(event="$pageview"), EventsNode(event="$pageview", math=BaseMathType.DAU)],
+                    properties=properties,
+                    breakdownFilter=breakdown_filter,
+                ),
+                team=self.team,
+            ),
+            "funnel": FunnelsQueryRunner(
+                query=FunnelsQuery(
+                    dateRange=date_range,
+                    series=[EventsNode(event="$pageview"), EventsNode(event="signed up")],
+                    properties=properties,
+                    breakdownFilter=breakdown_filter,
+                ),
+                team=self.team,
+            ),
+        }
+
+    def _compile(self, runner: QueryRunner) -> str:
+        query = runner.to_query()
+        assert isinstance(query, ast.SelectQuery | ast.SelectUnionQuery)
+        return print_ast(
+            query,
+            HogQLContext(team_id=self.team.pk, enable_select_queries=True, modifiers=runner.modifiers),
+            "clickhouse",
+        )
+
+    def test_cached_visit_methods_compile_insight_queries_the_same(self):
+        for name, runner in self._insight_query_runners().items():
+            with patch.object(AST, "accept", accept_looking_up_visit_method):
+                looked_up_sql = self._compile(runner)
+
+            assert self._compile(runner) == looked_up_sql, name
+
+    def test_visit_methods_are_cached_per_visitor_class(self):
+        class ConstantCounter(TraversingVisitor):
+            def __init__(self):
+                super().__init__()
+                self.constants = 0
+
+            def visit_constant(self, node: ast.Constant):
+                self.constants += 1
+
+        class ConstantSkipper(ConstantCounter):
+            def visit_constant(self, node: ast.Constant):
+                pass
+
+        counter, skipper = ConstantCounter(), ConstantSkipper()
+        counter.visit(parse_expr("1 + 2"))
+        skipper.visit(parse_expr("1 + 2"))
+
+        assert (counter.constants, skipper.constants) == (2, 0)
+        assert _visit_methods[ConstantCounter][ast.Constant] is ConstantCounter.visit_constant
+        assert _visit_methods[ConstantSkipper][ast.Constant] is ConstantSkipper.visit_constant
+        assert _visit_methods[ConstantSkipper][ast.ArithmeticOperation] is TraversingVisitor.visit_arithmetic_operation
@@ -2,10 +2,13 @@ import pytest
 from django.test import override_settings
 
 from posthog.hogql import ast
+from posthog.hogql.context import HogQLContext
 from posthog.hogql.errors import QueryError
-from posthog.hogql.parser import parse_expr
+from posthog.hogql.parser import parse_expr, parse_select
+from posthog.hogql.printer import print_ast
 from posthog.hogql.query import execute_hogql_query
 from posthog.hogql.test.utils import pretty_print_response_in_tests
+from posthog.hogql.visitor import clone_expr
 from posthog.models import Cohort
 from posthog.models.cohort.util import recalculate_cohortpeople
 from posthog.models.utils import UUIDT
@@ -138,6 +141,21 @@ class TestInCohort(BaseTest):
         )
         assert pretty_print_response_in_tests(response, self.team.pk) == self.snapshot  # type: ignore
 
+    @override_settings(PERSON_ON_EVENTS_OVERRIDE=True, PERSON_ON_EVENTS_V2_OVERRIDE=False)
+    def test_in_cohort_conjoined_leaves_query_unchanged(self):
+        cohort = Cohort.objects.create(team=self.team, is_static=True)
+        query = parse_select(f"SELECT event FROM events WHERE person_id IN COHORT {cohort.pk}")
+        original = clone_expr(query)
+
+        for dialect in ("hogql", "clickhouse"):
+            context = HogQLContext(
+                team_id=self.team.pk,
+                enable_select_queries=True,
+                modifiers=HogQLQueryModifiers(inCohortVia=InCohortVia.LEFTJOIN_CONJOINED),
+            )
+            assert "__in_cohort" in print_ast(query, context, dialect)
+            assert query == original
+
     @pytest.mark.usefixtures("unittest_snapshot")
     @override_settings(PERSON_ON_EVENTS_OVERRIDE=True, PERSON_ON_EVENTS_V2_OVERRIDE=False)
     def test_in_cohort_conjoined_dynamic(self):
@@ -1,4 +1,5 @@
 from datetime import timedelta
+from functools import partial
 from math import ceil
 from typing import Optional, Any, cast
 
@@ -17,6 +18,7 @@ from posthog.hogql.timings import HogQLTimings
 from posthog.hogql_queries.query_runner import QueryRunner
 from posthog.hogql_queries.utils.query_compare_to_date_range import QueryCompareToDateRange
 from posthog.hogql_queries.utils.query_date_range import QueryDateRange
+from posthog.hogql_queries.utils.query_executor import execute_queries_in_parallel
 from posthog.hogql_queries.utils.query_previous_period_date_range import QueryPreviousPeriodDateRange
 from posthog.models import Team
 from posthog.models.action.action import Action
@@ -202,16 +204,23 @@ class StickinessQueryRunner(QueryRunner):
         res = []
         timings = []
 
-        for index, query in enumerate(queries):
-            response = execute_hogql_query(
-                query_type="StickinessQuery",
-                query=query,
-                team=self.team,
-                timings=self.timings,
-                modifiers=self.modifiers,
-                limit_context=self.limit_context,
-            )
+        responses = execute_queries_in_parallel(
+            self.team.pk,
+            [
+                partial(
+                    execute_hogql_query,
+                    query_type="StickinessQuery",
+                    query=query,
+                    team=self.team,
+                    timings=self.timings.clone_for_subquery(index),
+                    modifiers=self.modifiers,
+                    limit_context=self.limit_context,
+                )
+                for index, query in enumerate(queries)
+            ],
+        )
 
+        for index, response in enumerate(responses):
             if response.timings is not None:
                 timings.extend(response.timings)
 
@@ -6,12 +6,15 @@ from itertools import groupby
 from typing import Optional
 from unittest.mock import MagicMock, patch
 from django.test import override_settings
+from django.utils import timezone
 from freezegun import freeze_time
 from posthog.clickhouse.client.execute import sync_execute
 from posthog.hogql import ast
 from posthog.hogql.constants import MAX_SELECT_RETURNED_ROWS, LimitContext
 from posthog.hogql.modifiers import create_default_modifiers_for_team
 from posthog.hogql_queries.insights.trends.trends_query_runner import TrendsQueryRunner, BREAKDOWN_OTHER_DISPLAY
+from posthog.hogql_queries.query_runner import ExecutionMode
+from posthog.models.action.action import Action
 from posthog.models.cohort.cohort import Cohort
 from posthog.models.property_definition import PropertyDefinition
 
@@ -21,7 +24,9 @@ from posthog.schema import (
     BreakdownFilter,
     BreakdownItem,
     BreakdownType,
+    CachedTrendsQueryResponse,
     ChartDisplayType,
+    CohortPropertyFilter,
     CompareItem,
     CountPerActorMathType,
     InsightDateRange,
@@ -30,7 +35,10 @@ from posthog.schema import (
     HogQLQueryModifiers,
     InCohortVia,
     IntervalType,
+    PersonPropertyFilter,
+    PersonsOnEventsMode,
     PropertyMathType,
+    PropertyOperator,
     TrendsFilter,
     TrendsQuery,
     CompareFilter,
@@ -2320,3 +2328,149 @@ class TestTrendsQueryRunner(ClickhouseTestMixin, APIBaseTest):
         assert len(response.results) == 1
         # 10% of 30 is 3, so check we're adjusting the results back up
         assert response.results[0]["aggregated_value"] > 5 and response.results[0]["aggregated_value"] < 30
+
+    @override_settings(QUERY_INCREMENTAL_REFRESH_MARGIN_HOURS=24, QUERY_INCREMENTAL_FULL_CALCULATION_HOURS=24 * 7)
+    def test_incremental_calculation_only_recalculates_intervals_since_last_refresh(self):
+        self._create_test_events()
+        runner = self._create_query_runner(self.default_date_from, self.default_date_to, IntervalType.DAY, None)
+
+        with freeze_time("2020-01-16T10:00:00Z"):
+            runner.run(execution_mode=ExecutionMode.CALCULATE_BLOCKING_ALWAYS)
+
+        # one event before the intervals that are recalculated, and one in them
+        _create_event(team=self.team, event="$pageview", distinct_id="p1", timestamp="2020-01-12T12:00:00Z")
+        _create_event(team=self.team, event="$pageview", distinct_id="p1", timestamp="2020-01-17T12:00:00Z")
+
+        with freeze_time("2020-01-20T10:00:00Z"):
+            response = runner.run(execution_mode=ExecutionMode.CALCULATE_INCREMENTALLY_BLOCKING_ALWAYS)
+
+        assert isinstance(response, CachedTrendsQueryResponse)
+        assert response.is_cached is False
+        assert response.incremental_calculations == 1
+        assert response.last_full_calculation == datetime(2020, 1, 16, 10, tzinfo=zoneinfo.ZoneInfo("UTC"))
+        assert response.results[0]["days"] == [f"2020-01-{day:02d}" for day in range(9, 20)]
+        assert response.results[0]["data"] == [1, 0, 1, 3, 1, 0, 2, 0, 2, 0, 1]
+        assert response.results[0]["count"] == 11
+        assert response.results[0]["labels"][0] == "9-Jan-2020"
+
+        full_response = runner.calculate()
+        assert full_response.results[0]["data"] == [1, 0, 1, 4, 1, 0, 2, 0, 2, 0, 1]
+        assert {**response.results[0], "data": None, "count": None} == {
+            **full_response.results[0],
+            "data": None,
+            "count": None,
+        }
+
+    def test_incremental_calculation_falls_back_to_full_calculation(self):
+        self._create_test_events()
+        breakdown_runner = self._create_query_runner(
+            self.default_date_from,
+            self.default_date_to,
+            IntervalType.DAY,
+            None,
+            breakdown=BreakdownFilter(breakdown="$browser"),
+        )
+        weekly_active_runner = self._create_query_runner(
+            self.default_date_from,
+            self.default_date_to,
+            IntervalType.DAY,
+            [EventsNode(event="$pageview", math=BaseMathType.WEEKLY_ACTIVE)],
+        )
+
+        for runner in (breakdown_runner, weekly_active_runner):
+            with freeze_time("2020-01-16T10:00:00Z"):
+                cached_response = runner.run(execution_mode=ExecutionMode.CALCULATE_BLOCKING_ALWAYS)
+            assert isinstance(cached_response, CachedTrendsQueryResponse)
+            assert runner.calculate_incrementally(cached_response) is None
+
+            with freeze_time("2020-01-20T10:00:00Z"):
+                response = runner.run(execution_mode=ExecutionMode.CALCULATE_INCREMENTALLY_BLOCKING_ALWAYS)
+            assert isinstance(response, CachedTrendsQueryResponse)
+            assert response.results == runner.calculate().results
+
+    @override_settings(QUERY_INCREMENTAL_FULL_CALCULATION_HOURS=24, QUERY_INCREMENTAL_MAX_CALCULATIONS=2)
+    def test_incremental_calculation_calculates_in_full_again_after_a_while(self):
+        self._create_test_events()
+        runner = self._create_query_runner(self.default_date_from, self.default_date_to, IntervalType.DAY, None)
+        utc = zoneinfo.ZoneInfo("UTC")
+
+        with freeze_time("2020-01-19T10:00:00Z"):
+            runner.run(execution_mode=ExecutionMode.CALCULATE_BLOCKING_ALWAYS)
+
+        with freeze_time("2020-01-19T12:00:00Z"):
+            responses = [
+                runner.run(execution_mode=ExecutionMode.CALCULATE_INCREMENTALLY_BLOCKING_ALWAYS) for _ in range(3)
+            ]
+        assert [(response.incremental_calculations, response.last_full_calculation) for response in responses] == [
+            (1, datetime(2020, 1, 19, 10, tzinfo=utc)),
+            (2, datetime(2020, 1, 19, 10, tzinfo=utc)),
+            (0, datetime(2020, 1, 19, 12, tzinfo=utc)),
+        ]
+
+        with freeze_time("2020-01-20T12:00:00Z"):
+            response = runner.run(execution_mode=ExecutionMode.CALCULATE_INCREMENTALLY_BLOCKING_ALWAYS)
+        assert isinstance(response, CachedTrendsQueryResponse)
+        assert response.incremental_calculations == 0
+        assert response.last_full_calculation == datetime(2020, 1, 20, 12, tzinfo=utc)
+
+    def test_incremental_calculation_calculates_in_full_when_dependencies_change(self):
+        self._create_test_events()
+        with freeze_time("2020-01-19T09:00:00Z"):
+            action = Action.objects.create(team=self.team, name="Viewed a page", steps_json=[{"event": "$pageview"}])
+            cohort = Cohort.objects.create(
+                team=self.team,
+                name="p1",
+                groups=[{"properties": [{"key": "name", "value": "p1", "type": "person"}]}],
+                last_calculation=timezone.now(),
+            )
+
+        def runners() -> dict[str, TrendsQueryRunner]:
+            # new runners each time, as they load the actions they use once
+            return {
+                "action": self._create_query_runner(
+                    self.default_date_from, self.default_date_to, IntervalType.DAY, [ActionsNode(id=action.pk)]
+                ),
+                "cohort": self._create_query_runner(
+                    self.default_date_from,
+                    self.default_date_to,
+                    IntervalType.DAY,
+                    [EventsNode(event="$pageview", properties=[CohortPropertyFilter(value=cohort.pk)])],
+                ),
+                "person properties": self._create_query_runner(
+                    self.default_date_from,
+                    self.default_date_to,
+                    IntervalType.DAY,
+                    [
+                        EventsNode(
+                            event="$pageview",
+                            properties=[PersonPropertyFilter(key="name", value="p1", operator=PropertyOperator.EXACT)],
+                        )
+                    ],
+                    hogql_modifiers=HogQLQueryModifiers(
+                        personsOnEventsMode=PersonsOnEventsMode.PERSON_ID_OVERRIDE_PROPERTIES_JOINED
+                    ),
+                ),
+            }
+
+        with freeze_time("2020-01-19T10:00:00Z"):
+            cached_responses = {
+                name: runner.run(execution_mode=ExecutionMode.CALCULATE_BLOCKING_ALWAYS)
+                for name, runner in runners().items()
+            }
+        assert all(isinstance(response, CachedTrendsQueryResponse) for response in cached_responses.values())
+
+        with freeze_time("2020-01-19T11:00:00Z"):
+            assert {
+                name: runner.calculate_incrementally(cached_responses[name]) is not None  # type: ignore
+                for name, runner in runners().items()
+            } == {"action": True, "cohort": True, "person properties": False}
+
+            action.steps_json = [{"event": "$pageview", "url": "/pricing", "url_matching": "contains"}]
+            action.save()
+            cohort.last_calculation = timezone.now()
+            cohort.save()
+
+            assert {
+                name: runner.calculate_incrementally(cached_responses[name]) is not None  # type: ignore
+                for name, runner in runners().items()
+            } == {"action": False, "cohort": False, "person properties": False}
@@ -1,10 +1,12 @@
+import re
+
 from natsort import natsorted, ns
 from typing import Union
 from copy import deepcopy
 from datetime import timedelta
 from math import ceil
+from functools import partial
 from operator import itemgetter
-import threading
 from typing import Optional, Any
 from django.conf import settings
 
@@ -14,13 +16,13 @@ from posthog.caching.insights_api import (
     REDUCED_MINIMUM_INSIGHT_REFRESH_INTERVAL,
     REAL_TIME_INSIGHT_REFRESH_INTERVAL,
 )
-from posthog.clickhouse import query_tagging
 
 from posthog.hogql import ast
 from posthog.hogql.constants import LimitContext, MAX_SELECT_RETURNED_ROWS, BREAKDOWN_VALUES_LIMIT
 from posthog.hogql.printer import to_printed_hogql
 from posthog.hogql.query import execute_hogql_query
 from posthog.hogql.timings import HogQLTimings
+from posthog.hogql_queries.insights.trends.aggregation_operations import AggregationOperations
 from posthog.hogql_queries.insights.trends.display import TrendsDisplay
 from posthog.hogql_queries.insights.trends.breakdown import (
     BREAKDOWN_NULL_DISPLAY,
@@ -35,6 +37,7 @@ from posthog.hogql_queries.query_runner import QueryRunner
 from posthog.hogql_queries.utils.formula_ast import FormulaAST
 from posthog.hogql_queries.utils.query_compare_to_date_range import QueryCompareToDateRange
 from posthog.hogql_queries.utils.query_date_range import QueryDateRange
+from posthog.hogql_queries.utils.query_executor import execute_queries_in_parallel
 from posthog.hogql_queries.utils.query_previous_period_date_range import (
     QueryPreviousPeriodDateRange,
 )
@@ -58,6 +61,7 @@ from posthog.schema import (
     HogQLQueryResponse,
     InCohortVia,
     InsightActorsQueryOptionsResponse,
+    InsightDateRange,
     QueryTiming,
     Series,
     TrendsQuery,
@@ -66,7 +70,9 @@ from posthog.schema import (
     DataWarehouseEventsModifier,
     BreakdownType,
     IntervalType,
+    PersonsOnEventsMode,
 )
+from posthog.schema_helpers import to_dict
 from posthog.warehouse.models import DataWarehouseTable
 from posthog.utils import format_label_date, multisort
 
@@ -292,73 +298,36 @@ class TrendsQueryRunner(QueryRunner):
 
         res_matrix: list[list[Any] | Any | None] = [None] * len(queries)
         timings_matrix: list[list[QueryTiming] | None] = [None] * (2 + len(queries))
-        errors: list[Exception] = []
         debug_errors: list[str] = []
 
-        def run(
-            index: int,
-            query: ast.SelectQuery | ast.SelectUnionQuery,
-            timings: HogQLTimings,
-            is_parallel: bool,
-            query_tags: Optional[dict] = None,
-        ):
-            try:
-                if query_tags:
-                    query_tagging.tag_queries(**query_tags)
-
-                series_with_extra = self.series[index]
-
-                response = execute_hogql_query(
-                    query_type="TrendsQuery",
-                    query=query,
-                    team=self.team,
-                    timings=timings,
-                    modifiers=self.modifiers,
-                    limit_context=self.limit_context,
-                )
+        def run(index: int, query: ast.SelectQuery | ast.SelectUnionQuery, timings: HogQLTimings) -> None:
+            series_with_extra = self.series[index]
 
-                timings_matrix[index + 1] = response.timings
-                res_matrix[index] = self.build_series_response(response, series_with_extra, len(queries))
-                if response.error:
-                    debug_errors.append(response.error)
-            except Exception as e:
-                errors.append(e)
-            finally:
-                if is_parallel:
-                    from django.db import connection
+            response = execute_hogql_query(
+                query_type="TrendsQuery",
+                query=query,
+                team=self.team,
+                timings=timings,
+                modifiers=self.modifiers,
+                limit_context=self.limit_context,
+            )
 
-                    # This will only close the DB connection for the newly spawned thread and not the whole app
-                    connection.close()
+            timings_matrix[index + 1] = response.timings
+            res_matrix[index] = self.build_series_response(response, series_with_extra, len(queries))
+            if response.error:
+                debug_errors.append(response.error)
 
         with self.timings.measure("execute_queries"):
             timings_matrix[0] = self.timings.to_list(back_out_stack=False)
             self.timings.clear_timings()
 
-            # This exists so that we're not spawning threads during unit tests. We can't do
-            # this right now due to the lack of multithreaded support of Django
-            if len(queries) == 1 or settings.IN_UNIT_TESTING:
-                for index, query in enumerate(queries):
-                    run(index, query, self.timings.clone_for_subquery(index), False)
-            else:
-                jobs = [
-                    threading.Thread(
-                        target=run,
-                        args=(
-                            index,
-                            query,
-                            self.timings.clone_for_subquery(index),
-                            True,
-                            query_tagging.get_query_tags(),
-                        ),
-                    )
+            execute_queries_in_parallel(
+                self.team.pk,
+                [
+                    partial(run, index, query, self.timings.clone_for_subquery(index))
                     for index, query in enumerate(queries)
-                ]
-                [j.start() for j in jobs]  # type:ignore
-                [j.join() for j in jobs]  # type:ignore
-
-        # Raise any errors raised in a seperate thread
-        if len(errors) > 0:
-            raise errors[0]
+                ],
+            )
 
         # Flatten res and timings
         returned_results: list[list[dict[str, Any]]] = []
@@ -407,6 +376,190 @@ class TrendsQueryRunner(QueryRunner):
             error=". ".join(debug_errors),
         )
 
+    def calculate_incrementally(self, cached_response: CachedTrendsQueryResponse) -> Optional[TrendsQueryResponse]:
+        last_full_calculation = cached_response.last_full_calculation
+        if (
+            last_full_calculation is None
+            or cached_response.timezone != self.team.timezone
+            or not self._can_calculate_incrementally()
+            or self._dependencies_changed_since(last_full_calculation)
+        ):
+            return None
+
+        # Intervals that ended before the cached results were calculated don't change, except for events ingested
+        # late, so only the intervals since then, less a margin, are recalculated
+        all_values = self.query_date_range.all_values()
+        last_refresh = cached_response.last_refresh.astimezone(self.team.timezone_info)
+        window_start = self.query_date_range.align_with_interval(
+            last_refresh - timedelta(hours=settings.QUERY_INCREMENTAL_REFRESH_MARGIN_HOURS)
+        )
+        window_start = min(window_start, all_values[-1])
+        if window_start <= all_values[0]:
+            return None
+
+        window_runner = TrendsQueryRunner(
+            query=self.query.model_copy(
+                update={
+                    "dateRange": InsightDateRange(
+                        date_from=window_start.isoformat(),
+                        date_to=self.query_date_range.date_to().isoformat(),
+                        explicitDate=True,
+                    )
+                }
+            ),
+            team=self.team,
+            timings=self.timings,
+            modifiers=self.modifiers,
+            limit_context=self.limit_context,
+        )
+        window_response = window_runner.calculate()
+        if len(window_response.results) != len(cached_response.results):
+            return None
+
+        days = [
+            day.strftime(
+                "%Y-%m-%d{}".format(" %H:%M:%S" if self.query_date_range.interval_name in ("hour", "minute") else "")
+            )
+            for day in all_values
+        ]
+        labels = [format_label_date(day, self.query_date_range.interval_name) for day in all_values]
+        series_filter = self._query_to_filter()
+
+        results = []
+        for cached_series, window_series in zip(cached_response.results, window_response.results):
+            if cached_series.get("action", {}).get("order") != window_series["action"]["order"]:
+                return None
+
+            values = dict(zip(cached_series.get("days", []), cached_series.get("data", [])))
+            values.update(zip(window_series["days"], window_series["data"]))
+            if any(day not in values for day in days):
+                # The cached results don't cover the start of the date range
+                return None
+
+            data = [values[day] for day in days]
+            results.append(
+                {
+                    **window_series,
+                    "data": data,
+                    "labels": labels,
+                    "days": days,
+                    "count": float(sum(data)),
+                    "filter": series_filter,
+                    "action": {**window_series["action"], "days": all_values},
+                }
+            )
+
+        with self.timings.measure("printing_hogql_for_response"):
+            response_hogql = to_printed_hogql(self.to_query(), self.team, self.modifiers)
+
+        return TrendsQueryResponse(
+            results=results,
+            timings=window_response.timings,
+            hogql=response_hogql,
+            modifiers=self.modifiers,
+            error=window_response.error,
+        )
+
+    def _can_calculate_incrementally(self) -> bool:
+        """
+        Whether the value of each interval only depends on the events in it, so that intervals can be recalculated
+        on their own and merged with the rest
+        """
+        trends_filter = self.query.trendsFilter
+        if (
+            self.query_date_range.interval_name == "minute"
+            or self._trends_display.is_total_value()
+            or self._trends_display.display_type == ChartDisplayType.ACTIONS_LINE_GRAPH_CUMULATIVE
+            or (self.query.compareFilter is not None and self.query.compareFilter.compare)
+            or (
+                self.query.breakdownFilter is not None
+                and (self.query.breakdownFilter.breakdown is not None or self.query.breakdownFilter.breakdowns)
+            )
+            or (
+                trends_filter is not None
+                and (bool(trends_filter.formula) or (trends_filter.smoothingIntervals or 1) > 1)
+            )
+        ):
+            return False
+
+        # Active users and counts per actor are calculated from events before each interval too
+        if any(
+            AggregationOperations(
+                self.team,
+                series.series,
+                self._trends_display.display_type,
+                self.query_date_range,
+                self._trends_display.is_total_value(),
+            ).requires_query_orchestration()
+            for series in self.series
+        ):
+            return False
+
+        # Which of the earlier intervals' events match changes whenever persons' or groups' properties do, unless
+        # persons' properties are read from the events themselves
+        properties_on_events = self.modifiers.personsOnEventsMode in (
+            PersonsOnEventsMode.PERSON_ID_NO_OVERRIDE_PROPERTIES_ON_EVENTS,
+            PersonsOnEventsMode.PERSON_ID_OVERRIDE_PROPERTIES_ON_EVENTS,
+        )
+        for property in self._property_filters():
+            if property.get("type") == "group" or (property.get("type") == "person" and not properties_on_events):
+                return False
+            if property.get("type") == "hogql" and re.search(r"\b(person|group_\d)\b", str(property.get("key"))):
+                return False
+        return True
+
+    def _dependencies_changed_since(self, moment: datetime) -> bool:
+        """
+        Whether the actions or the cohorts the query uses changed since `moment`, changing the earlier intervals too
+        """
+        action_ids = {int(series.id) for series in self.query.series if isinstance(series, ActionsNode)}
+        actions = self._incremental_actions
+        if len(actions) != len(action_ids) or any(action.deleted or action.updated_at > moment for action in actions):
+            return True
+
+        cohort_ids = {
+            int(property["value"])
+            for property in self._property_filters()
+            if property.get("type") == "cohort" and str(property.get("value")).isdigit()
+        }
+        if not cohort_ids:
+            return False
+        cohorts = list(Cohort.objects.filter(team=self.team, pk__in=cohort_ids))
+        return len(cohorts) != len(cohort_ids) or any(
+            # Static cohorts don't record when people were added to them
+            cohort.is_static or cohort.last_calculation is None or cohort.last_calculation > moment
+            for cohort in cohorts
+        )
+
+    @cached_property
+    def _incremental_actions(self) -> list[Action]:
+        action_ids = {int(series.id) for series in self.query.series if isinstance(series, ActionsNode)}
+        if not action_ids:
+            return []
+        return list(Action.objects.filter(team=self.team, pk__in=action_ids))
+
+    def _property_filters(self) -> list[dict]:
+        """
+        The property filters of the query and its series, and of the actions and test account filters it uses
+        """
+        filters: list[dict] = []
+
+        def collect(value: Any) -> None:
+            if isinstance(value, dict):
+                if "key" in value and "type" in value:
+                    filters.append(value)
+                for nested in value.values():
+                    collect(nested)
+            elif isinstance(value, list):
+                for nested in value:
+                    collect(nested)
+
+        collect(to_dict(self.query))
+        collect([action.steps_json for action in self._incremental_actions])
+        if self.query.filterTestAccounts:
+            collect(self.team.test_account_filters)
+        return filters
+
     def build_series_response(self, response: HogQLQueryResponse, series: SeriesWithExtras, series_count: int):
         def get_value(name: str, val: Any):
             if name not in ["date", "total", "breakdown_value"]:
@@ -749,32 +902,34 @@ class TrendsQueryRunner(QueryRunner):
 
         # we need to apply the formula to a group of results when we have a breakdown or the compare option is enabled
         if has_compare or has_breakdown:
-            keys = ["breakdown_value"] if has_breakdown else ["compare_label"]
+            key = itemgetter("breakdown_value") if has_breakdown else itemgetter("compare_label")
 
-            all_breakdown_values = set()
+            # index each series' results by breakdown value, so that matching them up doesn't scan all of them
+            results_by_breakdown_value: list[dict[Any, dict[str, Any]]] = []
             for result in results:
+                by_breakdown_value: dict[Any, dict[str, Any]] = {}
                 if isinstance(result, list):
                     for item in result:
-                        all_breakdown_values.add(itemgetter(*keys)(item))
+                        by_breakdown_value.setdefault(key(item), item)
+                results_by_breakdown_value.append(by_breakdown_value)
+
+            all_breakdown_values = set().union(*results_by_breakdown_value)
 
             # sort the results so that the breakdown values are in the correct order
             sorted_breakdown_values = natsorted(list(all_breakdown_values), alg=ns.IGNORECASE)
 
             computed_results = []
             for breakdown_value in sorted_breakdown_values:
-                any_result: Optional[dict[str, Any]] = None
-                for result in results:
-                    matching_result = [item for item in result if itemgetter(*keys)(item) == breakdown_value]
-                    if matching_result:
-                        any_result = matching_result[0]
-                        break
-                if not any_result:
-                    continue
+                any_result = next(
+                    by_breakdown_value[breakdown_value]
+                    for by_breakdown_value in results_by_breakdown_value
+                    if breakdown_value in by_breakdown_value
+                )
                 row_results = []
-                for result in results:
-                    matching_result = [item for item in result if itemgetter(*keys)(item) == breakdown_value]
-                    if matching_result:
-                        row_results.append(matching_result[0])
+                for by_breakdown_value in results_by_breakdown_value:
+                    matching_result = by_breakdown_value.get(breakdown_value)
+                    if matching_result is not None:
+                        row_results.append(matching_result)
                     else:
                         row_results.append(
                             {
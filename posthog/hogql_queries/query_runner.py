@@ -11,6 +11,8 @@ from pydantic import BaseModel, ConfigDict
 from sentry_sdk import capture_exception, push_scope
 
 from posthog.cache_utils import OrjsonJsonSerializer
+from posthog.caching.local_cache import PubSubInvalidatedCache
+from posthog.caching.single_flight import run_single_flight
 from posthog.caching.utils import is_stale, last_refresh_from_cached_result, ThresholdMode, cache_target_age
 from posthog.clickhouse.client.execute_async import enqueue_process_query_task, get_query_status, QueryNotFoundError
 from posthog.clickhouse.query_tagging import tag_queries, get_query_tag_value
@@ -65,16 +67,32 @@ QUERY_CACHE_WRITE_COUNTER = Counter(
     labelnames=[LABEL_TEAM_ID],
 )
 
+# Hot results are served from memory, skipping the Redis round trip and deserialization
+QUERY_RESPONSE_LOCAL_CACHE: PubSubInvalidatedCache[BaseModel] = PubSubInvalidatedCache(
+    "query_response",
+    max_entries=settings.QUERY_LOCAL_CACHE_MAX_ENTRIES,
+    max_weight=settings.QUERY_LOCAL_CACHE_MAX_BYTES,
+    max_entry_weight=settings.QUERY_LOCAL_CACHE_MAX_BYTES // 10,
+)
+
 QUERY_CACHE_HIT_COUNTER = Counter(
     "posthog_query_cache_hit_total",
     "Whether we could fetch the query from the cache or not.",
     labelnames=[LABEL_TEAM_ID, "cache_hit", "trigger"],
 )
 
+QUERY_INCREMENTAL_CALCULATION_COUNTER = Counter(
+    "posthog_query_incremental_calculation_total",
+    "Recalculations that asked to reuse cached results, and whether they could.",
+    labelnames=[LABEL_TEAM_ID, "incremental"],
+)
+
 EXTENDED_CACHE_AGE = timedelta(days=1)
 
 
 class ExecutionMode(IntEnum):  # Keep integer values the same for Celery's sake
+    CALCULATE_INCREMENTALLY_BLOCKING_ALWAYS = 6
+    """Always recalculate, but only what may have changed since the cached results, if the query runner can."""
     CALCULATE_BLOCKING_ALWAYS = 5
     """Always recalculate."""
     CALCULATE_ASYNC_ALWAYS = 4
@@ -405,6 +423,13 @@ class QueryRunner(ABC, Generic[Q, R, CR]):
     def calculate(self) -> R:
         raise NotImplementedError()
 
+    def calculate_incrementally(self, cached_response: CR) -> Optional[R]:
+        """
+        Recalculates only what may have changed since `cached_response` was calculated, and merges it into it.
+        Returns None when that isn't possible, in which case everything is recalculated.
+        """
+        return None
+
     def enqueue_async_calculation(
         self, *, cache_key: str, refresh_requested: bool = False, user: Optional[User] = None
     ) -> QueryStatus:
@@ -426,31 +451,45 @@ class QueryRunner(ABC, Generic[Q, R, CR]):
         except QueryNotFoundError:
             return None
 
-    def handle_cache_and_async_logic(
-        self, execution_mode: ExecutionMode, cache_key: str, user: Optional[User] = None
-    ) -> Optional[CR | CacheMissResponse]:
+    def load_cached_response(self, cache_key: str) -> Optional[CR]:
         CachedResponse: type[CR] = self.cached_response_type
-        cached_response: CR | CacheMissResponse
+        if settings.QUERY_LOCAL_CACHE_TTL_SECONDS > 0:
+            local_cached_response = QUERY_RESPONSE_LOCAL_CACHE.get(cache_key)
+            if isinstance(local_cached_response, CachedResponse):
+                # Callers attach query status etc. to the response and post-process its results in place, so don't hand
+                # out the shared instance or anything in it
+                return local_cached_response.model_copy(deep=True)
+
         cached_response_candidate_bytes: Optional[bytes] = get_safe_cache(cache_key)
         cached_response_candidate: Optional[dict] = (
             OrjsonJsonSerializer({}).loads(cached_response_candidate_bytes) if cached_response_candidate_bytes else None
         )
         if self.is_cached_response(cached_response_candidate):
+            assert cached_response_candidate_bytes is not None
             cached_response_candidate["is_cached"] = True
             cached_response = CachedResponse(**cached_response_candidate)
-        elif cached_response_candidate is None:
-            cached_response = CacheMissResponse(cache_key=cache_key)
-        else:
+            self._set_local_cached_response(
+                cache_key, cached_response.model_copy(deep=True), len(cached_response_candidate_bytes), publish=False
+            )
+            return cached_response
+        elif cached_response_candidate is not None:
             # Whatever's in cache is malformed, so let's treat is as non-existent
-            cached_response = CacheMissResponse(cache_key=cache_key)
             with push_scope() as scope:
                 scope.set_tag("cache_key", cache_key)
                 capture_exception(
-                    ValueError(f"Cached response is of unexpected type {type(cached_response)}, ignoring it")
+                    ValueError(f"Cached response is of unexpected type {type(cached_response_candidate)}, ignoring it")
                 )
+        return None
 
-        if self.is_cached_response(cached_response_candidate):
-            assert isinstance(cached_response, CachedResponse)
+    def handle_cache_and_async_logic(
+        self, execution_mode: ExecutionMode, cache_key: str, user: Optional[User] = None
+    ) -> Optional[CR | CacheMissResponse]:
+        CachedResponse: type[CR] = self.cached_response_type
+        cached_response: CR | CacheMissResponse = self.load_cached_response(cache_key) or CacheMissResponse(
+            cache_key=cache_key
+        )
+
+        if isinstance(cached_response, CachedResponse):
             cached_response.cache_target_age = self.cache_target_age(cached_response)
 
             if not self._is_stale(cached_response):
@@ -511,24 +550,62 @@ class QueryRunner(ABC, Generic[Q, R, CR]):
         cache_key = self.get_cache_key()
         tag_queries(cache_key=cache_key)
         self.query_id = query_id or self.query_id
-        CachedResponse: type[CR] = self.cached_response_type
 
         if execution_mode == ExecutionMode.CALCULATE_ASYNC_ALWAYS:
             # We should always kick off async calculation and disregard the cache
             return QueryStatusResponse(
                 query_status=self.enqueue_async_calculation(refresh_requested=True, cache_key=cache_key, user=user)
             )
-        elif execution_mode != ExecutionMode.CALCULATE_BLOCKING_ALWAYS:
+        elif execution_mode not in (
+            ExecutionMode.CALCULATE_BLOCKING_ALWAYS,
+            ExecutionMode.CALCULATE_INCREMENTALLY_BLOCKING_ALWAYS,
+        ):
             # Let's look in the cache first
             results = self.handle_cache_and_async_logic(execution_mode=execution_mode, cache_key=cache_key, user=user)
             if results is not None:
                 return results
 
+            if self._is_cacheable() and settings.QUERY_SINGLE_FLIGHT_WAIT_TIMEOUT_SECONDS > 0:
+                # Popular insights miss the cache for many users at once. Let one of them calculate, and the others
+                # wait for the result to be cached.
+                return run_single_flight(
+                    cache_key,
+                    calculate=lambda: self._calculate_and_cache(cache_key),
+                    get_result=lambda: self._get_fresh_cached_response(cache_key),
+                    team_id=self.team.pk,
+                    lock_timeout=settings.QUERY_SINGLE_FLIGHT_LOCK_TIMEOUT_SECONDS,
+                    wait_timeout=settings.QUERY_SINGLE_FLIGHT_WAIT_TIMEOUT_SECONDS,
+                )
+
+        return self._calculate_and_cache(
+            cache_key, incremental=execution_mode == ExecutionMode.CALCULATE_INCREMENTALLY_BLOCKING_ALWAYS
+        )
+
+    def _calculate_and_cache(self, cache_key: str, incremental: bool = False) -> CR:
+        CachedResponse: type[CR] = self.cached_response_type
+        now = datetime.now(UTC)
+        response: Optional[R] = None
+        last_full_calculation, incremental_calculations = now, 0
+        if incremental:
+            cached_response = self.load_cached_response(cache_key)
+            if cached_response is not None and not self._is_due_full_calculation(cached_response, now):
+                response = self.calculate_incrementally(cached_response)
+                if response is not None:
+                    last_full_calculation = cast(datetime, cached_response.last_full_calculation)
+                    incremental_calculations = (cached_response.incremental_calculations or 0) + 1
+            QUERY_INCREMENTAL_CALCULATION_COUNTER.labels(
+                team_id=self.team.pk, incremental="true" if response is not None else "false"
+            ).inc()
+        if response is None:
+            response = self.calculate()
+
         fresh_response_dict = {
-            **self.calculate().model_dump(),
+            **response.model_dump(),
             "is_cached": False,
-            "last_refresh": datetime.now(UTC),
-            "next_allowed_client_refresh": datetime.now(UTC) + self._refresh_frequency(),
+            "last_refresh": now,
+            "last_full_calculation": last_full_calculation,
+            "incremental_calculations": incremental_calculations,
+            "next_allowed_client_refresh": now + self._refresh_frequency(),
             "cache_key": cache_key,
             "timezone": self.team.timezone,
         }
@@ -538,14 +615,54 @@ class QueryRunner(ABC, Generic[Q, R, CR]):
 
         # Don't cache debug queries with errors and export queries
         has_error: Optional[list] = fresh_response_dict.get("error", None)
-        cache_ttl = self.cache_ttl()
-        if (has_error is None or len(has_error) == 0) and self.limit_context != LimitContext.EXPORT and cache_ttl > 0:
+        if (has_error is None or len(has_error) == 0) and self._is_cacheable():
             fresh_response_serialized = OrjsonJsonSerializer({}).dumps(fresh_response.model_dump())
-            cache.set(cache_key, fresh_response_serialized, cache_ttl)
+            cache.set(cache_key, fresh_response_serialized, self.cache_ttl())
             QUERY_CACHE_WRITE_COUNTER.labels(team_id=self.team.pk).inc()
+            if settings.QUERY_LOCAL_CACHE_TTL_SECONDS > 0:
+                # Cache what was serialized rather than `fresh_response`, whose results may be one-off iterators
+                local_cached_response = CachedResponse(
+                    **{**OrjsonJsonSerializer({}).loads(fresh_response_serialized), "is_cached": True}
+                )
+                self._set_local_cached_response(
+                    cache_key, local_cached_response, len(fresh_response_serialized), publish=True
+                )
 
         return fresh_response
 
+    @staticmethod
+    def _is_due_full_calculation(cached_response: CR, now: datetime) -> bool:
+        """
+        Whether `cached_response` has been merged into for too long, or too many times, to calculate it incrementally
+        again. Merging misses whatever changed in earlier intervals, such as events ingested later than the margin.
+        """
+        last_full_calculation = cached_response.last_full_calculation
+        return (
+            last_full_calculation is None
+            or now - last_full_calculation >= timedelta(hours=settings.QUERY_INCREMENTAL_FULL_CALCULATION_HOURS)
+            or (cached_response.incremental_calculations or 0) >= settings.QUERY_INCREMENTAL_MAX_CALCULATIONS
+        )
+
+    def _set_local_cached_response(self, cache_key: str, cached_response: CR, size: int, publish: bool) -> None:
+        if settings.QUERY_LOCAL_CACHE_TTL_SECONDS <= 0:
+            return
+        # Keep the in-process copy only until the result is due a refresh, so staleness is still decided by Redis
+        ttl: float = settings.QUERY_LOCAL_CACHE_TTL_SECONDS
+        target_age = self.cache_target_age(cached_response)
+        if target_age is not None:
+            ttl = min(ttl, (target_age - datetime.now(UTC)).total_seconds())
+        QUERY_RESPONSE_LOCAL_CACHE.set(cache_key, cached_response, ttl, size, publish=publish)
+
+    def _get_fresh_cached_response(self, cache_key: str) -> Optional[CR]:
+        cached_response = self.load_cached_response(cache_key)
+        if cached_response is None or self._is_stale(cached_response):
+            return None
+        cached_response.cache_target_age = self.cache_target_age(cached_response)
+        return cached_response
+
+    def _is_cacheable(self) -> bool:
+        return self.limit_context != LimitContext.EXPORT and self.cache_ttl() > 0
+
     @abstractmethod
     def to_query(self) -> ast.SelectQuery | ast.SelectUnionQuery:
         raise NotImplementedError()
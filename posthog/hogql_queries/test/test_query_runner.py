@@ -1,11 +1,14 @@
+import threading
 from datetime import datetime, timedelta
 from typing import Any, Literal, Optional
 from unittest import mock
 from zoneinfo import ZoneInfo
 
+from django.test import override_settings
 from freezegun import freeze_time
 from pydantic import BaseModel
 
+from posthog.caching.single_flight import run_single_flight
 from posthog.hogql_queries.query_runner import ExecutionMode, QueryRunner
 from posthog.models.team.team import Team
 from posthog.schema import (
@@ -202,6 +205,62 @@ class TestQueryRunner(BaseTest):
             self.assertEqual(response.is_cached, True)
             mock_on_commit.assert_called_once()
 
+    def test_concurrent_cache_miss_waits_for_calculation_in_flight(self):
+        TestQueryRunner = self.setup_test_query_runner_class()
+        leader = TestQueryRunner(query={"some_attr": "bla"}, team=self.team)
+        follower = TestQueryRunner(query={"some_attr": "bla"}, team=self.team)
+        cache_key = leader.get_cache_key()
+
+        leader_started = threading.Event()
+
+        def calculate():
+            leader_started.set()
+            # Give the follower time to find the lock taken
+            threading.Event().wait(0.5)
+            return leader._calculate_and_cache(cache_key)
+
+        leader_thread = threading.Thread(
+            target=run_single_flight,
+            args=(cache_key, calculate, lambda: None),
+            kwargs={"team_id": self.team.pk, "lock_timeout": 10, "wait_timeout": 10},
+        )
+        leader_thread.start()
+        leader_started.wait()
+
+        with mock.patch.object(follower, "calculate", side_effect=AssertionError("should not calculate")):
+            response = follower.run(execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+        leader_thread.join()
+
+        self.assertIsInstance(response, TestCachedBasicQueryResponse)
+        self.assertEqual(response.is_cached, True)
+
+    @override_settings(QUERY_LOCAL_CACHE_TTL_SECONDS=60)
+    def test_cached_response_is_served_from_memory(self):
+        TestQueryRunner = self.setup_test_query_runner_class()
+        runner = TestQueryRunner(query={"some_attr": "bla"}, team=self.team)
+        runner.run(execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+
+        with mock.patch("posthog.hogql_queries.query_runner.get_safe_cache") as get_safe_cache:
+            response = runner.run(execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+
+        get_safe_cache.assert_not_called()
+        self.assertIsInstance(response, TestCachedBasicQueryResponse)
+        self.assertEqual(response.is_cached, True)
+        self.assertEqual(response.results, [["row", 1, 2, 3], list(range(10))])
+
+    @override_settings(QUERY_LOCAL_CACHE_TTL_SECONDS=60)
+    def test_cached_response_served_from_memory_is_not_shared(self):
+        TestQueryRunner = self.setup_test_query_runner_class()
+        runner = TestQueryRunner(query={"some_attr": "bla"}, team=self.team)
+        runner.run(execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+
+        response = runner.run(execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+        response.results[0].append("changed by the caller")
+        response.results.append("added by the caller")
+
+        response = runner.run(execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+        self.assertEqual(response.results, [["row", 1, 2, 3], list(range(10))])
+
     def test_modifier_passthrough(self):
         try:
             from ee.clickhouse.materialized_columns.analyze import materialize
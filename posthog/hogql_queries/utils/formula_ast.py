@@ -1,77 +1,112 @@
 import ast
 import operator
+from collections.abc import Callable
+from functools import lru_cache
 from typing import Any
 
+import numpy as np
+
+# A compiled formula, evaluating to an array (or a constant) from the series it's given
+CompiledFormula = Callable[[list[np.ndarray]], Any]
+
+
+def _safe_division(op: Callable[[Any, Any], Any]) -> Callable[[Any, Any], Any]:
+    """
+    Makes a division operator evaluate to 0 where the divisor is 0, as dividing by zero did per data point
+    """
+
+    def divide(left, right):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(np.equal(right, 0), 0, op(left, right))
+
+    return divide
+
+
+def _safe_power(left, right):
+    # in floats, as integers don't overflow in Python, and numpy can't raise them to negative powers
+    left = np.asarray(left, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        return np.where(np.equal(left, 0) & np.less(right, 0), 0, np.power(left, right))
+
 
 class FormulaAST:
     op_map = {
         ast.Add: operator.add,
         ast.Sub: operator.sub,
         ast.Mult: operator.mul,
-        ast.Div: operator.truediv,
-        ast.Mod: operator.mod,
-        ast.Pow: operator.pow,
+        ast.Div: _safe_division(operator.truediv),
+        ast.Mod: _safe_division(operator.mod),
+        ast.Pow: _safe_power,
     }
-    zipped_data: list[tuple[float]]
+    series: list[np.ndarray]
+    length: int
 
     def __init__(self, data: list[list[float]]):
-        self.zipped_data = list(zip(*data))
-
-    def call(self, node: str):
-        res = []
-        for consts in self.zipped_data:
-            map = {}
-            for index, value in enumerate(consts):
-                map[chr(ord("`") + index + 1)] = value
-            result = self._evaluate(node.lower(), map)
-            res.append(result)
-        return res
-
-    def _evaluate(self, node, const_map: dict[str, Any]):
-        if isinstance(node, list | tuple):
-            return [self._evaluate(sub_node, const_map) for sub_node in node]
-
-        elif isinstance(node, str):
-            return self._evaluate(ast.parse(node), const_map)
-
-        elif isinstance(node, ast.Module):
-            values = []
-            for body in node.body:
-                values.append(self._evaluate(body, const_map))
-            if len(values) == 1:
-                values = values[0]
-            return values
-
-        elif isinstance(node, ast.Expr):
-            return self._evaluate(node.value, const_map)
+        # series are cut to the shortest one, as zipping the data points together did
+        length = min((len(series) for series in data), default=0)
+        self.series = [self._to_array(series[:length]) for series in data]
+        self.length = length
+
+    @staticmethod
+    def _to_array(series: list[float]) -> np.ndarray:
+        array = np.asarray(series)
+        if array.dtype.kind not in "iuf":
+            # e.g. Decimals, which numpy keeps as Python objects
+            array = array.astype(np.float64)
+        return array
+
+    def call(self, node: str) -> list:
+        """
+        Evaluates the formula over all data points at once, series A being the first series, B the second, and so on
+        """
+        if self.length == 0:
+            return []
+        result = self.compile(node.lower())(self.series)
+        return np.broadcast_to(result, (self.length,)).tolist()
+
+    @classmethod
+    @lru_cache(maxsize=256)
+    def compile(cls, formula: str) -> CompiledFormula:
+        """
+        Compiles the formula once, into a function of the series that it refers to
+        """
+        return cls._compile(ast.parse(formula, mode="eval"))
+
+    @classmethod
+    def _compile(cls, node: ast.AST) -> CompiledFormula:
+        if isinstance(node, ast.Expression):
+            return cls._compile(node.body)
 
         elif isinstance(node, ast.BinOp):
-            left = self._evaluate(node.left, const_map)
-            op = node.op
-            right = self._evaluate(node.right, const_map)
+            left = cls._compile(node.left)
+            right = cls._compile(node.right)
             try:
-                return self.op_map[type(op)](left, right)
-            except ZeroDivisionError:
-                return 0
+                op = cls.op_map[type(node.op)]
             except KeyError:
-                raise ValueError(f"Operator {op.__class__.__name__} not supported")
+                raise ValueError(f"Operator {node.op.__class__.__name__} not supported")
+            return lambda series: op(left(series), right(series))
 
         elif isinstance(node, ast.UnaryOp):
-            operand = self._evaluate(node.operand, const_map)
-            unary_op = node.op
-            if isinstance(unary_op, ast.USub):
-                return -operand
-            elif isinstance(unary_op, ast.UAdd):
+            operand = cls._compile(node.operand)
+            if isinstance(node.op, ast.USub):
+                return lambda series: -operand(series)
+            elif isinstance(node.op, ast.UAdd):
                 return operand
-            raise ValueError(f"Operator {unary_op.__class__.__name__} not supported")
+            raise ValueError(f"Operator {node.op.__class__.__name__} not supported")
 
-        elif isinstance(node, ast.Num):
-            return node.n
+        elif isinstance(node, ast.Constant) and isinstance(node.value, int | float):
+            value = node.value
+            return lambda series: value
 
         elif isinstance(node, ast.Name):
-            try:
-                return const_map[node.id]
-            except KeyError:
-                raise ValueError(f"Constant {node.id} not supported")
+            index = ord(node.id[0]) - ord("a") if len(node.id) == 1 else -1
+            name = node.id
+
+            def get_series(series: list[np.ndarray]) -> np.ndarray:
+                if not 0 <= index < len(series):
+                    raise ValueError(f"Constant {name} not supported")
+                return series[index]
+
+            return get_series
 
         raise TypeError(f"Unsupported operation: {node.__class__.__name__}")
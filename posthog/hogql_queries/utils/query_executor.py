@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Any, Optional, TypeVar
+
+from django.conf import settings
+from django.db import close_old_connections
+from prometheus_client import Counter, Gauge, Histogram
+
+from posthog.clickhouse.query_tagging import get_query_tags, reset_query_tags, tag_queries
+from posthog.metrics import LABEL_TEAM_ID
+
+T = TypeVar("T")
+
+QUERY_EXECUTOR_QUEUED_GAUGE = Gauge(
+    "posthog_query_executor_queued",
+    "Queries waiting for one of their team's slots in the shared query executor.",
+)
+QUERY_EXECUTOR_RUNNING_GAUGE = Gauge(
+    "posthog_query_executor_running",
+    "Queries running in the shared query executor.",
+)
+QUERY_EXECUTOR_WAIT_TIME = Histogram(
+    "posthog_query_executor_wait_seconds",
+    "Time queries waited in the shared query executor before they started running.",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2, 5, 10, 30, 60, float("inf")),
+)
+QUERY_EXECUTOR_CANCELLED_COUNTER = Counter(
+    "posthog_query_executor_cancelled_total",
+    "Queries that never ran, because another query they were submitted with failed.",
+    labelnames=[LABEL_TEAM_ID],
+)
+
+
+class _Job:
+    __slots__ = ("call", "future", "queued_at")
+
+    def __init__(self, call: Callable[[], Any]) -> None:
+        self.call = call
+        self.future: Future = Future()
+        self.queued_at = time.monotonic()
+
+
+class QueryExecutor:
+    """
+    A pool of threads running the queries of insights for the whole process.
+
+    At most max_workers queries run at once, and at most max_workers_per_team of them for any one team. A team's other
+    queries wait in a queue of its own rather than in the pool's, so a team running many heavy insights slows down its
+    own insights, not everyone else's.
+    """
+
+    def __init__(self, max_workers: int, max_workers_per_team: int) -> None:
+        self.max_workers_per_team = max_workers_per_team
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="query_executor")
+        self._lock = threading.Lock()
+        # number of each team's jobs that are in the pool, queued there or running
+        self._in_pool: dict[int, int] = {}
+        self._queued: dict[int, deque[_Job]] = {}
+        self._local = threading.local()
+
+    def submit(self, team_id: int, call: Callable[[], T]) -> "Future[T]":
+        job = _Job(call)
+        with self._lock:
+            if self._in_pool.get(team_id, 0) < self.max_workers_per_team:
+                self._in_pool[team_id] = self._in_pool.get(team_id, 0) + 1
+            else:
+                self._queued.setdefault(team_id, deque()).append(job)
+                QUERY_EXECUTOR_QUEUED_GAUGE.inc()
+                return job.future
+        self._pool.submit(self._run, team_id, job)
+        return job.future
+
+    def _run(self, team_id: int, job: _Job) -> None:
+        if job.future.set_running_or_notify_cancel():
+            QUERY_EXECUTOR_WAIT_TIME.observe(time.monotonic() - job.queued_at)
+            QUERY_EXECUTOR_RUNNING_GAUGE.inc()
+            self._local.in_worker = True
+            try:
+                job.future.set_result(job.call())
+            except BaseException as e:
+                job.future.set_exception(e)
+            finally:
+                self._local.in_worker = False
+                QUERY_EXECUTOR_RUNNING_GAUGE.dec()
+
+        # Hand the team's slot to its next query, at the back of the pool's queue, so that teams take turns
+        next_job: Optional[_Job] = None
+        with self._lock:
+            queued = self._queued.get(team_id)
+            if queued:
+                next_job = queued.popleft()
+                QUERY_EXECUTOR_QUEUED_GAUGE.dec()
+                if not queued:
+                    del self._queued[team_id]
+            elif self._in_pool[team_id] == 1:
+                del self._in_pool[team_id]
+            else:
+                self._in_pool[team_id] -= 1
+        if next_job is not None:
+            self._pool.submit(self._run, team_id, next_job)
+
+    def _cancel(self, team_id: int, futures: list[Future]) -> None:
+        # Both the failed query's thread and the caller cancel, and cancel() is also true for futures that already were
+        with self._lock:
+            cancelled = sum(not future.cancelled() and future.cancel() for future in list(futures))
+        QUERY_EXECUTOR_CANCELLED_COUNTER.labels(team_id=team_id).inc(cancelled)
+
+    def map(self, team_id: int, calls: Sequence[Callable[[], T]]) -> list[T]:
+        """
+        Runs the calls concurrently, with the query tags of the calling thread, and returns their results in order.
+        If one of them raises, the ones that haven't started yet are cancelled, and the first error is raised once the
+        running ones have finished.
+        """
+        if getattr(self._local, "in_worker", False):
+            # Waiting on the pool from one of its own threads could leave it waiting on itself
+            return [call() for call in calls]
+
+        query_tags = get_query_tags()
+        futures: list[Future[T]] = []
+
+        def run(call: Callable[[], T]) -> T:
+            tag_queries(**query_tags)
+            try:
+                return call()
+            except BaseException:
+                # Cancel the queries that haven't started, before this one's slot is handed to the next of them
+                self._cancel(team_id, futures)
+                raise
+            finally:
+                reset_query_tags()
+                close_old_connections()
+
+        for call in calls:
+            futures.append(self.submit(team_id, partial(run, call)))
+
+        done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+        if any(future.cancelled() or future.exception() is not None for future in done):
+            self._cancel(team_id, futures)
+            wait(futures)
+            for future in futures:
+                error = None if future.cancelled() else future.exception()
+                if error is not None:
+                    raise error
+
+        return [future.result() for future in futures]
+
+
+_query_executor: Optional[QueryExecutor] = None
+_query_executor_lock = threading.Lock()
+
+
+def get_query_executor() -> QueryExecutor:
+    global _query_executor
+    with _query_executor_lock:
+        if _query_executor is None:
+            _query_executor = QueryExecutor(
+                max_workers=settings.QUERY_EXECUTOR_MAX_WORKERS,
+                max_workers_per_team=settings.QUERY_EXECUTOR_MAX_WORKERS_PER_TEAM,
+            )
+        return _query_executor
+
+
+def execute_queries_in_parallel(team_id: int, calls: Sequence[Callable[[], T]]) -> list[T]:
+    """
+    Runs the team's queries (e.g. one per series of an insight) on the shared query executor, returning their results
+    """
+    # Not in tests, as other threads can't see what a test wrote to the database in its transaction
+    if len(calls) <= 1 or settings.TEST or settings.IN_UNIT_TESTING:
+        return [call() for call in calls]
+    return get_query_executor().map(team_id, calls)
@@ -66,3 +66,30 @@ class TestFormulaAST(APIBaseTest):
         formula = self._get_formula_ast()
         response = formula.call("+A")
         self.assertListEqual([1, 2, 3, 4], response)
+
+    def test_division_zero_in_expression(self):
+        formula = FormulaAST(data=[[1, 2, 3, 4], [1, 0, 3, 0]])
+        response = formula.call("A/(B-1)+1")
+        self.assertListEqual([1, -1, 2.5, -3], response)
+
+    def test_power_zero_to_negative(self):
+        formula = FormulaAST(data=[[0, 2], [-1, -1]])
+        response = formula.call("A**B")
+        self.assertListEqual([0, 0.5], response)
+
+    def test_series_of_different_lengths(self):
+        formula = FormulaAST(data=[[1, 2, 3, 4], [1, 2]])
+        response = formula.call("A+B")
+        self.assertListEqual([2, 4], response)
+
+    def test_no_data(self):
+        formula = FormulaAST(data=[])
+        response = formula.call("A+1")
+        self.assertListEqual([], response)
+
+    def test_unsupported(self):
+        formula = self._get_formula_ast()
+        with self.assertRaisesMessage(ValueError, "Operator FloorDiv not supported"):
+            formula.call("A//2")
+        with self.assertRaisesMessage(ValueError, "Constant c not supported"):
+            formula.call("A+C")
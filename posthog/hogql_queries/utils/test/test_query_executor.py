@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+
+from posthog.clickhouse.query_tagging import get_query_tags, reset_query_tags, tag_queries
+from posthog.hogql_queries.utils.query_executor import QueryExecutor
+
+
+class ConcurrencyTracker:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.running: dict[int, int] = {}
+        self.max_running: dict[int, int] = {}
+        self.max_running_in_total = 0
+
+    def call(self, team_id: int, result: int, duration: float = 0.05):
+        def run() -> int:
+            with self.lock:
+                self.running[team_id] = self.running.get(team_id, 0) + 1
+                self.max_running[team_id] = max(self.max_running.get(team_id, 0), self.running[team_id])
+                self.max_running_in_total = max(self.max_running_in_total, sum(self.running.values()))
+            time.sleep(duration)
+            with self.lock:
+                self.running[team_id] -= 1
+            return result
+
+        return run
+
+
+def test_runs_queries_within_the_global_and_per_team_limits() -> None:
+    executor = QueryExecutor(max_workers=4, max_workers_per_team=2)
+    tracker = ConcurrencyTracker()
+    results: dict[int, list[int]] = {}
+
+    def run_team_queries(team_id: int) -> None:
+        results[team_id] = executor.map(team_id, [tracker.call(team_id, i) for i in range(6)])
+
+    threads = [threading.Thread(target=run_team_queries, args=(team_id,)) for team_id in (1, 2, 3)]
+    [thread.start() for thread in threads]  # type: ignore
+    [thread.join() for thread in threads]  # type: ignore
+
+    assert results == {team_id: list(range(6)) for team_id in (1, 2, 3)}
+    assert tracker.max_running == {1: 2, 2: 2, 3: 2}
+    assert tracker.max_running_in_total == 4
+
+
+def test_cancels_queued_queries_after_an_error() -> None:
+    executor = QueryExecutor(max_workers=4, max_workers_per_team=1)
+    ran: list[int] = []
+
+    def fail() -> int:
+        time.sleep(0.05)
+        raise ValueError("query failed")
+
+    def succeed(i: int):
+        def run() -> int:
+            ran.append(i)
+            return i
+
+        return run
+
+    def cancelled_count() -> float:
+        return REGISTRY.get_sample_value("posthog_query_executor_cancelled_total", {"team_id": "1"}) or 0
+
+    cancelled_before = cancelled_count()
+    with pytest.raises(ValueError, match="query failed"):
+        executor.map(1, [fail, succeed(1), succeed(2)])
+
+    assert ran == []
+    assert cancelled_count() - cancelled_before == 2
+    assert executor.map(1, [succeed(3), succeed(4)]) == [3, 4]
+
+
+def test_runs_queries_with_the_callers_query_tags() -> None:
+    executor = QueryExecutor(max_workers=2, max_workers_per_team=2)
+    tag_queries(kind="TrendsQuery")
+    try:
+        tags = executor.map(1, [lambda: dict(get_query_tags()), lambda: dict(get_query_tags())])
+    finally:
+        reset_query_tags()
+
+    assert tags == [{"kind": "TrendsQuery"}, {"kind": "TrendsQuery"}]
+
+
+def test_runs_queries_submitted_from_its_own_threads_in_place() -> None:
+    executor = QueryExecutor(max_workers=1, max_workers_per_team=1)
+
+    assert executor.map(1, [lambda: executor.map(1, [lambda: 1, lambda: 2])]) == [[1, 2]]
@@ -1,11 +1,18 @@
+import asyncio
 import json
+import time
+from collections import Counter
+from dataclasses import dataclass
 from enum import StrEnum
 from typing import Any, Optional
-from collections.abc import Callable
+from collections.abc import Callable, Sequence
 
+import orjson
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from kafka import KafkaConsumer as KC
 from kafka import KafkaProducer as KP
+from kafka.errors import KafkaError, KafkaTimeoutError
 from kafka.producer.future import (
     FutureProduceResult,
     FutureRecordMetadata,
@@ -83,6 +90,27 @@ class KafkaConsumerForTests:
         return
 
 
+@dataclass(frozen=True)
+class KafkaMessage:
+    topic: str
+    data: Any
+    key: Any = None
+    headers: Optional[list[tuple[str, str]]] = None
+    value_serializer: Optional[Callable[[Any], Any]] = None
+
+
+class KafkaProduceBatchError(KafkaError):
+    """Raised by `produce_batch` once all messages are settled, with every failure rather than just the first."""
+
+    def __init__(self, errors: list[tuple[int, Exception]], total: int):
+        self.errors = errors
+        self.total = total
+        counts = Counter(error.__class__.__name__ for _, error in errors)
+        super().__init__(
+            f"{len(errors)} of {total} messages failed: " + ", ".join(f"{n} {name}" for name, n in counts.items())
+        )
+
+
 class _KafkaSecurityProtocol(StrEnum):
     PLAINTEXT = "PLAINTEXT"
     SSL = "SSL"
@@ -141,8 +169,11 @@ class _KafkaProducer:
 
     @staticmethod
     def json_serializer(d):
-        b = json.dumps(d).encode("utf-8")
-        return b
+        try:
+            return orjson.dumps(d, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            # e.g. integers wider than 64 bits, which json handles
+            return json.dumps(d).encode("utf-8")
 
     def on_send_success(self, record_metadata: RecordMetadata):
         statsd.incr("posthog_cloud_kafka_send_success", tags={"topic": record_metadata.topic})
@@ -174,6 +205,81 @@ class _KafkaProducer:
         future.add_callback(self.on_send_success).add_errback(lambda exc: self.on_send_failure(topic=topic, exc=exc))
         return future
 
+    def _produce_message(self, message: KafkaMessage) -> FutureRecordMetadata:
+        return self.produce(
+            topic=message.topic,
+            data=message.data,
+            key=message.key,
+            headers=message.headers,
+            value_serializer=message.value_serializer,
+        )
+
+    def produce_batch(self, messages: Sequence[KafkaMessage], timeout: float) -> list[Optional[RecordMetadata]]:
+        """
+        Produces all `messages`, then waits for all their acks within a single `timeout`.
+
+        Errors raised while producing (e.g. the buffer being full) are raised immediately, as with `produce`.
+        Delivery errors are collected and raised together as a `KafkaProduceBatchError` once every message has
+        settled, so callers can act on each failed message. We don't `flush` here, as that would also wait for
+        messages other requests sent through this (shared) producer.
+        """
+        futures = [self._produce_message(message) for message in messages]
+
+        deadline = time.monotonic() + timeout
+        results: list[Optional[RecordMetadata]] = []
+        errors: list[tuple[int, Exception]] = []
+        for index, future in enumerate(futures):
+            try:
+                results.append(future.get(timeout=max(deadline - time.monotonic(), 0)))
+            except KafkaError as exc:
+                results.append(None)
+                errors.append((index, exc))
+
+        statsd.incr("posthog_cloud_kafka_produce_batch", tags={"failed": bool(errors)})
+        if errors:
+            raise KafkaProduceBatchError(errors, total=len(futures))
+        return results
+
+    async def produce_batch_async(
+        self, messages: Sequence[KafkaMessage], timeout: float
+    ) -> list[Optional[RecordMetadata]]:
+        """
+        Like `produce_batch`, but awaits the acks rather than blocking the thread until they arrive,
+        so that the event loop can serve other requests meanwhile. Serializing and sending the messages
+        (which blocks while the producer's buffer is full) happens in a thread.
+        """
+        loop = asyncio.get_running_loop()
+        futures = await sync_to_async(
+            lambda: [_as_asyncio_future(self._produce_message(message), loop) for message in messages],
+            thread_sensitive=False,
+        )()
+        if futures:
+            await asyncio.wait(futures, timeout=timeout)
+
+        results: list[Optional[RecordMetadata]] = []
+        errors: list[tuple[int, Exception]] = []
+        for index, future in enumerate(futures):
+            if not future.done():
+                future.cancel()
+                # as raised by `future.get(timeout=...)` in `produce_batch`
+                errors.append((index, KafkaTimeoutError(f"Timeout after waiting for {timeout} secs.")))
+                results.append(None)
+                continue
+
+            exc = future.exception()
+            if isinstance(exc, KafkaError):
+                results.append(None)
+                errors.append((index, exc))
+            elif exc is not None:
+                raise exc
+            else:
+                results.append(future.result())
+
+        statsd.incr("posthog_cloud_kafka_produce_batch", tags={"failed": bool(errors)})
+        if errors:
+            raise KafkaProduceBatchError(errors, total=len(futures))
+        return results
+
     def flush(self, timeout=None):
         self.producer.flush(timeout)
 
@@ -181,6 +287,25 @@ class _KafkaProducer:
         self.producer.flush()
 
 
+def _as_asyncio_future(future: FutureRecordMetadata, loop: asyncio.AbstractEventLoop) -> asyncio.Future:
+    """
+    Wraps a future settled by the producer's I/O thread in an asyncio future settled on the event loop
+    """
+    awaitable = loop.create_future()
+
+    def set_result(metadata: RecordMetadata) -> None:
+        if not awaitable.done():
+            awaitable.set_result(metadata)
+
+    def set_exception(exc: Exception) -> None:
+        if not awaitable.done():
+            awaitable.set_exception(exc)
+
+    future.add_callback(lambda metadata: loop.call_soon_threadsafe(set_result, metadata))
+    future.add_errback(lambda exc: loop.call_soon_threadsafe(set_exception, exc))
+    return awaitable
+
+
 def can_connect():
     """
     This is intended to validate if we are able to connect to kafka, without
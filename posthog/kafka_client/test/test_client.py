@@ -1,9 +1,14 @@
-from unittest.mock import patch
+import asyncio
+from datetime import UTC, datetime
+from unittest.mock import MagicMock, patch
 
 import kafka
 from django.test import TestCase, override_settings
+from kafka.errors import KafkaTimeoutError, MessageSizeTooLargeError
+from kafka.producer.future import FutureProduceResult, FutureRecordMetadata
+from kafka.structs import TopicPartition
 
-from posthog.kafka_client.client import _KafkaProducer, build_kafka_consumer
+from posthog.kafka_client.client import KafkaMessage, KafkaProduceBatchError, _KafkaProducer, build_kafka_consumer
 
 
 class KafkaClientTestCase(TestCase):
@@ -20,6 +25,82 @@ class KafkaClientTestCase(TestCase):
         msg = next(consumer)
         self.assertEqual(msg, "message 1 from test_topic topic")
 
+    def test_kafka_produce_batch(self):
+        producer = _KafkaProducer(test=True)
+
+        results = producer.produce_batch([KafkaMessage(topic=self.topic, data=self.payload)] * 3, timeout=1)
+
+        self.assertEqual(len(results), 3)
+
+    def test_kafka_produce_batch_reports_all_failures(self):
+        producer = _KafkaProducer(test=True)
+        futures = [MagicMock(), MagicMock(), MagicMock()]
+        futures[0].get.side_effect = MessageSizeTooLargeError()
+        futures[2].get.side_effect = KafkaTimeoutError()
+
+        with patch.object(producer, "produce", side_effect=futures):
+            with self.assertRaises(KafkaProduceBatchError) as error:
+                producer.produce_batch([KafkaMessage(topic=self.topic, data=self.payload)] * 3, timeout=1)
+
+        self.assertEqual([index for index, _ in error.exception.errors], [0, 2])
+        self.assertIsInstance(error.exception.errors[0][1], MessageSizeTooLargeError)
+        self.assertEqual(error.exception.total, 3)
+        # Every message is waited on, even after a failure
+        for future in futures:
+            future.get.assert_called_once()
+
+    def test_kafka_produce_batch_async(self):
+        producer = _KafkaProducer(test=True)
+
+        results = asyncio.run(
+            producer.produce_batch_async([KafkaMessage(topic=self.topic, data=self.payload)] * 3, timeout=1)
+        )
+
+        self.assertEqual(len(results), 3)
+
+    def test_kafka_produce_batch_async_reports_all_failures(self):
+        producer = _KafkaProducer(test=True)
+        futures = [
+            FutureRecordMetadata(FutureProduceResult(TopicPartition(self.topic, 1)), 0, 0, 0, 0, 0, 0) for _ in range(3)
+        ]
+        futures[0].failure(MessageSizeTooLargeError())
+        futures[1].success(None)
+        # futures[2] is never acked, so times out
+
+        with patch.object(producer, "produce", side_effect=futures):
+            with self.assertRaises(KafkaProduceBatchError) as error:
+                asyncio.run(
+                    producer.produce_batch_async([KafkaMessage(topic=self.topic, data=self.payload)] * 3, timeout=0.1)
+                )
+
+        self.assertEqual([index for index, _ in error.exception.errors], [0, 2])
+        self.assertIsInstance(error.exception.errors[0][1], MessageSizeTooLargeError)
+        self.assertIsInstance(error.exception.errors[1][1], KafkaTimeoutError)
+        self.assertEqual(error.exception.total, 3)
+
+    def test_json_serializer_falls_back_for_large_integers(self):
+        self.assertEqual(_KafkaProducer.json_serializer({"a": 1, 2: "b"}), b'{"a":1,"2":"b"}')
+        self.assertEqual(_KafkaProducer.json_serializer({"a": 2**70}), b'{"a": 1180591620717411303424}')
+
+    def test_json_serializer_wire_format(self):
+        # Consumers decode messages as UTF-8 before parsing them, so unescaped non-ASCII parses to the same strings.
+        # Non-finite floats become null, where json wrote NaN and Infinity, which JSON.parse in the plugin server
+        # rejects. Datetimes are written in ISO format, where json raised.
+        self.assertEqual(
+            _KafkaProducer.json_serializer(
+                {
+                    "event": "café 🦔",
+                    "properties": {"a": float("nan"), "b": float("inf")},
+                    "timestamp": datetime(2024, 1, 1, tzinfo=UTC),
+                }
+            ),
+            '{"event":"café 🦔","properties":{"a":null,"b":null},"timestamp":"2024-01-01T00:00:00+00:00"}'.encode(),
+        )
+        self.assertEqual(
+            _KafkaProducer.json_serializer({"data": _KafkaProducer.json_serializer({"event": "é"}).decode()}),
+            '{"data":"{\\"event\\":\\"é\\"}"}'.encode(),
+        )
+
     def test_kafka_produce(self):
         producer = _KafkaProducer(test=False)
         producer.produce(topic=self.topic, data=self.payload)
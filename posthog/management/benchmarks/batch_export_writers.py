@@ -0,0 +1,89 @@
+"""
+Measures how many rows per second batch export writers serialize, comparing serializing record batches
+row by row (converting them to Python objects first) with serializing them column by column.
+"""
+
+import csv
+import datetime as dt
+import io
+import json
+import time
+from typing import Any
+
+import orjson
+import pyarrow as pa
+import structlog
+
+from posthog.temporal.batch_exports.temporary_file import record_batch_to_csv, record_batch_to_jsonl
+
+logger = structlog.get_logger(__name__)
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--rows", type=int, default=100_000, help="Number of rows per record batch")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of times to serialize the record batch")
+
+
+def run(options: dict[str, Any]) -> None:
+    n_rows: int = options["rows"]
+    repeat: int = options["repeat"]
+
+    start = dt.datetime(2024, 1, 1, tzinfo=dt.UTC)
+    record_batch = pa.RecordBatch.from_pydict(
+        {
+            "uuid": pa.array([f"018cc2fa-{i % 65536:04x}-7000-8000-{i:012x}" for i in range(n_rows)]),
+            "event": pa.array(["$pageview" if i % 3 else "$autocapture" for i in range(n_rows)]),
+            "properties": pa.array(
+                [
+                    json.dumps({"$current_url": f"https://example.com/{i % 100}", "$browser": "Chrome", "i": i})
+                    for i in range(n_rows)
+                ]
+            ),
+            "distinct_id": pa.array([f"user-{i % 1000}" for i in range(n_rows)]),
+            "team_id": pa.array([1] * n_rows),
+            "timestamp": pa.array(
+                [start + dt.timedelta(microseconds=i * 1234) for i in range(n_rows)],
+                type=pa.timestamp("us", tz="UTC"),
+            ),
+        }
+    )
+    field_names = record_batch.schema.names
+
+    def jsonl_row_by_row():
+        return b"".join(orjson.dumps(record, default=str) + b"\n" for record in record_batch.to_pylist())
+
+    def csv_row_by_row():
+        output = io.StringIO()
+        writer = csv.DictWriter(
+            output, fieldnames=field_names, escapechar="\\", quoting=csv.QUOTE_NONE, lineterminator="\n"
+        )
+        writer.writerows(record_batch.to_pylist())
+        return output.getvalue().encode("utf-8")
+
+    def csv_vectorized():
+        return record_batch_to_csv(
+            record_batch, field_names, delimiter=",", escape_char="\\", quote_char='"', line_terminator="\n"
+        )
+
+    def rows_per_second(serialize) -> float:
+        begin = time.perf_counter()
+        for _ in range(repeat):
+            serialize()
+        return n_rows * repeat / (time.perf_counter() - begin)
+
+    for name, row_by_row, vectorized in (
+        ("jsonl", jsonl_row_by_row, lambda: record_batch_to_jsonl(record_batch)),
+        ("csv", csv_row_by_row, csv_vectorized),
+    ):
+        if row_by_row() != vectorized():
+            logger.error("batch_export_writer_benchmark_output_mismatch", format=name)
+
+        before, after = rows_per_second(row_by_row), rows_per_second(vectorized)
+        logger.info(
+            "batch_export_writer_benchmark",
+            format=name,
+            rows=n_rows,
+            row_by_row_rows_per_second=round(before),
+            vectorized_rows_per_second=round(after),
+            speedup=round(after / before, 2),
+        )
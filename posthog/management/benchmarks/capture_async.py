@@ -0,0 +1,170 @@
+"""
+Measures how many capture requests per second a single worker serves, comparing the sync view on a pool of
+threads (as gunicorn's gthread workers run it) with the async view behind `CaptureASGIHandler`, with many requests
+in flight on one event loop (as it runs under ASGI with CAPTURE_ASYNC_VIEW_ENABLED). Uses the configured Kafka, so
+run it against a local stack, and use --ack-latency-ms to see how each holds up when acks are slow.
+"""
+
+import asyncio
+import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Any
+from unittest.mock import patch
+
+import structlog
+from django.test.client import RequestFactory
+from kafka.producer.future import FutureProduceResult, FutureRecordMetadata
+from kafka.structs import TopicPartition
+
+from posthog.api.capture import CaptureASGIHandler, get_event
+from posthog.kafka_client.client import _KafkaProducer
+
+logger = structlog.get_logger(__name__)
+
+
+def _delay_acks(produce, ack_latency_seconds: float):
+    """
+    Wraps `_KafkaProducer.produce` so acks settle ack_latency_seconds after Kafka's, as they do when it is loaded
+    """
+    # As the latency is the same for all acks, a single thread can settle them in the order they are due
+    due_acks: queue.SimpleQueue = queue.SimpleQueue()
+
+    def settle_due_acks():
+        while True:
+            due, settle = due_acks.get()
+            time.sleep(max(due - time.monotonic(), 0))
+            settle()
+
+    threading.Thread(target=settle_due_acks, daemon=True).start()
+
+    def delayed_produce(self, *args, **kwargs):
+        future = produce(self, *args, **kwargs)
+        produce_future = FutureProduceResult(TopicPartition("", 0))
+        delayed = FutureRecordMetadata(produce_future, 0, 0, 0, 0, 0, 0)
+
+        def settle():
+            # settles the record's future too, which callbacks wait on, as `get` does on the produce future
+            if future.succeeded():
+                produce_future.success((-1, -1, -1))
+            else:
+                produce_future.failure(future.exception)
+
+        future.add_both(lambda _: due_acks.put((time.monotonic() + ack_latency_seconds, settle)))
+        return delayed
+
+    return delayed_produce
+
+
+async def _serve_asgi(handler: CaptureASGIHandler, body: bytes) -> int:
+    """
+    Serves a /batch/ request through the ASGI handler, returning the status code it responded with
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/batch/",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json"), (b"host", b"localhost")],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    received = False
+    status_code = 0
+
+    async def receive() -> dict[str, Any]:
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # the client stays connected until the response is sent
+        await asyncio.Event().wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict[str, Any]) -> None:
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+
+    await handler(scope, receive, send)
+    return status_code
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--requests", type=int, default=2_000, help="Number of capture requests (default: 2000)")
+    parser.add_argument(
+        "--events-per-request", type=int, default=1, help="Number of events in each request (default: 1)"
+    )
+    parser.add_argument("--threads", type=int, default=8, help="Threads serving the sync view (default: 8)")
+    parser.add_argument(
+        "--concurrency", type=int, default=200, help="Requests in flight on the async view (default: 200)"
+    )
+    parser.add_argument("--ack-latency-ms", type=int, default=0, help="Extra latency added to each Kafka ack")
+    parser.add_argument("--token", type=str, default="phc_benchmark", help="Token to capture the events for")
+
+
+def run(options: dict[str, Any]) -> None:
+    logging.getLogger("kafka").setLevel(logging.WARNING)  # Hide kafka-python's logspam
+
+    n_requests: int = options["requests"]
+    concurrency: int = options["concurrency"]
+    token: str = options["token"]
+
+    batch = [
+        {
+            "event": "$pageview",
+            "distinct_id": f"user-{i}",
+            "properties": {"$current_url": f"https://example.com/page/{i}", "$lib": "web"},
+        }
+        for i in range(options["events_per_request"])
+    ]
+    body = json.dumps({"api_key": token, "batch": batch})
+    factory = RequestFactory()
+    handler = CaptureASGIHandler()
+
+    async def serve_async() -> list[int]:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def serve() -> int:
+            async with semaphore:
+                return await _serve_asgi(handler, body.encode())
+
+        return await asyncio.gather(*(serve() for _ in range(n_requests)))
+
+    ack_latency_seconds = options["ack_latency_ms"] / 1000
+    with (
+        patch.object(_KafkaProducer, "produce", _delay_acks(_KafkaProducer.produce, ack_latency_seconds))
+        if ack_latency_seconds
+        else nullcontext()
+    ):
+        requests = [factory.post("/batch/", data=body, content_type="application/json") for _ in range(n_requests)]
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options["threads"]) as executor:
+            sync_status_codes = [response.status_code for response in executor.map(get_event, requests)]
+        sync_requests_per_second = n_requests / (time.monotonic() - start)
+
+        start = time.monotonic()
+        async_status_codes = asyncio.run(serve_async())
+        async_requests_per_second = n_requests / (time.monotonic() - start)
+
+    logger.info(
+        "capture_async_benchmark",
+        requests=n_requests,
+        events_per_request=options["events_per_request"],
+        ack_latency_ms=options["ack_latency_ms"],
+        threads=options["threads"],
+        concurrency=concurrency,
+        sync_requests_per_second=round(sync_requests_per_second),
+        async_requests_per_second=round(async_requests_per_second),
+        sync_failures=sum(status_code != 200 for status_code in sync_status_codes),
+        async_failures=sum(status_code != 200 for status_code in async_status_codes),
+        speedup=round(async_requests_per_second / sync_requests_per_second, 2),
+    )
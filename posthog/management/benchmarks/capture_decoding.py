@@ -0,0 +1,147 @@
+"""
+Measures how fast capture request bodies are decompressed and parsed for each SDK's payloads, comparing
+`posthog.utils.decompress` with decoding them with the standard library as it used to.
+Captured request bodies can be used instead with --payloads-dir, named <name>.<compression>, e.g. js.gzip-js.
+"""
+
+import base64
+import gzip
+import json
+import os
+import time
+from datetime import UTC, datetime
+from typing import Any
+
+import lzstring
+import structlog
+
+from posthog.utils import decompress
+
+logger = structlog.get_logger(__name__)
+
+
+def _stdlib_decompress(data: Any, compression: str) -> Any:
+    """
+    How request bodies were decoded before `decompress` used orjson: inflated in one go, always tried as base64,
+    and parsed from the UTF-16 that base64 bodies were re-encoded as
+    """
+    if compression in ("gzip", "gzip-js"):
+        data = gzip.decompress(data)
+    if compression == "lz64":
+        data = lzstring.LZString().decompressFromBase64(data.decode().replace(" ", "+"))
+        data = data.encode("utf-16", "surrogatepass").decode("utf-16")
+    try:
+        text = data if isinstance(data, str) else data.decode()
+        decoded = base64.b64decode(text.replace(" ", "+") + "===")
+        data = decoded.decode("utf8", "surrogatepass").encode("utf-16", "surrogatepass")
+    except Exception:
+        pass
+    return json.loads(data, parse_constant=lambda x: None)
+
+
+def _sample_payloads(n_events: int) -> dict[str, tuple[Any, str]]:
+    """
+    Request bodies shaped like each SDK sends them, keyed by SDK, with the compression they declare
+    """
+    now = datetime.now(UTC).isoformat()
+    web_events = [
+        {
+            "event": "$autocapture" if i % 3 else "$pageview",
+            "properties": {
+                "$os": "Mac OS X",
+                "$browser": "Chrome",
+                "$current_url": f"https://example.com/pricing?ref={i}",
+                "$lib": "web",
+                "$lib_version": "1.130.0",
+                "distinct_id": "018f1b6c-3f54-7a6e-9c5e-2f1d7e0c4a11",
+                "$session_id": "018f1b6c-4a2b-7f3e-8d9c-5e6f7a8b9c0d",
+                "$window_id": "018f1b6c-4a2b-7f3e-8d9c-000000000001",
+                "token": "phc_benchmark",
+                "$elements": [
+                    {"tag_name": "button", "$el_text": "Get started – it's free 🚀", "attr__class": "btn btn-lg"},
+                    {"tag_name": "div", "nth_child": 2, "nth_of_type": 1, "attr__class": "hero"},
+                ],
+            },
+            "timestamp": now,
+        }
+        for i in range(n_events)
+    ]
+    server_events = [
+        {
+            "event": "order placed",
+            "distinct_id": f"user-{i}",
+            "properties": {"$lib": "posthog-python", "amount": 12.5 * i, "items": [{"sku": "a-1", "qty": 2}]},
+            "timestamp": now,
+            "api_key": "phc_benchmark",
+        }
+        for i in range(n_events)
+    ]
+    mobile_events = [
+        {
+            "event": "$screen",
+            "distinct_id": f"device-{i}",
+            "properties": {"$lib": "posthog-ios", "$screen_name": "Checkout", "$app_version": "4.2.1"},
+            "timestamp": now,
+        }
+        for i in range(n_events)
+    ]
+    snapshot = {
+        "event": "$snapshot",
+        "properties": {
+            "$session_id": "018f1b6c-4a2b-7f3e-8d9c-5e6f7a8b9c0d",
+            "$window_id": "018f1b6c-4a2b-7f3e-8d9c-000000000001",
+            "$snapshot_data": [
+                {"type": 3, "data": {"source": 1, "positions": [{"x": i, "y": 2 * i, "id": 7, "timeOffset": -i}]}}
+                for i in range(10 * n_events)
+            ],
+        },
+    }
+
+    web_json = json.dumps(web_events)
+    return {
+        "posthog-js": (gzip.compress(web_json.encode()), "gzip-js"),
+        "posthog-js-lz64": (lzstring.LZString().compressToBase64(web_json).encode(), "lz64"),
+        "posthog-js-base64": (base64.b64encode(web_json.encode()), ""),
+        "posthog-js-replay": (gzip.compress(json.dumps([snapshot]).encode()), "gzip-js"),
+        "posthog-python": (json.dumps({"api_key": "phc_benchmark", "batch": server_events}).encode(), ""),
+        "posthog-ios": (gzip.compress(json.dumps({"batch": mobile_events}).encode()), "gzip"),
+    }
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--events", type=int, default=50, help="Number of events in each sample (default: 50)")
+    parser.add_argument("--iterations", type=int, default=200, help="Times each payload is decoded")
+    parser.add_argument("--payloads-dir", type=str, help="Directory of captured request bodies to decode")
+
+
+def run(options: dict[str, Any]) -> None:
+    iterations: int = options["iterations"]
+
+    payloads_dir = options["payloads_dir"]
+    if payloads_dir:
+        payloads = {}
+        for name in sorted(os.listdir(payloads_dir)):
+            with open(os.path.join(payloads_dir, name), "rb") as f:
+                payloads[name] = (f.read(), name.rsplit(".", 1)[1] if "." in name else "")
+    else:
+        payloads = _sample_payloads(options["events"])
+
+    for name, (body, compression) in payloads.items():
+        assert decompress(body, compression) == _stdlib_decompress(body, compression)
+
+        timings = {}
+        for label, decode in (("stdlib", _stdlib_decompress), ("decompress", decompress)):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                decode(body, compression)
+            timings[label] = (time.perf_counter() - start) / iterations
+
+        logger.info(
+            "capture_decoding_benchmark",
+            payload=name,
+            compression=compression or "none",
+            body_bytes=len(body),
+            stdlib_us=round(timings["stdlib"] * 1e6),
+            decompress_us=round(timings["decompress"] * 1e6),
+            speedup=round(timings["stdlib"] / timings["decompress"], 2),
+        )
@@ -0,0 +1,83 @@
+"""
+Measures how many events per second a single capture worker can produce to Kafka, comparing producing
+events one by one (waiting on each ack) with producing them in batches (waiting on all acks at once).
+Events look like a posthog-python batch. Uses the configured Kafka, so run it against a local stack.
+"""
+
+import logging
+import time
+from datetime import UTC, datetime
+from typing import Any
+
+import structlog
+from django.conf import settings
+
+from posthog.api.capture import build_capture_message, capture_internal, log_events
+from posthog.models.utils import UUIDT
+
+logger = structlog.get_logger(__name__)
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--events", type=int, default=20_000, help="Number of events to produce (default: 20000)")
+    parser.add_argument(
+        "--batch-size", type=int, default=500, help="Number of events per capture request (default: 500)"
+    )
+    parser.add_argument("--token", type=str, default="phc_benchmark", help="Token to capture the events for")
+
+
+def run(options: dict[str, Any]) -> None:
+    logging.getLogger("kafka").setLevel(logging.WARNING)  # Hide kafka-python's logspam
+
+    n_events: int = options["events"]
+    batch_size: int = options["batch_size"]
+    token: str = options["token"]
+    now = datetime.now(UTC)
+
+    events = [
+        {
+            "event": "$pageview",
+            "distinct_id": f"user-{i % 1000}",
+            "timestamp": now.isoformat(),
+            "properties": {
+                "$current_url": f"https://example.com/page/{i % 50}",
+                "$lib": "posthog-python",
+                "$lib_version": "3.5.0",
+                "plan": "enterprise",
+                "value": i,
+            },
+        }
+        for i in range(n_events)
+    ]
+    batches = [events[i : i + batch_size] for i in range(0, n_events, batch_size)]
+
+    start = time.monotonic()
+    for batch in batches:
+        futures = [
+            capture_internal(event, event["distinct_id"], "127.0.0.1", "", now, None, UUIDT(), token) for event in batch
+        ]
+        for future in futures:
+            future.get(timeout=settings.KAFKA_PRODUCE_ACK_TIMEOUT_SECONDS)
+    one_by_one = n_events / (time.monotonic() - start)
+
+    start = time.monotonic()
+    for batch in batches:
+        log_events(
+            [
+                (
+                    event["event"],
+                    build_capture_message(event, event["distinct_id"], "127.0.0.1", "", now, None, UUIDT(), token),
+                )
+                for event in batch
+            ]
+        )
+    batched = n_events / (time.monotonic() - start)
+
+    logger.info(
+        "capture_produce_benchmark",
+        events=n_events,
+        batch_size=batch_size,
+        one_by_one_events_per_second=round(one_by_one),
+        batched_events_per_second=round(batched),
+        speedup=round(batched / one_by_one, 2),
+    )
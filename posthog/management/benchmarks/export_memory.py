@@ -0,0 +1,84 @@
+"""
+Measures the peak memory of rendering a tabular export, checking that it stays flat as the export grows
+when rows are streamed to a temporary file. With --compare, also renders the whole export in memory as
+exports used to, which has to come second as the peak memory of a process never goes down.
+"""
+
+import resource
+import tempfile
+import time
+from collections.abc import Iterator
+from typing import Any
+
+import structlog
+
+from posthog.tasks.exports.csv_exporter import (
+    EXPORT_SPOOL_MAX_SIZE,
+    _write_csv,
+    _write_excel,
+)
+from posthog.tasks.exports.ordered_csv_renderer import OrderedCsvRenderer
+
+logger = structlog.get_logger(__name__)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Number of rows to export")
+    parser.add_argument("--format", choices=["csv", "xlsx"], default="csv", help="Format to export to")
+    parser.add_argument("--compare", action="store_true", help="Also render the export in memory")
+
+
+def run(options: dict[str, Any]) -> None:
+    n_rows: int = options["rows"]
+    checkpoint = max(n_rows // 10, 1)
+
+    def rows() -> Iterator[dict[str, Any]]:
+        for i in range(n_rows):
+            if i % checkpoint == 0:
+                logger.info("export_memory_benchmark_progress", rows=i, peak_rss_mb=round(peak_rss_mb(), 1))
+            yield {
+                "id": f"018cc2fa-{i % 65536:04x}-7000-8000-{i:012x}",
+                "distinct_id": f"user-{i % 1000}",
+                "properties": {"$browser": "Chrome", "$current_url": f"https://example.com/{i % 100}"},
+                "event": "$pageview",
+                "timestamp": f"2024-01-01T00:00:{i % 60:02d}.000000+00:00",
+                "elements_chain": "",
+            }
+
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    table = OrderedCsvRenderer().tablize(rows())
+    with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE) as output:
+        if options["format"] == "csv":
+            _write_csv(table, output)
+        else:
+            _write_excel(table, output)
+        size = output.tell()
+    logger.info(
+        "export_memory_benchmark",
+        mode="streamed",
+        format=options["format"],
+        rows=n_rows,
+        size_mb=round(size / 1024 / 1024, 1),
+        seconds=round(time.perf_counter() - start, 1),
+        peak_rss_increase_mb=round(peak_rss_mb() - baseline, 1),
+    )
+
+    if options["compare"]:
+        baseline = peak_rss_mb()
+        start = time.perf_counter()
+        content = OrderedCsvRenderer().render(list(rows()))
+        logger.info(
+            "export_memory_benchmark",
+            mode="in_memory",
+            format="csv",
+            rows=n_rows,
+            size_mb=round(len(content) / 1024 / 1024, 1),
+            seconds=round(time.perf_counter() - start, 1),
+            peak_rss_increase_mb=round(peak_rss_mb() - baseline, 1),
+        )
@@ -0,0 +1,127 @@
+"""
+Measures how fast the hog functions an event matches are found, comparing running each function's filters
+bytecode on it with evaluating one filter set of all their filters. Uses sample filters and events, or the
+enabled functions of a team with --team-id.
+"""
+
+import random
+import time
+from typing import Any, Optional
+
+import structlog
+
+from hogvm.python.execute import execute_bytecode
+from posthog.cdp.filters import compile_filter_set, compile_filters_bytecode
+from posthog.models import HogFunction, Team
+
+logger = structlog.get_logger(__name__)
+
+EVENTS = ["$pageview", "$autocapture", "$identify", "signed up", "purchase", "$screen"] + [
+    f"custom event {i}" for i in range(20)
+]
+BROWSERS = ["Chrome", "Safari", "Firefox"]
+
+
+def _sample_filters(n_functions: int) -> dict[str, dict]:
+    """
+    Filters like the ones functions are set up with: an event or two, some with a property, most excluding test accounts
+    """
+    rng = random.Random(0)
+    filters_by_function_id = {}
+    for i in range(n_functions):
+        events: list[dict[str, Any]] = [
+            {"id": event, "name": event, "type": "events", "order": order}
+            for order, event in enumerate(rng.sample(EVENTS, rng.choice([1, 1, 2])))
+        ]
+        if rng.random() < 0.5:
+            events[0]["properties"] = [
+                {"key": "$browser", "value": rng.choice(BROWSERS), "operator": "exact", "type": "event"}
+            ]
+        filters_by_function_id[f"function-{i}"] = {
+            # a few functions run for every event
+            "events": events if i % 20 else [],
+            "filter_test_accounts": rng.random() < 0.8,
+        }
+    return filters_by_function_id
+
+
+def _sample_globals(n_events: int) -> list[dict[str, Any]]:
+    rng = random.Random(1)
+    return [
+        {
+            "event": rng.choice(EVENTS),
+            "properties": {"$browser": rng.choice(BROWSERS), "$current_url": "https://example.com/pricing"},
+            "person": {"properties": {"email": rng.choice(["max@posthog.com", "someone@example.com"])}},
+            "distinct_id": f"user-{i}",
+        }
+        for i in range(n_events)
+    ]
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--functions", type=int, default=300, help="Number of sample functions (default: 300)")
+    parser.add_argument("--events", type=int, default=1_000, help="Number of sample events (default: 1000)")
+    parser.add_argument("--team-id", type=int, help="Benchmark the filters of this team's enabled functions")
+
+
+def run(options: dict[str, Any]) -> None:
+    team_id: Optional[int] = options["team_id"]
+    if team_id is not None:
+        team = Team.objects.get(pk=team_id)
+        filters_by_function_id = {
+            str(hog_function.id): hog_function.filters
+            for hog_function in HogFunction.objects.filter(team=team, enabled=True, deleted=False)
+        }
+        actions = None
+    else:
+        team = Team(
+            id=1,
+            test_account_filters=[
+                {"key": "email", "value": "@posthog.com", "operator": "not_icontains", "type": "person"}
+            ],
+        )
+        filters_by_function_id = _sample_filters(options["functions"])
+        actions = {}
+
+    all_globals = _sample_globals(options["events"])
+
+    start = time.perf_counter()
+    bytecodes = {
+        function_id: compile_filters_bytecode(dict(filters or {}), team, actions).get("bytecode")
+        for function_id, filters in filters_by_function_id.items()
+    }
+    bytecode_compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    filter_set = compile_filter_set(filters_by_function_id, team, actions)
+    filter_set_compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matches_by_bytecode = [
+        [
+            function_id
+            for function_id, bytecode in bytecodes.items()
+            if bytecode is not None and execute_bytecode(bytecode, globals).result
+        ]
+        for globals in all_globals
+    ]
+    bytecode_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matches_by_filter_set = [filter_set.matching_function_ids(globals) for globals in all_globals]
+    filter_set_time = time.perf_counter() - start
+
+    assert matches_by_filter_set == matches_by_bytecode
+
+    logger.info(
+        "hog_function_filters_benchmark",
+        functions=len(filters_by_function_id),
+        events=len(all_globals),
+        conditions=len(filter_set.conditions),
+        matches_per_event=round(sum(map(len, matches_by_filter_set)) / len(all_globals), 1),
+        bytecode_compile_ms=round(bytecode_compile_time * 1000),
+        filter_set_compile_ms=round(filter_set_compile_time * 1000),
+        bytecode_us_per_event=round(bytecode_time / len(all_globals) * 1e6),
+        filter_set_us_per_event=round(filter_set_time / len(all_globals) * 1e6),
+        speedup=round(bytecode_time / filter_set_time, 2),
+    )
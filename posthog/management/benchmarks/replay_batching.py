@@ -0,0 +1,110 @@
+"""
+Measures grouping snapshots sent without $snapshot_bytes (by older clients) into Kafka sized messages,
+comparing splitting lists in half until they fit with packing them by their precomputed sizes.
+"""
+
+import random
+import string
+import time
+from typing import Any
+
+import structlog
+
+from posthog.session_recordings.session_recording_helpers import (
+    RRWEB_MAP_EVENT_TYPE,
+    byte_size_dict,
+    preprocess_replay_events,
+)
+
+logger = structlog.get_logger(__name__)
+
+
+def split_by_halving(snapshots: list[dict], max_size_bytes: float) -> list[list[dict]]:
+    """
+    How snapshots used to be grouped: halving lists, re-serializing each of them, until they fit
+    """
+    groups: list[list[dict]] = []
+    parts = [snapshots]
+    loop_count = 0
+    while parts and loop_count < 10:
+        loop_count += 1
+        new_parts = []
+        for part in parts:
+            if byte_size_dict(part) < max_size_bytes or len(part) == 1:
+                groups.append(part)
+            else:
+                new_parts.extend([part[: len(part) // 2], part[len(part) // 2 :]])
+        parts = new_parts
+    return groups + parts
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--snapshots", type=int, default=50_000, help="Number of snapshots in the payload")
+    parser.add_argument("--max-size-bytes", type=int, default=1024 * 1024, help="Max size of a message")
+
+
+def run(options: dict[str, Any]) -> None:
+    n_snapshots: int = options["snapshots"]
+    max_size_bytes: int = options["max_size_bytes"]
+
+    rng = random.Random(0)
+
+    def snapshot(i: int) -> dict[str, Any]:
+        if i % 5000 == 0:
+            # A full snapshot of a big DOM
+            return {
+                "type": RRWEB_MAP_EVENT_TYPE.FullSnapshot,
+                "timestamp": i,
+                "data": {"node": "".join(rng.choices(string.ascii_letters, k=200_000))},
+            }
+        if i % 3 == 0:
+            # Mutations of a few nodes
+            return {
+                "type": RRWEB_MAP_EVENT_TYPE.IncrementalSnapshot,
+                "timestamp": i,
+                "data": {
+                    "source": 0,
+                    "adds": [
+                        {"parentId": rng.randint(1, 1000), "node": {"tagName": "div", "textContent": "é" * 50}}
+                        for _ in range(rng.randint(1, 20))
+                    ],
+                },
+            }
+        # Mouse moves
+        return {
+            "type": RRWEB_MAP_EVENT_TYPE.IncrementalSnapshot,
+            "timestamp": i,
+            "data": {"source": 1, "positions": [{"x": rng.randint(0, 2000), "y": rng.randint(0, 2000)}]},
+        }
+
+    snapshots = [snapshot(i) for i in range(n_snapshots)]
+    events = [
+        {
+            "event": "$snapshot",
+            "properties": {"distinct_id": "d", "$session_id": "s", "$window_id": "w", "$snapshot_data": data},
+        }
+        for data in snapshots
+    ]
+    other_snapshots = [s for s in snapshots if s["type"] != RRWEB_MAP_EVENT_TYPE.FullSnapshot]
+
+    start = time.perf_counter()
+    halving_groups = split_by_halving(other_snapshots, max_size_bytes * 0.9)
+    halving_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    packed_events = list(preprocess_replay_events(events, max_size_bytes=max_size_bytes))
+    packing_seconds = time.perf_counter() - start
+
+    logger.info(
+        "replay_batching_benchmark",
+        snapshots=n_snapshots,
+        payload_mb=round(byte_size_dict(snapshots) / 1024 / 1024, 1),
+        halving_messages=len(halving_groups),
+        halving_ms=round(halving_seconds * 1000),
+        # Not counting the full snapshots, which are sent individually either way
+        packed_messages=len(packed_events) - (len(snapshots) - len(other_snapshots)),
+        packing_ms=round(packing_seconds * 1000),
+        largest_packed_message_bytes=max(
+            byte_size_dict(event["properties"]["$snapshot_items"]) for event in packed_events
+        ),
+    )
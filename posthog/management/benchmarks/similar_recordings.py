@@ -0,0 +1,82 @@
+"""
+Measures the recall and latency of finding similar recordings with the in-memory embeddings index.
+With --team-id, the index is loaded from ClickHouse and compared with scanning all embeddings there, otherwise
+it is built from synthetic embeddings and compared with scanning all of them in memory.
+"""
+
+import time
+from typing import Any, Optional
+
+import numpy as np
+import structlog
+
+from ee.session_recordings.ai.embeddings_index import RecordingEmbeddingsIndex
+from ee.session_recordings.ai.similar_recordings import closest_embeddings
+
+logger = structlog.get_logger(__name__)
+
+LIMIT = 3
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--team-id", type=int, help="Team to load embeddings for, instead of synthetic ones")
+    parser.add_argument("--recordings", type=int, default=50_000, help="Number of synthetic recordings")
+    parser.add_argument("--dimensions", type=int, default=1536, help="Size of synthetic embeddings")
+    parser.add_argument("--queries", type=int, default=100, help="Number of recordings to find neighbours of")
+
+
+def run(options: dict[str, Any]) -> None:
+    team_id: Optional[int] = options["team_id"]
+    rng = np.random.default_rng(0)
+
+    start = time.perf_counter()
+    index = RecordingEmbeddingsIndex(team_id or 0)
+    if team_id:
+        index.refresh()
+    else:
+        # embeddings of similar recordings are close together, so make them in groups around random topics
+        n_recordings: int = options["recordings"]
+        topics = rng.standard_normal((max(n_recordings // 100, 1), options["dimensions"]), dtype=np.float32)
+        embeddings = topics[rng.integers(len(topics), size=n_recordings)] + 0.5 * rng.standard_normal(
+            (n_recordings, options["dimensions"]), dtype=np.float32
+        )
+        index.add([str(i) for i in range(n_recordings)], embeddings, np.full(n_recordings, time.time()))
+        index.train_if_due()
+    build_seconds = time.perf_counter() - start
+
+    if not index.size:
+        logger.info("similar_recordings_benchmark_no_embeddings", team_id=team_id)
+        return
+
+    queries = [index.session_ids[i] for i in rng.choice(index.size, size=min(options["queries"], index.size))]
+
+    scan_seconds = 0.0
+    index_seconds = 0.0
+    found = 0
+    for session_id in queries:
+        start = time.perf_counter()
+        if team_id:
+            expected = {row[0] for row in closest_embeddings(session_id=session_id, team_id=team_id)}
+        else:
+            assert index.embeddings is not None
+            distances = 1 - index.embeddings[: index.size] @ index.embeddings[index.positions[session_id]]
+            distances[index.positions[session_id]] = np.inf
+            expected = {index.session_ids[i] for i in np.argsort(distances)[:LIMIT]}
+        scan_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        nearest = index.nearest(session_id, limit=LIMIT)
+        index_seconds += time.perf_counter() - start
+
+        found += len(expected & {neighbour for neighbour, _ in nearest})
+
+    logger.info(
+        "similar_recordings_benchmark",
+        source="clickhouse" if team_id else "synthetic",
+        recordings=index.size,
+        inverted_lists=0 if index.centroids is None else len(index.centroids),
+        build_seconds=round(build_seconds, 1),
+        recall=round(found / (LIMIT * len(queries)), 3),
+        scan_ms_per_query=round(scan_seconds * 1000 / len(queries), 2),
+        index_ms_per_query=round(index_seconds * 1000 / len(queries), 2),
+    )
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posthog.management.benchmarks import (
+    batch_export_writers,
+    capture_async,
+    capture_decoding,
+    capture_produce,
+    export_memory,
+    hog_function_filters,
+    replay_batching,
+)
+
+BENCHMARKS = {
+    "batch_export_writers": batch_export_writers,
+    "capture_async": capture_async,
+    "capture_decoding": capture_decoding,
+    "capture_produce": capture_produce,
+    "export_memory": export_memory,
+    "hog_function_filters": hog_function_filters,
+    "replay_batching": replay_batching,
+}
+
+if settings.EE_AVAILABLE:
+    from posthog.management.benchmarks import similar_recordings
+
+    BENCHMARKS["similar_recordings"] = similar_recordings
+
+
+class Command(BaseCommand):
+    help = """
+        Measures how fast parts of PostHog are, compared with how they used to work, and logs the results.
+        Run `benchmark <name> --help` for what each benchmark measures and its options.
+        Benchmarks that are tracked over time are in the asv suite in ee/benchmarks instead.
+    """
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest="benchmark", required=True, metavar="benchmark")
+        for name, benchmark in BENCHMARKS.items():
+            benchmark.add_arguments(subparsers.add_parser(name, help=benchmark.__doc__, description=benchmark.__doc__))
+
+    def handle(self, *args, **options):
+        BENCHMARKS[options["benchmark"]].run(options)
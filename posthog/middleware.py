@@ -415,6 +415,22 @@ class ShortCircuitMiddleware:
         return response
 
 
+CAPTURE_PATHS = (
+    "/e",
+    "/e/",
+    "/s",
+    "/s/",
+    "/track",
+    "/track/",
+    "/capture",
+    "/capture/",
+    "/batch",
+    "/batch/",
+    "/engage/",
+    "/engage",
+)
+
+
 class CaptureMiddleware:
     """
     Middleware to serve up capture responses. We specifically want to avoid
@@ -447,20 +463,7 @@ class CaptureMiddleware:
         self.CAPTURE_MIDDLEWARE = middlewares
 
     def __call__(self, request: HttpRequest):
-        if request.path in (
-            "/e",
-            "/e/",
-            "/s",
-            "/s/",
-            "/track",
-            "/track/",
-            "/capture",
-            "/capture/",
-            "/batch",
-            "/batch/",
-            "/engage/",
-            "/engage",
-        ):
+        if request.path in CAPTURE_PATHS:
             try:
                 # :KLUDGE: Manually tag ClickHouse queries as CHMiddleware is skipped
                 tag_queries(
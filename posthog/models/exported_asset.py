@@ -1,6 +1,6 @@
 import secrets
 from datetime import timedelta
-from typing import Optional
+from typing import IO, Optional, Union
 
 import structlog
 from django.conf import settings
@@ -155,7 +155,11 @@ def get_content_response(asset: ExportedAsset, download: bool = False):
     return res
 
 
-def save_content(exported_asset: ExportedAsset, content: bytes) -> None:
+def save_content(exported_asset: ExportedAsset, content: Union[bytes, IO[bytes]]) -> None:
+    """
+    Content can be a file object positioned at its start, which is streamed to object storage rather than read into
+    memory. It's only read whole when it has to be saved on the asset itself.
+    """
     try:
         if settings.OBJECT_STORAGE_ENABLED:
             save_content_to_object_storage(exported_asset, content)
@@ -172,12 +176,16 @@ def save_content(exported_asset: ExportedAsset, content: bytes) -> None:
         save_content_to_exported_asset(exported_asset, content)
 
 
-def save_content_to_exported_asset(exported_asset: ExportedAsset, content: bytes) -> None:
+def save_content_to_exported_asset(exported_asset: ExportedAsset, content: Union[bytes, IO[bytes]]) -> None:
+    if not isinstance(content, bytes):
+        # A failed upload might have read part of it already
+        content.seek(0)
+        content = content.read()
     exported_asset.content = content
     exported_asset.save(update_fields=["content"])
 
 
-def save_content_to_object_storage(exported_asset: ExportedAsset, content: bytes) -> None:
+def save_content_to_object_storage(exported_asset: ExportedAsset, content: Union[bytes, IO[bytes]]) -> None:
     path_parts: list[str] = [
         settings.OBJECT_STORAGE_EXPORTS_FOLDER,
         exported_asset.export_format.split("/")[1],
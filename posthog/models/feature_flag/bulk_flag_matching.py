@@ -0,0 +1,289 @@
+from typing import Optional, Union, cast
+
+from django.conf import settings
+from django.db.models.query import QuerySet
+from sentry_sdk.api import start_span
+
+from posthog.database_healthcheck import DATABASE_FOR_FLAG_MATCHING, postgres_healthcheck
+from posthog.models.cohort import Cohort, CohortOrEmpty
+from posthog.models.filters import Filter
+from posthog.models.person import Person
+from posthog.models.property import GroupTypeName
+from posthog.models.property.property import Property
+from posthog.models.utils import execute_with_timeout
+
+from .feature_flag import (
+    FeatureFlag,
+    FeatureFlagHashKeyOverride,
+    get_feature_flags_for_team_in_cache,
+    set_feature_flags_for_team_in_cache,
+)
+from .flag_matching import (
+    ENTITY_EXISTS_PREFIX,
+    PERSON_KEY,
+    FeatureFlagMatcher,
+    FlagsMatcherCache,
+    add_local_person_and_group_properties,
+    get_hashes,
+    handle_feature_flag_exception,
+)
+
+# Number of distinct_ids whose person conditions are queried at once
+BULK_FLAG_MATCHING_BATCH_SIZE = 1000
+# Per batch. Looser than for /decide, as nobody's waiting on a single user's flags.
+BULK_FLAG_MATCHING_QUERY_TIMEOUT_MS = 5000
+
+# flag values, evaluation reasons, payloads, and whether there were errors computing flags
+FlagMatches = tuple[dict[str, Union[str, bool]], dict[str, dict], dict[str, object], bool]
+
+
+class BulkFeatureFlagMatcher:
+    """
+    Evaluates flags for many distinct_ids at once, with the same results as a `FeatureFlagMatcher` per distinct_id.
+
+    Person conditions are queried for a batch of distinct_ids in one query, group conditions once (the groups are
+    the same for every distinct_id), and hashes for rollouts and variants are computed a flag at a time.
+
+    :TRICKY: Conditions on the `distinct_id` property are matched against each distinct_id itself, so they can't be
+    shared by a batch. Flags with such conditions are evaluated one distinct_id at a time.
+    """
+
+    def __init__(
+        self,
+        feature_flags: list[FeatureFlag],
+        distinct_ids: list[str],
+        groups: Optional[dict[GroupTypeName, str]] = None,
+        group_property_value_overrides: Optional[dict[str, dict[str, Union[str, int]]]] = None,
+        cache: Optional[FlagsMatcherCache] = None,
+        skip_database_flags: bool = False,
+        batch_size: int = BULK_FLAG_MATCHING_BATCH_SIZE,
+    ):
+        self.feature_flags = feature_flags
+        self.distinct_ids = distinct_ids
+        self.team_id = feature_flags[0].team_id
+        self.groups = groups or {}
+        _, self.group_property_value_overrides = add_local_person_and_group_properties(
+            None, self.groups, {}, group_property_value_overrides or {}
+        )
+        self.cache = cache or FlagsMatcherCache(self.team_id)
+        self.skip_database_flags = skip_database_flags
+        self.batch_size = batch_size
+        self.cohorts_cache: dict[int, CohortOrEmpty] = {}
+        # Conditions that are the same for every distinct_id, queried with the first batch
+        self._shared_conditions: Optional[dict[str, bool]] = None
+
+    def get_matches(self) -> dict[str, FlagMatches]:
+        if not self.skip_database_flags and any(feature_flag.uses_cohorts for feature_flag in self.feature_flags):
+            try:
+                with execute_with_timeout(BULK_FLAG_MATCHING_QUERY_TIMEOUT_MS, DATABASE_FOR_FLAG_MATCHING):
+                    self.cohorts_cache.update(
+                        {
+                            cohort.pk: cohort
+                            for cohort in Cohort.objects.using(DATABASE_FOR_FLAG_MATCHING).filter(
+                                team_id=self.team_id, deleted=False
+                            )
+                        }
+                    )
+            except Exception as err:
+                handle_feature_flag_exception(err, "[Feature Flags] Error fetching cohorts for bulk evaluation")
+                self.skip_database_flags = True
+
+        batched_flags: list[FeatureFlag] = []
+        per_distinct_id_flags: list[FeatureFlag] = []
+        for feature_flag in self.feature_flags:
+            if self._uses_distinct_id_property(feature_flag):
+                per_distinct_id_flags.append(feature_flag)
+            else:
+                batched_flags.append(feature_flag)
+
+        matches: dict[str, FlagMatches] = {}
+        for start in range(0, len(self.distinct_ids), self.batch_size):
+            batch = self.distinct_ids[start : start + self.batch_size]
+            matches.update(self._get_batch_matches(batched_flags, per_distinct_id_flags, batch))
+        return matches
+
+    def _get_batch_matches(
+        self, batched_flags: list[FeatureFlag], per_distinct_id_flags: list[FeatureFlag], distinct_ids: list[str]
+    ) -> dict[str, FlagMatches]:
+        skip_database_flags = self.skip_database_flags
+        query_conditions: dict[str, dict[str, bool]] = {}
+        hash_key_overrides: dict[str, dict[str, str]] = {}
+        if not skip_database_flags:
+            try:
+                query_conditions, hash_key_overrides = self._query_conditions(batched_flags, distinct_ids)
+            except Exception as err:
+                handle_feature_flag_exception(err, "[Feature Flags] Error computing flags in bulk")
+                # Like /decide, still return the flags that don't need the database
+                skip_database_flags = True
+
+        hashes = self._get_hashes(batched_flags, distinct_ids, hash_key_overrides)
+        matches: dict[str, FlagMatches] = {}
+        with start_span(op="bulk_feature_flag_matching"):
+            for distinct_id in distinct_ids:
+                flag_matches: FlagMatches = ({}, {}, {}, False)
+                for feature_flags, preloaded in ((batched_flags, True), (per_distinct_id_flags, False)):
+                    if not feature_flags:
+                        continue
+                    flag_matches = _merge_matches(
+                        flag_matches,
+                        FeatureFlagMatcher(
+                            feature_flags,
+                            distinct_id,
+                            self.groups,
+                            self.cache,
+                            hash_key_overrides.get(distinct_id, {}),
+                            {"distinct_id": distinct_id},
+                            self.group_property_value_overrides,
+                            skip_database_flags,
+                            self.cohorts_cache,
+                            query_conditions=(
+                                query_conditions.get(distinct_id, {}) if preloaded and not skip_database_flags else None
+                            ),
+                            hashes=hashes[distinct_id] if preloaded else None,
+                        ).get_matches(),
+                    )
+                matches[distinct_id] = flag_matches
+        return matches
+
+    def _query_conditions(
+        self, feature_flags: list[FeatureFlag], distinct_ids: list[str]
+    ) -> tuple[dict[str, dict[str, bool]], dict[str, dict[str, str]]]:
+        """Returns the query conditions of `feature_flags` and the hash key overrides of each distinct_id."""
+        with execute_with_timeout(BULK_FLAG_MATCHING_QUERY_TIMEOUT_MS, DATABASE_FOR_FLAG_MATCHING):
+            person_query: QuerySet = Person.objects.using(DATABASE_FOR_FLAG_MATCHING).filter(
+                team_id=self.team_id,
+                persondistinctid__distinct_id__in=distinct_ids,
+                persondistinctid__team_id=self.team_id,
+            )
+            shared_conditions: dict[str, bool] = {}
+            person_fields: list[str] = []
+            check_person_exists = False
+            if feature_flags:
+                # Builds the same queries as a single distinct_id's matcher, with the person query covering the batch
+                matcher = FeatureFlagMatcher(
+                    feature_flags,
+                    "",
+                    self.groups,
+                    self.cache,
+                    group_property_value_overrides=self.group_property_value_overrides,
+                    cohorts_cache=self.cohorts_cache,
+                )
+                group_query_per_group_type_mapping = matcher.group_condition_queries()
+                shared_conditions, person_query, person_fields = matcher.annotate_condition_queries(
+                    person_query, group_query_per_group_type_mapping
+                )
+                if self._shared_conditions is None:
+                    self._shared_conditions = {
+                        **matcher.entity_existence_conditions(None, group_query_per_group_type_mapping),
+                        **matcher.query_group_conditions(group_query_per_group_type_mapping),
+                    }
+                shared_conditions = {**shared_conditions, **self._shared_conditions}
+                check_person_exists = PERSON_KEY in matcher.has_pure_is_not_conditions
+
+            distinct_ids_by_person_id: dict[int, list[str]] = {}
+            query_conditions: dict[str, dict[str, bool]] = {}
+            for row in person_query.values("id", "persondistinctid__distinct_id", *person_fields):
+                distinct_id = row.pop("persondistinctid__distinct_id")
+                distinct_ids_by_person_id.setdefault(row.pop("id"), []).append(distinct_id)
+                query_conditions[distinct_id] = {**shared_conditions, **row}
+
+            hash_key_overrides: dict[str, dict[str, str]] = {}
+            if distinct_ids_by_person_id and any(
+                feature_flag.ensure_experience_continuity for feature_flag in self.feature_flags
+            ):
+                for person_id, feature_flag_key, hash_key in (
+                    FeatureFlagHashKeyOverride.objects.using(DATABASE_FOR_FLAG_MATCHING)
+                    .filter(team_id=self.team_id, person_id__in=list(distinct_ids_by_person_id.keys()))
+                    .values_list("person_id", "feature_flag_key", "hash_key")
+                ):
+                    for distinct_id in distinct_ids_by_person_id[person_id]:
+                        hash_key_overrides.setdefault(distinct_id, {})[feature_flag_key] = hash_key
+
+        for distinct_id in distinct_ids:
+            person_exists = distinct_id in query_conditions
+            if not person_exists:
+                query_conditions[distinct_id] = dict(shared_conditions)
+            if check_person_exists:
+                query_conditions[distinct_id][f"{ENTITY_EXISTS_PREFIX}{PERSON_KEY}"] = person_exists
+        return query_conditions, hash_key_overrides
+
+    def _get_hashes(
+        self,
+        feature_flags: list[FeatureFlag],
+        distinct_ids: list[str],
+        hash_key_overrides: dict[str, dict[str, str]],
+    ) -> dict[str, dict[tuple[str, str], float]]:
+        hashes: dict[str, dict[tuple[str, str], float]] = {distinct_id: {} for distinct_id in distinct_ids}
+        for feature_flag in feature_flags:
+            salts = []
+            if any(condition.get("rollout_percentage") is not None for condition in feature_flag.conditions):
+                salts.append("")
+            if feature_flag.variants:
+                salts.append("variant")
+            if not salts or feature_flag.aggregation_group_type_index is not None:
+                # Group flags hash the same group key for everyone, leave that to the matchers
+                continue
+
+            identifiers: list[Optional[str]] = list(distinct_ids)
+            if feature_flag.ensure_experience_continuity:
+                identifiers = [
+                    hash_key_overrides.get(distinct_id, {}).get(feature_flag.key, distinct_id)
+                    for distinct_id in distinct_ids
+                ]
+            for salt in salts:
+                for distinct_id, hash_val in zip(distinct_ids, get_hashes(feature_flag.key, identifiers, salt)):
+                    hashes[distinct_id][(feature_flag.key, salt)] = hash_val
+        return hashes
+
+    def _uses_distinct_id_property(self, feature_flag: FeatureFlag) -> bool:
+        if feature_flag.aggregation_group_type_index is not None:
+            return False
+        return any(
+            self._properties_use_distinct_id(Filter(data=condition).property_groups.flat, set())
+            for condition in [*feature_flag.super_conditions, *feature_flag.conditions]
+        )
+
+    def _properties_use_distinct_id(self, properties: list[Property], seen_cohort_ids: set[int]) -> bool:
+        for property in properties:
+            if property.type == "cohort":
+                cohort_id = int(cast(Union[str, int], property.value))
+                cohort = self.cohorts_cache.get(cohort_id)
+                if cohort and cohort_id not in seen_cohort_ids:
+                    seen_cohort_ids.add(cohort_id)
+                    if self._properties_use_distinct_id(cohort.properties.flat, seen_cohort_ids):
+                        return True
+            elif property.key == "distinct_id":
+                return True
+        return False
+
+
+def _merge_matches(matches: FlagMatches, other: FlagMatches) -> FlagMatches:
+    return (
+        {**matches[0], **other[0]},
+        {**matches[1], **other[1]},
+        {**matches[2], **other[2]},
+        matches[3] or other[3],
+    )
+
+
+def get_all_feature_flags_for_distinct_ids(
+    team_id: int,
+    distinct_ids: list[str],
+    groups: Optional[dict[GroupTypeName, str]] = None,
+    group_property_value_overrides: Optional[dict[str, dict[str, Union[str, int]]]] = None,
+) -> dict[str, FlagMatches]:
+    """`get_all_feature_flags` for many distinct_ids, without writing hash key overrides."""
+    all_feature_flags = get_feature_flags_for_team_in_cache(team_id)
+    if all_feature_flags is None:
+        all_feature_flags = set_feature_flags_for_team_in_cache(team_id)
+    if not all_feature_flags or not distinct_ids:
+        return {distinct_id: ({}, {}, {}, False) for distinct_id in distinct_ids}
+
+    is_database_alive = (not settings.DECIDE_SKIP_POSTGRES_FLAGS) and postgres_healthcheck.is_connected()
+    return BulkFeatureFlagMatcher(
+        all_feature_flags,
+        distinct_ids,
+        groups,
+        group_property_value_overrides,
+        skip_database_flags=not is_database_alive,
+    ).get_matches()
@@ -142,6 +142,8 @@ class FeatureFlagMatcher:
         group_property_value_overrides: Optional[dict[str, dict[str, Union[str, int]]]] = None,
         skip_database_flags: bool = False,
         cohorts_cache: Optional[dict[int, CohortOrEmpty]] = None,
+        query_conditions: Optional[dict[str, bool]] = None,
+        hashes: Optional[dict[tuple[str, str], float]] = None,
     ):
         if group_property_value_overrides is None:
             group_property_value_overrides = {}
@@ -165,6 +167,11 @@ class FeatureFlagMatcher:
         else:
             self.cohorts_cache = cohorts_cache
 
+        # Conditions already queried for this distinct_id, e.g. by `BulkFeatureFlagMatcher`
+        self.preloaded_query_conditions = query_conditions
+        # (flag key, salt) -> hash
+        self.hashes = hashes if hashes is not None else {}
+
     def get_match(self, feature_flag: FeatureFlag) -> FeatureFlagMatch:
         # If aggregating flag by groups and relevant group type is not passed - flag is off!
         if self.hashed_identifier(feature_flag) is None:
@@ -406,196 +413,35 @@ class FeatureFlagMatcher:
 
     @cached_property
     def query_conditions(self) -> dict[str, bool]:
+        if self.preloaded_query_conditions is not None:
+            return self.preloaded_query_conditions
         try:
             # Some extra wiggle room here for timeouts because this depends on the number of flags as well,
             # and not just the database query.
             with execute_with_timeout(FLAG_MATCHING_QUERY_TIMEOUT_MS * 2, DATABASE_FOR_FLAG_MATCHING):
-                all_conditions: dict = {}
                 team_id = self.feature_flags[0].team_id
                 person_query: QuerySet = Person.objects.using(DATABASE_FOR_FLAG_MATCHING).filter(
                     team_id=team_id,
                     persondistinctid__distinct_id=self.distinct_id,
                     persondistinctid__team_id=team_id,
                 )
-                basic_group_query: QuerySet = Group.objects.using(DATABASE_FOR_FLAG_MATCHING).filter(team_id=team_id)
-                group_query_per_group_type_mapping: dict[GroupTypeIndex, tuple[QuerySet, list[str]]] = {}
-                # :TRICKY: Create a queryset for each group type that uniquely identifies a group, based on the groups passed in.
-                # If no groups for a group type are passed in, we can skip querying for that group type,
-                # since the result will always be `false`.
-                for group_type, group_key in self.groups.items():
-                    group_type_index = self.cache.group_types_to_indexes.get(group_type)
-                    if group_type_index is not None:
-                        # a tuple of querySet and field names
-                        group_query_per_group_type_mapping[group_type_index] = (
-                            basic_group_query.filter(group_type_index=group_type_index, group_key=group_key),
-                            [],
-                        )
-
-                person_fields: list[str] = []
-
-                for existence_condition_key in self.has_pure_is_not_conditions:
-                    if existence_condition_key == PERSON_KEY:
-                        person_exists = person_query.exists()
-                        all_conditions[f"{ENTITY_EXISTS_PREFIX}{PERSON_KEY}"] = person_exists
-                    else:
-                        if existence_condition_key not in group_query_per_group_type_mapping:
-                            continue
-
-                        group_query, _ = group_query_per_group_type_mapping[
-                            cast(GroupTypeIndex, existence_condition_key)
-                        ]
-                        group_exists = group_query.exists()
-                        all_conditions[f"{ENTITY_EXISTS_PREFIX}{existence_condition_key}"] = group_exists
-
-                def condition_eval(key, condition):
-                    team_id = self.feature_flags[0].team_id
-                    expr = None
-                    annotate_query = True
-                    nonlocal person_query
-
-                    property_list = Filter(data=condition).property_groups.flat
-                    properties_with_math_operators = get_all_properties_with_math_operators(
-                        property_list, self.cohorts_cache, team_id
-                    )
-
-                    if len(condition.get("properties", {})) > 0:
-                        # Feature Flags don't support OR filtering yet
-                        target_properties = self.property_value_overrides
-                        if feature_flag.aggregation_group_type_index is not None:
-                            if feature_flag.aggregation_group_type_index not in self.cache.group_type_index_to_name:
-                                target_properties = {}
-                            else:
-                                target_properties = self.group_property_value_overrides.get(
-                                    self.cache.group_type_index_to_name[feature_flag.aggregation_group_type_index],
-                                    {},
-                                )
-
-                        expr = properties_to_Q(
-                            team_id,
-                            property_list,
-                            override_property_values=target_properties,
-                            cohorts_cache=self.cohorts_cache,
-                            using_database=DATABASE_FOR_FLAG_MATCHING,
-                        )
-
-                        # TRICKY: Due to property overrides for cohorts, we sometimes shortcircuit the condition check.
-                        # In that case, the expression is either an explicit True or explicit False, or multiple conditions.
-                        # We can skip going to the database in explicit True|False conditions. This is important
-                        # as it allows resolving flags correctly for non-ingested persons.
-                        # However, this doesn't work for the multiple condition case (when expr has multiple Q objects),
-                        # but it's better than nothing.
-                        # TODO: A proper fix would be to handle cohorts with property overrides before we get to this point.
-                        # Unskip test test_complex_cohort_filter_with_override_properties when we fix this.
-                        if expr == Q(pk__isnull=False):
-                            all_conditions[key] = True
-                            annotate_query = False
-                        elif expr == Q(pk__isnull=True):
-                            all_conditions[key] = False
-                            annotate_query = False
-
-                    if annotate_query:
-                        if feature_flag.aggregation_group_type_index is None:
-                            # :TRICKY: Flag matching depends on type of property when doing >, <, >=, <= comparisons.
-                            # This requires a generated field to query in Q objects, which sadly don't allow inlining fields,
-                            # hence we need to annotate the query here, even though these annotations are used much deeper,
-                            # in properties_to_q, in empty_or_null_with_value_q
-                            # These need to come in before the expr so they're available to use inside the expr.
-                            # Same holds for the group queries below.
-                            type_property_annotations = {
-                                prop_key: Func(F(prop_field), function="JSONB_TYPEOF", output_field=CharField())
-                                for prop_key, prop_field in properties_with_math_operators
-                            }
-                            person_query = person_query.annotate(
-                                **type_property_annotations,
-                                **{
-                                    key: ExpressionWrapper(
-                                        expr if expr else RawSQL("true", []),
-                                        output_field=BooleanField(),
-                                    ),
-                                },
-                            )
-                            person_fields.append(key)
-                        else:
-                            if feature_flag.aggregation_group_type_index not in group_query_per_group_type_mapping:
-                                # ignore flags that didn't have the right groups passed in
-                                return
-                            (
-                                group_query,
-                                group_fields,
-                            ) = group_query_per_group_type_mapping[feature_flag.aggregation_group_type_index]
-                            type_property_annotations = {
-                                prop_key: Func(F(prop_field), function="JSONB_TYPEOF", output_field=CharField())
-                                for prop_key, prop_field in properties_with_math_operators
-                            }
-                            group_query = group_query.annotate(
-                                **type_property_annotations,
-                                **{
-                                    key: ExpressionWrapper(
-                                        expr if expr else RawSQL("true", []),
-                                        output_field=BooleanField(),
-                                    )
-                                },
-                            )
-                            group_fields.append(key)
-                            group_query_per_group_type_mapping[feature_flag.aggregation_group_type_index] = (
-                                group_query,
-                                group_fields,
-                            )
+                group_query_per_group_type_mapping = self.group_condition_queries()
 
-                # only fetch all cohorts if not passed in any cached cohorts
-                if not self.cohorts_cache and any(feature_flag.uses_cohorts for feature_flag in self.feature_flags):
-                    all_cohorts = {
-                        cohort.pk: cohort
-                        for cohort in Cohort.objects.using(DATABASE_FOR_FLAG_MATCHING).filter(
-                            team_id=team_id, deleted=False
-                        )
-                    }
-                    self.cohorts_cache.update(all_cohorts)
-                # release conditions
-                for feature_flag in self.feature_flags:
-                    # super release conditions
-                    if feature_flag.super_conditions and len(feature_flag.super_conditions) > 0:
-                        condition = feature_flag.super_conditions[0]
-                        prop_key = (condition.get("properties") or [{}])[0].get("key")
-                        if prop_key:
-                            key = f"flag_{feature_flag.pk}_super_condition"
-                            condition_eval(key, condition)
-
-                            is_set_key = f"flag_{feature_flag.pk}_super_condition_is_set"
-                            is_set_condition = {
-                                "properties": [
-                                    {
-                                        "key": prop_key,
-                                        "operator": "is_set",
-                                    }
-                                ]
-                            }
-                            condition_eval(is_set_key, is_set_condition)
+                all_conditions: dict = self.entity_existence_conditions(
+                    person_query, group_query_per_group_type_mapping
+                )
 
-                    with start_span(
-                        op="parse_feature_flag_conditions",
-                        description=f"feature_flag={feature_flag.pk} key={feature_flag.key}",
-                    ):
-                        for index, condition in enumerate(feature_flag.conditions):
-                            key = f"flag_{feature_flag.pk}_condition_{index}"
-                            condition_eval(key, condition)
+                conditions, person_query, person_fields = self.annotate_condition_queries(
+                    person_query, group_query_per_group_type_mapping
+                )
+                all_conditions = {**all_conditions, **conditions}
 
                 if len(person_fields) > 0:
                     person_query = person_query.values(*person_fields)
                     if len(person_query) > 0:
                         all_conditions = {**all_conditions, **person_query[0]}
 
-                for (
-                    group_query,
-                    group_fields,
-                ) in group_query_per_group_type_mapping.values():
-                    # Only query the group if there's a field to query
-                    if len(group_fields) > 0:
-                        group_query = group_query.values(*group_fields)
-                        if len(group_query) > 0:
-                            assert len(group_query) == 1, f"Expected 1 group query result, got {len(group_query)}"
-                            all_conditions = {**all_conditions, **group_query[0]}
-                return all_conditions
+                return {**all_conditions, **self.query_group_conditions(group_query_per_group_type_mapping)}
         except DatabaseError:
             self.failed_to_fetch_conditions = True
             raise
@@ -605,6 +451,208 @@ class FeatureFlagMatcher:
             # Covers all cases like invalid JSON, invalid operator, invalid property name, invalid group input format, etc.
             raise
 
+    def group_condition_queries(self) -> dict[GroupTypeIndex, tuple[QuerySet, list[str]]]:
+        team_id = self.feature_flags[0].team_id
+        basic_group_query: QuerySet = Group.objects.using(DATABASE_FOR_FLAG_MATCHING).filter(team_id=team_id)
+        group_query_per_group_type_mapping: dict[GroupTypeIndex, tuple[QuerySet, list[str]]] = {}
+        # :TRICKY: Create a queryset for each group type that uniquely identifies a group, based on the groups passed in.
+        # If no groups for a group type are passed in, we can skip querying for that group type,
+        # since the result will always be `false`.
+        for group_type, group_key in self.groups.items():
+            group_type_index = self.cache.group_types_to_indexes.get(group_type)
+            if group_type_index is not None:
+                # a tuple of querySet and field names
+                group_query_per_group_type_mapping[group_type_index] = (
+                    basic_group_query.filter(group_type_index=group_type_index, group_key=group_key),
+                    [],
+                )
+        return group_query_per_group_type_mapping
+
+    def entity_existence_conditions(
+        self,
+        person_query: Optional[QuerySet],
+        group_query_per_group_type_mapping: dict[GroupTypeIndex, tuple[QuerySet, list[str]]],
+    ) -> dict[str, bool]:
+        """Whether the person (unless `person_query` is None) and groups exist, if any flag needs to know."""
+        all_conditions: dict[str, bool] = {}
+        for existence_condition_key in self.has_pure_is_not_conditions:
+            if existence_condition_key == PERSON_KEY:
+                if person_query is None:
+                    continue
+                person_exists = person_query.exists()
+                all_conditions[f"{ENTITY_EXISTS_PREFIX}{PERSON_KEY}"] = person_exists
+            else:
+                if existence_condition_key not in group_query_per_group_type_mapping:
+                    continue
+
+                group_query, _ = group_query_per_group_type_mapping[cast(GroupTypeIndex, existence_condition_key)]
+                group_exists = group_query.exists()
+                all_conditions[f"{ENTITY_EXISTS_PREFIX}{existence_condition_key}"] = group_exists
+        return all_conditions
+
+    def annotate_condition_queries(
+        self,
+        person_query: QuerySet,
+        group_query_per_group_type_mapping: dict[GroupTypeIndex, tuple[QuerySet, list[str]]],
+    ) -> tuple[dict[str, bool], QuerySet, list[str]]:
+        """
+        Annotates the person query and the group queries (in place) with a field per flag condition.
+
+        Returns the conditions that property overrides already decide, the annotated person query, and its fields.
+        """
+        all_conditions: dict[str, bool] = {}
+        team_id = self.feature_flags[0].team_id
+        person_fields: list[str] = []
+
+        def condition_eval(key, condition):
+            team_id = self.feature_flags[0].team_id
+            expr = None
+            annotate_query = True
+            nonlocal person_query
+
+            property_list = Filter(data=condition).property_groups.flat
+            properties_with_math_operators = get_all_properties_with_math_operators(
+                property_list, self.cohorts_cache, team_id
+            )
+
+            if len(condition.get("properties", {})) > 0:
+                # Feature Flags don't support OR filtering yet
+                target_properties = self.property_value_overrides
+                if feature_flag.aggregation_group_type_index is not None:
+                    if feature_flag.aggregation_group_type_index not in self.cache.group_type_index_to_name:
+                        target_properties = {}
+                    else:
+                        target_properties = self.group_property_value_overrides.get(
+                            self.cache.group_type_index_to_name[feature_flag.aggregation_group_type_index],
+                            {},
+                        )
+
+                expr = properties_to_Q(
+                    team_id,
+                    property_list,
+                    override_property_values=target_properties,
+                    cohorts_cache=self.cohorts_cache,
+                    using_database=DATABASE_FOR_FLAG_MATCHING,
+                )
+
+                # TRICKY: Due to property overrides for cohorts, we sometimes shortcircuit the condition check.
+                # In that case, the expression is either an explicit True or explicit False, or multiple conditions.
+                # We can skip going to the database in explicit True|False conditions. This is important
+                # as it allows resolving flags correctly for non-ingested persons.
+                # However, this doesn't work for the multiple condition case (when expr has multiple Q objects),
+                # but it's better than nothing.
+                # TODO: A proper fix would be to handle cohorts with property overrides before we get to this point.
+                # Unskip test test_complex_cohort_filter_with_override_properties when we fix this.
+                if expr == Q(pk__isnull=False):
+                    all_conditions[key] = True
+                    annotate_query = False
+                elif expr == Q(pk__isnull=True):
+                    all_conditions[key] = False
+                    annotate_query = False
+
+            if annotate_query:
+                if feature_flag.aggregation_group_type_index is None:
+                    # :TRICKY: Flag matching depends on type of property when doing >, <, >=, <= comparisons.
+                    # This requires a generated field to query in Q objects, which sadly don't allow inlining fields,
+                    # hence we need to annotate the query here, even though these annotations are used much deeper,
+                    # in properties_to_q, in empty_or_null_with_value_q
+                    # These need to come in before the expr so they're available to use inside the expr.
+                    # Same holds for the group queries below.
+                    type_property_annotations = {
+                        prop_key: Func(F(prop_field), function="JSONB_TYPEOF", output_field=CharField())
+                        for prop_key, prop_field in properties_with_math_operators
+                    }
+                    person_query = person_query.annotate(
+                        **type_property_annotations,
+                        **{
+                            key: ExpressionWrapper(
+                                expr if expr else RawSQL("true", []),
+                                output_field=BooleanField(),
+                            ),
+                        },
+                    )
+                    person_fields.append(key)
+                else:
+                    if feature_flag.aggregation_group_type_index not in group_query_per_group_type_mapping:
+                        # ignore flags that didn't have the right groups passed in
+                        return
+                    (
+                        group_query,
+                        group_fields,
+                    ) = group_query_per_group_type_mapping[feature_flag.aggregation_group_type_index]
+                    type_property_annotations = {
+                        prop_key: Func(F(prop_field), function="JSONB_TYPEOF", output_field=CharField())
+                        for prop_key, prop_field in properties_with_math_operators
+                    }
+                    group_query = group_query.annotate(
+                        **type_property_annotations,
+                        **{
+                            key: ExpressionWrapper(
+                                expr if expr else RawSQL("true", []),
+                                output_field=BooleanField(),
+                            )
+                        },
+                    )
+                    group_fields.append(key)
+                    group_query_per_group_type_mapping[feature_flag.aggregation_group_type_index] = (
+                        group_query,
+                        group_fields,
+                    )
+
+        # only fetch all cohorts if not passed in any cached cohorts
+        if not self.cohorts_cache and any(feature_flag.uses_cohorts for feature_flag in self.feature_flags):
+            all_cohorts = {
+                cohort.pk: cohort
+                for cohort in Cohort.objects.using(DATABASE_FOR_FLAG_MATCHING).filter(team_id=team_id, deleted=False)
+            }
+            self.cohorts_cache.update(all_cohorts)
+        # release conditions
+        for feature_flag in self.feature_flags:
+            # super release conditions
+            if feature_flag.super_conditions and len(feature_flag.super_conditions) > 0:
+                condition = feature_flag.super_conditions[0]
+                prop_key = (condition.get("properties") or [{}])[0].get("key")
+                if prop_key:
+                    key = f"flag_{feature_flag.pk}_super_condition"
+                    condition_eval(key, condition)
+
+                    is_set_key = f"flag_{feature_flag.pk}_super_condition_is_set"
+                    is_set_condition = {
+                        "properties": [
+                            {
+                                "key": prop_key,
+                                "operator": "is_set",
+                            }
+                        ]
+                    }
+                    condition_eval(is_set_key, is_set_condition)
+
+            with start_span(
+                op="parse_feature_flag_conditions",
+                description=f"feature_flag={feature_flag.pk} key={feature_flag.key}",
+            ):
+                for index, condition in enumerate(feature_flag.conditions):
+                    key = f"flag_{feature_flag.pk}_condition_{index}"
+                    condition_eval(key, condition)
+
+        return all_conditions, person_query, person_fields
+
+    def query_group_conditions(
+        self, group_query_per_group_type_mapping: dict[GroupTypeIndex, tuple[QuerySet, list[str]]]
+    ) -> dict[str, bool]:
+        all_conditions: dict[str, bool] = {}
+        for (
+            group_query,
+            group_fields,
+        ) in group_query_per_group_type_mapping.values():
+            # Only query the group if there's a field to query
+            if len(group_fields) > 0:
+                group_query = group_query.values(*group_fields)
+                if len(group_query) > 0:
+                    assert len(group_query) == 1, f"Expected 1 group query result, got {len(group_query)}"
+                    all_conditions = {**all_conditions, **group_query[0]}
+        return all_conditions
+
     def hashed_identifier(self, feature_flag: FeatureFlag) -> Optional[str]:
         """
         If aggregating by people, returns distinct_id.
@@ -631,9 +679,11 @@ class FeatureFlagMatcher:
     # uniformly distributed between 0 and 1, so if we want to show this feature to 20% of traffic
     # we can do _hash(key, identifier) < 0.2
     def get_hash(self, feature_flag: FeatureFlag, salt="") -> float:
-        hash_key = f"{feature_flag.key}.{self.hashed_identifier(feature_flag)}{salt}"
-        hash_val = int(hashlib.sha1(hash_key.encode("utf-8")).hexdigest()[:15], 16)
-        return hash_val / __LONG_SCALE__
+        hash_val = self.hashes.get((feature_flag.key, salt))
+        if hash_val is None:
+            hash_val = get_hashes(feature_flag.key, [self.hashed_identifier(feature_flag)], salt)[0]
+            self.hashes[(feature_flag.key, salt)] = hash_val
+        return hash_val
 
     def can_compute_locally(
         self,
@@ -680,6 +730,18 @@ class FeatureFlagMatcher:
         return entity_to_condition_check
 
 
+def get_hashes(feature_flag_key: str, identifiers: list[Optional[str]], salt: str = "") -> list[float]:
+    """`FeatureFlagMatcher.get_hash` of the flag for each identifier, computed in one pass."""
+    prefix = f"{feature_flag_key}.".encode()
+    suffix = salt.encode()
+    sha1 = hashlib.sha1
+    # The first 15 hex digits of the digest, i.e. its first 60 bits
+    return [
+        (int.from_bytes(sha1(prefix + f"{identifier}".encode() + suffix).digest()[:8], "big") >> 4) / __LONG_SCALE__
+        for identifier in identifiers
+    ]
+
+
 def get_feature_flag_hash_key_overrides(
     team_id: int,
     distinct_ids: list[str],
@@ -574,6 +574,10 @@ class HogQLQueryModifiers(BaseModel):
     personsOnEventsMode: Optional[PersonsOnEventsMode] = None
     s3TableUseInvalidColumns: Optional[bool] = None
     sessionTableVersion: Optional[SessionTableVersion] = None
+    useCompiledQueryCache: Optional[bool] = Field(
+        default=None,
+        description="Reuse the printed ClickHouse SQL of an identical earlier query. Enabled unless set to false.",
+    )
 
 
 class HogQueryResponse(BaseModel):
@@ -1047,7 +1051,15 @@ class TestCachedBasicQueryResponse(BaseModel):
         description="Query error. Returned only if 'explain' or `modifiers.debug` is true. Throws an error otherwise.",
     )
     hogql: Optional[str] = Field(default=None, description="Generated HogQL query.")
+    incremental_calculations: Optional[int] = Field(
+        default=None,
+        description="How many times only the latest intervals were recalculated since `last_full_calculation`",
+    )
     is_cached: bool
+    last_full_calculation: Optional[AwareDatetime] = Field(
+        default=None,
+        description="When the results were last calculated in full, rather than only their latest intervals",
+    )
     last_refresh: AwareDatetime
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
@@ -1345,7 +1357,15 @@ class CachedActorsQueryResponse(BaseModel):
     )
     hasMore: Optional[bool] = None
     hogql: str = Field(..., description="Generated HogQL query.")
+    incremental_calculations: Optional[int] = Field(
+        default=None,
+        description="How many times only the latest intervals were recalculated since `last_full_calculation`",
+    )
     is_cached: bool
+    last_full_calculation: Optional[AwareDatetime] = Field(
+        default=None,
+        description="When the results were last calculated in full, rather than only their latest intervals",
+    )
     last_refresh: AwareDatetime
     limit: int
     missing_actors_count: Optional[int] = None
@@ -1381,7 +1401,15 @@ class CachedEventsQueryResponse(BaseModel):
     )
     hasMore: Optional[bool] = None
     hogql: str = Field(..., description="Generated HogQL query.")
+    incremental_calculations: Optional[int] = Field(
+        default=None,
+        description="How many times only the latest intervals were recalculated since `last_full_calculation`",
+    )
     is_cached: bool
+    last_full_calculation: Optional[AwareDatetime] = Field(
+        default=None,
+        description="When the results were last calculated in full, rather than only their latest intervals",
+    )
     last_refresh: AwareDatetime
     limit: Optional[int] = None
     modifiers: Optional[HogQLQueryModifiers] = Field(
@@ -1416,7 +1444,15 @@ class CachedFunnelCorrelationResponse(BaseModel):
     )
     hasMore: Optional[bool] = None
     hogql: Optional[str] = Field(default=None, description="Generated HogQL query.")
+    incremental_calculations: Optional[int] = Field(
+        default=None,
+        description="How many times only the latest intervals were recalculated since `last_full_calculation`",
+    )
     is_cached: bool
+    last_full_calculation: Optional[AwareDatetime] = Field(
+        default=None,
+        description="When the results were last calculated in full, rather than only their latest intervals",
+    )
     last_refresh: AwareDatetime
     limit: Optional[int] = None
     modifiers: Optional[HogQLQueryModifiers] = Field(
@@ -1449,7 +1485,15 @@ class CachedFunnelsQueryResponse(BaseModel):
         description="Query error. Returned only if 'explain' or `modifiers.debug` is true. Throws an error otherwise.",
     )
     hogql: Optional[str] = Field(default=None, description="Generated HogQL query.")
+    incremental_calculations: Optional[int] = Field(
+        default=None,
+        description="How many times only the latest intervals were recalculated since `last_full_calculation`",
+    )
     is_cached: bool
+    last_full_calculation: Optional[AwareDatetime] = Field(
+        default=None,
+        description="When the results were last calculated in full, rather than only their latest intervals",
+    )
     last_refresh: AwareDatetime
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
@@ -1477,8 +1521,16 @@ class CachedInsightActorsQueryOptionsResponse(BaseModel):
     )
     compare: Optional[list[CompareItem]] = None
     day: Optional[list[DayItem]] = None
+    incremental_calculations: Optional[int] = Field(
+        default=None,
+        description="How many times only the latest intervals were recalculated since `last_full_calculation`",
+    )
     interval: Optional[list[IntervalItem]] = None
     is_cached: bool
+    last_full_calculation: Optional[AwareDatetime] = Field(
+        default=None,
+        description="When the results were last calculated in full, rather than only their latest intervals",
+    )
     last_refresh: AwareDatetime
     next_allowed_client_refresh: AwareDatetime
     query_status: Optional[QueryStatus] = Field(
@@ -1503,7 +1555,15 @@ class CachedLifecycleQueryResponse(BaseModel):
         description="Query error. Returned only if 'explain' or `modifiers.debug` is true. Throws an error otherwise.",
     )
     hogql: Optional[str] = Field(default=None, description="Generated HogQL query.")
+    incremental_calculations: Optional[int] = Field(
+        default=None,
+        description="How many times only the latest intervals were recalculated since `last_full_calculation`",
+    )
     is_cached: bool
+    last_full_calculation: Optional[AwareDatetime] = Field(
+        default=None,
+        description="When the results were last calculated in full, rather than only their latest intervals",
+    )
     last_refresh: AwareDatetime
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
@@ -1533,7 +1593,15 @@ class CachedPathsQueryResponse(BaseModel):
         description="Query error. Returned only if 'explain' or `modifiers.debug` is true. Throws an error otherwise.",
     )
     hogql: Optional[str] = Field(default=None, description="Generated HogQL query.")
+    incremental_calculations: Optional[int] = Field(
+        default=None,
+        description="How many times only the latest intervals were recalculated since `last_full_calculation`",
+    )
     is_cached: bool
+    last_full_calculation: Optional[AwareDatetime] = Field(
+        default=None,
+        description="When the results were last calculated in full, rather than only their latest intervals",
+    )
     last_refresh: AwareDatetime
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
@@ -1564,7 +1632,15 @@ class CachedSessionsTimelineQueryResponse(BaseModel):
     )
     hasMore: Optional[bool] = None
     hogql: Optional[str] = Field(default=None, description="Generated HogQL query.")
+    incremental_calculations: Optional[int] = Field(
+        default=None,
+        description="How many times only the latest intervals were recalculated since `last_full_calculation`",
+    )
     is_cached: bool
+    last_full_calculation: Optional[AwareDatetime] = Field(
+        default=None,
+        description="When the results were last calculated in full, rather than only their latest intervals",
+    )
     last_refresh: AwareDatetime
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
@@ -1594,7 +1670,15 @@ class CachedStickinessQueryResponse(BaseModel):
         description="Query error. Returned only if 'explain' or `modifiers.debug` is true. Throws an error otherwise.",
     )
     hogql: Optional[str] = Field(default=None, description="Generated HogQL query.")
+    incremental_calculations: Optional[int] = Field(
+        default=None,
+        description="How many times only the latest intervals were recalculated since `last_full_calculation`",
+    )
     is_cached: bool
+    last_full_calculation: Optional[AwareDatetime] = Field(
+        default=None,
+        description="When the results were last calculated in full, rather than only their latest intervals",
+    )
     last_refresh: AwareDatetime
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
@@ -1624,7 +1708,15 @@ class CachedTrendsQueryResponse(BaseModel):
         description="Query error. Returned only if 'explain' or `modifiers.debug` is true. Throws an error otherwise.",
     )
     hogql: Optional[str] = Field(default=None, description="Generated HogQL query.")
+    incremental_calculations: Optional[int] = Field(
+        default=None,
+        description="How many times only the latest intervals were recalculated since `last_full_calculation`",
+    )
     is_cached: bool
+    last_full_calculation: Optional[AwareDatetime] = Field(
+        default=None,
+        description="When the results were last calculated in full, rather than only their latest intervals",
+    )
     last_refresh: AwareDatetime
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
@@ -1656,7 +1748,15 @@ class CachedWebOverviewQueryResponse(BaseModel):
         description="Query error. Returned only if 'explain' or `modifiers.debug` is true. Throws an error otherwise.",
     )
     hogql: Optional[str] = Field(default=None, description="Generated HogQL query.")
+    incremental_calculations: Optional[int] = Field(
+        default=None,
+        description="How many times only the latest intervals were recalculated since `last_full_calculation`",
+    )
     is_cached: bool
+    last_full_calculation: Optional[AwareDatetime] = Field(
+        default=None,
+        description="When the results were last calculated in full, rather than only their latest intervals",
+    )
     last_refresh: AwareDatetime
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
@@ -1689,7 +1789,15 @@ class CachedWebStatsTableQueryResponse(BaseModel):
     )
     hasMore: Optional[bool] = None
     hogql: Optional[str] = Field(default=None, description="Generated HogQL query.")
+    incremental_calculations: Optional[int] = Field(
+        default=None,
+        description="How many times only the latest intervals were recalculated since `last_full_calculation`",
+    )
     is_cached: bool
+    last_full_calculation: Optional[AwareDatetime] = Field(
+        default=None,
+        description="When the results were last calculated in full, rather than only their latest intervals",
+    )
     last_refresh: AwareDatetime
     limit: Optional[int] = None
     modifiers: Optional[HogQLQueryModifiers] = Field(
@@ -1724,7 +1832,15 @@ class CachedWebTopClicksQueryResponse(BaseModel):
         description="Query error. Returned only if 'explain' or `modifiers.debug` is true. Throws an error otherwise.",
     )
     hogql: Optional[str] = Field(default=None, description="Generated HogQL query.")
+    incremental_calculations: Optional[int] = Field(
+        default=None,
+        description="How many times only the latest intervals were recalculated since `last_full_calculation`",
+    )
     is_cached: bool
+    last_full_calculation: Optional[AwareDatetime] = Field(
+        default=None,
+        description="When the results were last calculated in full, rather than only their latest intervals",
+    )
     last_refresh: AwareDatetime
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
@@ -2042,7 +2158,15 @@ class GenericCachedQueryResponse(BaseModel):
     calculation_trigger: Optional[str] = Field(
         default=None, description="What triggered the calculation of the query, leave empty if user/immediate"
     )
+    incremental_calculations: Optional[int] = Field(
+        default=None,
+        description="How many times only the latest intervals were recalculated since `last_full_calculation`",
+    )
     is_cached: bool
+    last_full_calculation: Optional[AwareDatetime] = Field(
+        default=None,
+        description="When the results were last calculated in full, rather than only their latest intervals",
+    )
     last_refresh: AwareDatetime
     next_allowed_client_refresh: AwareDatetime
     query_status: Optional[QueryStatus] = Field(
@@ -2801,7 +2925,15 @@ class CachedHogQLQueryResponse(BaseModel):
     explain: Optional[list[str]] = Field(default=None, description="Query explanation output")
     hasMore: Optional[bool] = None
     hogql: Optional[str] = Field(default=None, description="Generated HogQL query.")
+    incremental_calculations: Optional[int] = Field(
+        default=None,
+        description="How many times only the latest intervals were recalculated since `last_full_calculation`",
+    )
     is_cached: bool
+    last_full_calculation: Optional[AwareDatetime] = Field(
+        default=None,
+        description="When the results were last calculated in full, rather than only their latest intervals",
+    )
     last_refresh: AwareDatetime
     limit: Optional[int] = None
     metadata: Optional[HogQLMetadataResponse] = Field(default=None, description="Query metadata output")
@@ -2836,7 +2968,15 @@ class CachedRetentionQueryResponse(BaseModel):
         description="Query error. Returned only if 'explain' or `modifiers.debug` is true. Throws an error otherwise.",
     )
     hogql: Optional[str] = Field(default=None, description="Generated HogQL query.")
+    incremental_calculations: Optional[int] = Field(
+        default=None,
+        description="How many times only the latest intervals were recalculated since `last_full_calculation`",
+    )
     is_cached: bool
+    last_full_calculation: Optional[AwareDatetime] = Field(
+        default=None,
+        description="When the results were last calculated in full, rather than only their latest intervals",
+    )
     last_refresh: AwareDatetime
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
@@ -13,7 +13,7 @@ import posthoganalytics
 import requests
 from django.contrib.auth.models import AnonymousUser
 from django.core.cache import cache
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from drf_spectacular.utils import extend_schema
 from loginas.utils import is_impersonated_session
 from rest_framework import exceptions, request, serializers, viewsets
@@ -50,12 +50,19 @@ from posthog.rate_limit import (
 )
 from posthog.session_recordings.queries.session_replay_events import SessionReplayEvents
 from posthog.session_recordings.realtime_snapshots import get_realtime_snapshots, publish_subscription
+from posthog.session_recordings.snapshot_blob_cache import (
+    CachedBlob,
+    UnsatisfiableRange,
+    get_snapshot_blob_cache,
+    parse_byte_range,
+)
 from ee.session_recordings.session_summary.summarize_session import summarize_recording
 from ee.session_recordings.ai.similar_recordings import similar_recordings
 from ee.session_recordings.ai.error_clustering import error_clustering
 from posthog.session_recordings.snapshots.convert_legacy_snapshots import convert_original_version_lts_recording
 from posthog.storage import object_storage
 from prometheus_client import Counter
+from sentry_sdk import capture_exception
 
 
 SNAPSHOT_SOURCE_REQUESTED = Counter(
@@ -79,6 +86,12 @@ STREAM_RESPONSE_TO_CLIENT_HISTOGRAM = Histogram(
     "Time taken to stream a session snapshot to the client",
 )
 
+SNAPSHOT_BLOB_CACHE_REQUESTS = Counter(
+    "session_snapshots_blob_cache_requests_counter",
+    "Blob snapshot requests by whether they were served from the local blob cache",
+    labelnames=["result"],
+)
+
 
 class SurrogatePairSafeJSONEncoder(JSONEncoder):
     def encode(self, o):
@@ -608,7 +621,8 @@ class SessionRecordingViewSet(TeamAndOrgViewSetMixin, viewsets.GenericViewSet):
             raise exceptions.ValidationError("clustered errors is not enabled for this user")
 
         # Clustering will eventually be done during a scheduled background task
-        clusters = error_clustering(self.team)
+        # until then, only new errors are clustered unless a refresh is asked for
+        clusters = error_clustering(self.team, incremental=not refresh_clusters)
 
         if clusters:
             cache.set(cache_key, clusters, settings.CACHED_RESULTS_TTL)
@@ -619,24 +633,30 @@ class SessionRecordingViewSet(TeamAndOrgViewSetMixin, viewsets.GenericViewSet):
 
     def _stream_blob_to_client(
         self, recording: SessionRecording, request: request.Request, event_properties: dict
-    ) -> HttpResponse:
+    ) -> HttpResponse | StreamingHttpResponse:
         blob_key = request.GET.get("blob_key", "")
         self._validate_blob_key(blob_key)
 
-        # very short-lived pre-signed URL
-        with GENERATE_PRE_SIGNED_URL_HISTOGRAM.time():
-            if recording.object_storage_path:
-                if recording.storage_version == "2023-08-01":
-                    file_key = f"{recording.object_storage_path}/{blob_key}"
-                else:
-                    # this is a legacy recording, we need to load the file from the old path
-                    file_key = convert_original_version_lts_recording(recording)
+        if recording.object_storage_path:
+            if recording.storage_version == "2023-08-01":
+                file_key = f"{recording.object_storage_path}/{blob_key}"
             else:
-                blob_prefix = settings.OBJECT_STORAGE_SESSION_RECORDING_BLOB_INGESTION_FOLDER
-                file_key = f"{blob_prefix}/team_id/{self.team.pk}/session_id/{recording.session_id}/data/{blob_key}"
-            url = object_storage.get_presigned_url(file_key, expiration=60)
-            if not url:
-                raise exceptions.NotFound("Snapshot file not found")
+                # this is a legacy recording, we need to load the file from the old path
+                file_key = convert_original_version_lts_recording(recording)
+        else:
+            blob_prefix = settings.OBJECT_STORAGE_SESSION_RECORDING_BLOB_INGESTION_FOLDER
+            file_key = f"{blob_prefix}/team_id/{self.team.pk}/session_id/{recording.session_id}/data/{blob_key}"
+
+        blob_cache = get_snapshot_blob_cache()
+        cached_blob = blob_cache.get(file_key) if blob_cache else None
+
+        url = None
+        if not cached_blob:
+            # very short-lived pre-signed URL
+            with GENERATE_PRE_SIGNED_URL_HISTOGRAM.time():
+                url = object_storage.get_presigned_url(file_key, expiration=60)
+                if not url:
+                    raise exceptions.NotFound("Snapshot file not found")
 
         event_properties["source"] = "blob"
         event_properties["blob_key"] = blob_key
@@ -647,6 +667,13 @@ class SessionRecordingViewSet(TeamAndOrgViewSetMixin, viewsets.GenericViewSet):
         )
 
         with STREAM_RESPONSE_TO_CLIENT_HISTOGRAM.time():
+            if cached_blob:
+                SNAPSHOT_BLOB_CACHE_REQUESTS.labels(result="hit").inc()
+                return self._send_cached_blob_to_client(cached_blob, request)
+
+            if blob_cache:
+                SNAPSHOT_BLOB_CACHE_REQUESTS.labels(result="miss").inc()
+
             # streams the file from S3 to the client
             # will not decompress the possibly large file because of `stream=True`
             #
@@ -663,27 +690,105 @@ class SessionRecordingViewSet(TeamAndOrgViewSetMixin, viewsets.GenericViewSet):
             if if_none_match:
                 headers["If-None-Match"] = ensure_not_weak(if_none_match)
 
+            # with the blob cache we load the whole blob into it and serve the range from there,
+            # otherwise object storage can serve the range itself
+            range_header = request.headers.get("Range")
+            if range_header and not blob_cache:
+                headers["Range"] = range_header
+
+            assert url is not None
             with stream_from(url=url, headers=headers) as streaming_response:
-                streaming_response.raise_for_status()
+                if streaming_response.status_code == 416:
+                    response = HttpResponse(status=416)
+                    response["Content-Range"] = streaming_response.headers.get("Content-Range", "")
+                    return response
 
-                response = HttpResponse(content=streaming_response.raw, status=streaming_response.status_code)
+                streaming_response.raise_for_status()
 
                 etag = streaming_response.headers.get("ETag")
-                if etag:
-                    response["ETag"] = ensure_not_weak(etag)
+                content_length = streaming_response.headers.get("Content-Length")
+                if (
+                    blob_cache
+                    and streaming_response.status_code == 200
+                    and etag
+                    and blob_cache.can_cache(int(content_length) if content_length else None)
+                ):
+                    try:
+                        cached_blob = blob_cache.put(
+                            file_key,
+                            etag=etag,
+                            cache_control=streaming_response.headers.get("Cache-Control"),
+                            content=streaming_response.raw,
+                        )
+                    except OSError as e:
+                        # e.g. the cache's disk is full, which shouldn't stop the blob from being served
+                        capture_exception(e)
+                    else:
+                        return self._send_cached_blob_to_client(cached_blob, request)
+
+                    if streaming_response.raw.tell():
+                        # part of the blob was already read into the cache, so it is streamed from the start again
+                        with stream_from(url=url, headers=headers) as streaming_response:
+                            streaming_response.raise_for_status()
+                            return self._send_streamed_blob_to_client(streaming_response)
+
+                return self._send_streamed_blob_to_client(streaming_response)
+
+    def _send_streamed_blob_to_client(self, streaming_response: requests.Response) -> HttpResponse:
+        response = HttpResponse(content=streaming_response.raw, status=streaming_response.status_code)
+
+        etag = streaming_response.headers.get("ETag")
+        if etag:
+            response["ETag"] = ensure_not_weak(etag)
+
+        content_range = streaming_response.headers.get("Content-Range")
+        if content_range:
+            response["Content-Range"] = content_range
+
+        # blobs are immutable, _really_ we can cache forever
+        # but let's cache for an hour since people won't re-watch too often
+        # we're setting cache control and ETag which might be considered overkill,
+        # but it helps avoid network latency from the client to PostHog, then to object storage, and back again
+        # when a client has a fresh copy
+        response["Cache-Control"] = streaming_response.headers.get("Cache-Control") or "max-age=3600"
+
+        response["Content-Type"] = "application/json"
+        response["Content-Disposition"] = "inline"
 
-                # blobs are immutable, _really_ we can cache forever
-                # but let's cache for an hour since people won't re-watch too often
-                # we're setting cache control and ETag which might be considered overkill,
-                # but it helps avoid network latency from the client to PostHog, then to object storage, and back again
-                # when a client has a fresh copy
-                response["Cache-Control"] = streaming_response.headers.get("Cache-Control") or "max-age=3600"
+        return response
 
-                response["Content-Type"] = "application/json"
-                response["Content-Disposition"] = "inline"
+    def _send_cached_blob_to_client(
+        self, cached_blob: CachedBlob, request: request.Request
+    ) -> HttpResponse | StreamingHttpResponse:
+        response: HttpResponse | StreamingHttpResponse
+        etag = ensure_not_weak(cached_blob.etag)
+        if_none_match = request.headers.get("If-None-Match")
 
+        if if_none_match and ensure_not_weak(if_none_match).strip('"') == etag.strip('"'):
+            cached_blob.file.close()
+            response = HttpResponse(status=304)
+        else:
+            try:
+                byte_range = parse_byte_range(request.headers.get("Range"), cached_blob.size)
+            except UnsatisfiableRange:
+                cached_blob.file.close()
+                response = HttpResponse(status=416)
+                response["Content-Range"] = f"bytes */{cached_blob.size}"
                 return response
 
+            start, end = byte_range or (0, cached_blob.size - 1)
+            response = StreamingHttpResponse(cached_blob.read_range(start, end), status=206 if byte_range else 200)
+            response["Content-Length"] = str(end - start + 1)
+            if byte_range:
+                response["Content-Range"] = f"bytes {start}-{end}/{cached_blob.size}"
+            response["Content-Type"] = "application/json"
+            response["Content-Disposition"] = "inline"
+
+        response["ETag"] = etag
+        response["Accept-Ranges"] = "bytes"
+        response["Cache-Control"] = cached_blob.cache_control or "max-age=3600"
+        return response
+
     def _send_realtime_snapshots_to_client(
         self, recording: SessionRecording, request: request.Request, event_properties: dict
     ) -> HttpResponse | Response:
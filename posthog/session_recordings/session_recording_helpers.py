@@ -17,7 +17,6 @@ from posthog.session_recordings.models.metadata import (
 from posthog.utils import flatten
 
 FULL_SNAPSHOT = 2
-ARBITRARY_LOOP_LIMIT = 10
 
 # NOTE: For reference here are some helpful enum mappings from rrweb
 # https://github.com/rrweb-io/rrweb/blob/master/packages/rrweb/src/types.ts
@@ -117,7 +116,7 @@ def preprocess_replay_events(
        If one message has this property, they all do (thanks to batching).
     2. If this property isn't set, we estimate the size (json.dumps) and if it is small enough - merge it all together in one event
     3. If not, we split out the "full snapshots" from the rest (they are typically bigger) and send them individually,
-            trying one more time to group the rest, otherwise sending them individually
+            then pack the rest into as few events as fit
     """
 
     if isinstance(_events, Generator):
@@ -150,10 +149,6 @@ def preprocess_replay_events(
             },
         }
 
-    def split_list(xs: list) -> list[list]:
-        mid = len(xs) // 2
-        return [xs[:mid], xs[mid:]]
-
     # 1. Group by $snapshot_bytes if any of the events have it
     if events[0]["properties"].get("$snapshot_bytes"):
         current_event: dict | None = None
@@ -181,60 +176,36 @@ def preprocess_replay_events(
 
         snapshot_data_list = list(flatten([event["properties"]["$snapshot_data"] for event in events], max_depth=1))
 
+        # Each snapshot is only serialized once to size it, lists of them are sized from that
+        snapshot_sizes = byte_sizes(snapshot_data_list)
+
         # 2. Otherwise, try and group all the events if they are small enough
-        if byte_size_dict(snapshot_data_list) < size_with_headroom:
+        if list_byte_size(snapshot_sizes) < size_with_headroom:
             event = new_event(snapshot_data_list)
             yield event
         else:
             # 3. If not, split out the full snapshots from the rest
             full_snapshots = []
             other_snapshots = []
+            other_snapshot_sizes = []
 
-            for snapshot_data in snapshot_data_list:
+            for snapshot_data, size in zip(snapshot_data_list, snapshot_sizes):
                 if snapshot_data["type"] == RRWEB_MAP_EVENT_TYPE.FullSnapshot:
                     full_snapshots.append(snapshot_data)
                 else:
                     other_snapshots.append(snapshot_data)
+                    other_snapshot_sizes.append(size)
 
             # Send the full snapshots individually
             for snapshot_data in full_snapshots:
                 event = new_event([snapshot_data])
                 yield event
 
-            # Try and group the rest
-            if byte_size_dict(other_snapshots) < size_with_headroom:
-                event = new_event(other_snapshots)
+            # Pack the rest into as few events as fit, keeping them in order. There could be tens of thousands
+            # in data from these older clients that batched poorly
+            for part in group_by_byte_size(other_snapshots, other_snapshot_sizes, size_with_headroom):
+                event = new_event(part)
                 yield event
-            else:
-                # If not, keep splitting the list until all parts fit within headroom
-                # we want to avoid sending them all individually if we can - there could be tens of thousands
-                # in data from these older clients that batched poorly
-                parts = [other_snapshots]
-                loop_count = 0
-                while parts and loop_count < ARBITRARY_LOOP_LIMIT:
-                    loop_count += 1
-                    new_parts = []
-                    for part in parts:
-                        if byte_size_dict(part) < size_with_headroom:
-                            event = new_event(part)
-                            yield event
-                        elif len(part) > 1:  # Only split if the part has more than one item
-                            new_parts.extend(split_list(part))
-                        else:
-                            # If part has only one item and still doesn't fit, yield it as is
-                            event = new_event(part)
-                            yield event
-                    parts = new_parts
-
-                # finally, in the case where the list was split ten times
-                # and there are still items probably over the headroom
-                # we have to try to emit each remaining part individually
-                # there's a strong chance these fail, but it should be
-                # the vast minority of cases, if it even does happen
-                if parts:
-                    for part in parts:
-                        event = new_event(part)
-                        yield event
 
 
 def _process_windowed_events(
@@ -310,3 +281,41 @@ def byte_size_dict(x: dict | list) -> int:
     # and deciding whether it will reject on size
     json_bytes = json_str.encode("utf-8")
     return len(json_bytes)
+
+
+def byte_sizes(xs: list) -> list[int]:
+    """
+    The size of each item as `byte_size_dict` counts it, from which `list_byte_size` sizes lists of them
+    """
+    return [byte_size_dict(x) for x in xs]
+
+
+def list_byte_size(item_sizes: list[int]) -> int:
+    """
+    The size `byte_size_dict` would count for a list of items with these sizes, without serializing it again:
+    the brackets, the items and a ", " separator between each of them
+    """
+    return 2 + sum(item_sizes) + 2 * max(len(item_sizes) - 1, 0)
+
+
+def group_by_byte_size(xs: list, item_sizes: list[int], max_size_bytes: float) -> Generator[list, None, None]:
+    """
+    Groups consecutive items into lists whose size (as `byte_size_dict` counts it) is under max_size_bytes,
+    in a single pass. An item too big to fit on its own is put in a list by itself.
+    """
+    group: list = []
+    group_size = 2  # the brackets of the list
+    for x, size in zip(xs, item_sizes):
+        # Every item after the first comes with a separator
+        additional_bytes = size + 2 if group else size
+        if group and group_size + additional_bytes >= max_size_bytes:
+            yield group
+            group = []
+            group_size = 2
+            additional_bytes = size
+
+        group.append(x)
+        group_size += additional_bytes
+
+    if group:
+        yield group
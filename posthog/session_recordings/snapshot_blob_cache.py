@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from dataclasses import dataclass
+from typing import IO, Optional
+
+import structlog
+from django.conf import settings
+from prometheus_client import Counter
+
+logger = structlog.get_logger(__name__)
+
+BLOB_CACHE_EVICTIONS = Counter(
+    "session_snapshots_blob_cache_evictions_counter",
+    "Snapshot blobs removed from the local disk cache to keep it under its size limit",
+)
+
+TEMP_FILE_PREFIX = ".tmp-"
+
+BYTE_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class UnsatisfiableRange(Exception):
+    pass
+
+
+@dataclass
+class CachedBlob:
+    file: IO[bytes]
+    # where the blob starts in the file, after the metadata line
+    offset: int
+    size: int
+    etag: str
+    cache_control: Optional[str]
+
+    def read_range(self, start: int, end: int, chunk_size: int = 64 * 1024):
+        """
+        Yields the bytes of the blob from start to end (inclusive), closing the file once done
+        """
+        try:
+            self.file.seek(self.offset + start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = self.file.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            self.file.close()
+
+
+class SnapshotBlobCache:
+    """
+    A local disk cache of snapshot blobs, so that popular recordings aren't streamed from object storage every time
+    they are watched. It is shared by all processes on a host, so the directory is the only source of truth:
+
+    * each blob is one file named by a hash of its file key, starting with a line of JSON metadata (ETag etc.)
+    * blobs are written to a temporary file and moved into place, so readers never see a partial blob
+    * reading a blob touches its modification time, and the least recently read blobs are evicted
+      once the cache grows over its size limit
+
+    Blobs are immutable once written to object storage, so a cached blob is served without asking object storage
+    whether it has changed. The ETag is kept alongside it to answer If-None-Match without a round trip.
+    """
+
+    def __init__(self, directory: str, max_size_bytes: int):
+        self.directory = directory
+        self.max_size_bytes = max_size_bytes
+
+    def _path(self, file_key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(file_key.encode("utf-8")).hexdigest())
+
+    def can_cache(self, size: Optional[int]) -> bool:
+        return size is not None and 0 <= size <= self.max_size_bytes
+
+    def get(self, file_key: str) -> Optional[CachedBlob]:
+        path = self._path(file_key)
+        try:
+            file = open(path, "rb")
+        except FileNotFoundError:
+            return None
+
+        try:
+            metadata_line = file.readline()
+            metadata = json.loads(metadata_line)
+            if metadata["file_key"] != file_key:
+                # a hash collision, treat it as a miss and let the blob be overwritten
+                file.close()
+                return None
+            size = os.fstat(file.fileno()).st_size - len(metadata_line)
+            os.utime(path)
+        except (ValueError, KeyError, OSError):
+            file.close()
+            logger.exception("snapshot_blob_cache.unreadable_entry", file_key=file_key)
+            return None
+
+        # the open file can still be read if the blob is evicted by another process while we serve it
+        return CachedBlob(
+            file=file,
+            offset=len(metadata_line),
+            size=size,
+            etag=metadata["etag"],
+            cache_control=metadata.get("cache_control"),
+        )
+
+    def put(self, file_key: str, etag: str, cache_control: Optional[str], content: IO[bytes]) -> CachedBlob:
+        """
+        Caches the blob read from content, returning it ready to be served
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        metadata = {"file_key": file_key, "etag": etag, "cache_control": cache_control}
+        metadata_line = json.dumps(metadata).encode("utf-8") + b"\n"
+
+        with tempfile.NamedTemporaryFile(dir=self.directory, prefix=TEMP_FILE_PREFIX, delete=False) as temp_file:
+            try:
+                temp_file.write(metadata_line)
+                shutil.copyfileobj(content, temp_file)
+            except Exception:
+                temp_file.close()
+                os.unlink(temp_file.name)
+                raise
+
+        # opened before it can be evicted, so that it can be served even if the cache is full of newer blobs
+        file = open(temp_file.name, "rb")
+        size = os.fstat(file.fileno()).st_size - len(metadata_line)
+        os.replace(temp_file.name, self._path(file_key))
+        self._evict()
+
+        return CachedBlob(file=file, offset=len(metadata_line), size=size, etag=etag, cache_control=cache_control)
+
+    def _evict(self) -> None:
+        entries = []
+        total_size = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.startswith(TEMP_FILE_PREFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    # evicted by another process
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_size += stat.st_size
+
+        if total_size <= self.max_size_bytes:
+            return
+
+        for _, size, path in sorted(entries):
+            try:
+                os.unlink(path)
+                BLOB_CACHE_EVICTIONS.inc()
+            except FileNotFoundError:
+                pass
+            total_size -= size
+            if total_size <= self.max_size_bytes:
+                break
+
+
+def get_snapshot_blob_cache() -> Optional[SnapshotBlobCache]:
+    if settings.SESSION_RECORDING_BLOB_CACHE_MAX_SIZE_BYTES <= 0:
+        return None
+    return SnapshotBlobCache(
+        directory=settings.SESSION_RECORDING_BLOB_CACHE_DIR,
+        max_size_bytes=settings.SESSION_RECORDING_BLOB_CACHE_MAX_SIZE_BYTES,
+    )
+
+
+def parse_byte_range(range_header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """
+    Parses a single range HTTP Range header into the first and last (inclusive) byte it asks for.
+    Returns None if the whole blob should be sent, which is allowed for headers we don't understand (e.g. multiple
+    ranges), and raises UnsatisfiableRange if the range is outside the blob.
+    """
+    if not range_header:
+        return None
+
+    match = BYTE_RANGE_PATTERN.match(range_header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+
+    first, last = match.group(1), match.group(2)
+    if first == "":
+        # a suffix range, e.g. bytes=-500 is the last 500 bytes
+        suffix_length = int(last)
+        if suffix_length == 0 or size == 0:
+            raise UnsatisfiableRange()
+        return max(size - suffix_length, 0), size - 1
+
+    start = int(first)
+    end = size - 1 if last == "" else min(int(last), size - 1)
+    if last != "" and int(last) < start:
+        return None
+    if start >= size:
+        raise UnsatisfiableRange()
+    return start, end
@@ -11,7 +11,11 @@ from pytest_mock import MockerFixture
 from posthog.session_recordings.session_recording_helpers import (
     RRWEB_MAP_EVENT_TYPE,
     SessionRecordingEventSummary,
+    byte_size_dict,
+    byte_sizes,
+    group_by_byte_size,
     is_active_event,
+    list_byte_size,
     preprocess_replay_events_for_blob_ingestion,
     split_replay_events,
 )
@@ -436,9 +440,9 @@ def test_new_ingestion_many_small_non_full_snapshots_are_separated(raw_snapshot_
     ]
     capture_output = list(mock_capture_flow(events, max_size_bytes=2000))[1]
 
-    # the list was split multiple times until likely to all fit into kafka messages
+    # the snapshots were packed into as few kafka messages as fit
     snapshot_items_lengths = [len(x["properties"]["$snapshot_items"]) for x in capture_output]
-    assert snapshot_items_lengths == [5, 6, 6, 3, 1, 2]
+    assert snapshot_items_lengths == [10, 10, 2, 1]
     assert sum(snapshot_items_lengths) == 23
 
 
@@ -477,7 +481,7 @@ def test_new_ingestion_many_small_non_full_snapshots_are_separated_without_loopi
     ]
     capture_output = list(mock_capture_flow(events, max_size_bytes=2000))[1]
 
-    # the list was split multiple times until likely to all fit into kafka messages
+    # the snapshots were packed into as few kafka messages as fit
     snapshot_items_lengths = [len(x["properties"]["$snapshot_items"]) for x in capture_output]
     # we didn't emit every item individually
     assert len(snapshot_items_lengths) < len(too_big_payload)
@@ -569,3 +573,28 @@ def test_new_ingestion_groups_using_snapshot_bytes_if_possible(raw_snapshot_even
             },
         },
     ]
+
+
+@pytest.mark.parametrize(
+    "items",
+    [
+        [],
+        [{"type": 3}],
+        [{"type": 3, "data": {"text": "héllo ☃", "values": [1, 2.5, None, True]}}, "a string", 12, [[]]],
+    ],
+)
+def test_list_byte_size_matches_serializing_the_list(items):
+    assert list_byte_size(byte_sizes(items)) == byte_size_dict(items)
+
+
+def test_group_by_byte_size_packs_consecutive_items():
+    items = [{"type": 3, "data": "x" * size} for size in [100, 100, 100, 1000, 100, 100]]
+    sizes = byte_sizes(items)
+
+    groups = list(group_by_byte_size(items, sizes, max_size_bytes=400))
+
+    # in order, each group under the max size unless an item is too big on its own
+    assert [len(group) for group in groups] == [3, 1, 2]
+    assert [item for group in groups for item in group] == items
+    assert byte_size_dict(groups[0]) < 400
+    assert byte_size_dict(groups[0] + groups[1]) >= 400
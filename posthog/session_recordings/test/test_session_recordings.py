@@ -1,7 +1,9 @@
 import json
+import tempfile
 import time
 import uuid
 from datetime import datetime, timedelta, UTC
+from io import BytesIO
 from unittest.mock import ANY, patch, MagicMock, call
 from urllib.parse import urlencode
 
@@ -787,6 +789,112 @@ class TestSessionRecordings(APIBaseTest, ClickhouseTestMixin, QueryMatchingTest)
         assert response.headers.get("etag") == "represents the file contents"  # we don't allow weak etags
         assert response.headers.get("cache-control") == "more specific cache control"
 
+    @patch(
+        "posthog.session_recordings.queries.session_replay_events.SessionReplayEvents.exists",
+        return_value=True,
+    )
+    @patch("posthog.session_recordings.session_recording_api.SessionRecording.get_or_build")
+    @patch("posthog.session_recordings.session_recording_api.object_storage.get_presigned_url")
+    @patch("posthog.session_recordings.session_recording_api.stream_from")
+    def test_can_serve_blobs_and_ranges_of_them_from_the_blob_cache(
+        self,
+        mock_stream_from,
+        mock_presigned_url,
+        mock_get_session_recording,
+        _mock_exists,
+    ) -> None:
+        session_id = str(uuid.uuid4())
+        url = f"/api/projects/{self.team.pk}/session_recordings/{session_id}/snapshots/?source=blob&blob_key=1682608337071"
+
+        mock_get_session_recording.return_value = SessionRecording(session_id=session_id, team=self.team, deleted=False)
+        mock_presigned_url.return_value = "https://test.com/"
+        streaming_response = setup_stream_from({"ETag": '"represents the file contents"', "Content-Length": "15"})
+        streaming_response.raw = BytesIO(b"Example content")
+        mock_stream_from.return_value = streaming_response
+
+        with (
+            tempfile.TemporaryDirectory() as cache_dir,
+            self.settings(SESSION_RECORDING_BLOB_CACHE_DIR=cache_dir, SESSION_RECORDING_BLOB_CACHE_MAX_SIZE_BYTES=1024),
+        ):
+            response = self.client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert b"".join(response.streaming_content) == b"Example content"
+            assert response.headers.get("content-length") == "15"
+            assert response.headers.get("accept-ranges") == "bytes"
+
+            response = self.client.get(url, HTTP_RANGE="bytes=8-")
+            assert response.status_code == status.HTTP_206_PARTIAL_CONTENT
+            assert b"".join(response.streaming_content) == b"content"
+            assert response.headers.get("content-range") == "bytes 8-14/15"
+            assert response.headers.get("etag") == '"represents the file contents"'
+
+            response = self.client.get(url, HTTP_RANGE="bytes=15-")
+            assert response.status_code == status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+            assert response.headers.get("content-range") == "bytes */15"
+
+            response = self.client.get(url, HTTP_IF_NONE_MATCH='"represents the file contents"')
+            assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        # only the first request went to object storage
+        mock_presigned_url.assert_called_once()
+        mock_stream_from.assert_called_once_with(url="https://test.com/", headers={})
+
+    @parameterized.expand([("before_reading_the_blob", 0), ("after_reading_part_of_the_blob", 8)])
+    @patch(
+        "posthog.session_recordings.queries.session_replay_events.SessionReplayEvents.exists",
+        return_value=True,
+    )
+    @patch("posthog.session_recordings.session_recording_api.SessionRecording.get_or_build")
+    @patch("posthog.session_recordings.session_recording_api.object_storage.get_presigned_url")
+    @patch("posthog.session_recordings.session_recording_api.stream_from")
+    @patch("posthog.session_recordings.session_recording_api.capture_exception")
+    def test_serves_blobs_directly_when_the_blob_cache_cant_be_written(
+        self,
+        _name: str,
+        bytes_read_before_failing: int,
+        mock_capture_exception,
+        mock_stream_from,
+        mock_presigned_url,
+        mock_get_session_recording,
+        _mock_exists,
+    ) -> None:
+        session_id = str(uuid.uuid4())
+        url = f"/api/projects/{self.team.pk}/session_recordings/{session_id}/snapshots/?source=blob&blob_key=1682608337071"
+
+        mock_get_session_recording.return_value = SessionRecording(session_id=session_id, team=self.team, deleted=False)
+        mock_presigned_url.return_value = "https://test.com/"
+        streaming_responses = []
+        for _ in range(2):
+            streaming_response = setup_stream_from(
+                {"ETag": '"represents the file contents"', "Content-Length": "15", "Cache-Control": "max-age=60"}
+            )
+            streaming_response.raw = BytesIO(b"Example content")
+            streaming_responses.append(streaming_response)
+        mock_stream_from.side_effect = streaming_responses
+
+        def put_failing_with_a_full_disk(file_key, etag, cache_control, content):
+            content.read(bytes_read_before_failing)
+            raise OSError(28, "No space left on device")
+
+        with (
+            tempfile.TemporaryDirectory() as cache_dir,
+            self.settings(SESSION_RECORDING_BLOB_CACHE_DIR=cache_dir, SESSION_RECORDING_BLOB_CACHE_MAX_SIZE_BYTES=1024),
+            patch(
+                "posthog.session_recordings.snapshot_blob_cache.SnapshotBlobCache.put",
+                side_effect=put_failing_with_a_full_disk,
+            ),
+        ):
+            response = self.client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == b"Example content"
+        assert response.headers.get("etag") == '"represents the file contents"'
+        assert response.headers.get("cache-control") == "max-age=60"
+        assert response.headers.get("content-type") == "application/json"
+        mock_capture_exception.assert_called_once()
+        # the blob is only streamed again if reading part of it into the cache used it up
+        assert mock_stream_from.call_count == (2 if bytes_read_before_failing else 1)
+
     @patch(
         "posthog.session_recordings.queries.session_replay_events.SessionReplayEvents.exists",
         return_value=True,
@@ -0,0 +1,97 @@
+import os
+from io import BytesIO
+
+import pytest
+
+from posthog.session_recordings.snapshot_blob_cache import (
+    SnapshotBlobCache,
+    UnsatisfiableRange,
+    parse_byte_range,
+)
+
+
+def read_all(cache: SnapshotBlobCache, file_key: str) -> bytes | None:
+    cached_blob = cache.get(file_key)
+    if cached_blob is None:
+        return None
+    return b"".join(cached_blob.read_range(0, cached_blob.size - 1))
+
+
+def test_can_get_a_cached_blob(tmp_path) -> None:
+    cache = SnapshotBlobCache(directory=str(tmp_path), max_size_bytes=1024)
+
+    assert cache.get("session_recordings/a") is None
+
+    cached_blob = cache.put("session_recordings/a", etag='"abc"', cache_control=None, content=BytesIO(b"a blob\n{}"))
+    assert b"".join(cached_blob.read_range(0, cached_blob.size - 1)) == b"a blob\n{}"
+
+    cached_blob = cache.get("session_recordings/a")
+    assert cached_blob is not None
+    assert cached_blob.etag == '"abc"'
+    assert cached_blob.size == len(b"a blob\n{}")
+    assert b"".join(cached_blob.read_range(2, 5)) == b"blob"
+
+
+def test_evicts_least_recently_read_blobs(tmp_path) -> None:
+    cache = SnapshotBlobCache(directory=str(tmp_path), max_size_bytes=350)
+
+    for i, file_key in enumerate(["a", "b", "c"]):
+        cache.put(file_key, etag=file_key, cache_control=None, content=BytesIO(b"x" * 50)).file.close()
+        # modification times can be too coarse to tell the writes apart
+        os.utime(cache._path(file_key), (i, i))
+
+    cached_blob = cache.get("a")
+    assert cached_blob is not None
+    cached_blob.file.close()
+
+    # each entry is the blob plus its metadata, so this doesn't fit alongside all three
+    cache.put("d", etag="d", cache_control=None, content=BytesIO(b"x" * 50)).file.close()
+
+    assert read_all(cache, "b") is None
+    assert read_all(cache, "a") == b"x" * 50
+    assert read_all(cache, "c") == b"x" * 50
+    assert read_all(cache, "d") == b"x" * 50
+
+
+def test_can_serve_a_blob_evicted_while_it_is_cached(tmp_path) -> None:
+    cache = SnapshotBlobCache(directory=str(tmp_path), max_size_bytes=10)
+
+    # the metadata alone is larger than the cache
+    cached_blob = cache.put("a", etag="a", cache_control=None, content=BytesIO(b"the blob"))
+
+    assert cache.get("a") is None
+    assert b"".join(cached_blob.read_range(0, cached_blob.size - 1)) == b"the blob"
+
+
+def test_can_cache_only_blobs_of_known_size_that_fit(tmp_path) -> None:
+    cache = SnapshotBlobCache(directory=str(tmp_path), max_size_bytes=100)
+
+    assert cache.can_cache(100)
+    assert not cache.can_cache(101)
+    assert not cache.can_cache(None)
+
+
+@pytest.mark.parametrize(
+    "range_header,expected",
+    [
+        (None, None),
+        ("bytes=0-9", (0, 9)),
+        ("bytes=10-", (10, 99)),
+        ("bytes=90-200", (90, 99)),
+        ("bytes=-10", (90, 99)),
+        ("bytes=-200", (0, 99)),
+        # we don't serve multiple ranges, or ones we don't understand, so the whole blob is sent
+        ("bytes=0-9,20-29", None),
+        ("bytes=9-0", None),
+        ("lines=0-9", None),
+        ("bytes=-", None),
+    ],
+)
+def test_parse_byte_range(range_header: str | None, expected: tuple[int, int] | None) -> None:
+    assert parse_byte_range(range_header, size=100) == expected
+
+
+@pytest.mark.parametrize("range_header", ["bytes=100-", "bytes=200-300", "bytes=-0"])
+def test_parse_unsatisfiable_byte_range(range_header: str) -> None:
+    with pytest.raises(UnsatisfiableRange):
+        parse_byte_range(range_header, size=100)
@@ -111,6 +111,64 @@ IN_UNIT_TESTING: bool = get_from_env("IN_UNIT_TESTING", False, type_cast=str_to_
 
 HOGQL_INCREASED_MAX_EXECUTION_TIME: int = get_from_env("HOGQL_INCREASED_MAX_EXECUTION_TIME", 600, type_cast=int)
 
+# Bounds for the in-process cache of parsed HogQL ASTs. Set max entries to 0 to disable the cache.
+HOGQL_PARSE_CACHE_MAX_ENTRIES: int = get_from_env("HOGQL_PARSE_CACHE_MAX_ENTRIES", 2048, type_cast=int)
+# Total length of the cached source strings, used as a proxy for the memory held by the cached ASTs
+HOGQL_PARSE_CACHE_MAX_CHARS: int = get_from_env("HOGQL_PARSE_CACHE_MAX_CHARS", 4_000_000, type_cast=int)
+
+# In-process cache of per-team HogQL databases. Entries are invalidated on schema changes and expire after the TTL,
+# which bounds how long changes made outside of Django (e.g. new group types) take to show up. Set TTL to 0 to disable.
+# Off in tests, which change teams in ways that don't invalidate it.
+HOGQL_DATABASE_CACHE_TTL_SECONDS: int = get_from_env(
+    "HOGQL_DATABASE_CACHE_TTL_SECONDS", 0 if TEST else 60, type_cast=int
+)
+HOGQL_DATABASE_CACHE_MAX_ENTRIES: int = get_from_env("HOGQL_DATABASE_CACHE_MAX_ENTRIES", 256, type_cast=int)
+
+# In-process cache of printed ClickHouse SQL for identical HogQL queries. Some inputs of the printer (property types,
+# materialized columns) change without invalidating it, so it's off in tests and entries are short-lived elsewhere.
+HOGQL_COMPILED_QUERY_CACHE_TTL_SECONDS: int = get_from_env(
+    "HOGQL_COMPILED_QUERY_CACHE_TTL_SECONDS", 0 if TEST else 60, type_cast=int
+)
+HOGQL_COMPILED_QUERY_CACHE_MAX_ENTRIES: int = get_from_env(
+    "HOGQL_COMPILED_QUERY_CACHE_MAX_ENTRIES", 1024, type_cast=int
+)
+HOGQL_COMPILED_QUERY_CACHE_MAX_CHARS: int = get_from_env(
+    "HOGQL_COMPILED_QUERY_CACHE_MAX_CHARS", 20_000_000, type_cast=int
+)
+
+# Concurrent cache misses for the same query wait for a single calculation instead of all hitting ClickHouse.
+# The lock outlives the longest expected query; waiters give up after the wait timeout (0 disables single-flight).
+QUERY_SINGLE_FLIGHT_LOCK_TIMEOUT_SECONDS: int = get_from_env(
+    "QUERY_SINGLE_FLIGHT_LOCK_TIMEOUT_SECONDS", 300, type_cast=int
+)
+QUERY_SINGLE_FLIGHT_WAIT_TIMEOUT_SECONDS: int = get_from_env(
+    "QUERY_SINGLE_FLIGHT_WAIT_TIMEOUT_SECONDS", 180, type_cast=int
+)
+
+# In-process cache of query results in front of Redis, invalidated over pub/sub when a newer result is written.
+# Entries live until the result is due a refresh, capped by the TTL. Off in tests, as they clear the Django cache.
+QUERY_LOCAL_CACHE_TTL_SECONDS: int = get_from_env("QUERY_LOCAL_CACHE_TTL_SECONDS", 0 if TEST else 60, type_cast=int)
+QUERY_LOCAL_CACHE_MAX_ENTRIES: int = get_from_env("QUERY_LOCAL_CACHE_MAX_ENTRIES", 1000, type_cast=int)
+QUERY_LOCAL_CACHE_MAX_BYTES: int = get_from_env("QUERY_LOCAL_CACHE_MAX_BYTES", 200_000_000, type_cast=int)
+
+# Scheduled insight refreshes recalculate trends only from when they were last calculated, going back this many hours
+# further for events that were ingested late
+QUERY_INCREMENTAL_REFRESH_MARGIN_HOURS: int = get_from_env("QUERY_INCREMENTAL_REFRESH_MARGIN_HOURS", 24, type_cast=int)
+# They're calculated in full again once this many hours, or this many incremental refreshes, have passed since they
+# last were, and whenever the actions or cohorts they use change
+QUERY_INCREMENTAL_FULL_CALCULATION_HOURS: int = get_from_env(
+    "QUERY_INCREMENTAL_FULL_CALCULATION_HOURS", 24, type_cast=int
+)
+QUERY_INCREMENTAL_MAX_CALCULATIONS: int = get_from_env("QUERY_INCREMENTAL_MAX_CALCULATIONS", 24, type_cast=int)
+
+# Insights' queries (e.g. one per trends series) run on a thread pool shared by the whole process, at most this many at
+# once, and at most this many at once for any one team
+QUERY_EXECUTOR_MAX_WORKERS: int = get_from_env("QUERY_EXECUTOR_MAX_WORKERS", 32, type_cast=int)
+QUERY_EXECUTOR_MAX_WORKERS_PER_TEAM: int = get_from_env("QUERY_EXECUTOR_MAX_WORKERS_PER_TEAM", 8, type_cast=int)
+
+# The ClickHouse queries collecting usage reports run concurrently on the offline cluster, at most this many at once
+USAGE_REPORT_MAX_CONCURRENT_QUERIES: int = get_from_env("USAGE_REPORT_MAX_CONCURRENT_QUERIES", 4, type_cast=int)
+
 # Extend and override these settings with EE's ones
 if "ee.apps.EnterpriseConfig" in INSTALLED_APPS:
     from ee.settings import *  # noqa: F401, F403
@@ -27,6 +27,10 @@ EVENTS_DEAD_LETTER_QUEUE_STATSD_METRIC = "events_added_to_dead_letter_queue"
 
 QUOTA_LIMITING_ENABLED = get_from_env("QUOTA_LIMITING_ENABLED", False, type_cast=str_to_bool)
 
+# Whether, when served over ASGI, capture requests skip the middleware and go to the async capture view, which awaits
+# Kafka acks rather than blocking a thread on them
+CAPTURE_ASYNC_VIEW_ENABLED = get_from_env("CAPTURE_ASYNC_VIEW_ENABLED", False, type_cast=str_to_bool)
+
 # Capture-side overflow detection for analytics events.
 # Not accurate enough, superseded by detection in plugin-server and should be phased out.
 PARTITION_KEY_AUTOMATIC_OVERRIDE_ENABLED = get_from_env(
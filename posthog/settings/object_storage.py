@@ -30,3 +30,5 @@ OBJECT_STORAGE_SESSION_RECORDING_LTS_FOLDER = os.getenv(
 )
 OBJECT_STORAGE_EXPORTS_FOLDER = os.getenv("OBJECT_STORAGE_EXPORTS_FOLDER", "exports")
 OBJECT_STORAGE_MEDIA_UPLOADS_FOLDER = os.getenv("OBJECT_STORAGE_MEDIA_UPLOADS_FOLDER", "media_uploads")
+# how many requests the object storage client makes at once, e.g. when copying all the files of a recording
+OBJECT_STORAGE_MAX_CONCURRENCY = get_from_env("OBJECT_STORAGE_MAX_CONCURRENCY", 8, type_cast=int)
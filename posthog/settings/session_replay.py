@@ -1,4 +1,8 @@
+import os
+import tempfile
+
 from posthog.settings import get_from_env, get_list
+from posthog.settings.base_variables import TEST
 from posthog.utils import str_to_bool
 
 # TRICKY: we saw unusual memory usage behavior in EU clickhouse cluster
@@ -26,6 +30,13 @@ REPLAY_EMBEDDINGS_CLUSTERING_DBSCAN_EPS = get_from_env("REPLAY_EMBEDDINGS_CLUSTE
 REPLAY_EMBEDDINGS_CLUSTERING_DBSCAN_MIN_SAMPLES = get_from_env(
     "REPLAY_EMBEDDINGS_CLUSTERING_DBSCAN_MIN_SAMPLES", 10, type_cast=int
 )
+# the largest state of incremental error clustering cached for a team, before Redis compresses it
+REPLAY_EMBEDDINGS_CLUSTERING_MAX_STATE_BYTES = get_from_env(
+    "REPLAY_EMBEDDINGS_CLUSTERING_MAX_STATE_BYTES", 50_000_000, type_cast=int
+)
+# the in-memory nearest neighbour indexes of recording embeddings kept by each process, and their total size
+REPLAY_EMBEDDINGS_INDEX_MAX_TEAMS = get_from_env("REPLAY_EMBEDDINGS_INDEX_MAX_TEAMS", 20, type_cast=int)
+REPLAY_EMBEDDINGS_INDEX_MAX_BYTES = get_from_env("REPLAY_EMBEDDINGS_INDEX_MAX_BYTES", 256_000_000, type_cast=int)
 
 REPLAY_MESSAGE_TOO_LARGE_SAMPLE_RATE = get_from_env("REPLAY_MESSAGE_TOO_LARGE_SAMPLE_RATE", 0, type_cast=float)
 REPLAY_MESSAGE_TOO_LARGE_SAMPLE_BUCKET = get_from_env(
@@ -41,3 +52,13 @@ REPLAY_MESSAGE_TOO_LARGE_SAMPLE_BUCKET = get_from_env(
 # gzip is the current default in production
 # TODO we can clean this up once we've tested the new gzip-in-capture compression and don't need a setting
 SESSION_RECORDING_KAFKA_COMPRESSION = get_from_env("SESSION_RECORDING_KAFKA_COMPRESSION", "gzip")
+
+# snapshot blobs are cached on local disk, so that popular recordings aren't streamed from object storage repeatedly
+# the least recently watched blobs are evicted once the cache is larger than SESSION_RECORDING_BLOB_CACHE_MAX_SIZE_BYTES
+# setting it to 0 disables the cache
+SESSION_RECORDING_BLOB_CACHE_DIR = get_from_env(
+    "SESSION_RECORDING_BLOB_CACHE_DIR", os.path.join(tempfile.gettempdir(), "posthog-snapshot-blobs")
+)
+SESSION_RECORDING_BLOB_CACHE_MAX_SIZE_BYTES = get_from_env(
+    "SESSION_RECORDING_BLOB_CACHE_MAX_SIZE_BYTES", 0 if TEST else 1024 * 1024 * 1024, type_cast=int
+)
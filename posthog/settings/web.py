@@ -132,6 +132,10 @@ else:
 
 # Max size of a POST body (for event ingestion)
 DATA_UPLOAD_MAX_MEMORY_SIZE = 20971520  # 20 MB
+# Max size of a POST body once decompressed, so that a small gzip bomb can't exhaust a worker's memory
+DATA_UPLOAD_MAX_DECOMPRESSED_SIZE = get_from_env(
+    "DATA_UPLOAD_MAX_DECOMPRESSED_SIZE", 10 * DATA_UPLOAD_MAX_MEMORY_SIZE, type_cast=int
+)
 
 ROOT_URLCONF = "posthog.urls"
 
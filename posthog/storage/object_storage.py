@@ -1,14 +1,38 @@
 import abc
-from typing import Optional, Union
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from io import BytesIO
+from typing import IO, Optional, Union
 
 import structlog
 from boto3 import client
+from boto3.s3.transfer import TransferConfig
 from botocore.client import Config
 from django.conf import settings
+from prometheus_client import Counter, Histogram
 from sentry_sdk import capture_exception
 
 logger = structlog.get_logger(__name__)
 
+# File objects are uploaded in parts of this size, so that at most
+# MULTIPART_UPLOAD_CONCURRENCY parts of them are held in memory at once
+MULTIPART_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+MULTIPART_UPLOAD_CONCURRENCY = 4
+
+OBJECT_STORAGE_COPY_OBJECTS_HISTOGRAM = Histogram(
+    "object_storage_copy_objects_histogram",
+    "Time taken to copy all the objects under a prefix to another prefix",
+)
+
+OBJECT_STORAGE_OBJECTS_COPIED_COUNTER = Counter(
+    "object_storage_objects_copied_counter",
+    "Objects copied from one prefix to another",
+)
+
+OBJECT_STORAGE_MULTIPART_WRITES_COUNTER = Counter(
+    "object_storage_multipart_writes_counter",
+    "Writes of content large enough to be uploaded in parts",
+)
+
 
 class ObjectStorageError(Exception):
     pass
@@ -42,7 +66,10 @@ class ObjectStorageClient(metaclass=abc.ABCMeta):
         pass
 
     @abc.abstractmethod
-    def write(self, bucket: str, key: str, content: Union[str, bytes], extras: dict | None) -> None:
+    def write(self, bucket: str, key: str, content: Union[str, bytes, IO[bytes]], extras: dict | None) -> None:
+        """
+        Write content to the key. File objects are streamed from their current position using a multipart upload.
+        """
         pass
 
     @abc.abstractmethod
@@ -72,7 +99,7 @@ class UnavailableStorage(ObjectStorageClient):
     def tag(self, bucket: str, key: str, tags: dict[str, str]) -> None:
         pass
 
-    def write(self, bucket: str, key: str, content: Union[str, bytes], extras: dict | None) -> None:
+    def write(self, bucket: str, key: str, content: Union[str, bytes, IO[bytes]], extras: dict | None) -> None:
         pass
 
     def copy_objects(self, bucket: str, source_prefix: str, target_prefix: str) -> int | None:
@@ -155,10 +182,23 @@ class ObjectStorage(ObjectStorageClient):
             capture_exception(e)
             raise ObjectStorageError("tag failed") from e
 
-    def write(self, bucket: str, key: str, content: Union[str, bytes], extras: dict | None) -> None:
+    def write(self, bucket: str, key: str, content: Union[str, bytes, IO[bytes]], extras: dict | None) -> None:
         s3_response = {}
         try:
-            s3_response = self.aws_client.put_object(Bucket=bucket, Body=content, Key=key, **(extras or {}))
+            if isinstance(content, str | bytes):
+                s3_response = self.aws_client.put_object(Bucket=bucket, Body=content, Key=key, **(extras or {}))
+            else:
+                self.aws_client.upload_fileobj(
+                    content,
+                    bucket,
+                    key,
+                    ExtraArgs=extras,
+                    Config=TransferConfig(
+                        multipart_threshold=MULTIPART_UPLOAD_CHUNK_SIZE,
+                        multipart_chunksize=MULTIPART_UPLOAD_CHUNK_SIZE,
+                        max_concurrency=MULTIPART_UPLOAD_CONCURRENCY,
+                    ),
+                )
         except Exception as e:
             logger.exception(
                 "object_storage.write_failed",
@@ -191,6 +231,67 @@ class ObjectStorage(ObjectStorageClient):
             return None
 
 
+class ConcurrentObjectStorage(ObjectStorage):
+    """
+    Spends less time waiting on S3 round trips by making up to max_concurrency requests at once
+    (the boto3 client is thread-safe), and by uploading large writes in parts
+    """
+
+    def __init__(self, aws_client, max_concurrency: int) -> None:
+        super().__init__(aws_client)
+        self.max_concurrency = max_concurrency
+
+    def write(self, bucket: str, key: str, content: Union[str, bytes, IO[bytes]], extras: dict | None) -> None:
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        if isinstance(content, bytes) and len(content) > MULTIPART_UPLOAD_CHUNK_SIZE:
+            # uploaded as a file object, in parts of MULTIPART_UPLOAD_CHUNK_SIZE
+            content = BytesIO(content)
+            OBJECT_STORAGE_MULTIPART_WRITES_COUNTER.inc()
+        super().write(bucket, key, content, extras)
+
+    def _list_all_objects(self, bucket: str, prefix: str) -> list[str]:
+        # unlike list_objects, this isn't limited to the first page of 1000 keys
+        paginator = self.aws_client.get_paginator("list_objects_v2")
+        pages = paginator.paginate(Bucket=bucket, Prefix=prefix)
+        return [obj["Key"] for page in pages for obj in page.get("Contents", [])]
+
+    def copy_objects(self, bucket: str, source_prefix: str, target_prefix: str) -> int | None:
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        try:
+            with OBJECT_STORAGE_COPY_OBJECTS_HISTOGRAM.time():
+                source_objects = self._list_all_objects(bucket, source_prefix)
+
+                futures = [
+                    executor.submit(
+                        self.aws_client.copy,
+                        {"Bucket": bucket, "Key": object_key},
+                        bucket,
+                        object_key.replace(source_prefix.rstrip("/"), target_prefix),
+                        # the executor already bounds how many requests are made at once
+                        Config=TransferConfig(use_threads=False),
+                    )
+                    for object_key in source_objects
+                ]
+                for future in as_completed(futures):
+                    future.result()
+                    OBJECT_STORAGE_OBJECTS_COPIED_COUNTER.inc()
+
+            return len(source_objects)
+        except Exception as e:
+            logger.exception(
+                "object_storage.copy_objects_failed",
+                source_prefix=source_prefix,
+                target_prefix=target_prefix,
+                error=e,
+            )
+            capture_exception(e)
+            return None
+        finally:
+            # don't keep copying once one copy has failed
+            executor.shutdown(cancel_futures=True)
+
+
 _client: ObjectStorageClient = UnavailableStorage()
 
 
@@ -200,7 +301,7 @@ def object_storage_client() -> ObjectStorageClient:
     if not settings.OBJECT_STORAGE_ENABLED:
         _client = UnavailableStorage()
     elif isinstance(_client, UnavailableStorage):
-        _client = ObjectStorage(
+        _client = ConcurrentObjectStorage(
             client(
                 "s3",
                 endpoint_url=settings.OBJECT_STORAGE_ENDPOINT,
@@ -210,15 +311,23 @@ def object_storage_client() -> ObjectStorageClient:
                     signature_version="s3v4",
                     connect_timeout=1,
                     retries={"max_attempts": 1},
+                    # enough connections for concurrent requests and the parts of a multipart upload
+                    max_pool_connections=settings.OBJECT_STORAGE_MAX_CONCURRENCY + MULTIPART_UPLOAD_CONCURRENCY,
                 ),
                 region_name=settings.OBJECT_STORAGE_REGION,
-            )
+            ),
+            max_concurrency=settings.OBJECT_STORAGE_MAX_CONCURRENCY,
         )
 
     return _client
 
 
-def write(file_name: str, content: Union[str, bytes], extras: dict | None = None, bucket: str | None = None) -> None:
+def write(
+    file_name: str,
+    content: Union[str, bytes, IO[bytes]],
+    extras: dict | None = None,
+    bucket: str | None = None,
+) -> None:
     return object_storage_client().write(
         bucket=bucket or settings.OBJECT_STORAGE_BUCKET,
         key=file_name,
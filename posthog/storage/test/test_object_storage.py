@@ -1,5 +1,6 @@
 import uuid
-from unittest.mock import patch
+from io import BytesIO
+from unittest.mock import MagicMock, patch
 
 from boto3 import resource
 from botocore.client import Config
@@ -11,6 +12,8 @@ from posthog.settings import (
     OBJECT_STORAGE_SECRET_ACCESS_KEY,
 )
 from posthog.storage.object_storage import (
+    MULTIPART_UPLOAD_CHUNK_SIZE,
+    ConcurrentObjectStorage,
     health_check,
     read,
     write,
@@ -60,6 +63,19 @@ class TestStorage(APIBaseTest):
             write(file_name, b"my content")
             self.assertEqual(read(file_name), "my content")
 
+    def test_write_and_read_works_with_file_content(self) -> None:
+        with self.settings(OBJECT_STORAGE_ENABLED=True):
+            file_name = f"{TEST_BUCKET}/test_write_and_read_works_with_file_content/{uuid.uuid4()}"
+            write(file_name, BytesIO(b"my content"))
+            self.assertEqual(read(file_name), "my content")
+
+    def test_write_and_read_works_with_content_uploaded_in_parts(self) -> None:
+        with self.settings(OBJECT_STORAGE_ENABLED=True):
+            file_name = f"{TEST_BUCKET}/test_write_and_read_works_with_content_uploaded_in_parts/{uuid.uuid4()}"
+            content = "a" * (MULTIPART_UPLOAD_CHUNK_SIZE * 2 + 1)
+            write(file_name, content)
+            self.assertEqual(read(file_name), content)
+
     def test_can_generate_presigned_url_for_existing_file(self) -> None:
         with self.settings(OBJECT_STORAGE_ENABLED=True):
             session_id = str(uuid.uuid4())
@@ -157,3 +173,32 @@ class TestStorage(APIBaseTest):
                 "test_storage_bucket/a_shared_prefix/b",
                 "test_storage_bucket/a_shared_prefix/c",
             ]
+
+    def test_concurrent_copy_objects_copies_every_page_of_objects(self) -> None:
+        aws_client = MagicMock()
+        aws_client.get_paginator.return_value.paginate.return_value = [
+            {"Contents": [{"Key": f"a_shared_prefix/{i}"} for i in range(1000)]},
+            {"Contents": [{"Key": "a_shared_prefix/1000"}]},
+        ]
+
+        copied_count = ConcurrentObjectStorage(aws_client, max_concurrency=4).copy_objects(
+            bucket="bucket", source_prefix="a_shared_prefix/", target_prefix="the_destination/folder"
+        )
+
+        assert copied_count == 1001
+        assert sorted(call.args[2] for call in aws_client.copy.call_args_list) == sorted(
+            f"the_destination/folder/{i}" for i in range(1001)
+        )
+
+    def test_concurrent_copy_objects_fails_if_any_copy_fails(self) -> None:
+        aws_client = MagicMock()
+        aws_client.get_paginator.return_value.paginate.return_value = [
+            {"Contents": [{"Key": f"a_shared_prefix/{i}"} for i in range(3)]},
+        ]
+        aws_client.copy.side_effect = [None, Exception("copy failed"), None]
+
+        copied_count = ConcurrentObjectStorage(aws_client, max_concurrency=2).copy_objects(
+            bucket="bucket", source_prefix="a_shared_prefix/", target_prefix="the_destination/folder"
+        )
+
+        assert copied_count is None
@@ -1,7 +1,10 @@
+import csv
 import datetime
 import io
-from typing import Any, Optional
-from collections.abc import Generator
+import itertools
+import tempfile
+from typing import IO, Any, Optional
+from collections.abc import Generator, Iterator
 from urllib.parse import parse_qsl, quote, urlencode, urlparse, urlunparse
 
 from pydantic import BaseModel
@@ -33,6 +36,9 @@ logger = structlog.get_logger(__name__)
 RESULT_LIMIT_KEYS = ("distinct_ids",)
 RESULT_LIMIT_LENGTH = 10
 
+# Rendered exports are kept in memory up to this size and spill over to disk beyond it
+EXPORT_SPOOL_MAX_SIZE = 5 * 1024 * 1024
+
 
 # SUPPORTED CSV TYPES
 
@@ -54,9 +60,9 @@ RESULT_LIMIT_LENGTH = 10
 # HOW DOES THIS WORK
 # 1. We receive an export task with a given resource uri (identical to the API)
 # 2. We call the actual API to load the data with the given params so that we receive a paginateable response
-# 3. We save the response to a chunk in object storage and then load the `next` page of results
+# 3. We render the rows of the response to a temporary file and then load the `next` page of results
 # 4. Repeat until exhausted or limit reached
-# 5. We save the final blob output and update the ExportedAsset
+# 5. We upload the file to object storage and update the ExportedAsset
 
 
 def add_query_params(url: str, params: dict[str, str]) -> str:
@@ -284,60 +290,85 @@ def get_from_hogql_query(exported_asset: ExportedAsset, limit: int, resource: di
 
 
 def _export_to_dict(exported_asset: ExportedAsset, limit: int) -> Any:
+    """
+    Returns the renderer, the first rows of the export (from which the header is inferred),
+    the iterator over the rest of them and the render context.
+    """
     resource = exported_asset.export_context
 
     columns: list[str] = resource.get("columns", [])
-    returned_rows: Generator[Any, None, None]
+    returned_rows: Iterator[Any]
 
     if resource.get("source"):
         returned_rows = get_from_hogql_query(exported_asset, limit, resource)
     else:
         returned_rows = get_from_insights_api(exported_asset, limit, resource)
 
-    all_csv_rows = list(returned_rows)
+    first_csv_row = next(returned_rows, None)
     renderer = OrderedCsvRenderer()
-    render_context = {}
+    render_context: dict[str, Any] = {}
     if columns:
         render_context["header"] = columns
 
-    if len(all_csv_rows):
-        # NOTE: This is not ideal as some rows _could_ have different keys
-        # Ideally we would extend the csvrenderer to supported keeping the order in place
-        is_any_col_list_or_dict = [x for x in all_csv_rows[0].values() if isinstance(x, dict) or isinstance(x, list)]
+    if first_csv_row is not None:
+        is_any_col_list_or_dict = [x for x in first_csv_row.values() if isinstance(x, dict) or isinstance(x, list)]
         if not is_any_col_list_or_dict:
             # If values are serialised then keep the order of the keys, else allow it to be unordered
-            renderer.header = all_csv_rows[0].keys()
+            render_context["group_fields"] = False
+        csv_rows = itertools.chain([first_csv_row], returned_rows)
     else:
         # If we have no rows, that means we couldn't convert anything, so put something to avoid confusion
-        all_csv_rows = [{"error": "No data available or unable to format for export."}]
+        csv_rows = iter([{"error": "No data available or unable to format for export."}])
 
-    return renderer, all_csv_rows, render_context
+    return renderer, csv_rows, render_context
 
 
 def _export_to_csv(exported_asset: ExportedAsset, limit: int) -> None:
-    renderer, all_csv_rows, render_context = _export_to_dict(exported_asset, limit)
+    renderer, csv_rows, render_context = _export_to_dict(exported_asset, limit)
 
-    rendered_csv_content = renderer.render(all_csv_rows, renderer_context=render_context)
-    save_content(exported_asset, rendered_csv_content)
+    with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE) as output:
+        _write_csv(
+            renderer.tablize(
+                csv_rows,
+                header=render_context.get("header"),
+                group_fields=render_context.get("group_fields", True),
+            ),
+            output,
+        )
+        output.seek(0)
+        save_content(exported_asset, output)
+
+
+def _write_csv(table: Iterator[list[Any]], output: IO[bytes]) -> None:
+    # The same output as `OrderedCsvRenderer.render`, without building the whole of it in a string first
+    text_output = io.TextIOWrapper(output, encoding="utf-8", newline="")
+    csv.writer(text_output).writerows(table)
+    text_output.detach()
 
 
 def _export_to_excel(exported_asset: ExportedAsset, limit: int) -> None:
-    output = io.BytesIO()
+    renderer, csv_rows, render_context = _export_to_dict(exported_asset, limit)
+
+    with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE) as output:
+        _write_excel(renderer.tablize(csv_rows, header=render_context.get("header")), output)
+        output.seek(0)
+        save_content(exported_asset, output)
 
-    workbook = Workbook()
-    worksheet = workbook.active
 
-    renderer, all_csv_rows, render_context = _export_to_dict(exported_asset, limit)
+def _write_excel(table: Iterator[list[Any]], output: IO[bytes]) -> None:
+    # Write-only workbooks write their rows out as they are appended instead of keeping every cell in memory
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet()
 
-    for row_num, row_data in enumerate(renderer.tablize(all_csv_rows, header=render_context.get("header"))):
-        for col_num, value in enumerate(row_data):
-            if value is not None and not isinstance(value, str | int | float | bool):
-                value = str(value)
-            worksheet.cell(row=row_num + 1, column=col_num + 1, value=value)
+    for row_data in table:
+        worksheet.append(
+            [
+                str(value) if value is not None and not isinstance(value, str | int | float | bool) else value
+                for value in row_data
+            ]
+        )
 
     workbook.save(output)
-    output.seek(0)
-    save_content(exported_asset, output.getvalue())
 
 
 def get_limit_param_key(path: str) -> str:
@@ -1,18 +1,29 @@
 import itertools
+import pickle
+import tempfile
 from collections import OrderedDict
 from typing import Any
 from collections.abc import Generator
 
-from more_itertools import unique_everseen
 from rest_framework_csv.renderers import CSVRenderer
 
+# Flattened rows are kept in memory up to this size while the header is built, and spill over to disk beyond it
+TABLIZE_SPOOL_MAX_SIZE = 5 * 1024 * 1024
+
 
 class OrderedCsvRenderer(
     CSVRenderer,
 ):
-    def tablize(self, data: Any, header: Any = None, labels: Any = None) -> Generator:
+    def tablize(self, data: Any, header: Any = None, labels: Any = None, group_fields: bool = True) -> Generator:
         """
         Convert a list of data into a table.
+
+        `data` can be any iterable of rows. They're flattened and spooled to a
+        temporary file while the header is built from the keys of all of them,
+        and then replayed, so that the rows don't have to be held in memory.
+
+        Without `group_fields`, the header keeps the order the keys were first
+        seen in rather than grouping the fields flattened from the same key.
         """
         if not header and hasattr(data, "header"):
             header = data.header
@@ -20,44 +31,53 @@ class OrderedCsvRenderer(
         if not data:
             return []
 
-        # First, flatten the data (i.e., convert it to a list of
-        # dictionaries that are each exactly one level deep).  The key for
-        # each item designates the name of the column that the item will
-        # fall into.
-        data = tuple(self.flatten_data(data))
-
-        # Get the set of all unique headers, and sort them.
-        unique_fields = list(unique_everseen(itertools.chain(*(item.keys() for item in data))))
-
-        ordered_fields: dict[str, Any] = OrderedDict()
-        for item in unique_fields:
-            field = item.split(".")
-            field = field[0]
-            if field in ordered_fields:
-                ordered_fields[field].append(item)
+        with tempfile.SpooledTemporaryFile(max_size=TABLIZE_SPOOL_MAX_SIZE) as spool:
+            # First, flatten the data (i.e., convert it to a list of
+            # dictionaries that are each exactly one level deep).  The key for
+            # each item designates the name of the column that the item will
+            # fall into.
+            unique_fields: dict[str, None] = {}
+            for item in self.flatten_data(data):
+                unique_fields.update(dict.fromkeys(item))
+                pickle.dump(item, spool, protocol=pickle.HIGHEST_PROTOCOL)
+
+            ordered_fields: dict[str, Any] = OrderedDict()
+            for item in unique_fields:
+                field = item.split(".")
+                field = field[0]
+                if field in ordered_fields:
+                    ordered_fields[field].append(item)
+                else:
+                    ordered_fields[field] = [item]
+
+            if group_fields:
+                flat_ordered_fields = list(itertools.chain(*ordered_fields.values()))
             else:
-                ordered_fields[field] = [item]
-
-        flat_ordered_fields = list(itertools.chain(*ordered_fields.values()))
-        if not header:
-            field_headers = flat_ordered_fields
-        else:
-            field_headers = header
-            for single_header in field_headers:
-                if single_header in flat_ordered_fields or single_header not in ordered_fields:
-                    continue
-
-                pos_single_header = field_headers.index(single_header)
-                field_headers.remove(single_header)
-                field_headers[pos_single_header:pos_single_header] = ordered_fields[single_header]
-
-        # Return your "table", with the headers as the first row.
-        if labels:
-            yield [labels.get(x, x) for x in field_headers]
-        else:
-            yield field_headers
-
-        # Create a row for each dictionary, filling in columns for which the
-        # item has no data with None values.
-        for item in data:
-            yield [item.get(key, None) for key in field_headers]
+                flat_ordered_fields = list(unique_fields)
+            if not header:
+                field_headers = flat_ordered_fields
+            else:
+                field_headers = header
+                for single_header in field_headers:
+                    if single_header in flat_ordered_fields or single_header not in ordered_fields:
+                        continue
+
+                    pos_single_header = field_headers.index(single_header)
+                    field_headers.remove(single_header)
+                    field_headers[pos_single_header:pos_single_header] = ordered_fields[single_header]
+
+            # Return your "table", with the headers as the first row.
+            if labels:
+                yield [labels.get(x, x) for x in field_headers]
+            else:
+                yield field_headers
+
+            # Create a row for each dictionary, filling in columns for which the
+            # item has no data with None values.
+            spool.seek(0)
+            while True:
+                try:
+                    item = pickle.load(spool)
+                except EOFError:
+                    break
+                yield [item.get(key, None) for key in field_headers]
@@ -283,6 +283,47 @@ class TestCSVExporter(APIBaseTest):
                 ("2", "Safari", "event_name", None),
             ]
 
+    @patch("posthog.models.exported_asset.UUIDT")
+    @patch.object(csv_exporter, "EXPORT_SPOOL_MAX_SIZE", 10)
+    def test_csv_exporter_streams_exports_larger_than_the_spool_to_object_storage(self, mocked_uuidt) -> None:
+        exported_asset = self._create_asset()
+        mocked_uuidt.return_value = "a-guid"
+
+        with self.settings(OBJECT_STORAGE_ENABLED=True, OBJECT_STORAGE_EXPORTS_FOLDER="Test-Exports"):
+            csv_exporter.export_tabular(exported_asset)
+
+            assert exported_asset.content is None
+            content = object_storage.read(exported_asset.content_location)
+            assert (
+                content
+                == "id,distinct_id,properties.$browser,event,timestamp,person,elements_chain\r\ne9ca132e-400f-4854-a83c-16c151b2f145,2,Safari,event_name,2022-07-06T19:37:43.095295+00:00,,\r\n1624228e-a4f1-48cd-aabc-6baa3ddb22e4,2,Safari,event_name,2022-07-06T19:37:43.095279+00:00,,\r\n66d45914-bdf5-4980-a54a-7dc699bdcce9,2,Safari,event_name,2022-07-06T19:37:43.095262+00:00,,\r\n"
+            )
+
+    def test_csv_exporter_keeps_columns_only_later_rows_have(self) -> None:
+        for pages, expected_content in [
+            (
+                [[{"a": 1, "p": {"x": 1}}], [{"a": 2, "p": {"x": 2, "y": 3}}]],
+                b"a,p.x,p.y\r\n1,1,\r\n2,2,3\r\n",
+            ),
+            # the order of the keys of serialized values is kept
+            ([[{"b": 1, "a": 1}], [{"b": 2, "a": 2, "c": 3}]], b"b,a,c\r\n1,1,\r\n2,2,3\r\n"),
+        ]:
+            exported_asset = self._create_asset()
+
+            with patch("posthog.tasks.exports.csv_exporter.requests.request") as patched_request:
+                mock_response = Mock()
+                mock_response.status_code = 200
+                mock_response.json.side_effect = [
+                    {"next": "http://testserver/api/literally/anything?page=2", "results": pages[0]},
+                    {"next": None, "results": pages[1]},
+                ]
+                patched_request.return_value = mock_response
+
+                with self.settings(OBJECT_STORAGE_ENABLED=False):
+                    csv_exporter.export_tabular(exported_asset)
+
+            assert exported_asset.content == expected_content
+
     @patch("posthog.models.exported_asset.UUIDT")
     @patch("posthog.models.exported_asset.object_storage.write")
     @patch("requests.request")
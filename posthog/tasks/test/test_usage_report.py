@@ -42,6 +42,12 @@ from posthog.tasks.usage_report import (
     _get_teams_for_usage_reports,
     capture_event,
     get_instance_metadata,
+    get_teams_with_billable__personful_event_,
+    get_teams_with_billable_enhanced_persons_event_count_in_period,
+    get_teams_with_billable_event_count_in_period,
+    get_teams_with_event_count_with_groups_in_period,
+    get_teams_with_event_counters_in_period,
+    get_teams_with_survey_responses_count_in_period,
     send_all_org_usage_reports,
 )
 from posthog.test.base import (
@@ -677,6 +683,34 @@ class UsageReport(APIBaseTest, ClickhouseTestMixin, ClickhouseDestroyTablesMixin
         assert mock_posthog.capture.call_count == 2
         mock_posthog.capture.assert_has_calls(calls, any_order=True)
 
+    @freeze_time("2022-01-10T00:01:00Z")
+    def test_event_counters_match_counting_them_separately(self) -> None:
+        self._create_sample_usage_data()
+        period_start, period_end = get_previous_day()
+
+        counters = get_teams_with_event_counters_in_period(period_start, period_end)
+
+        assert {key: sorted(rows) for key, rows in counters.items()} == {
+            "teams_with_event_count_in_period": sorted(
+                get_teams_with_billable_event_count_in_period(period_start, period_end, count_distinct=True)
+            ),
+            "teams_with_enhanced_persons_event_count_in_period": sorted(
+                get_teams_with_billable_enhanced_persons_event_count_in_period(
+                    period_start, period_end, count_distinct=True
+                )
+            ),
+            "teams_with__personful_event_": sorted(
+                get_teams_with_billable__personful_event_(period_start, period_end, count_distinct=True)
+            ),
+            "teams_with_event_count_with_groups_in_period": sorted(
+                get_teams_with_event_count_with_groups_in_period(period_start, period_end)
+            ),
+            "teams_with_survey_responses_count_in_period": sorted(
+                get_teams_with_survey_responses_count_in_period(period_start, period_end)
+            ),
+        }
+        assert counters["teams_with_event_count_in_period"]
+
 
 @freeze_time("2022-01-09T00:01:00Z")
 class ReplayUsageReport(APIBaseTest, ClickhouseTestMixin, ClickhouseDestroyTablesMixin):
@@ -823,7 +857,8 @@ class TestFeatureFlagsUsageReport(ClickhouseDestroyTablesMixin, TestCase, Clickh
         )
         flush_persons_and_events()
 
-        with self.settings(DECIDE_BILLING_ANALYTICS_TOKEN="correct"):
+        # One query at a time, so that they are snapshotted in a stable order
+        with self.settings(DECIDE_BILLING_ANALYTICS_TOKEN="correct", USAGE_REPORT_MAX_CONCURRENT_QUERIES=1):
             period = get_previous_day(at=now() + relativedelta(days=1))
             period_start, period_end = period
             all_reports = _get_all_org_reports(period_start, period_end)
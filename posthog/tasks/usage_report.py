@@ -1,8 +1,11 @@
 import dataclasses
 import os
+import time
 from collections import Counter
-from collections.abc import Sequence
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from typing import Any, Literal, Optional, TypedDict, Union, cast
 
 import requests
@@ -19,6 +22,7 @@ from sentry_sdk import capture_exception
 
 from posthog import version_requirement
 from posthog.clickhouse.client.connection import Workload
+from posthog.clickhouse.query_tagging import get_query_tags, reset_query_tags, tag_queries
 from posthog.client import sync_execute
 from posthog.cloud_utils import get_cached_instance_license, is_cloud
 from posthog.constants import FlagRequestType
@@ -628,6 +632,51 @@ def get_teams_with_rows_synced_in_period(begin: datetime, end: datetime) -> list
     return results
 
 
+@timed_log()
+@retry(tries=QUERY_RETRIES, delay=QUERY_RETRY_DELAY, backoff=QUERY_RETRY_BACKOFF)
+def get_teams_with_event_counters_in_period(begin: datetime, end: datetime) -> dict[str, list[tuple[int, int]]]:
+    """
+    Counts everything the usage report counts on the events table in a single scan of the period,
+    rather than scanning it once per counter. Returns the rows the matching `get_teams_with_*` function
+    would (with `count_distinct=True` where it applies) for each key of the usage data.
+    """
+    results = sync_execute(
+        """
+        WITH (event != '$feature_flag_called' AND event NOT IN ('survey sent', 'survey shown', 'survey dismissed')) AS is_billable,
+             (person_mode IN ('full', 'force_upgrade')) AS is_enhanced_persons
+        SELECT team_id,
+            uniqExactIf(toDate(timestamp), event, cityHash64(distinct_id), cityHash64(uuid), is_billable) AS event_count,
+            uniqExactIf(toDate(timestamp), event, cityHash64(distinct_id), cityHash64(uuid), is_billable AND is_enhanced_persons) AS enhanced_persons_event_count,
+            uniqExactIf(
+                toDate(timestamp), event, cityHash64(distinct_id), cityHash64(uuid),
+                is_billable AND is_enhanced_persons AND JSONExtractBool(properties, '$is_identified') = 0 AND JSONExtractString(properties, '$lib') = 'web'
+            ) AS personful_event_count,
+            countIf($group_0 != '' OR $group_1 != '' OR $group_2 != '' OR $group_3 != '' OR $group_4 != '') AS event_count_with_groups,
+            countIf(event = 'survey sent') AS survey_responses_count
+        FROM events
+        WHERE timestamp between %(begin)s AND %(end)s
+        GROUP BY team_id
+    """,
+        {"begin": begin, "end": end},
+        workload=Workload.OFFLINE,
+        settings=CH_BILLING_SETTINGS,
+    )
+
+    # Teams only get a row for the counters they have events for, as with separate queries
+    return {
+        key: [(row[0], row[index + 1]) for row in results if row[index + 1]]
+        for index, key in enumerate(
+            (
+                "teams_with_event_count_in_period",
+                "teams_with_enhanced_persons_event_count_in_period",
+                "teams_with__personful_event_",
+                "teams_with_event_count_with_groups_in_period",
+                "teams_with_survey_responses_count_in_period",
+            )
+        )
+    }
+
+
 @shared_task(**USAGE_REPORT_TASK_KWARGS, max_retries=0)
 def capture_report(
     capture_event_name: str,
@@ -673,156 +722,208 @@ def convert_team_usage_rows_to_dict(rows: list[Union[dict, tuple[int, int]]]) ->
     return team_id_map
 
 
+def _run_usage_queries_concurrently(
+    executor: ThreadPoolExecutor, queries: dict[str, Callable[[], Any]]
+) -> dict[str, Future[Any]]:
+    """
+    Submits the (independent) queries to the executor, timing how long each of them takes to run once it starts.
+    The queries run with the query tags of the calling thread.
+    """
+    query_tags = get_query_tags()
+
+    def run(key: str, query: Callable[[], Any]) -> Any:
+        tag_queries(**query_tags)
+        start = time.perf_counter()
+        try:
+            return query()
+        finally:
+            logger.info(
+                "usage_report.query_finished",
+                usage_data_key=key,
+                duration_ms=round((time.perf_counter() - start) * 1000, 1),
+            )
+            reset_query_tags()
+
+    return {key: executor.submit(run, key, query) for key, query in queries.items()}
+
+
 def _get_all_usage_data(period_start: datetime, period_end: datetime) -> dict[str, Any]:
     """
     Gets all usage data for the specified period. Clickhouse is good at counting things so
-    we count across all teams rather than doing it one by one
+    we count across all teams rather than doing it one by one. Counters on the events table are
+    counted in a single scan, and the ClickHouse queries run concurrently while Postgres is queried.
     """
-    return {
-        "teams_with_event_count_in_period": get_teams_with_billable_event_count_in_period(
-            period_start, period_end, count_distinct=True
-        ),
-        "teams_with_enhanced_persons_event_count_in_period": get_teams_with_billable_enhanced_persons_event_count_in_period(
-            period_start, period_end, count_distinct=True
-        ),
-        "teams_with__personful_event_": get_teams_with_billable__personful_event_(
-            period_start, period_end, count_distinct=True
-        ),
-        "teams_with_event_count_with_groups_in_period": get_teams_with_event_count_with_groups_in_period(
-            period_start, period_end
-        ),
-        "teams_with_recording_count_in_period": get_teams_with_recording_count_in_period(
-            period_start, period_end, snapshot_source="web"
-        ),
-        "teams_with_mobile_recording_count_in_period": get_teams_with_recording_count_in_period(
-            period_start, period_end, snapshot_source="mobile"
-        ),
-        "teams_with_decide_requests_count_in_period": get_teams_with_feature_flag_requests_count_in_period(
-            period_start, period_end, FlagRequestType.DECIDE
-        ),
-        "teams_with_local_evaluation_requests_count_in_period": get_teams_with_feature_flag_requests_count_in_period(
-            period_start, period_end, FlagRequestType.LOCAL_EVALUATION
-        ),
-        "teams_with_group_types_total": list(
-            GroupTypeMapping.objects.values("team_id").annotate(total=Count("id")).order_by("team_id")
+    clickhouse_queries: dict[str, Callable[[], Any]] = {
+        "teams_with_event_counters_in_period": partial(
+            get_teams_with_event_counters_in_period, period_start, period_end
         ),
-        "teams_with_dashboard_count": list(
-            Dashboard.objects.values("team_id").annotate(total=Count("id")).order_by("team_id")
+        "teams_with_recording_count_in_period": partial(
+            get_teams_with_recording_count_in_period, period_start, period_end, snapshot_source="web"
         ),
-        "teams_with_dashboard_template_count": list(
-            Dashboard.objects.filter(creation_mode="template")
-            .values("team_id")
-            .annotate(total=Count("id"))
-            .order_by("team_id")
+        "teams_with_mobile_recording_count_in_period": partial(
+            get_teams_with_recording_count_in_period, period_start, period_end, snapshot_source="mobile"
         ),
-        "teams_with_dashboard_shared_count": list(
-            Dashboard.objects.filter(sharingconfiguration__enabled=True)
-            .values("team_id")
-            .annotate(total=Count("id"))
-            .order_by("team_id")
+        "teams_with_decide_requests_count_in_period": partial(
+            get_teams_with_feature_flag_requests_count_in_period, period_start, period_end, FlagRequestType.DECIDE
         ),
-        "teams_with_dashboard_tagged_count": list(
-            Dashboard.objects.filter(tagged_items__isnull=False)
-            .values("team_id")
-            .annotate(total=Count("id"))
-            .order_by("team_id")
-        ),
-        "teams_with_ff_count": list(
-            FeatureFlag.objects.values("team_id").annotate(total=Count("id")).order_by("team_id")
-        ),
-        "teams_with_ff_active_count": list(
-            FeatureFlag.objects.filter(active=True).values("team_id").annotate(total=Count("id")).order_by("team_id")
+        "teams_with_local_evaluation_requests_count_in_period": partial(
+            get_teams_with_feature_flag_requests_count_in_period,
+            period_start,
+            period_end,
+            FlagRequestType.LOCAL_EVALUATION,
         ),
-        "teams_with_hogql_app_bytes_read": get_teams_with_hogql_metric(
+        "teams_with_hogql_app_bytes_read": partial(
+            get_teams_with_hogql_metric,
             period_start,
             period_end,
             metric="read_bytes",
             query_types=["hogql_query", "HogQLQuery"],
             access_method="",
         ),
-        "teams_with_hogql_app_rows_read": get_teams_with_hogql_metric(
+        "teams_with_hogql_app_rows_read": partial(
+            get_teams_with_hogql_metric,
             period_start,
             period_end,
             metric="read_rows",
             query_types=["hogql_query", "HogQLQuery"],
             access_method="",
         ),
-        "teams_with_hogql_app_duration_ms": get_teams_with_hogql_metric(
+        "teams_with_hogql_app_duration_ms": partial(
+            get_teams_with_hogql_metric,
             period_start,
             period_end,
             metric="query_duration_ms",
             query_types=["hogql_query", "HogQLQuery"],
             access_method="",
         ),
-        "teams_with_hogql_api_bytes_read": get_teams_with_hogql_metric(
+        "teams_with_hogql_api_bytes_read": partial(
+            get_teams_with_hogql_metric,
             period_start,
             period_end,
             metric="read_bytes",
             query_types=["hogql_query", "HogQLQuery"],
             access_method="personal_api_key",
         ),
-        "teams_with_hogql_api_rows_read": get_teams_with_hogql_metric(
+        "teams_with_hogql_api_rows_read": partial(
+            get_teams_with_hogql_metric,
             period_start,
             period_end,
             metric="read_rows",
             query_types=["hogql_query", "HogQLQuery"],
             access_method="personal_api_key",
         ),
-        "teams_with_hogql_api_duration_ms": get_teams_with_hogql_metric(
+        "teams_with_hogql_api_duration_ms": partial(
+            get_teams_with_hogql_metric,
             period_start,
             period_end,
             metric="query_duration_ms",
             query_types=["hogql_query", "HogQLQuery"],
             access_method="personal_api_key",
         ),
-        "teams_with_event_explorer_app_bytes_read": get_teams_with_hogql_metric(
+        "teams_with_event_explorer_app_bytes_read": partial(
+            get_teams_with_hogql_metric,
             period_start,
             period_end,
             metric="read_bytes",
             query_types=["EventsQuery"],
             access_method="",
         ),
-        "teams_with_event_explorer_app_rows_read": get_teams_with_hogql_metric(
+        "teams_with_event_explorer_app_rows_read": partial(
+            get_teams_with_hogql_metric,
             period_start,
             period_end,
             metric="read_rows",
             query_types=["EventsQuery"],
             access_method="",
         ),
-        "teams_with_event_explorer_app_duration_ms": get_teams_with_hogql_metric(
+        "teams_with_event_explorer_app_duration_ms": partial(
+            get_teams_with_hogql_metric,
             period_start,
             period_end,
             metric="query_duration_ms",
             query_types=["EventsQuery"],
             access_method="",
         ),
-        "teams_with_event_explorer_api_bytes_read": get_teams_with_hogql_metric(
+        "teams_with_event_explorer_api_bytes_read": partial(
+            get_teams_with_hogql_metric,
             period_start,
             period_end,
             metric="read_bytes",
             query_types=["EventsQuery"],
             access_method="personal_api_key",
         ),
-        "teams_with_event_explorer_api_rows_read": get_teams_with_hogql_metric(
+        "teams_with_event_explorer_api_rows_read": partial(
+            get_teams_with_hogql_metric,
             period_start,
             period_end,
             metric="read_rows",
             query_types=["EventsQuery"],
             access_method="personal_api_key",
         ),
-        "teams_with_event_explorer_api_duration_ms": get_teams_with_hogql_metric(
+        "teams_with_event_explorer_api_duration_ms": partial(
+            get_teams_with_hogql_metric,
             period_start,
             period_end,
             metric="query_duration_ms",
             query_types=["EventsQuery"],
             access_method="personal_api_key",
         ),
-        "teams_with_survey_responses_count_in_period": get_teams_with_survey_responses_count_in_period(
-            period_start, period_end
-        ),
-        "teams_with_rows_synced_in_period": get_teams_with_rows_synced_in_period(period_start, period_end),
+        "teams_with_rows_synced_in_period": partial(get_teams_with_rows_synced_in_period, period_start, period_end),
     }
 
+    executor = ThreadPoolExecutor(
+        max_workers=settings.USAGE_REPORT_MAX_CONCURRENT_QUERIES, thread_name_prefix="usage_report"
+    )
+    try:
+        clickhouse_results = _run_usage_queries_concurrently(executor, clickhouse_queries)
+
+        all_data: dict[str, Any] = {
+            "teams_with_group_types_total": list(
+                GroupTypeMapping.objects.values("team_id").annotate(total=Count("id")).order_by("team_id")
+            ),
+            "teams_with_dashboard_count": list(
+                Dashboard.objects.values("team_id").annotate(total=Count("id")).order_by("team_id")
+            ),
+            "teams_with_dashboard_template_count": list(
+                Dashboard.objects.filter(creation_mode="template")
+                .values("team_id")
+                .annotate(total=Count("id"))
+                .order_by("team_id")
+            ),
+            "teams_with_dashboard_shared_count": list(
+                Dashboard.objects.filter(sharingconfiguration__enabled=True)
+                .values("team_id")
+                .annotate(total=Count("id"))
+                .order_by("team_id")
+            ),
+            "teams_with_dashboard_tagged_count": list(
+                Dashboard.objects.filter(tagged_items__isnull=False)
+                .values("team_id")
+                .annotate(total=Count("id"))
+                .order_by("team_id")
+            ),
+            "teams_with_ff_count": list(
+                FeatureFlag.objects.values("team_id").annotate(total=Count("id")).order_by("team_id")
+            ),
+            "teams_with_ff_active_count": list(
+                FeatureFlag.objects.filter(active=True)
+                .values("team_id")
+                .annotate(total=Count("id"))
+                .order_by("team_id")
+            ),
+        }
+
+        for key, future in clickhouse_results.items():
+            if key == "teams_with_event_counters_in_period":
+                all_data.update(future.result())
+            else:
+                all_data[key] = future.result()
+    finally:
+        # Don't start any more queries if one of them failed, the whole report is retried
+        executor.shutdown(cancel_futures=True)
+
+    return all_data
+
 
 def _get_all_usage_data_as_team_rows(period_start: datetime, period_end: datetime) -> dict[str, Any]:
     """
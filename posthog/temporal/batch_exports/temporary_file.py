@@ -12,6 +12,7 @@ import typing
 import brotli
 import orjson
 import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.parquet as pq
 
 
@@ -26,14 +27,172 @@ def replace_broken_unicode(obj):
         return obj
 
 
-def json_dumps_bytes(d) -> bytes:
+def json_dumps_bytes(d, default: typing.Callable = str) -> bytes:
     try:
-        return orjson.dumps(d, default=str)
+        return orjson.dumps(d, default=default)
     except orjson.JSONEncodeError:
         # orjson is very strict about invalid unicode. This slow path protects us against
         # things we've observed in practice, like single surrogate codes, e.g. "\ud83d"
         cleaned_d = replace_broken_unicode(d)
-        return orjson.dumps(cleaned_d, default=str)
+        return orjson.dumps(cleaned_d, default=default)
+
+
+# Characters orjson escapes with a short sequence; other control characters are escaped as "\u00XX"
+_JSON_SHORT_ESCAPES = {"\b": "\\b", "\t": "\\t", "\n": "\\n", "\f": "\\f", "\r": "\\r"}
+_JSON_CONTROL_CHARACTERS = "[\\x00-\\x1f]"
+
+
+def _join(*parts: pa.Array | str | bytes) -> pa.Array:
+    """Concatenate arrays and literals element-wise, as `large_binary`. Any null part makes the result null."""
+    return pc.binary_join_element_wise(
+        *(
+            pa.scalar(part.encode("utf-8") if isinstance(part, str) else part, pa.large_binary())
+            if isinstance(part, str | bytes)
+            else pc.cast(part, pa.large_binary())
+            for part in parts
+        ),
+        pa.scalar(b"", pa.large_binary()),
+    )
+
+
+def _utf8_replace_all(array: pa.Array, replacements: collections.abc.Iterable[tuple[str, str]]) -> pa.Array:
+    for pattern, replacement in replacements:
+        array = pc.replace_substring(array, pattern, replacement)
+    return array
+
+
+def _json_string_fragments(array: pa.Array) -> pa.Array:
+    """Encode a string array as JSON strings, escaping exactly what orjson escapes."""
+    escaped = _utf8_replace_all(array, [("\\", "\\\\"), ('"', '\\"')])
+    if pc.any(pc.match_substring_regex(array, _JSON_CONTROL_CHARACTERS)).as_py():
+        escaped = _utf8_replace_all(
+            escaped,
+            ((chr(code), _JSON_SHORT_ESCAPES.get(chr(code), f"\\u{code:04x}")) for code in range(0x20)),
+        )
+    return _join('"', escaped, '"')
+
+
+def _timestamp_fragments(array: pa.Array) -> pa.Array:
+    """Encode a timestamp array as JSON strings, formatted like orjson formats the corresponding datetimes."""
+    seconds = pc.cast(pc.floor_temporal(array, unit="second"), pa.timestamp("s", tz=array.type.tz))
+    formatted = pc.strftime(seconds, format="%Y-%m-%dT%H:%M:%S")
+    microseconds = pc.subtract(
+        pc.cast(pc.cast(array, pa.timestamp("us", tz=array.type.tz)), pa.int64()),
+        pc.multiply(pc.cast(seconds, pa.int64()), 1_000_000),
+    )
+    fraction = pc.if_else(
+        pc.equal(microseconds, 0),
+        pa.scalar(b"", pa.large_binary()),
+        _join(".", pc.utf8_lpad(pc.cast(microseconds, pa.string()), 6, "0")),
+    )
+    offset = "" if array.type.tz is None else "+00:00"
+    return _join('"', formatted, fraction, offset + '"')
+
+
+def _json_fragments(array: pa.Array, default: typing.Callable) -> pa.Array:
+    """Encode each value of `array` as JSON, the same way `orjson.dumps` encodes the corresponding Python value.
+
+    Types with a vectorized encoding are encoded with Arrow compute functions. Everything else (e.g. floats,
+    whose formatting differs, or nested types) is encoded value by value.
+    """
+    if pa.types.is_string(array.type) or pa.types.is_large_string(array.type):
+        fragments = _json_string_fragments(array)
+    elif pa.types.is_integer(array.type):
+        fragments = pc.cast(array, pa.string())
+    elif pa.types.is_boolean(array.type):
+        fragments = pc.if_else(array, pa.scalar(b"true", pa.large_binary()), pa.scalar(b"false", pa.large_binary()))
+    elif (
+        pa.types.is_timestamp(array.type)
+        and array.type.unit in ("s", "ms", "us")
+        and array.type.tz in (None, "UTC", "utc", "+00:00", "Etc/UTC")
+    ):
+        fragments = _timestamp_fragments(array)
+    else:
+        fragments = pa.array(
+            [json_dumps_bytes(value, default=default) for value in array.to_pylist()], type=pa.large_binary()
+        )
+    return pc.fill_null(pc.cast(fragments, pa.large_binary()), pa.scalar(b"null", pa.large_binary()))
+
+
+def record_batch_to_jsonl(record_batch: pa.RecordBatch, default: typing.Callable = str) -> bytes:
+    """Serialize a record batch as JSON lines, column by column.
+
+    Produces the same bytes as calling `orjson.dumps` on each row of `record_batch.to_pylist()`, followed
+    by a newline, without creating Python objects for most columns.
+    """
+    if record_batch.num_rows == 0:
+        return b""
+    if record_batch.num_columns == 0:
+        return b"{}\n" * record_batch.num_rows
+
+    parts: list[pa.Array | bytes] = []
+    for index, (name, column) in enumerate(zip(record_batch.schema.names, record_batch.columns)):
+        parts.append((b"{" if index == 0 else b",") + orjson.dumps(name) + b":")
+        parts.append(_json_fragments(column, default))
+    parts.append(b"}\n")
+
+    return _concatenate_binary(_join(*parts))
+
+
+def _csv_text(array: pa.Array) -> pa.Array:
+    """The text `csv.writer` writes for each value of `array`, i.e. `str(value)`, or an empty string for nulls."""
+    if pa.types.is_string(array.type) or pa.types.is_large_string(array.type):
+        text = pc.cast(array, pa.large_string())
+    elif pa.types.is_integer(array.type):
+        text = pc.cast(array, pa.large_string())
+    elif pa.types.is_boolean(array.type):
+        text = pc.if_else(array, pa.scalar("True", pa.large_string()), pa.scalar("False", pa.large_string()))
+    else:
+        text = pa.array([None if value is None else str(value) for value in array.to_pylist()], pa.large_string())
+    return pc.fill_null(text, pa.scalar("", pa.large_string()))
+
+
+def record_batch_to_csv(
+    record_batch: pa.RecordBatch,
+    field_names: collections.abc.Sequence[str],
+    delimiter: str,
+    escape_char: str,
+    quote_char: str,
+    line_terminator: str,
+) -> bytes:
+    """Serialize a record batch as CSV rows, column by column.
+
+    Produces the same bytes as a `csv.DictWriter` with `quoting=csv.QUOTE_NONE`, which escapes the delimiter,
+    the quote and escape characters, and line terminator characters with `escape_char`. Columns not in
+    `field_names` are ignored, and missing ones are written empty.
+    """
+    if record_batch.num_rows == 0:
+        return b""
+
+    special_characters = [escape_char] + [
+        character for character in dict.fromkeys(delimiter + quote_char + line_terminator) if character != escape_char
+    ]
+    parts: list[pa.Array | str] = []
+    for index, field_name in enumerate(field_names):
+        if index > 0:
+            parts.append(delimiter)
+        if field_name not in record_batch.schema.names:
+            continue
+        parts.append(
+            _utf8_replace_all(
+                _csv_text(record_batch.column(field_name)),
+                ((character, escape_char + character) for character in special_characters),
+            )
+        )
+    parts.append(line_terminator)
+
+    lines = _join(*parts) if any(isinstance(part, pa.Array) for part in parts) else None
+    if lines is None:
+        return "".join(typing.cast(list[str], parts)).encode("utf-8") * record_batch.num_rows
+    return _concatenate_binary(lines)
+
+
+def _concatenate_binary(array: pa.Array) -> bytes:
+    """All values of a non-null `large_binary` array, concatenated. Cheap, as they are contiguous in its data buffer."""
+    _, offsets_buffer, data_buffer = array.buffers()
+    offsets = pa.Array.from_buffers(pa.int64(), len(array) + 1, [None, offsets_buffer], offset=array.offset)
+    start, end = offsets[0].as_py(), offsets[-1].as_py()
+    return data_buffer[start:end].to_pybytes()
 
 
 class BatchExportTemporaryFile:
@@ -445,8 +604,7 @@ class JSONLBatchExportWriter(BatchExportWriter):
 
     def _write_record_batch(self, record_batch: pa.RecordBatch) -> None:
         """Write records to a temporary file as JSONL."""
-        for record in record_batch.to_pylist():
-            self.write(record)
+        self.batch_export_file.write(record_batch_to_jsonl(record_batch, default=self.default))
 
 
 class CSVBatchExportWriter(BatchExportWriter):
@@ -498,7 +656,32 @@ class CSVBatchExportWriter(BatchExportWriter):
 
     def _write_record_batch(self, record_batch: pa.RecordBatch) -> None:
         """Write records to a temporary file as CSV."""
-        self.csv_writer.writerows(record_batch.to_pylist())
+        if self._can_write_vectorized(record_batch):
+            assert self.escape_char is not None
+            self.batch_export_file.write(
+                record_batch_to_csv(
+                    record_batch,
+                    field_names=self.field_names,
+                    delimiter=self.delimiter,
+                    escape_char=self.escape_char,
+                    quote_char=self.quote_char,
+                    line_terminator=self.line_terminator,
+                )
+            )
+        else:
+            self.csv_writer.writerows(record_batch.to_pylist())
+
+    def _can_write_vectorized(self, record_batch: pa.RecordBatch) -> bool:
+        """Whether `record_batch_to_csv` writes exactly what `csv_writer` would.
+
+        Other quoting modes, and cases where `csv_writer` raises (characters to escape without an escape
+        character, extra columns with `extras_action="raise"`, empty single field rows), go through `csv_writer`.
+        """
+        if self.quoting != csv.QUOTE_NONE or not self.escape_char or len(self.field_names) < 2:
+            return False
+        if self.extras_action == "raise" and not set(record_batch.schema.names) <= set(self.field_names):
+            return False
+        return True
 
 
 class ParquetBatchExportWriter(BatchExportWriter):
@@ -3,6 +3,7 @@ import datetime as dt
 import io
 import json
 
+import orjson
 import pyarrow as pa
 import pyarrow.parquet as pq
 import pytest
@@ -13,6 +14,8 @@ from posthog.temporal.batch_exports.temporary_file import (
     JSONLBatchExportWriter,
     ParquetBatchExportWriter,
     json_dumps_bytes,
+    record_batch_to_csv,
+    record_batch_to_jsonl,
 )
 
 
@@ -396,3 +399,72 @@ async def test_flushing_parquet_writer_resets_underlying_file(record_batch):
         assert writer.records_since_last_flush == 0
 
     assert flush_counter == 2
+
+
+TRICKY_STRINGS = ['a"b', "c\\d", None, "e\nf\r\t\x01\x1f\b\f", "ü,😀", "", '{"prop": 1}', "x|y\x7f"]
+TRICKY_RECORD_BATCH = pa.RecordBatch.from_pydict(
+    {
+        "string": pa.array(TRICKY_STRINGS),
+        "large_string": pa.array(TRICKY_STRINGS, type=pa.large_string()),
+        "int": pa.array([1, -2, None, 3, 2**62, 0, 7, 8]),
+        "uint": pa.array([1, 2, 3, 4, 5, 6, 7, 2**64 - 1], type=pa.uint64()),
+        "bool": pa.array([True, False, None, True, True, False, True, False]),
+        "float": pa.array([1.0, 1.5, None, float("nan"), 1e20, -0.0, 3.3, 2.0]),
+        "timestamp": pa.array(
+            [
+                dt.datetime(2023, 1, 1, tzinfo=dt.UTC),
+                dt.datetime(2023, 1, 1, 1, 2, 3, 4500, tzinfo=dt.UTC),
+                None,
+                dt.datetime(1969, 12, 31, 23, 59, 59, 999999, tzinfo=dt.UTC),
+                dt.datetime(2000, 2, 29, tzinfo=dt.UTC),
+                dt.datetime(2023, 1, 1, 0, 0, 0, 1, tzinfo=dt.UTC),
+                dt.datetime(9999, 12, 31, tzinfo=dt.UTC),
+                dt.datetime(1900, 1, 1, 0, 0, 0, 500000, tzinfo=dt.UTC),
+            ],
+            type=pa.timestamp("us", tz="UTC"),
+        ),
+        "naive_timestamp": pa.array([dt.datetime(2023, 1, 1, 0, 0, 0, 123000)] * 8, type=pa.timestamp("ms")),
+        "list": pa.array([[1, 2], None, [], [3], [4], [5], [6], [7]]),
+        'key with "quotes"': pa.array(range(8)),
+    }
+)
+
+
+@pytest.mark.parametrize("record_batch", [TRICKY_RECORD_BATCH, TRICKY_RECORD_BATCH.slice(3, 2), *TEST_RECORD_BATCHES])
+def test_record_batch_to_jsonl_matches_serializing_row_by_row(record_batch):
+    """Test the vectorized JSONL serialization produces the same bytes as orjson does for each row."""
+    expected = b"".join(orjson.dumps(record, default=str) + b"\n" for record in record_batch.to_pylist())
+
+    assert record_batch_to_jsonl(record_batch) == expected
+
+
+@pytest.mark.parametrize(
+    "delimiter,quote_char,line_terminator",
+    [(",", '"', "\n"), ("|", "'", "\r\n"), ("\t", '"', "\n")],
+)
+def test_record_batch_to_csv_matches_csv_writer(delimiter, quote_char, line_terminator):
+    """Test the vectorized CSV serialization produces the same output as `csv.DictWriter`."""
+    field_names = ["string", "int", "bool", "float", "timestamp", "missing"]
+    expected = io.StringIO()
+    writer = csv.DictWriter(
+        expected,
+        fieldnames=field_names,
+        extrasaction="ignore",
+        delimiter=delimiter,
+        quotechar=quote_char,
+        escapechar="\\",
+        quoting=csv.QUOTE_NONE,
+        lineterminator=line_terminator,
+    )
+    writer.writerows(TRICKY_RECORD_BATCH.to_pylist())
+
+    written = record_batch_to_csv(
+        TRICKY_RECORD_BATCH,
+        field_names,
+        delimiter=delimiter,
+        escape_char="\\",
+        quote_char=quote_char,
+        line_terminator=line_terminator,
+    )
+
+    assert written == expected.getvalue().encode("utf-8")
@@ -0,0 +1,164 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posthog.models import Cohort, FeatureFlag, GroupTypeMapping, Person
+from posthog.models.feature_flag.bulk_flag_matching import (
+    BulkFeatureFlagMatcher,
+    get_all_feature_flags_for_distinct_ids,
+)
+from posthog.models.feature_flag.feature_flag import FeatureFlagHashKeyOverride
+from posthog.models.feature_flag.flag_matching import get_all_feature_flags
+from posthog.models.group import Group
+from posthog.test.base import BaseTest
+
+
+@patch("posthog.models.feature_flag.bulk_flag_matching.postgres_healthcheck.is_connected", return_value=True)
+@patch("posthog.models.feature_flag.flag_matching.postgres_healthcheck.is_connected", return_value=True)
+class TestBulkFeatureFlagMatcher(BaseTest):
+    maxDiff = None
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def create_feature_flag(self, key: str, **kwargs) -> FeatureFlag:
+        return FeatureFlag.objects.create(team=self.team, name=key, key=key, created_by=self.user, **kwargs)
+
+    def create_flags(self):
+        GroupTypeMapping.objects.create(team=self.team, group_type="organization", group_type_index=0)
+        Group.objects.create(
+            team=self.team, group_type_index=0, group_key="acme", group_properties={"plan": "enterprise"}, version=1
+        )
+        cohort = Cohort.objects.create(
+            team=self.team,
+            groups=[
+                {"properties": [{"key": "email", "value": "@posthog.com", "type": "person", "operator": "icontains"}]}
+            ],
+        )
+        person = Person.objects.create(
+            team=self.team, distinct_ids=["alice", "alice-2"], properties={"email": "alice@posthog.com"}
+        )
+        Person.objects.create(team=self.team, distinct_ids=["bob"], properties={"email": "bob@example.com", "age": 30})
+        Person.objects.create(team=self.team, distinct_ids=["carol"], properties={"email": "carol@posthog.com"})
+
+        self.create_feature_flag("everyone", filters={"groups": [{"properties": [], "rollout_percentage": None}]})
+        self.create_feature_flag("half", filters={"groups": [{"properties": [], "rollout_percentage": 50}]})
+        self.create_feature_flag(
+            "variants",
+            filters={
+                "groups": [{"properties": [], "rollout_percentage": 100}],
+                "multivariate": {
+                    "variants": [
+                        {"key": "control", "rollout_percentage": 50},
+                        {"key": "test", "rollout_percentage": 50},
+                    ]
+                },
+                "payloads": {"test": {"color": "blue"}},
+            },
+        )
+        self.create_feature_flag(
+            "email",
+            filters={
+                "groups": [
+                    {
+                        "properties": [
+                            {"key": "email", "value": "posthog.com", "type": "person", "operator": "icontains"}
+                        ],
+                        "rollout_percentage": 60,
+                    }
+                ]
+            },
+        )
+        self.create_feature_flag(
+            "older",
+            filters={"groups": [{"properties": [{"key": "age", "value": 20, "type": "person", "operator": "gt"}]}]},
+        )
+        self.create_feature_flag(
+            "no-email",
+            filters={"groups": [{"properties": [{"key": "email", "type": "person", "operator": "is_not_set"}]}]},
+        )
+        self.create_feature_flag(
+            "cohort",
+            filters={"groups": [{"properties": [{"key": "id", "value": cohort.pk, "type": "cohort"}]}]},
+        )
+        self.create_feature_flag(
+            "enterprise",
+            filters={
+                "aggregation_group_type_index": 0,
+                "groups": [
+                    {"properties": [{"key": "plan", "value": "enterprise", "type": "group", "group_type_index": 0}]}
+                ],
+            },
+        )
+        self.create_feature_flag(
+            "by-distinct-id",
+            filters={
+                "groups": [
+                    {"properties": [{"key": "distinct_id", "value": ["bob"], "type": "person", "operator": "exact"}]}
+                ]
+            },
+        )
+        self.create_feature_flag(
+            "continuity",
+            ensure_experience_continuity=True,
+            filters={"groups": [{"properties": [], "rollout_percentage": 50}]},
+        )
+        FeatureFlagHashKeyOverride.objects.create(
+            team=self.team, person=person, feature_flag_key="continuity", hash_key="anonymous"
+        )
+
+    def test_matches_evaluating_each_distinct_id(self, *args):
+        self.create_flags()
+        distinct_ids = ["alice", "alice-2", "bob", "carol", "not-ingested", *[f"user-{i}" for i in range(20)]]
+
+        matches = get_all_feature_flags_for_distinct_ids(self.team.pk, distinct_ids, {"organization": "acme"})
+
+        self.assertEqual(list(matches.keys()), distinct_ids)
+        for distinct_id in distinct_ids:
+            expected = get_all_feature_flags(self.team.pk, distinct_id, {"organization": "acme"})
+            self.assertEqual(matches[distinct_id], expected, distinct_id)
+
+    def test_queries_per_batch(self, *args):
+        self.create_flags()
+        # Everything but the flag on the distinct_id property, which is evaluated for each distinct_id
+        flags = list(FeatureFlag.objects.filter(team=self.team).exclude(key="by-distinct-id"))
+        distinct_ids = ["alice", "bob", *[f"user-{i}" for i in range(50)]]
+
+        with CaptureQueriesContext(connection) as few:
+            BulkFeatureFlagMatcher(flags, distinct_ids[:2], {"organization": "acme"}).get_matches()
+        with CaptureQueriesContext(connection) as many:
+            BulkFeatureFlagMatcher(flags, distinct_ids, {"organization": "acme"}).get_matches()
+        with CaptureQueriesContext(connection) as batched:
+            BulkFeatureFlagMatcher(flags, distinct_ids, {"organization": "acme"}, batch_size=10).get_matches()
+
+        def queries_from(context: CaptureQueriesContext, table: str) -> int:
+            return len([query for query in context.captured_queries if f'FROM "{table}" ' in query["sql"]])
+
+        self.assertEqual(len(many), len(few))
+        # The persons are queried for each batch, the group once
+        self.assertEqual(queries_from(batched, "posthog_person"), 6)
+        self.assertEqual(queries_from(batched, "posthog_group"), queries_from(many, "posthog_group"))
+
+    def test_flags_that_dont_need_the_database_are_evaluated_when_it_is_down(self, *args):
+        self.create_flags()
+        flags = list(FeatureFlag.objects.filter(team=self.team))
+
+        matches = BulkFeatureFlagMatcher(flags, ["alice", "bob"], skip_database_flags=True).get_matches()
+
+        for distinct_id in ("alice", "bob"):
+            flag_values, _, _, errors = matches[distinct_id]
+            self.assertTrue(errors)
+            self.assertEqual(flag_values["everyone"], True)
+            self.assertNotIn("continuity", flag_values)
+            self.assertNotIn("enterprise", flag_values)
+        self.assertEqual(matches["bob"][0]["by-distinct-id"], True)
+        self.assertEqual(matches["alice"][0]["by-distinct-id"], False)
+
+    def test_no_flags(self, *args):
+        self.assertEqual(
+            get_all_feature_flags_for_distinct_ids(self.team.pk, ["alice", "bob"]),
+            {"alice": ({}, {}, {}, False), "bob": ({}, {}, {}, False)},
+        )
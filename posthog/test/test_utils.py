@@ -1,13 +1,18 @@
+import base64
+import gzip
+import json
 from datetime import datetime
 from unittest.mock import call, patch
 from zoneinfo import ZoneInfo
 
 import pytest
+from django.core.exceptions import RequestDataTooBig
 from django.core.handlers.wsgi import WSGIRequest
 from django.http import HttpRequest
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.test.client import RequestFactory
 from freezegun import freeze_time
+from parameterized import parameterized
 from rest_framework.request import Request
 
 from posthog.api.test.mock_sentry import mock_sentry_context_for_tagging
@@ -18,6 +23,7 @@ from posthog.test.base import BaseTest
 from posthog.utils import (
     PotentialSecurityProblemException,
     absolute_uri,
+    decompress,
     flatten,
     format_query_params_absolute_url,
     get_available_timezones_with_offsets,
@@ -393,14 +399,14 @@ class TestLoadDataFromRequest(TestCase):
             str(ctx.exception),
         )
 
-    @patch("posthog.utils.gzip")
-    def test_can_decompress_gzipped_body_received_with_no_compression_flag(self, patched_gzip):
+    @patch("posthog.utils.gunzip")
+    def test_can_decompress_gzipped_body_received_with_no_compression_flag(self, patched_gunzip):
         # see https://sentry.io/organizations/posthog2/issues/3136510367
         # one organization is causing a request parsing error by sending an encoded body
         # but the empty string for the compression value
         # this accounts for a large majority of our Sentry errors
 
-        patched_gzip.decompress.return_value = '{"what is it": "the decompressed value"}'
+        patched_gunzip.return_value = b'{"what is it": "the decompressed value"}'
 
         rf = RequestFactory()
         # a request with no compression set
@@ -410,6 +416,45 @@ class TestLoadDataFromRequest(TestCase):
         self.assertEqual({"what is it": "the decompressed value"}, data)
 
 
+CAPTURED_EVENT = {"event": "$pageview", "properties": {"emoji": "💻"}}
+CAPTURED_EVENT_JSON = json.dumps(CAPTURED_EVENT, ensure_ascii=False).encode()
+
+
+class TestDecompress(TestCase):
+    @parameterized.expand(
+        [
+            ("json", CAPTURED_EVENT_JSON, ""),
+            ("gzip", gzip.compress(CAPTURED_EVENT_JSON), "gzip"),
+            ("gzip-js", gzip.compress(CAPTURED_EVENT_JSON), "gzip-js"),
+            ("base64", base64.b64encode(CAPTURED_EVENT_JSON), ""),
+            ("base64 form field", base64.b64encode(CAPTURED_EVENT_JSON).decode(), ""),
+        ]
+    )
+    def test_decodes_each_compression(self, _name: str, data: bytes | str, compression: str) -> None:
+        self.assertEqual(decompress(data, compression), CAPTURED_EVENT)
+
+    def test_parses_short_json_that_is_also_valid_base64(self) -> None:
+        self.assertEqual(decompress(b'{"a":1}', ""), {"a": 1})
+
+    def test_parses_what_orjson_rejects_as_json_does(self) -> None:
+        self.assertEqual(
+            decompress(b'{"a": NaN, "b": 18446744073709551616, "c": "\\ud800"}', ""),
+            {"a": None, "b": 2**64, "c": "\ud800"},
+        )
+
+    def test_decompresses_multi_member_gzip(self) -> None:
+        data = gzip.compress(b'{"event": ') + gzip.compress(b'"$pageview"}')
+
+        self.assertEqual(decompress(data, "gzip-js"), {"event": "$pageview"})
+
+    @override_settings(DATA_UPLOAD_MAX_DECOMPRESSED_SIZE=1000)
+    def test_rejects_gzip_that_decompresses_to_more_than_the_max_size(self) -> None:
+        data = gzip.compress(b'{"a": "' + b"a" * 1000 + b'"}')
+
+        with self.assertRaises(RequestDataTooBig):
+            decompress(data, "gzip")
+
+
 class TestShouldRefresh(TestCase):
     def test_refresh_requested_by_client_with_refresh_true(self):
         request = HttpRequest()
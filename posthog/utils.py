@@ -28,6 +28,7 @@ from urllib.parse import urljoin, urlparse
 from zoneinfo import ZoneInfo
 
 import lzstring
+import orjson
 import posthoganalytics
 import pytz
 import structlog
@@ -38,11 +39,13 @@ from dateutil import parser
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
 from django.core.cache import cache
+from django.core.exceptions import RequestDataTooBig
 from django.db.utils import DatabaseError
 from django.http import HttpRequest, HttpResponse
 from django.template.loader import get_template
 from django.utils import timezone
 from django.utils.cache import patch_cache_control
+from prometheus_client import Counter, Histogram
 from rest_framework.request import Request
 from sentry_sdk import configure_scope
 from sentry_sdk.api import capture_exception
@@ -597,22 +600,106 @@ def get_celery_heartbeat() -> Union[str, int]:
     return "offline"
 
 
-def base64_decode(data):
+REQUEST_DECODE_TIMING = Histogram(
+    "posthog_request_decode_seconds",
+    "Time spent decompressing and parsing the JSON body of capture and decide requests",
+    labelnames=["compression"],
+)
+REQUEST_DECODE_FAILURES = Counter(
+    "posthog_request_decode_failures_total",
+    "Capture and decide request bodies that could not be decompressed or parsed",
+    labelnames=["compression"],
+)
+# clients can send anything as the compression, so anything else is counted as "other"
+KNOWN_COMPRESSIONS = {"gzip", "gzip-js", "lz64", ""}
+# JSON objects and arrays, as opposed to base64 which never contains either bracket
+LOOKS_LIKE_JSON_BYTES = re.compile(rb"\s*[\[{]")
+LOOKS_LIKE_JSON_STR = re.compile(r"\s*[\[{]")
+GZIP_CHUNK_SIZE = 1024 * 1024
+
+
+def gunzip(data: bytes, max_size: int) -> bytes:
     """
-    Decodes base64 bytes into string taking into account necessary transformations to match client libraries.
+    Decompresses (possibly multi-member) gzip data a chunk at a time,
+    raising RequestDataTooBig as soon as the output exceeds max_size rather than once it has all been inflated.
     """
-    if not isinstance(data, str):
-        data = data.decode()
+    chunks: list[bytes] = []
+    size = 0
+    while True:
+        if data[:2] != b"\037\213":
+            # the same as gzip.decompress raises
+            raise gzip.BadGzipFile(f"Not a gzipped file ({data[:2]!r})")
+        decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+        while data:
+            chunk = decompressor.decompress(data, GZIP_CHUNK_SIZE)
+            size += len(chunk)
+            if size > max_size:
+                raise RequestDataTooBig("Decompressed request body exceeded DATA_UPLOAD_MAX_DECOMPRESSED_SIZE.")
+            chunks.append(chunk)
+            if decompressor.eof:
+                break
+            data = decompressor.unconsumed_tail
+        if not decompressor.eof:
+            # the same as gzip.decompress raises
+            raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+        data = decompressor.unused_data
+        if not data:
+            return b"".join(chunks)
+
+
+def parse_json(data: Union[str, bytes]) -> Any:
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        # orjson rejects NaN and Infinity, lone surrogates and integers wider than 64 bits, which json parses.
+        # parse_constant gets called in case of NaN, Infinity etc
+        # default behaviour is to put those into the DB directly
+        # but we just want it to return None
+        return json.loads(data, parse_constant=lambda x: None)
 
-    data = base64.b64decode(data.replace(" ", "+") + "===")
 
-    return data.decode("utf8", "surrogatepass").encode("utf-16", "surrogatepass")
+def _parse_base64_json(data: Union[str, bytes]) -> tuple[bool, Any]:
+    """
+    Parses data as base64 wrapped JSON, returning whether it was base64 and what it held
+    """
+    # anything else isn't base64, so the JSON is parsed from it as is
+    if not data.isascii():
+        return False, None
+    if isinstance(data, str):
+        data = data.encode()
+    try:
+        decoded = base64.b64decode(data.replace(b" ", b"+") + b"===")
+    except ValueError:
+        return False, None
+
+    try:
+        # valid UTF-8, i.e. nearly always, can be parsed as is
+        return True, orjson.loads(decoded)
+    except orjson.JSONDecodeError:
+        pass
+
+    # otherwise it can hold surrogates encoded by client libraries, which utf-16 needs to pair back up
+    try:
+        utf16_encoded = decoded.decode("utf8", "surrogatepass").encode("utf-16", "surrogatepass")
+    except Exception:
+        return False, None
+    return True, json.loads(utf16_encoded, parse_constant=lambda x: None)
 
 
 def decompress(data: Any, compression: str):
     if not data:
         return None
 
+    label = compression if compression in KNOWN_COMPRESSIONS else "other"
+    try:
+        with REQUEST_DECODE_TIMING.labels(compression=label or "none").time():
+            return _decompress(data, compression)
+    except Exception:
+        REQUEST_DECODE_FAILURES.labels(compression=label or "none").inc()
+        raise
+
+
+def _decompress(data: Any, compression: str):
     if compression == "gzip" or compression == "gzip-js":
         if data == b"undefined":
             raise RequestParsingError(
@@ -620,7 +707,7 @@ def decompress(data: Any, compression: str):
             )
 
         try:
-            data = gzip.decompress(data)
+            data = gunzip(data, max_size=settings.DATA_UPLOAD_MAX_DECOMPRESSED_SIZE)
         except (EOFError, OSError, zlib.error) as error:
             raise RequestParsingError("Failed to decompress data. {}".format(str(error)))
 
@@ -637,25 +724,23 @@ def decompress(data: Any, compression: str):
 
         data = data.encode("utf-16", "surrogatepass").decode("utf-16")
 
-    base64_decoded = None
+    # TODO: data can also be an array, function assumes it's either None or a dictionary.
     try:
-        base64_decoded = base64_decode(data)
-        KLUDGES_COUNTER.labels(kludge="base64_after_decompression_" + compression).inc()
-    except Exception:
-        pass
+        # base64 never starts with a bracket, so JSON needn't be tried as base64 first
+        looks_like_json = (LOOKS_LIKE_JSON_STR if isinstance(data, str) else LOOKS_LIKE_JSON_BYTES).match(data)
+        if looks_like_json:
+            return parse_json(data)
 
-    if base64_decoded:
-        data = base64_decoded
+        is_base64, parsed = _parse_base64_json(data)
+        if is_base64:
+            KLUDGES_COUNTER.labels(kludge="base64_after_decompression_" + compression).inc()
+            return parsed
 
-    try:
-        # parse_constant gets called in case of NaN, Infinity etc
-        # default behaviour is to put those into the DB directly
-        # but we just want it to return None
-        data = json.loads(data, parse_constant=lambda x: None)
+        return parse_json(data)
     except (json.JSONDecodeError, UnicodeDecodeError) as error_main:
         if compression == "":
             try:
-                fallback = decompress(data, "gzip")
+                fallback = _decompress(data, "gzip")
                 KLUDGES_COUNTER.labels(kludge="unspecified_gzip_fallback").inc()
                 return fallback
             except Exception as inner:
@@ -664,9 +749,6 @@ def decompress(data: Any, compression: str):
         else:
             raise RequestParsingError("Invalid JSON: {}".format(str(error_main)))
 
-    # TODO: data can also be an array, function assumes it's either None or a dictionary.
-    return data
-
 
 # Used by non-DRF endpoints from capture.py and decide.py (/decide, /batch, /capture, etc)
 def load_data_from_request(request):